@@ -0,0 +1,73 @@
+"""
+Output size of the full versus the compact (short-key) plan format.
+
+Plans from the rule-based generator stand in for provider answers. Each plan
+is serialized in both formats and its output tokens are estimated. The wall
+time a provider needs to emit them is derived from a decode rate, and the
+measured cost of expanding the compact form locally is added on top.
+
+Token counts use the usual estimate of about four characters per token;
+compare with the usage providers report to calibrate.
+
+Usage:
+    python benchmarks/bench_compact_output.py --plans 50 --tokens-per-second 60
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.ai.compact import compact_plan_data, expand_plan_data
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+from bench_generation import make_profiles
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, round(len(text) / 4))
+
+
+def measure(plan_type: str, plans, tokens_per_second: float) -> None:
+    full_key = "sessions" if plan_type == "workout" else "daily_plans"
+    full_tokens, compact_tokens, expand_ms = [], [], []
+    for plan in plans:
+        full = {full_key: plan[full_key]}
+        compact_text = json.dumps(compact_plan_data(plan_type, full), separators=(",", ":"))
+        full_tokens.append(estimate_tokens(json.dumps(full, separators=(",", ":"))))
+        compact_tokens.append(estimate_tokens(compact_text))
+
+        started = time.perf_counter()
+        expand_plan_data(plan_type, json.loads(compact_text))
+        expand_ms.append((time.perf_counter() - started) * 1000)
+
+    full_mean = statistics.mean(full_tokens)
+    compact_mean = statistics.mean(compact_tokens)
+    full_s = full_mean / tokens_per_second
+    compact_s = compact_mean / tokens_per_second + statistics.mean(expand_ms) / 1000
+    print(
+        f"{plan_type:9} tokens full={full_mean:.0f} compact={compact_mean:.0f} "
+        f"(-{1 - compact_mean / full_mean:.0%}) | decode full={full_s:.1f}s compact={compact_s:.1f}s "
+        f"| expand={statistics.mean(expand_ms):.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output tokens of full versus compact plans")
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rules = RuleBasedAIService()
+    profiles = make_profiles(args.plans, random.Random(args.seed))
+    measure("workout", [rules.generate_workout_plan(p) for p in profiles], args.tokens_per_second)
+    measure("nutrition", [rules.generate_nutrition_plan(p) for p in profiles], args.tokens_per_second)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Load test of the plan-generation pipeline against the replay provider.
+
+Runs entirely offline: an in-memory SQLite database, synthetic users and
+recorded provider responses. If the corpus file does not exist it is seeded
+from the rule-based generator, so the benchmark works on a fresh checkout.
+
+Usage:
+    python benchmarks/bench_generation.py --requests 200 --concurrency 20 \
+        --latency lognormal:0,0.5 --error-rate 0.05 --truncation-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.application.planning_service import PlanningService
+from src.domain.models import User, UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import WORKOUT_SYSTEM_MESSAGE, NUTRITION_SYSTEM_MESSAGE
+from src.infrastructure.ai.circuit_breaker import CircuitBreakerRegistry
+from src.infrastructure.ai.fallback import FallbackAIService
+from src.infrastructure.ai.metrics import LatencyTracker, _percentile
+from src.infrastructure.ai.provider_router import ProviderRouter
+from src.infrastructure.ai.replay import ReplayAIService, ReplayCorpus
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+from src.infrastructure.database import Base
+from src.infrastructure.repositories import (
+    SqlAlchemyUserRepository, SqlAlchemyWorkoutPlanRepository, SqlAlchemyNutritionPlanRepository
+)
+
+
+def make_profiles(count: int, rng: random.Random):
+    injuries = [[], [], ["knee"], ["lower back"], ["shoulder"]]
+    restrictions = [[], [], ["vegan"], ["gluten free"], ["lactose intolerant"]]
+    return [
+        UserProfile(
+            age=rng.randint(18, 65),
+            weight=round(rng.uniform(50, 110), 1),
+            height=round(rng.uniform(150, 195), 1),
+            gender=rng.choice(["male", "female"]),
+            goal=rng.choice(list(Goal)),
+            activity_level=rng.choice(list(ActivityLevel)),
+            dietary_restrictions=rng.choice(restrictions),
+            injuries=rng.choice(injuries),
+        )
+        for _ in range(count)
+    ]
+
+
+def seed_corpus(corpus: ReplayCorpus, profiles, rng: random.Random) -> None:
+    """Record rule-based plans as if they were provider answers"""
+    rules = RuleBasedAIService()
+    prompts = ReplayAIService(corpus)
+    for profile in profiles:
+        workout = {'sessions': rules.generate_workout_plan(profile)['sessions']}
+        nutrition = {'daily_plans': rules.generate_nutrition_plan(profile)['daily_plans']}
+        corpus.add(prompts._build_workout_prompt(profile), WORKOUT_SYSTEM_MESSAGE, json.dumps(workout), rng.lognormvariate(1.5, 0.5))
+        corpus.add(prompts._build_nutrition_prompt(profile), NUTRITION_SYSTEM_MESSAGE, json.dumps(nutrition), rng.lognormvariate(1.8, 0.5))
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    corpus = ReplayCorpus(args.corpus)
+    if len(corpus) == 0:
+        print(f"Seeding {args.corpus} from the rule-based generator")
+        seed_corpus(corpus, make_profiles(20, rng), rng)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user_repo = SqlAlchemyUserRepository(db)
+
+    user_ids = []
+    for profile in make_profiles(args.requests, rng):
+        user = User(id=str(uuid.uuid4()), username=f"bench-{uuid.uuid4().hex[:8]}", profile=profile)
+        user_repo.save(user)
+        user_ids.append(user.id)
+
+    replay = ReplayAIService(
+        corpus,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        truncation_rate=args.truncation_rate,
+        seed=args.seed
+    )
+    breakers = CircuitBreakerRegistry()
+    ai_service = FallbackAIService(
+        ProviderRouter([replay], breakers, LatencyTracker()),
+        RuleBasedAIService(),
+        timeout_seconds=args.timeout
+    )
+    service = PlanningService(
+        ai_service,
+        SqlAlchemyWorkoutPlanRepository(db),
+        SqlAlchemyNutritionPlanRepository(db),
+        user_repo
+    )
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def one(user_id: str):
+        nonlocal failures
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                if args.plan_type == "workout":
+                    await service.generate_workout_plan_async(user_id)
+                else:
+                    await service.generate_nutrition_plan_async(user_id)
+                latencies.append(time.monotonic() - started)
+            except Exception:
+                failures += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(one(user_id) for user_id in user_ids))
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency}")
+    print(f"elapsed={elapsed:.2f}s throughput={args.requests / elapsed:.1f} req/s failures={failures}")
+    for q in (50, 95, 99):
+        value = _percentile(latencies, q)
+        print(f"p{q}={value:.3f}s" if value is not None else f"p{q}=n/a")
+    print(f"breakers={breakers.snapshot()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of plan generation")
+    parser.add_argument("--corpus", default="data/ai_corpus.jsonl")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--plan-type", choices=("workout", "nutrition"), default="workout")
+    parser.add_argument("--latency", default="lognormal:0,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncation-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-request overhead of building AI provider clients versus reusing them.
+
+Two measurements, both offline:
+  1. Building the AI service stack (genai.configure, GenerativeModel, the
+     composites around it) per request, as get_ai_service() used to, against
+     the process-wide instance it now returns.
+  2. A fresh HTTP client per call against one pooled keep-alive client,
+     talking to a local server, to show the connection set-up that pooling
+     saves. Remote providers add a TLS handshake on top of this.
+
+Usage:
+    python benchmarks/bench_provider_clients.py --iterations 200
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+warnings.filterwarnings("ignore", category=FutureWarning)
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+
+import httpx
+
+from src.dependencies import get_ai_service, get_remote_providers
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"choices": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn, iterations: int) -> float:
+    """Mean milliseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+
+def bench_service_construction(iterations: int) -> None:
+    def per_request():
+        get_ai_service.cache_clear()
+        get_remote_providers.cache_clear()
+        get_ai_service()
+
+    built = timed(per_request, iterations)
+    get_ai_service()
+    reused = timed(get_ai_service, iterations)
+    print(f"service stack: per-request={built:.3f}ms reused={reused:.4f}ms")
+
+
+def bench_http_connections(iterations: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), JsonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    payload = {"model": "benchmark", "messages": []}
+
+    def per_request():
+        with httpx.Client() as client:
+            client.post(url, json=payload)
+
+    pooled = httpx.Client(limits=httpx.Limits(max_keepalive_connections=10))
+    fresh = timed(per_request, iterations)
+    reused = timed(lambda: pooled.post(url, json=payload), iterations)
+    pooled.close()
+    server.shutdown()
+    print(f"http call:     per-request={fresh:.3f}ms reused={reused:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provider client construction overhead")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    bench_service_construction(args.iterations)
+    bench_http_connections(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
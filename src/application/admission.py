@@ -0,0 +1,143 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class Overloaded(Exception):
+    """A generation was refused because too much AI work is already in flight"""
+
+    def __init__(self, reason: str, retry_after_seconds: float):
+        super().__init__(reason)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Caps concurrent plan generations and sheds load when they get slow.
+
+    Up to max_in_flight generations run at once; up to max_queue more wait
+    (at most queue_timeout_seconds) for a slot. Beyond that, or while the p95
+    duration of generations finished in the last latency_window_seconds is
+    above max_latency_seconds, new generations are refused with Overloaded
+    instead of piling up behind a slow provider. Slow samples age out of the
+    window, so admission resumes by itself once nothing slow has finished for
+    a while.
+    """
+
+    # Finished generations needed before the latency threshold applies
+    MIN_LATENCY_SAMPLES = 5
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int = 0,
+        queue_timeout_seconds: float = 10.0,
+        max_latency_seconds: float = 0,
+        latency_window_seconds: float = 60.0,
+        retry_after_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.max_latency_seconds = max_latency_seconds
+        self.latency_window_seconds = latency_window_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: Deque[Future] = deque()
+        self._durations: Deque[Tuple[float, float]] = deque()  # (finished at, seconds)
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> float:
+        """
+        Take a generation slot, waiting in the queue if all are busy.
+
+        Returns:
+            The clock time the slot was taken, to pass to release()
+
+        Raises:
+            Overloaded: If the queue is full, the wait times out or generations are too slow
+        """
+        with self._lock:
+            p95 = self._recent_p95()
+            if self.max_latency_seconds > 0 and p95 is not None and p95 > self.max_latency_seconds:
+                self.rejected += 1
+                raise Overloaded(f"Generations are slow (p95 {p95:.1f}s)", self.retry_after_seconds)
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                self.admitted += 1
+                return self.clock()
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Too many generations in progress", self.retry_after_seconds)
+            waiter = Future()
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(waiter), self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    # Cancelling wait_for may already have cancelled the waiter
+                    waiter.cancel()
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+            if granted:
+                # The slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded("Timed out waiting for a generation slot", self.retry_after_seconds)
+        with self._lock:
+            self.admitted += 1
+        return self.clock()
+
+    def release(self, started: float) -> None:
+        """Give back the slot taken at started, recording how long the generation held it"""
+        now = self.clock()
+        with self._lock:
+            self._durations.append((now, now - started))
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            # Hand the slot straight to the longest waiter so newcomers can't jump the queue
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(None)
+                    return
+            self._in_flight -= 1
+
+    def _recent_p95(self) -> Optional[float]:
+        cutoff = self.clock() - self.latency_window_seconds
+        while self._durations and self._durations[0][0] < cutoff:
+            self._durations.popleft()
+        if len(self._durations) < self.MIN_LATENCY_SAMPLES:
+            return None
+        durations = sorted(seconds for _, seconds in self._durations)
+        return durations[max(1, math.ceil(0.95 * len(durations))) - 1]
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            p95 = self._recent_p95()
+            return {
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "recent_p95_seconds": round(p95, 3) if p95 is not None else None,
+                "max_latency_seconds": self.max_latency_seconds,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,29 @@
+"""
+Blocking repository work called from async code.
+
+The async generation paths run on the event loop, but the repositories use
+a synchronous DB session. BlockingCalls moves each call to a worker thread
+so a slow query does not hold up every other request on the loop. The
+repositories of one request share a single session, which must never be
+used by two threads at once, so the calls made through one BlockingCalls go
+one at a time; concurrent generations of a bulk request take turns.
+"""
+import asyncio
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+
+class BlockingCalls:
+    """Runs blocking calls in a worker thread, one at a time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        def locked():
+            with self._lock:
+                return fn(*args)
+        # to_thread copies the context, so the deadline and usage scope stay current
+        return await asyncio.to_thread(locked)
@@ -0,0 +1,96 @@
+"""
+Per-request time budget for AI generation.
+
+A Deadline is opened when a request arrives and made current while
+PlanningService works on it. The AI layer reads it through call_timeout(), so
+every provider call, retry and repair is bounded by what is left of the
+request rather than by its own fixed timeout, and nothing is sent to a
+provider once the budget is spent.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class DeadlineExceeded(ValueError):
+    """The request's time budget ran out; handled like any other provider failure"""
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must be answered"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Request time budget of {self.seconds:g}s exceeded")
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Make the deadline current for the calls made inside the block"""
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def call_timeout(limit: float) -> float:
+    """
+    Timeout for the next AI call: the limit, shortened to what is left of the
+    current deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return limit
+    deadline.check()
+    return min(limit, deadline.remaining())
+
+
+async def iterate_within(stream: AsyncIterator[T], deadline: Optional[Deadline]) -> AsyncIterator[T]:
+    """
+    Items of the stream, each produced with the deadline current.
+
+    The wait for the first item is left to the AI layer, which can still fall
+    back when the budget runs out. Once items have been shown nothing can
+    fall back, so the rest must arrive before the deadline.
+    """
+    first = True
+    while True:
+        # Set and reset within one step: the caller may resume us from another task
+        with deadline_scope(deadline):
+            try:
+                if first or deadline is None:
+                    item = await stream.__anext__()
+                else:
+                    item = await asyncio.wait_for(stream.__anext__(), deadline.remaining())
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Request time budget of {deadline.seconds:g}s exceeded")
+        first = False
+        yield item
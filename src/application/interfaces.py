@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List
 from src.domain.models import UserProfile
 
 class AIService(ABC):
@@ -10,3 +10,91 @@ class AIService(ABC):
     @abstractmethod
     def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
         pass
+
+class AsyncAIService(ABC):
+    """Non-blocking variant of AIService for use from the event loop"""
+    @abstractmethod
+    async def generate_workout_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    async def generate_nutrition_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        pass
+
+class StreamingAIService(ABC):
+    """AI service that yields plan items as soon as each one is complete"""
+    @abstractmethod
+    def stream_workout_sessions(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        """Yield raw session dicts in plan order"""
+        pass
+
+    @abstractmethod
+    def stream_nutrition_days(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        """Yield raw daily meal plan dicts in plan order"""
+        pass
+
+class PlanRepairAIService(ABC):
+    """AI service that regenerates only some days of an otherwise accepted plan"""
+    @abstractmethod
+    def complete_workout_sessions(
+        self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Return sessions for the given days (or the rest of the week when days is empty)"""
+        pass
+
+    @abstractmethod
+    def complete_nutrition_days(
+        self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Return daily meal plans for the given days"""
+        pass
+
+    @abstractmethod
+    async def complete_workout_sessions_async(
+        self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def complete_nutrition_days_async(
+        self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        pass
+
+class PlanFanOutAIService(ABC):
+    """AI service that generates a week a few days at a time against a shared outline"""
+    @abstractmethod
+    def outline_workout_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        """Return the training days of the week as {'day', 'focus'} dicts, in order"""
+        pass
+
+    @abstractmethod
+    def outline_nutrition_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        """Return every day of the week with its calorie and macro targets, in order"""
+        pass
+
+    @abstractmethod
+    def generate_workout_sessions(
+        self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Return sessions for the given days of the outline"""
+        pass
+
+    @abstractmethod
+    def generate_nutrition_days(
+        self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Return daily meal plans for the given days of the outline"""
+        pass
+
+    @abstractmethod
+    async def generate_workout_sessions_async(
+        self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def generate_nutrition_days_async(
+        self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]
+    ) -> List[Dict[str, Any]]:
+        pass
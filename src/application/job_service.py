@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import uuid
+from src.domain.models import GenerationJob, JobStatus
+from src.domain.repositories import GenerationJobRepository
+from src.application.planning_service import PlanningService
+from src.application.pregeneration import PlanPregenerator
+
+PLAN_TYPES = ("workout", "nutrition")
+
+
+class JobService:
+    """Queues plan generation so HTTP requests don't wait on the AI round-trip"""
+
+    def __init__(self, job_repo: GenerationJobRepository, pregenerator: Optional[PlanPregenerator] = None):
+        self.job_repo = job_repo
+        self.pregenerator = pregenerator
+
+    def enqueue(
+        self,
+        user_id: str,
+        plan_type: str,
+        requested_by: str,
+        bypass_cache: bool = False,
+        priority: int = 0
+    ) -> GenerationJob:
+        """Queue a plan-generation job
+
+        Args:
+            user_id: ID of the user the plan is for
+            plan_type: "workout" or "nutrition"
+            requested_by: ID of the user who asked for the plan
+            bypass_cache: Skip the plan cache when the job runs
+            priority: Higher values are picked up first
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If plan type is unknown
+        """
+        if plan_type not in PLAN_TYPES:
+            raise ValueError(f"Invalid plan type: {plan_type}")
+
+        job = GenerationJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            plan_type=plan_type,
+            requested_by=requested_by,
+            status=JobStatus.QUEUED.value,
+            priority=priority,
+            bypass_cache=bypass_cache,
+            created_at=datetime.now()
+        )
+        self.job_repo.save(job)
+        return job
+
+    def get_job(self, job_id: str, user_id: str) -> Optional[GenerationJob]:
+        """Get a job visible to the given user (its owner or requester)"""
+        job = self.job_repo.get_by_id(job_id)
+        if not job or user_id not in (job.user_id, job.requested_by):
+            return None
+        return job
+
+    def process_next(self, planning_service: PlanningService) -> Optional[GenerationJob]:
+        """Claim and run the next queued job, if any
+
+        Returns:
+            The finished job, or None when the queue is empty
+        """
+        job = self.job_repo.claim_next()
+        if not job:
+            return None
+        return self.run_job(job, planning_service)
+
+    def run_job(self, job: GenerationJob, planning_service: PlanningService) -> GenerationJob:
+        """Generate the plan for a claimed job and record the outcome
+
+        Speculative jobs hold plan data for the user's next request instead,
+        so they finish without a plan_id.
+        """
+        try:
+            prepared = self.pregenerator.get_for_job(job.id) if self.pregenerator else None
+            if prepared is not None:
+                plan_data = planning_service.pregenerate_plan_data(prepared)
+                if plan_data is None:
+                    self.pregenerator.discard(prepared)
+                else:
+                    self.pregenerator.fill(prepared, plan_data)
+                job.plan_id = None
+            elif job.plan_type == "workout":
+                job.plan_id = planning_service.generate_workout_plan(job.user_id, bypass_cache=job.bypass_cache).id
+            else:
+                job.plan_id = planning_service.generate_nutrition_plan(job.user_id, bypass_cache=job.bypass_cache).id
+            job.status = JobStatus.SUCCEEDED.value
+            job.error = None
+        except Exception as e:
+            job.status = JobStatus.FAILED.value
+            job.error = str(e)
+
+        job.finished_at = datetime.now()
+        self.job_repo.update(job)
+        return job
+
+    def requeue_stale(self, timeout_seconds: float, max_attempts: int) -> Tuple[int, int]:
+        """
+        Requeue jobs that have been running for longer than the timeout.
+
+        Jobs already run max_attempts times are failed instead, so a job that
+        keeps killing its worker is not retried forever.
+
+        Returns:
+            Number of jobs requeued and number failed
+        """
+        started_before = datetime.now() - timedelta(seconds=timeout_seconds)
+        return self.job_repo.requeue_stale(started_before, max(1, max_attempts))
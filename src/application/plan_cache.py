@@ -0,0 +1,175 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional
+from src.domain.models import UserProfile, CachedPlanData
+from src.domain.nutrition import estimate_daily_targets
+from src.domain.repositories import PlanCacheRepository
+
+
+def profile_fingerprint(profile: UserProfile, plan_type: str) -> str:
+    """Build a stable fingerprint from the profile fields the AI prompt uses.
+
+    Only fields that change the generated plan take part, so two users with the
+    same age, gender, goal and activity level (plus injuries for workouts or
+    dietary restrictions for nutrition) share a fingerprint. Nutrition also
+    keys on the daily calorie and macro targets, which depend on weight and
+    height and are written into day-by-day nutrition prompts; cached entries
+    outlive a change of PLAN_FAN_OUT_DAYS, so they take part either way.
+    Free-text fields are normalized so casing, spacing and ordering don't
+    cause misses.
+
+    Args:
+        profile: User profile to fingerprint
+        plan_type: "workout" or "nutrition"
+
+    Returns:
+        Hex digest identifying the normalized profile
+    """
+    def normalize(items):
+        return sorted({item.strip().lower() for item in items if item and item.strip()})
+
+    fields = {
+        "age": profile.age,
+        "gender": (profile.gender or "").strip().lower(),
+        "goal": profile.goal.value,
+        "activity_level": profile.activity_level.value,
+    }
+    if plan_type == "workout":
+        fields["injuries"] = normalize(profile.injuries)
+    else:
+        fields["dietary_restrictions"] = normalize(profile.dietary_restrictions)
+        fields["daily_targets"] = asdict(estimate_daily_targets(profile))
+
+    payload = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLLRUCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class PlanCacheStats:
+    """Process-wide hit/miss counters for the plan cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+
+class PlanCache:
+    """Two-tier cache of raw AI plan output keyed by plan type and profile fingerprint.
+
+    The in-process LRU tier and the stats are shared across requests, while the
+    persistent tier is backed by a repository bound to the current DB session.
+    """
+
+    def __init__(
+        self,
+        memory: TTLLRUCache,
+        stats: PlanCacheStats,
+        repository: Optional[PlanCacheRepository] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.memory = memory
+        self.stats = stats
+        self.repository = repository
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else memory.ttl_seconds
+
+    @staticmethod
+    def make_key(plan_type: str, profile: UserProfile) -> str:
+        return f"{plan_type}:{profile_fingerprint(profile, plan_type)}"
+
+    def get(self, plan_type: str, profile: UserProfile) -> Optional[Dict[str, Any]]:
+        """Look up cached plan data, checking memory first and then the persistent tier"""
+        key = self.make_key(plan_type, profile)
+
+        plan_data = self.memory.get(key)
+        if plan_data is not None:
+            self.stats.increment("memory_hits")
+            return copy.deepcopy(plan_data)
+
+        if self.repository:
+            entry = self.repository.get(key)
+            if entry and entry.created_at + timedelta(seconds=self.ttl_seconds) > datetime.now():
+                self.stats.increment("persistent_hits")
+                self.memory.set(key, entry.plan_data)
+                return copy.deepcopy(entry.plan_data)
+
+        self.stats.increment("misses")
+        return None
+
+    def put(self, plan_type: str, profile: UserProfile, plan_data: Dict[str, Any]) -> None:
+        """Store plan data in both tiers"""
+        key = self.make_key(plan_type, profile)
+        stored = copy.deepcopy(plan_data)
+        self.memory.set(key, stored)
+
+        if self.repository:
+            self.repository.save(CachedPlanData(
+                key=key,
+                plan_type=plan_type,
+                plan_data=stored,
+                created_at=datetime.now()
+            ))
+
+    def record_bypass(self) -> None:
+        self.stats.increment("bypasses")
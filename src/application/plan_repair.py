@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from src.application.plan_schema import ITEM_VALIDATORS
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@dataclass
+class PlanGaps:
+    """Which parts of a generated plan need to be regenerated"""
+    accepted: List[Dict[str, Any]]  # Items that are fine as they are
+    days: List[str] = field(default_factory=list)  # Days to regenerate
+    remaining: bool = False  # Workout was cut short: ask for the rest of the week
+
+    @property
+    def needs_repair(self) -> bool:
+        return bool(self.days) or self.remaining
+
+
+def items_key(plan_type: str) -> str:
+    return 'sessions' if plan_type == "workout" else 'daily_plans'
+
+
+def plan_items(plan_type: str, plan_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The plan's sessions/days, each still marked as not cacheable if the
+    plan was, so the mark survives when the items are used one by one
+    (streamed, repaired or assembled into another plan).
+    """
+    items = plan_data.get(items_key(plan_type)) or []
+    if plan_data.get('cacheable', True):
+        return items
+    return [dict(item, cacheable=False) if isinstance(item, dict) else item for item in items]
+
+
+def is_cacheable(plan_type: str, plan_data: Dict[str, Any]) -> bool:
+    """False if the plan or any of its items was marked as not cacheable, e.g. served by a fallback"""
+    if not plan_data.get('cacheable', True):
+        return False
+    return all(
+        item.get('cacheable', True) for item in plan_data.get(items_key(plan_type)) or [] if isinstance(item, dict)
+    )
+
+
+def _day_name(item: Dict[str, Any]) -> str:
+    day = item.get('day') if isinstance(item, dict) else None
+    return day.strip().capitalize() if isinstance(day, str) else ""
+
+
+def _is_valid_session(session: Dict[str, Any]) -> bool:
+    return ITEM_VALIDATORS["workout"](session) and bool(_day_name(session)) and any(
+        e['name'] for e in session['exercises']
+    )
+
+
+def _is_valid_day(day: Dict[str, Any]) -> bool:
+    return ITEM_VALIDATORS["nutrition"](day) and _day_name(day) in WEEK_DAYS and any(
+        m['name'] for m in day['meals']
+    )
+
+
+def find_plan_gaps(plan_type: str, plan_data: Dict[str, Any]) -> PlanGaps:
+    """
+    Split a raw plan into accepted items and the days that must be regenerated.
+
+    Nutrition plans must cover every day of the week with at least one meal.
+    Workout plans have no fixed number of sessions, so only sessions without
+    exercises are regenerated, plus the rest of the week if the response was
+    truncated.
+    """
+    items = plan_data.get(items_key(plan_type)) or []
+    accepted, invalid_days, seen = [], [], set()
+
+    is_valid = _is_valid_session if plan_type == "workout" else _is_valid_day
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        day = _day_name(item)
+        if is_valid(item) and day not in seen:
+            accepted.append(item)
+            seen.add(day)
+        elif day and day not in seen and day not in invalid_days:
+            invalid_days.append(day)
+
+    if plan_type == "workout":
+        days = [d for d in invalid_days if d not in seen]
+        truncated = bool((plan_data.get('parse_report') or {}).get('truncated'))
+        return PlanGaps(accepted=accepted, days=days, remaining=truncated or not accepted)
+
+    return PlanGaps(accepted=accepted, days=[d for d in WEEK_DAYS if d not in seen])
+
+
+def merge_repaired_items(
+    plan_type: str,
+    plan_data: Dict[str, Any],
+    gaps: PlanGaps,
+    repaired: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Add the regenerated items to the accepted ones, in week order"""
+    is_valid = _is_valid_session if plan_type == "workout" else _is_valid_day
+    taken = {_day_name(item) for item in gaps.accepted}
+    merged = list(gaps.accepted)
+    for item in repaired:
+        if not isinstance(item, dict) or not is_valid(item):
+            continue
+        day = _day_name(item)
+        wanted = day in gaps.days or (gaps.remaining and day not in gaps.days)
+        if day in taken or not wanted:
+            continue
+        merged.append(item)
+        taken.add(day)
+
+    order = {day: i for i, day in enumerate(WEEK_DAYS)}
+    merged.sort(key=lambda item: order.get(_day_name(item), len(WEEK_DAYS)))
+
+    result = dict(plan_data)
+    result[items_key(plan_type)] = merged
+    return result
+
+
+def assemble_days(plan_type: str, days: List[str], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build plan data from items generated separately, in the order of days.
+
+    Days nobody returned get an empty placeholder so find_plan_gaps picks
+    them up for repair; items for days that were not asked for are ignored.
+    """
+    by_day: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        if isinstance(item, dict):
+            by_day.setdefault(_day_name(item), item)
+    return {items_key(plan_type): [by_day.get(day, {'day': day}) for day in days]}
@@ -0,0 +1,123 @@
+from typing import Any, Callable, Dict
+
+# Response schemas for generated plans, in the subset of JSON Schema that both
+# Gemini (response_schema) and OpenAI (json_schema response format) accept:
+# type, properties, items and required only.
+
+EXERCISE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "sets": {"type": "integer"},
+        "reps": {"type": "string"},
+        "rest_time": {"type": "string"},
+        "video_url": {"type": "string"},
+    },
+    "required": ["name", "sets", "reps"],
+}
+
+SESSION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "day": {"type": "string"},
+        "focus": {"type": "string"},
+        "exercises": {"type": "array", "items": EXERCISE_SCHEMA},
+    },
+    "required": ["day", "exercises"],
+}
+
+MEAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "calories": {"type": "integer"},
+        "protein": {"type": "integer"},
+        "carbs": {"type": "integer"},
+        "fats": {"type": "integer"},
+        "ingredients": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["name", "calories"],
+}
+
+DAY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "day": {"type": "string"},
+        "meals": {"type": "array", "items": MEAL_SCHEMA},
+    },
+    "required": ["day", "meals"],
+}
+
+WORKOUT_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {"sessions": {"type": "array", "items": SESSION_SCHEMA}},
+    "required": ["sessions"],
+}
+
+NUTRITION_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {"daily_plans": {"type": "array", "items": DAY_SCHEMA}},
+    "required": ["daily_plans"],
+}
+
+PLAN_SCHEMAS = {"workout": WORKOUT_PLAN_SCHEMA, "nutrition": NUTRITION_PLAN_SCHEMA}
+ITEM_SCHEMAS = {"workout": SESSION_SCHEMA, "nutrition": DAY_SCHEMA}
+
+Validator = Callable[[Any], bool]
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+_TYPE_CHECKS: Dict[str, Validator] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    Turn a schema into a nested set of closures, once.
+
+    Validating then costs one call per value, with no schema lookups. Unknown
+    properties are allowed, like the providers do.
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        properties = [(name, compile_schema(sub)) for name, sub in schema.get("properties", {}).items()]
+        required = tuple(schema.get("required", ()))
+
+        def validate_object(value: Any) -> bool:
+            if not isinstance(value, dict):
+                return False
+            for name in required:
+                if name not in value:
+                    return False
+            for name, validate in properties:
+                if name in value and not validate(value[name]):
+                    return False
+            return True
+        return validate_object
+
+    if kind == "array":
+        validate_item = compile_schema(schema.get("items", {}))
+
+        def validate_array(value: Any) -> bool:
+            return isinstance(value, list) and all(validate_item(item) for item in value)
+        return validate_array
+
+    if kind in _TYPE_CHECKS:
+        return _TYPE_CHECKS[kind]
+    return lambda value: True
+
+
+PLAN_VALIDATORS: Dict[str, Validator] = {plan_type: compile_schema(s) for plan_type, s in PLAN_SCHEMAS.items()}
+ITEM_VALIDATORS: Dict[str, Validator] = {plan_type: compile_schema(s) for plan_type, s in ITEM_SCHEMAS.items()}
+
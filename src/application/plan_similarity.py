@@ -0,0 +1,226 @@
+import copy
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.domain.models import ApprovedPlanSample, UserProfile, Goal, ActivityLevel
+from src.domain.nutrition import estimate_daily_targets
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the index falls back to a pure-Python scan
+    np = None
+
+# Distance of one unit along each numeric axis; the default threshold of 1.0
+# therefore accepts roughly 5 years, 5 kg or 5 cm of difference on one axis
+NUMERIC_SCALES = (("age", 5.0), ("weight", 5.0), ("height", 5.0))
+GOALS = list(Goal)
+ACTIVITY_LEVELS = list(ActivityLevel)
+
+
+def profile_vector(profile: UserProfile) -> List[float]:
+    """Scaled age, weight and height followed by one-hot goal and activity level.
+
+    A differing goal or activity level adds sqrt(2) to the distance, so with a
+    threshold below that only profiles sharing both can match.
+    """
+    vector = [float(getattr(profile, name)) / scale for name, scale in NUMERIC_SCALES]
+    vector += [1.0 if profile.goal == goal else 0.0 for goal in GOALS]
+    vector += [1.0 if profile.activity_level == level else 0.0 for level in ACTIVITY_LEVELS]
+    return vector
+
+
+def filter_key(plan_type: str, profile: UserProfile) -> tuple:
+    """Fields that must match exactly: gender, plus injuries or dietary restrictions"""
+    def normalize(items):
+        return tuple(sorted({item.strip().lower() for item in items or [] if item and item.strip()}))
+
+    constraints = profile.injuries if plan_type == "workout" else profile.dietary_restrictions
+    return (plan_type, (profile.gender or "").strip().lower(), normalize(constraints))
+
+
+class _Group:
+    """Samples sharing a filter key, with their vectors stacked for a vectorized scan"""
+
+    def __init__(self):
+        # Insertion ordered, so the first entry is the oldest
+        self.samples: Dict[str, ApprovedPlanSample] = {}
+        self.vectors: Dict[str, List[float]] = {}
+        self._matrix = None
+        self._order: List[str] = []
+
+    def add(self, sample: ApprovedPlanSample, max_entries: int) -> None:
+        self.remove(sample.plan_id)
+        self.samples[sample.plan_id] = sample
+        self.vectors[sample.plan_id] = profile_vector(sample.profile)
+        if len(self.samples) > max_entries:
+            self.remove(next(iter(self.samples)))
+        self._matrix = None
+
+    def remove(self, plan_id: str) -> None:
+        if self.samples.pop(plan_id, None) is not None:
+            del self.vectors[plan_id]
+            self._matrix = None
+
+    def nearest(self, vector: List[float]) -> Optional[Tuple[ApprovedPlanSample, float]]:
+        if not self.samples:
+            return None
+        if np is not None:
+            if self._matrix is None:
+                self._order = list(self.vectors)
+                self._matrix = np.asarray(list(self.vectors.values()), dtype=np.float64)
+            distances = np.sqrt(((self._matrix - np.asarray(vector)) ** 2).sum(axis=1))
+            index = int(distances.argmin())
+            return self.samples[self._order[index]], float(distances[index])
+        best, best_distance = None, math.inf
+        for plan_id, candidate in self.vectors.items():
+            distance = math.dist(candidate, vector)
+            if distance < best_distance:
+                best, best_distance = self.samples[plan_id], distance
+        return best, best_distance
+
+
+class SimilarPlanIndex:
+    """Process-wide nearest-neighbour index over profiles with approved plans"""
+
+    def __init__(self, max_entries_per_group: int = 2000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries_per_group = max_entries_per_group
+        self._clock = clock
+        self._groups: Dict[tuple, _Group] = {}
+        self._group_of: Dict[str, tuple] = {}  # plan_id -> filter key
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, sample: ApprovedPlanSample) -> None:
+        key = filter_key(sample.plan_type, sample.profile)
+        with self._lock:
+            # A re-approved plan may now belong to a different group
+            previous = self._group_of.get(sample.plan_id)
+            if previous is not None and previous != key and previous in self._groups:
+                self._groups[previous].remove(sample.plan_id)
+            self._group_of[sample.plan_id] = key
+            self._groups.setdefault(key, _Group()).add(sample, self.max_entries_per_group)
+
+    def nearest(self, plan_type: str, profile: UserProfile) -> Optional[Tuple[ApprovedPlanSample, float]]:
+        with self._lock:
+            group = self._groups.get(filter_key(plan_type, profile))
+            return group.nearest(profile_vector(profile)) if group else None
+
+    def needs_load(self, plan_type: str, reload_seconds: float) -> bool:
+        with self._lock:
+            loaded_at = self._loaded_at.get(plan_type)
+            return loaded_at is None or self._clock() - loaded_at >= reload_seconds
+
+    def mark_loaded(self, plan_type: str) -> None:
+        with self._lock:
+            self._loaded_at[plan_type] = self._clock()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": sum(len(g.samples) for g in self._groups.values()),
+                "groups": len(self._groups),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "vectorized": np is not None,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(g.samples) for g in self._groups.values())
+
+
+def adapt_plan_data(plan_type: str, sample: ApprovedPlanSample, profile: UserProfile) -> Dict[str, Any]:
+    """Copy an approved plan for a new profile.
+
+    Workouts are reused as they are (injuries already match exactly).
+    Meal portions are scaled to the new profile's estimated calorie needs.
+    """
+    plan_data = copy.deepcopy(sample.plan_data)
+    if plan_type == "nutrition":
+        source = estimate_daily_targets(sample.profile).calories
+        ratio = estimate_daily_targets(profile).calories / source if source else 1.0
+        for day in plan_data.get('daily_plans', []):
+            for meal in day.get('meals', []):
+                for field in ('calories', 'protein', 'carbs', 'fats'):
+                    if isinstance(meal.get(field), (int, float)):
+                        meal[field] = int(round(meal[field] * ratio))
+    plan_data['reused_from'] = sample.plan_id
+    return plan_data
+
+
+class SimilarPlanMatcher:
+    """Reuses the nearest approved plan for a similar profile instead of calling the AI.
+
+    The index is shared across requests and (re)loaded through list_approved
+    every reload_seconds, so approvals made by other workers show up too.
+    Loads run on a background thread, never on the request path: lookups are
+    answered from what the index already holds until the load finishes.
+    list_approved therefore must not use a request's DB session.
+    """
+
+    def __init__(
+        self,
+        index: SimilarPlanIndex,
+        list_approved: Optional[Callable[[str, int], List[ApprovedPlanSample]]] = None,
+        max_distance: float = 1.0,
+        load_limit: int = 5000,
+        reload_seconds: float = 300
+    ):
+        self.index = index
+        self.list_approved = list_approved
+        self.max_distance = max_distance
+        self.load_limit = load_limit
+        self.reload_seconds = reload_seconds
+        # Last load started by this matcher, if any
+        self.loader: Optional[threading.Thread] = None
+
+    def find(self, plan_type: str, profile: UserProfile) -> Optional[Dict[str, Any]]:
+        """Plan data adapted from the closest approved plan, or None if nothing is close enough"""
+        self._load(plan_type)
+        match = self.index.nearest(plan_type, profile)
+        if match is None or match[1] > self.max_distance:
+            self.index.record(hit=False)
+            return None
+        self.index.record(hit=True)
+        return adapt_plan_data(plan_type, match[0], profile)
+
+    def remember(self, plan_type: str, plan_id: str, profile: UserProfile, plan_data: Dict[str, Any]) -> None:
+        """Add a newly approved plan to the index"""
+        self.index.add(ApprovedPlanSample(
+            plan_id=plan_id,
+            plan_type=plan_type,
+            profile=profile,
+            plan_data=copy.deepcopy(plan_data)
+        ))
+
+    def _load(self, plan_type: str) -> None:
+        if not self.list_approved or not self.index.needs_load(plan_type, self.reload_seconds):
+            return
+        # Marked before the load starts, so concurrent lookups don't start another one
+        self.index.mark_loaded(plan_type)
+        self.loader = threading.Thread(
+            target=self._load_samples, args=(plan_type,), name=f"plan-reuse-load-{plan_type}", daemon=True
+        )
+        self.loader.start()
+
+    def _load_samples(self, plan_type: str) -> None:
+        try:
+            samples = self.list_approved(plan_type, self.load_limit)
+        except Exception as e:
+            print(f"Loading approved {plan_type} plans for reuse failed: {e}")
+            return
+        # Oldest first, so the newest plans survive the per-group cap
+        for sample in reversed(samples):
+            self.index.add(sample)
@@ -1,62 +1,619 @@
-from typing import Optional, TypeVar, Generic
-from datetime import datetime
+import asyncio
+import contextvars
+import uuid
+from contextlib import AsyncExitStack
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import (
+    Optional, TypeVar, Generic, Dict, Any, List, Sequence, AsyncIterator, AsyncContextManager, Union, Callable, Awaitable
+)
+from datetime import datetime, timedelta
 from src.domain.models import (
     User, UserProfile, WorkoutPlan, NutritionPlan,
-    WorkoutSession, Exercise, DailyMealPlan, Meal
+    WorkoutSession, Exercise, DailyMealPlan, Meal, PreparedPlan
 )
 from src.domain.repositories import UserRepository, WorkoutPlanRepository, NutritionPlanRepository
-from src.application.interfaces import AIService
+from src.application.interfaces import (
+    AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService
+)
+from src.application.plan_repair import (
+    find_plan_gaps, merge_repaired_items, assemble_days, plan_items, is_cacheable
+)
+from src.application.plan_cache import PlanCache, profile_fingerprint
+from src.application.pregeneration import PlanPregenerator
+from src.application.plan_similarity import SimilarPlanMatcher
+from src.application.single_flight import SingleFlight, GenerationLease
+from src.application.blocking import BlockingCalls
+from src.application.deadline import Deadline, deadline_scope, iterate_within
+from src.application.usage_ledger import (
+    AIUsageLedger, UsageContext, current_usage_context, usage_scope, iterate_in_usage_scope
+)
 
 # Type variable for generic plan repository
 PlanType = TypeVar('PlanType', WorkoutPlan, NutritionPlan)
 
+@dataclass
+class BulkGenerationResult:
+    """Outcome of generating one plan for one client in a bulk run"""
+    client_id: str
+    plan_type: str  # "workout" or "nutrition"
+    success: bool
+    plan_id: Optional[str] = None
+    error: Optional[str] = None
+
 class PlanningService:
     def __init__(
         self,
         ai_service: AIService,
         workout_repo: WorkoutPlanRepository,
         nutrition_repo: NutritionPlanRepository,
-        user_repo: UserRepository
+        user_repo: UserRepository,
+        plan_cache: Optional[PlanCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        generation_lease: Optional[GenerationLease] = None,
+        fan_out_days: int = 0,
+        plan_matcher: Optional[SimilarPlanMatcher] = None,
+        request_budget_seconds: float = 0,
+        usage_ledger: Optional[AIUsageLedger] = None,
+        pregenerator: Optional[PlanPregenerator] = None,
+        blocking_calls: Optional[BlockingCalls] = None
     ):
         self.ai_service = ai_service
         self.workout_repo = workout_repo
         self.nutrition_repo = nutrition_repo
         self.user_repo = user_repo
+        self.plan_cache = plan_cache
+        self.single_flight = single_flight
+        self.generation_lease = generation_lease
+        # Days per provider call when generating a week in parallel; 0 asks for the whole week at once
+        self.fan_out_days = fan_out_days
+        self.plan_matcher = plan_matcher
+        # Time allowed for the AI work of a generation the caller gave no deadline for; 0 is unbounded
+        self.request_budget_seconds = request_budget_seconds
+        # Plan cache and reuse hits are logged here next to the provider calls
+        self.usage_ledger = usage_ledger
+        # Plan data generated speculatively when the profile was completed
+        self.pregenerator = pregenerator
+        # Repository calls of the async paths, off the event loop; shared with the lease of the same request
+        self.blocking_calls = blocking_calls or BlockingCalls()
+
+    def generate_workout_plan(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> WorkoutPlan:
+        """
+        Generates a draft workout plan.
+        
+        AI calls are bounded by the deadline (by default one of
+        request_budget_seconds from now); once it passes, the AI service
+        falls back or fails instead of waiting on the provider.
+        """
+        with deadline_scope(self._deadline(deadline)), usage_scope(self._usage_context("workout", user_id)):
+            return self._coalesce("workout", user_id, lambda: self._generate_plan("workout", user_id, bypass_cache))
+
+    def generate_nutrition_plan(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> NutritionPlan:
+        """Generates a draft nutrition plan (see generate_workout_plan for the deadline)"""
+        with deadline_scope(self._deadline(deadline)), usage_scope(self._usage_context("nutrition", user_id)):
+            return self._coalesce("nutrition", user_id, lambda: self._generate_plan("nutrition", user_id, bypass_cache))
+
+    async def generate_workout_plan_async(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> WorkoutPlan:
+        """
+        Event-loop friendly variant of generate_workout_plan.
+        
+        Uses the provider's native async client when the AI service supports it,
+        otherwise runs the blocking call in a worker thread. Cancelling the
+        coroutine cancels the provider call in flight.
+        """
+        with deadline_scope(self._deadline(deadline)), usage_scope(self._usage_context("workout", user_id)):
+            return await self._coalesce_async(
+                "workout", user_id, lambda: self._generate_plan_async("workout", user_id, bypass_cache)
+            )
+
+    async def generate_nutrition_plan_async(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> NutritionPlan:
+        """Event-loop friendly variant of generate_nutrition_plan"""
+        with deadline_scope(self._deadline(deadline)), usage_scope(self._usage_context("nutrition", user_id)):
+            return await self._coalesce_async(
+                "nutrition", user_id, lambda: self._generate_plan_async("nutrition", user_id, bypass_cache)
+            )
+
+    def _deadline(self, deadline: Optional[Deadline]) -> Optional[Deadline]:
+        """The caller's deadline, or a new one from the configured budget"""
+        if deadline is None and self.request_budget_seconds > 0:
+            return Deadline(self.request_budget_seconds)
+        return deadline
+
+    def _usage_context(self, plan_type: str, user_id: str) -> UsageContext:
+        """Ledger attribution for one generation, under the endpoint that asked for it"""
+        outer = current_usage_context()
+        return UsageContext(endpoint=outer.endpoint if outer else None, user_id=user_id, plan_type=plan_type)
+
+    def _generate_plan(self, plan_type: str, user_id: str, bypass_cache: bool):
+        profile = self._get_profile(user_id)
+
+        plan_data = self._take_prepared_plan_data(plan_type, user_id, profile, bypass_cache)
+        if plan_data is None:
+            plan_data = self._generate_plan_data(plan_type, profile, bypass_cache)
+        
+        return self._save_new_plan(plan_type, user_id, plan_data)
+
+    async def _generate_plan_async(self, plan_type: str, user_id: str, bypass_cache: bool):
+        run = self.blocking_calls.run
+        profile = await run(self._get_profile, user_id)
+
+        plan_data = await run(self._reuse_plan_data, plan_type, user_id, profile, bypass_cache)
+        if plan_data is None:
+            plan_data = await self._request_plan_data_async(plan_type, profile)
+            plan_data = await self._repair_plan_data_async(plan_type, profile, plan_data)
+            await run(self._cache_plan_data, plan_type, profile, plan_data)
+        
+        return await run(self._save_new_plan, plan_type, user_id, plan_data)
+
+    def _reuse_plan_data(
+        self, plan_type: str, user_id: str, profile: UserProfile, bypass_cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Prepared, cached or similar-plan data that saves a provider call, if there is any"""
+        plan_data = self._take_prepared_plan_data(plan_type, user_id, profile, bypass_cache)
+        if plan_data is None:
+            plan_data = self._get_cached_plan_data(plan_type, profile, bypass_cache)
+        if plan_data is None:
+            plan_data = self._get_similar_plan_data(plan_type, profile, bypass_cache)
+        return plan_data
+
+    def _generate_plan_data(self, plan_type: str, profile: UserProfile, bypass_cache: bool) -> Dict[str, Any]:
+        plan_data = self._get_cached_plan_data(plan_type, profile, bypass_cache)
+        if plan_data is None:
+            plan_data = self._get_similar_plan_data(plan_type, profile, bypass_cache)
+        if plan_data is None:
+            # Get raw data from AI service
+            plan_data = self._request_plan_data(plan_type, profile)
+            plan_data = self._repair_plan_data(plan_type, profile, plan_data)
+            self._cache_plan_data(plan_type, profile, plan_data)
+        return plan_data
+
+    def pregenerate_plan_data(self, prepared: PreparedPlan) -> Optional[Dict[str, Any]]:
+        """
+        Plan data for a speculative job (see PlanPregenerator), without saving a plan.
+        
+        Returns:
+            None when it is no longer worth holding: the profile changed, the
+            user generated a plan meanwhile, or only the fallback answered
+        """
+        plan_type, user_id = prepared.plan_type, prepared.user_id
+        profile = self._get_profile(user_id)
+        if profile_fingerprint(profile, plan_type) != prepared.profile_key:
+            return None
+        
+        generate = lambda: self._generate_plan_data(plan_type, profile, bypass_cache=False)
+        with deadline_scope(self._deadline(None)), usage_scope(self._usage_context(plan_type, user_id)):
+            # Only the lease, not SingleFlight: in-process waiters expect a saved plan, not plan data
+            if self.generation_lease:
+                result = self.generation_lease.run(
+                    f"{plan_type}:{user_id}", generate, lambda since: self._recent_draft(plan_type, user_id, since)
+                )
+            else:
+                result = generate()
+        
+        if not isinstance(result, dict) or not is_cacheable(plan_type, result):
+            return None
+        return result
+
+    def _request_plan_data(self, plan_type: str, profile: UserProfile) -> Dict[str, Any]:
+        if self._fans_out():
+            return self._fan_out_plan_data(plan_type, profile)
+        if plan_type == "workout":
+            return self.ai_service.generate_workout_plan(profile)
+        return self.ai_service.generate_nutrition_plan(profile)
+
+    async def _request_plan_data_async(self, plan_type: str, profile: UserProfile) -> Dict[str, Any]:
+        if self._fans_out():
+            return await self._fan_out_plan_data_async(plan_type, profile)
+        if isinstance(self.ai_service, AsyncAIService):
+            if plan_type == "workout":
+                return await self.ai_service.generate_workout_plan_async(profile)
+            return await self.ai_service.generate_nutrition_plan_async(profile)
+        return await asyncio.to_thread(self._request_plan_data, plan_type, profile)
+
+    def _fans_out(self) -> bool:
+        return self.fan_out_days > 0 and isinstance(self.ai_service, PlanFanOutAIService)
+
+    def _fan_out_groups(self, plan_type: str, profile: UserProfile):
+        """The week outline shared by every call, and the days each call generates"""
+        if plan_type == "workout":
+            outline = self.ai_service.outline_workout_week(profile)
+        else:
+            outline = self.ai_service.outline_nutrition_week(profile)
+        days = [d['day'] for d in outline]
+        size = self.fan_out_days
+        return outline, days, [days[i:i + size] for i in range(0, len(days), size)]
+
+    def _fan_out_plan_data(self, plan_type: str, profile: UserProfile) -> Dict[str, Any]:
+        """
+        Generate the week as concurrent calls of fan_out_days days each, so
+        generation takes about as long as one group instead of the whole week.
+        Groups that fail are left as gaps for _repair_plan_data.
+        """
+        outline, days, groups = self._fan_out_groups(plan_type, profile)
+        if plan_type == "workout":
+            generate = self.ai_service.generate_workout_sessions
+        else:
+            generate = self.ai_service.generate_nutrition_days
+
+        with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, generate, profile, outline, group)
+                for group in groups
+            ]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except ValueError as e:
+                    results.append(e)
+        return self._assemble_fan_out(plan_type, days, results)
+
+    async def _fan_out_plan_data_async(self, plan_type: str, profile: UserProfile) -> Dict[str, Any]:
+        """Async counterpart of _fan_out_plan_data"""
+        outline, days, groups = self._fan_out_groups(plan_type, profile)
+        if plan_type == "workout":
+            generate = self.ai_service.generate_workout_sessions_async
+        else:
+            generate = self.ai_service.generate_nutrition_days_async
+
+        results = await asyncio.gather(
+            *(generate(profile, outline, group) for group in groups), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, ValueError):
+                raise result
+        return self._assemble_fan_out(plan_type, days, results)
+
+    def _assemble_fan_out(self, plan_type: str, days: List[str], results: List[Any]) -> Dict[str, Any]:
+        errors = [r for r in results if isinstance(r, ValueError)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+        for error in errors:
+            print(f"Day group generation failed ({error}), leaving it for repair")
+        items = [item for r in results if not isinstance(r, ValueError) for item in r]
+        return assemble_days(plan_type, days, items)
+
+    def _repair_plan_data(self, plan_type: str, profile: UserProfile, plan_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Re-prompt only for the days the provider left out or returned without
+        content, and merge them into the accepted ones. If the repair call
+        fails the plan is kept as it came.
+        """
+        if not isinstance(self.ai_service, PlanRepairAIService):
+            return plan_data
+        gaps = find_plan_gaps(plan_type, plan_data)
+        if not gaps.needs_repair:
+            return plan_data
+        try:
+            if plan_type == "workout":
+                repaired = self.ai_service.complete_workout_sessions(profile, gaps.accepted, gaps.days)
+            else:
+                repaired = self.ai_service.complete_nutrition_days(profile, gaps.accepted, gaps.days)
+        except ValueError as e:
+            print(f"Plan repair failed ({e}), keeping the plan as generated")
+            return plan_data
+        return merge_repaired_items(plan_type, plan_data, gaps, repaired)
+
+    async def _repair_plan_data_async(self, plan_type: str, profile: UserProfile, plan_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of _repair_plan_data"""
+        if not isinstance(self.ai_service, PlanRepairAIService):
+            return plan_data
+        gaps = find_plan_gaps(plan_type, plan_data)
+        if not gaps.needs_repair:
+            return plan_data
+        try:
+            if plan_type == "workout":
+                repaired = await self.ai_service.complete_workout_sessions_async(profile, gaps.accepted, gaps.days)
+            else:
+                repaired = await self.ai_service.complete_nutrition_days_async(profile, gaps.accepted, gaps.days)
+        except ValueError as e:
+            print(f"Plan repair failed ({e}), keeping the plan as generated")
+            return plan_data
+        return merge_repaired_items(plan_type, plan_data, gaps, repaired)
+
+    def _save_new_plan(self, plan_type: str, user_id: str, plan_data: Dict[str, Any]):
+        """Map raw AI output to a draft plan and persist it"""
+        if plan_type == "workout":
+            plan = self._build_workout_plan(user_id, plan_data)
+            self.workout_repo.save(plan)
+        else:
+            plan = self._build_nutrition_plan(user_id, plan_data)
+            self.nutrition_repo.save(plan)
+        usage = current_usage_context()
+        if usage is not None:
+            usage.plan_id = plan.id
+        return plan
+
+    def _coalesce(self, plan_type: str, user_id: str, generate: Callable[[], Any]):
+        """
+        Collapse identical concurrent generations into one provider call:
+        in-process through SingleFlight, across workers through the DB lease.
+        """
+        key = f"{plan_type}:{user_id}"
+        call = generate
+        if self.generation_lease:
+            call = lambda: self.generation_lease.run(
+                key, generate, lambda since: self._recent_draft(plan_type, user_id, since)
+            )
+        if self.single_flight:
+            return self.single_flight.do(key, call)
+        return call()
+
+    async def _coalesce_async(self, plan_type: str, user_id: str, generate: Callable[[], Awaitable[Any]]):
+        """Async counterpart of _coalesce"""
+        key = f"{plan_type}:{user_id}"
+        call = generate
+        if self.generation_lease:
+            call = lambda: self.generation_lease.run_async(
+                key, generate, lambda since: self._recent_draft(plan_type, user_id, since)
+            )
+        if self.single_flight:
+            return await self.single_flight.do_async(key, call)
+        return await call()
+
+    def _recent_draft(self, plan_type: str, user_id: str, since: datetime):
+        """Latest draft created since the given time, i.e. one another worker just generated"""
+        repo = self.workout_repo if plan_type == "workout" else self.nutrition_repo
+        plan = repo.get_current_plan(user_id)
+        if plan and plan.state == "draft" and plan.created_at and plan.created_at >= since:
+            return plan
+        return None
+
+    async def stream_workout_plan(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Union[WorkoutSession, WorkoutPlan]]:
+        """
+        Generates a workout plan, yielding each WorkoutSession as soon as the
+        provider finishes it and finally the saved WorkoutPlan.
+        """
+        profile = await self.blocking_calls.run(self._get_profile, user_id)
+        deadline = self._deadline(deadline)
+        usage = self._usage_context("workout", user_id)
+        with usage_scope(usage):
+            reused = await self.blocking_calls.run(self._reuse_plan_data, "workout", user_id, profile, bypass_cache)
+        
+        raw_sessions = []
+        stream = iterate_in_usage_scope(self._stream_raw_items("workout", profile, reused), usage)
+        async for raw in iterate_within(stream, deadline):
+            raw_sessions.append(raw)
+            yield self._build_workout_session(raw)
+        
+        plan_data = {'sessions': raw_sessions}
+        with deadline_scope(deadline), usage_scope(usage):
+            plan_data = await self._repair_plan_data_async("workout", profile, plan_data)
+        for raw in plan_data['sessions']:
+            if not any(raw is seen for seen in raw_sessions):
+                yield self._build_workout_session(raw)
+        if reused is None:
+            # Only fresh provider output: reused data is already cached or was never meant to be
+            await self.blocking_calls.run(self._cache_plan_data, "workout", profile, plan_data)
+        plan = self._build_workout_plan(user_id, plan_data)
+        await self.blocking_calls.run(self.workout_repo.save, plan)
+        usage.plan_id = plan.id
+        yield plan
 
-    def generate_workout_plan(self, user_id: str) -> WorkoutPlan:
+    async def stream_nutrition_plan(
+        self, user_id: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Union[DailyMealPlan, NutritionPlan]]:
+        """
+        Generates a nutrition plan, yielding each DailyMealPlan as soon as the
+        provider finishes it and finally the saved NutritionPlan.
+        """
+        profile = await self.blocking_calls.run(self._get_profile, user_id)
+        deadline = self._deadline(deadline)
+        usage = self._usage_context("nutrition", user_id)
+        with usage_scope(usage):
+            reused = await self.blocking_calls.run(self._reuse_plan_data, "nutrition", user_id, profile, bypass_cache)
+        
+        raw_days = []
+        stream = iterate_in_usage_scope(self._stream_raw_items("nutrition", profile, reused), usage)
+        async for raw in iterate_within(stream, deadline):
+            raw_days.append(raw)
+            yield self._build_daily_meal_plan(raw)
+        
+        plan_data = {'daily_plans': raw_days}
+        with deadline_scope(deadline), usage_scope(usage):
+            plan_data = await self._repair_plan_data_async("nutrition", profile, plan_data)
+        for raw in plan_data['daily_plans']:
+            if not any(raw is seen for seen in raw_days):
+                yield self._build_daily_meal_plan(raw)
+        if reused is None:
+            # Only fresh provider output: reused data is already cached or was never meant to be
+            await self.blocking_calls.run(self._cache_plan_data, "nutrition", profile, plan_data)
+        plan = self._build_nutrition_plan(user_id, plan_data)
+        await self.blocking_calls.run(self.nutrition_repo.save, plan)
+        usage.plan_id = plan.id
+        yield plan
+
+    async def _stream_raw_items(
+        self, plan_type: str, profile: UserProfile, reused: Optional[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield raw sessions/days from reused plan data, the provider's stream, or a one-shot call"""
+        items_key = 'sessions' if plan_type == "workout" else 'daily_plans'
+        
+        if reused is not None:
+            for item in reused.get(items_key, []):
+                yield item
+            return
+        
+        if isinstance(self.ai_service, StreamingAIService):
+            if plan_type == "workout":
+                stream = self.ai_service.stream_workout_sessions(profile)
+            else:
+                stream = self.ai_service.stream_nutrition_days(profile)
+            async for item in stream:
+                yield item
+            return
+        
+        plan_data = await self._request_plan_data_async(plan_type, profile)
+        for item in plan_items(plan_type, plan_data):
+            yield item
+
+    async def generate_plans_for_clients(
+        self,
+        clients: Sequence[User],
+        plan_types: Sequence[str] = ("workout",),
+        max_concurrency: int = 5,
+        bypass_cache: bool = False,
+        generation_slots: Sequence[Callable[[], AsyncContextManager]] = ()
+    ) -> List[BulkGenerationResult]:
+        """
+        Generates plans for many clients concurrently.
+        
+        At most max_concurrency AI calls are in flight at once, so a whole
+        roster takes roughly as long as its slowest batch instead of the sum
+        of every call. A failure for one client never aborts the others.
+        
+        Args:
+            clients: Clients to generate for (e.g. from RoleService.get_my_clients)
+            plan_types: Any of "workout" and "nutrition"
+            max_concurrency: Upper bound on simultaneous generations
+            bypass_cache: Skip the plan cache for every generation
+            generation_slots: Entered, in order, around each generation (e.g. to
+                charge the caller's quota); an error entering one fails that client
+            
+        Returns:
+            One result per client and plan type, in roster order
+        """
+        for plan_type in plan_types:
+            if plan_type not in ("workout", "nutrition"):
+                raise ValueError(f"Invalid plan type: {plan_type}")
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def generate(client_id: str, plan_type: str) -> BulkGenerationResult:
+            async with semaphore:
+                try:
+                    async with AsyncExitStack() as stack:
+                        for slot in generation_slots:
+                            await stack.enter_async_context(slot())
+                        if plan_type == "workout":
+                            plan = await self.generate_workout_plan_async(client_id, bypass_cache=bypass_cache)
+                        else:
+                            plan = await self.generate_nutrition_plan_async(client_id, bypass_cache=bypass_cache)
+                    return BulkGenerationResult(client_id, plan_type, success=True, plan_id=plan.id)
+                except Exception as e:
+                    return BulkGenerationResult(client_id, plan_type, success=False, error=str(e))
+        
+        return await asyncio.gather(*(
+            generate(client.id, plan_type)
+            for client in clients
+            for plan_type in plan_types
+        ))
+
+    def _get_profile(self, user_id: str) -> UserProfile:
         user = self.user_repo.get_by_id(user_id)
         if not user or not user.profile:
             raise ValueError("User profile incomplete or not found")
+        return user.profile
+
+    def _take_prepared_plan_data(
+        self, plan_type: str, user_id: str, profile: UserProfile, bypass_cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Plan data generated in the background for this very profile, if it is ready"""
+        if not self.pregenerator or bypass_cache:
+            return None
+        plan_data = self.pregenerator.take(plan_type, user_id, profile)
+        if plan_data is not None:
+            self._log_hit("pregenerated")
+        return plan_data
+
+    def _get_cached_plan_data(self, plan_type: str, profile: UserProfile, bypass_cache: bool) -> Optional[Dict[str, Any]]:
+        """Return cached AI output for an identical profile, unless caching is off or bypassed"""
+        if not self.plan_cache:
+            return None
+        if bypass_cache:
+            self.plan_cache.record_bypass()
+            return None
+        plan_data = self.plan_cache.get(plan_type, profile)
+        if plan_data is not None:
+            self._log_hit("plan_cache")
+        return plan_data
+
+    def _get_similar_plan_data(self, plan_type: str, profile: UserProfile, bypass_cache: bool) -> Optional[Dict[str, Any]]:
+        """Adapted copy of an approved plan for a near-identical profile, if there is one"""
+        if not self.plan_matcher or bypass_cache:
+            return None
+        plan_data = self.plan_matcher.find(plan_type, profile)
+        if plan_data is not None:
+            self._log_hit("plan_reuse")
+        return plan_data
+
+    def _log_hit(self, source: str) -> None:
+        """Ledger entry for a plan served without calling a provider"""
+        if self.usage_ledger is not None:
+            self.usage_ledger.record(source, cache_hit=True)
+
+    def _remember_approved_plan(self, plan_type: str, plan) -> None:
+        """Make a freshly approved plan available for reuse by similar profiles"""
+        if not self.plan_matcher:
+            return
+        user = self.user_repo.get_by_id(plan.user_id)
+        if not user or not user.profile:
+            return
+        if plan_type == "workout":
+            plan_data = {'sessions': [asdict(s) for s in plan.sessions]}
+        else:
+            plan_data = {'daily_plans': [asdict(d) for d in plan.daily_plans]}
+        self.plan_matcher.remember(plan_type, plan.id, user.profile, plan_data)
+
+    def _cache_plan_data(self, plan_type: str, profile: UserProfile, plan_data: Dict[str, Any]) -> None:
+        """
+        Remember AI output for reuse. Empty plans are never cached, nor are
+        plans with anything served by the rule-based fallback, whether the
+        whole plan, streamed items, repaired days or fan-out groups.
+        """
+        items_key = 'sessions' if plan_type == "workout" else 'daily_plans'
+        if self.plan_cache and plan_data.get(items_key) and is_cacheable(plan_type, plan_data):
+            self.plan_cache.put(plan_type, profile, plan_data)
+
+    def _build_workout_session(self, s: Dict[str, Any]) -> WorkoutSession:
+        exercises = []
+        for e in s.get('exercises', []):
+            exercises.append(Exercise(
+                name=e.get('name', 'Unknown Exercise'),
+                description=e.get('description', ''),
+                sets=e.get('sets', 0),
+                reps=str(e.get('reps', '')),
+                rest_time=str(e.get('rest_time', '')),
+                video_url=e.get('video_url')
+            ))
+        return WorkoutSession(
+            day=s.get('day', 'Unknown Day'),
+            focus=s.get('focus', 'General'),
+            exercises=exercises
+        )
 
-        # Get raw data from AI service
-        plan_data = self.ai_service.generate_workout_plan(user.profile)
-        
-        # Convert raw data to domain objects
-        sessions = []
-        if 'sessions' in plan_data:
-            for s in plan_data['sessions']:
-                exercises = []
-                if 'exercises' in s:
-                    for e in s['exercises']:
-                        exercises.append(Exercise(
-                            name=e.get('name', 'Unknown Exercise'),
-                            description=e.get('description', ''),
-                            sets=e.get('sets', 0),
-                            reps=str(e.get('reps', '')),
-                            rest_time=str(e.get('rest_time', '')),
-                            video_url=e.get('video_url')
-                        ))
-                sessions.append(WorkoutSession(
-                    day=s.get('day', 'Unknown Day'),
-                    focus=s.get('focus', 'General'),
-                    exercises=exercises
-                ))
-
-        # Create domain plan
-        import uuid
-        from datetime import datetime, timedelta
-        
-        plan = WorkoutPlan(
+    def _build_daily_meal_plan(self, d: Dict[str, Any]) -> DailyMealPlan:
+        meals = []
+        for m in d.get('meals', []):
+            meals.append(Meal(
+                name=m.get('name', 'Unknown Meal'),
+                description=m.get('description', ''),
+                calories=m.get('calories', 0),
+                protein=m.get('protein', 0),
+                carbs=m.get('carbs', 0),
+                fats=m.get('fats', 0),
+                ingredients=m.get('ingredients', [])
+            ))
+        return DailyMealPlan(
+            day=d.get('day', 'Unknown Day'),
+            meals=meals
+        )
+
+    def _build_workout_plan(self, user_id: str, plan_data: Dict[str, Any]) -> WorkoutPlan:
+        """Convert raw AI output into a draft WorkoutPlan"""
+        sessions = [self._build_workout_session(s) for s in plan_data.get('sessions', [])]
+
+        return WorkoutPlan(
             id=str(uuid.uuid4()),
             user_id=user_id,
             start_date=datetime.now(),
@@ -66,44 +623,12 @@ class PlanningService:
             created_by=user_id,
             state="draft"
         )
-        
-        self.workout_repo.save(plan)
-        return plan
 
-    def generate_nutrition_plan(self, user_id: str) -> NutritionPlan:
-        user = self.user_repo.get_by_id(user_id)
-        if not user or not user.profile:
-            raise ValueError("User profile incomplete or not found")
+    def _build_nutrition_plan(self, user_id: str, plan_data: Dict[str, Any]) -> NutritionPlan:
+        """Convert raw AI output into a draft NutritionPlan"""
+        daily_plans = [self._build_daily_meal_plan(d) for d in plan_data.get('daily_plans', [])]
 
-        # Get raw data from AI service
-        plan_data = self.ai_service.generate_nutrition_plan(user.profile)
-        
-        # Convert raw data to domain objects
-        daily_plans = []
-        if 'daily_plans' in plan_data:
-            for d in plan_data['daily_plans']:
-                meals = []
-                if 'meals' in d:
-                    for m in d['meals']:
-                        meals.append(Meal(
-                            name=m.get('name', 'Unknown Meal'),
-                            description=m.get('description', ''),
-                            calories=m.get('calories', 0),
-                            protein=m.get('protein', 0),
-                            carbs=m.get('carbs', 0),
-                            fats=m.get('fats', 0),
-                            ingredients=m.get('ingredients', [])
-                        ))
-                daily_plans.append(DailyMealPlan(
-                    day=d.get('day', 'Unknown Day'),
-                    meals=meals
-                ))
-
-        # Create domain plan
-        import uuid
-        from datetime import datetime, timedelta
-        
-        plan = NutritionPlan(
+        return NutritionPlan(
             id=str(uuid.uuid4()),
             user_id=user_id,
             start_date=datetime.now(),
@@ -113,9 +638,6 @@ class PlanningService:
             created_by=user_id,
             state="draft"
         )
-        
-        self.nutrition_repo.save(plan)
-        return plan
 
     def _activate_plan(self, plan_id: str, user_id: str, repo):
         """
@@ -200,6 +722,7 @@ class PlanningService:
         )
         
         self.workout_repo.update(updated_plan)
+        self._remember_approved_plan("workout", updated_plan)
         return updated_plan
 
     def update_nutrition_plan(
@@ -241,4 +764,5 @@ class PlanningService:
         )
         
         self.nutrition_repo.update(updated_plan)
+        self._remember_approved_plan("nutrition", updated_plan)
         return updated_plan
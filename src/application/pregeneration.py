@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from src.domain.models import GenerationJob, JobStatus, PreparedPlan, UserProfile
+from src.domain.repositories import GenerationJobRepository, PreparedPlanRepository
+from src.application.plan_cache import profile_fingerprint
+
+# Queue priority of speculative jobs: any job someone is waiting for runs first
+SPECULATIVE_PRIORITY = -10
+
+PLAN_TYPES = ("workout", "nutrition")
+
+
+class PlanPregenerator:
+    """
+    Generates plan data ahead of the user's first generate request.
+
+    Completing or changing a profile queues a low-priority job per plan type,
+    which fills a PreparedPlan with plan data for that profile (see
+    JobService.run_job). The next generate request turns it into a draft
+    without waiting on the provider. Prepared data is only used with the
+    profile it was generated for, and only once; changing the profile in a way
+    that changes the plan discards it.
+    """
+
+    def __init__(
+        self,
+        prepared_repo: PreparedPlanRepository,
+        job_repo: GenerationJobRepository,
+        max_age_seconds: float = 86400
+    ):
+        self.prepared_repo = prepared_repo
+        self.job_repo = job_repo
+        self.max_age_seconds = max_age_seconds
+
+    def profile_updated(self, user_id: str, previous: Optional[UserProfile], profile: UserProfile) -> List[GenerationJob]:
+        """
+        Queue speculative generation for each plan type the profile change affects.
+
+        Returns:
+            The queued jobs (none when the change doesn't alter any plan)
+        """
+        jobs = []
+        for plan_type in PLAN_TYPES:
+            profile_key = profile_fingerprint(profile, plan_type)
+            if previous is not None and profile_fingerprint(previous, plan_type) == profile_key:
+                continue
+            existing = self.prepared_repo.get(user_id, plan_type)
+            if existing:
+                self.discard(existing)
+            # JobService imports PlanningService, which uses this module, so the job is built here
+            job = GenerationJob(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                plan_type=plan_type,
+                requested_by=user_id,
+                status=JobStatus.QUEUED.value,
+                priority=SPECULATIVE_PRIORITY,
+                created_at=datetime.now()
+            )
+            # The entry goes in first: it is what marks the job as speculative
+            self.prepared_repo.save(PreparedPlan(user_id, plan_type, profile_key, job.id))
+            self.job_repo.save(job)
+            jobs.append(job)
+        return jobs
+
+    def get_for_job(self, job_id: str) -> Optional[PreparedPlan]:
+        """The entry a speculative job fills, or None for an ordinary job"""
+        return self.prepared_repo.get_by_job(job_id)
+
+    def fill(self, prepared: PreparedPlan, plan_data: Dict[str, Any]) -> None:
+        """Store the job's plan data, unless the entry was discarded while it ran"""
+        current = self.prepared_repo.get(prepared.user_id, prepared.plan_type)
+        if current is None or current.job_id != prepared.job_id:
+            return
+        current.plan_data = plan_data
+        self.prepared_repo.save(current)
+
+    def take(self, plan_type: str, user_id: str, profile: UserProfile) -> Optional[Dict[str, Any]]:
+        """
+        Claim the ready plan data for the user's current profile.
+
+        Returns:
+            The plan data, or None if nothing usable is prepared
+        """
+        prepared = self.prepared_repo.get(user_id, plan_type)
+        if prepared is None:
+            return None
+        if prepared.profile_key != profile_fingerprint(profile, plan_type) or self._expired(prepared):
+            self.discard(prepared)
+            return None
+        if prepared.plan_data is None:
+            # The caller is about to generate anyway; don't spend the call twice
+            if self.job_repo.cancel_queued(prepared.job_id):
+                self.prepared_repo.delete(prepared)
+            return None
+        if not self.prepared_repo.delete(prepared):
+            return None
+        return prepared.plan_data
+
+    def discard(self, prepared: PreparedPlan) -> None:
+        """Drop the entry, cancelling its job if it hasn't started"""
+        self.job_repo.cancel_queued(prepared.job_id)
+        self.prepared_repo.delete(prepared)
+
+    def _expired(self, prepared: PreparedPlan) -> bool:
+        return prepared.created_at < datetime.now() - timedelta(seconds=self.max_age_seconds)
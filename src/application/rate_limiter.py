@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+from src.domain.models import TokenBucket, User
+from src.domain.repositories import RateLimitRepository
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    """Burst size and sustained rate of one role's bucket"""
+    capacity: int
+    per_hour: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_hour / 3600
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of taking (or just inspecting) tokens from a bucket"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_seconds: float  # Until enough tokens for the request; 0 when allowed
+    reset_after_seconds: float  # Until the bucket is full again
+
+
+def parse_budgets(spec: str) -> Dict[str, RateLimitBudget]:
+    """Parse "client=5/10,trainer=50/200" into per-role budgets (capacity/per-hour refill)"""
+    budgets = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            role, value = entry.split("=")
+            capacity, per_hour = value.split("/")
+            budgets[role.strip()] = RateLimitBudget(int(capacity), float(per_hour))
+        except ValueError:
+            raise ValueError(f"Invalid rate limit budget: {entry.strip()!r} (expected role=capacity/per_hour)")
+    return budgets
+
+
+class InMemoryRateLimitStore(RateLimitRepository):
+    """Process-local bucket state, for a single API worker"""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[TokenBucket]:
+        with self._lock:
+            return self._buckets.get(key)
+
+    def compare_and_set(self, expected: Optional[TokenBucket], bucket: TokenBucket) -> bool:
+        with self._lock:
+            if self._buckets.get(bucket.key) != expected:
+                return False
+            self._buckets[bucket.key] = bucket
+            return True
+
+
+class RateLimiter:
+    """Token bucket per user, sized by the most generous of the user's roles.
+
+    Buckets start full and refill continuously. Updates use compare-and-set,
+    so the same limiter works across workers with a shared DB store.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(
+        self,
+        store: RateLimitRepository,
+        budgets: Dict[str, RateLimitBudget],
+        scope: str = "generation",
+        clock: Callable[[], float] = time.time
+    ):
+        self.store = store
+        self.budgets = budgets
+        self.scope = scope
+        self._clock = clock
+
+    def budget_for(self, roles: Iterable[str]) -> Optional[RateLimitBudget]:
+        """Largest budget among the roles; None means the user is not limited"""
+        matching = [self.budgets[role] for role in roles if role in self.budgets]
+        if not matching:
+            return self.budgets.get("default")
+        return max(matching, key=lambda b: (b.capacity, b.per_hour))
+
+    def consume(self, user: User, cost: int = 1) -> RateLimitDecision:
+        """Take cost tokens if available; the bucket is left untouched when denied.
+
+        A cost above the bucket's capacity is always denied: it could never be paid.
+        """
+        budget = self.budget_for(user.roles)
+        if budget is None:
+            return RateLimitDecision(True, 0, 0, 0.0, 0.0)
+        cost = max(1, cost)
+        key = self._key(user)
+        if cost > budget.capacity:
+            return self._decision(False, budget, self._refilled(self.store.get(key), budget, self._clock()), cost)
+
+        for _ in range(self.MAX_ATTEMPTS):
+            stored = self.store.get(key)
+            now = self._clock()
+            tokens = self._refilled(stored, budget, now)
+            if tokens < cost:
+                return self._decision(False, budget, tokens, cost)
+            if self.store.compare_and_set(stored, TokenBucket(key, tokens - cost, now)):
+                return self._decision(True, budget, tokens - cost, cost)
+        # Lost every race: another request is spending the same bucket right now
+        return self._decision(False, budget, 0.0, cost)
+
+    def refund(self, user: User, cost: int = 1) -> None:
+        """Give back tokens taken for a request that generated nothing (never past a full bucket)"""
+        budget = self.budget_for(user.roles)
+        if budget is None or cost < 1:
+            return
+        key = self._key(user)
+
+        for _ in range(self.MAX_ATTEMPTS):
+            stored = self.store.get(key)
+            now = self._clock()
+            tokens = min(float(budget.capacity), self._refilled(stored, budget, now) + cost)
+            if self.store.compare_and_set(stored, TokenBucket(key, tokens, now)):
+                return
+
+    def usage(self, user: User) -> RateLimitDecision:
+        """Current state of the user's bucket, without taking anything"""
+        budget = self.budget_for(user.roles)
+        if budget is None:
+            return RateLimitDecision(True, 0, 0, 0.0, 0.0)
+        tokens = self._refilled(self.store.get(self._key(user)), budget, self._clock())
+        return self._decision(tokens >= 1, budget, tokens, 1)
+
+    def _key(self, user: User) -> str:
+        return f"{self.scope}:{user.id}"
+
+    def _refilled(self, stored: Optional[TokenBucket], budget: RateLimitBudget, now: float) -> float:
+        if stored is None:
+            return float(budget.capacity)
+        elapsed = max(0.0, now - stored.updated_at)
+        return min(float(budget.capacity), stored.tokens + elapsed * budget.refill_per_second)
+
+    def _decision(self, allowed: bool, budget: RateLimitBudget, tokens: float, cost: int) -> RateLimitDecision:
+        rate = budget.refill_per_second
+
+        def seconds_until(amount: float) -> float:
+            missing = max(0.0, amount - tokens)
+            if not missing:
+                return 0.0
+            return math.inf if rate <= 0 else missing / rate
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=budget.capacity,
+            remaining=int(math.floor(tokens + 1e-9)),
+            retry_after_seconds=0.0 if allowed else seconds_until(cost),
+            reset_after_seconds=seconds_until(budget.capacity)
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from src.domain.repositories import GenerationLeaseRepository
+from src.application.blocking import BlockingCalls
+
+
+class _LeaderCancelled(Exception):
+    """The caller running a shared call was cancelled before it finished"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for, and receive, the same result (or exception). Works for
+    threads and for coroutines on any event loop, since waiters share a
+    thread-safe concurrent.futures.Future.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                return await asyncio.wrap_future(future)
+            except _LeaderCancelled:
+                # Its client went away; the waiters still want the result
+                return await self.do_async(key, fn)
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class GenerationLease:
+    """Cross-worker coalescing through a lease row in the database.
+
+    The worker holding the lease generates; the others wait for the lease to
+    be released and then reuse the result it persisted, generating themselves
+    only if nothing usable shows up.
+
+    run_async makes its lease and result lookups through blocking_calls, so
+    they stay off the event loop and take turns with the other repository
+    calls of the request.
+    """
+
+    def __init__(
+        self,
+        lease_repo: GenerationLeaseRepository,
+        ttl_seconds: float = 120,
+        poll_seconds: float = 0.5,
+        blocking_calls: Optional[BlockingCalls] = None
+    ):
+        self.lease_repo = lease_repo
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.blocking_calls = blocking_calls or BlockingCalls()
+
+    def run(self, key: str, generate: Callable[[], Any], fetch_result: Callable[[datetime], Optional[Any]]) -> Any:
+        """Run generate under the lease, or wait for the holder and reuse its result
+
+        Args:
+            key: Lease key (plan type and user)
+            generate: Produces and persists the result
+            fetch_result: Loads a result persisted since the given time, if any
+        """
+        owner = str(uuid.uuid4())
+        if self.lease_repo.acquire(key, owner, self.ttl_seconds):
+            try:
+                return generate()
+            finally:
+                self.lease_repo.release(key, owner)
+
+        since = datetime.now() - timedelta(seconds=self.ttl_seconds)
+        deadline = time.monotonic() + self.ttl_seconds
+        while self.lease_repo.is_held(key) and time.monotonic() < deadline:
+            time.sleep(self.poll_seconds)
+
+        result = fetch_result(since)
+        return result if result is not None else generate()
+
+    async def run_async(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Any]],
+        fetch_result: Callable[[datetime], Optional[Any]]
+    ) -> Any:
+        """Async counterpart of run"""
+        run = self.blocking_calls.run
+        owner = str(uuid.uuid4())
+        if await run(self.lease_repo.acquire, key, owner, self.ttl_seconds):
+            try:
+                return await generate()
+            finally:
+                await run(self.lease_repo.release, key, owner)
+
+        since = datetime.now() - timedelta(seconds=self.ttl_seconds)
+        deadline = time.monotonic() + self.ttl_seconds
+        while await run(self.lease_repo.is_held, key) and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_seconds)
+
+        result = await run(fetch_result, since)
+        return result if result is not None else await generate()
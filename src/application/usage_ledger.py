@@ -0,0 +1,197 @@
+"""
+Per-call AI usage ledger.
+
+Provider services hand every call to an AIUsageLedger, which prices it and
+buffers it in memory; a background thread writes the buffer in batches, so
+recording never waits on the database. Who the call was for (endpoint, plan
+owner, plan) comes from the UsageContext current when the call is made.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from src.domain.models import AIUsageRecord
+
+T = TypeVar('T')
+
+
+@dataclass
+class UsageContext:
+    """What AI calls are being made for; plan_id is filled in once the plan is saved"""
+    endpoint: Optional[str] = None
+    user_id: Optional[str] = None
+    plan_type: Optional[str] = None
+    plan_id: Optional[str] = None
+
+
+_current: ContextVar[Optional[UsageContext]] = ContextVar("ai_usage_context", default=None)
+
+
+def current_usage_context() -> Optional[UsageContext]:
+    return _current.get()
+
+
+@contextmanager
+def usage_scope(context: UsageContext) -> Iterator[UsageContext]:
+    """Attribute the AI calls made inside the block to the context"""
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+async def iterate_in_usage_scope(stream: AsyncIterator[T], context: UsageContext) -> AsyncIterator[T]:
+    """Items of the stream, each produced with the context current"""
+    while True:
+        with usage_scope(context):
+            try:
+                item = await stream.__anext__()
+            except StopAsyncIteration:
+                return
+        yield item
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens"""
+    prompt: float
+    completion: float
+    cached: float
+
+    def cost(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+        uncached = max(0, prompt_tokens - cached_tokens)
+        return (uncached * self.prompt + cached_tokens * self.cached + completion_tokens * self.completion) / 1_000_000
+
+
+def parse_prices(spec: str) -> Dict[str, ModelPrice]:
+    """Parse "gpt-4o-mini=0.15/0.60/0.075,..." into per-model prices (prompt/completion[/cached] per 1M tokens)"""
+    prices = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            model, value = entry.split("=")
+            parts = [float(p) for p in value.split("/")]
+            if len(parts) not in (2, 3):
+                raise ValueError
+            prompt, completion = parts[0], parts[1]
+            prices[model.strip()] = ModelPrice(prompt, completion, parts[2] if len(parts) == 3 else prompt)
+        except ValueError:
+            raise ValueError(f"Invalid AI price: {entry.strip()!r} (expected model=prompt/completion[/cached])")
+    return prices
+
+
+class AIUsageLedger:
+    """
+    Buffers usage records and writes them in batches from a background thread.
+
+    A batch is written every flush_seconds, or as soon as batch_size records
+    are waiting. If writing fails the batch is dropped (and reported), and at
+    most max_pending records are kept while the database is unreachable.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[AIUsageRecord]], None],
+        prices: Optional[Dict[str, ModelPrice]] = None,
+        batch_size: int = 200,
+        flush_seconds: float = 2.0,
+        max_pending: int = 10000
+    ):
+        self.write_batch = write_batch
+        self.prices = prices or {}
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[AIUsageRecord, Optional[UsageContext]]] = []
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def record(
+        self,
+        provider: str,
+        model: str = "",
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_seconds: float = 0.0,
+        outcome: str = "ok",
+        cache_hit: bool = False
+    ) -> None:
+        """Queue one call for writing, attributed to the current UsageContext"""
+        price = self.prices.get(model)
+        record = AIUsageRecord(
+            provider=provider,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            completion_tokens=completion_tokens,
+            latency_ms=round(latency_seconds * 1000),
+            outcome=outcome,
+            cache_hit=cache_hit,
+            cost_usd=price.cost(prompt_tokens, cached_tokens, completion_tokens) if price else 0.0
+        )
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append((record, current_usage_context()))
+            full = len(self._pending) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of records written"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        # Resolved now rather than at record time: the plan is saved after its AI calls
+        records = [_attribute(record, context) for record, context in pending]
+        try:
+            self.write_batch(records)
+        except Exception as e:
+            print(f"Failed to write {len(records)} AI usage record(s): {e}")
+            return 0
+        return len(records)
+
+    def close(self) -> None:
+        """Stop the writer thread and write what is left"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ai-usage-ledger", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+
+def _attribute(record: AIUsageRecord, context: Optional[UsageContext]) -> AIUsageRecord:
+    if context is None:
+        return record
+    return replace(
+        record,
+        endpoint=context.endpoint,
+        user_id=context.user_id,
+        plan_type=context.plan_type,
+        plan_id=context.plan_id
+    )
@@ -0,0 +1,60 @@
+import math
+from collections import defaultdict
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from src.domain.repositories import AIUsageRepository
+
+# Upper bound on the calls loaded to compute latency percentiles
+MAX_LATENCY_SAMPLES = 50000
+
+
+class AIUsageService:
+    """Reports over the AI usage ledger"""
+
+    def __init__(self, usage_repo: AIUsageRepository):
+        self.usage_repo = usage_repo
+
+    def spend(self, days: int = 30, group_by: str = "provider") -> Dict[str, Any]:
+        """
+        Calls, tokens and cost per day, split by provider, model, endpoint,
+        user or plan type.
+
+        Raises:
+            ValueError: If days is not positive or the grouping is unknown
+        """
+        since = self._since(days)
+        totals = self.usage_repo.daily_totals(since, group_by)
+        return {
+            "since": since.date().isoformat(),
+            "group_by": group_by,
+            "total_cost_usd": round(sum(t.cost_usd for t in totals), 6),
+            "days": [asdict(t) for t in totals],
+        }
+
+    def latency(self, days: int = 1) -> Dict[str, Any]:
+        """p50/p95 latency (ms) of successful provider calls per provider and model"""
+        samples = defaultdict(list)
+        for provider, model, latency_ms in self.usage_repo.latencies(self._since(days), MAX_LATENCY_SAMPLES):
+            samples[f"{provider}/{model}" if model else provider].append(latency_ms)
+        result = {}
+        for name, values in sorted(samples.items()):
+            values.sort()
+            result[name] = {
+                "calls": len(values),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+            }
+        return result
+
+    def _since(self, days: int) -> datetime:
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=days - 1)
+
+
+def _percentile(sorted_values: List[int], q: float) -> int:
+    """Nearest-rank percentile of a non-empty sorted list"""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
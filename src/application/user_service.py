@@ -1,10 +1,13 @@
 from typing import Optional
 from src.domain.models import User, UserProfile
 from src.domain.repositories import UserRepository
+from src.application.pregeneration import PlanPregenerator
 
 class UserService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, pregenerator: Optional[PlanPregenerator] = None):
         self.user_repo = user_repo
+        # Set to draft plans in the background as soon as a profile is complete
+        self.pregenerator = pregenerator
 
     def register_user(self, user_id: str, username: str) -> User:
         existing_user = self.user_repo.get_by_id(user_id)
@@ -20,8 +23,16 @@ class UserService:
         if not user:
             raise ValueError("User not found")
         
+        previous = user.profile
         user.profile = profile
         self.user_repo.update(user)
+        
+        if self.pregenerator:
+            try:
+                self.pregenerator.profile_updated(user_id, previous, profile)
+            except Exception as e:
+                # Only a head start; the profile update itself succeeded
+                print(f"Could not queue plan pre-generation: {e}")
         return user
 
     def get_user(self, user_id: str) -> Optional[User]:
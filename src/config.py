@@ -17,7 +17,114 @@ class Settings:
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     
     # AI Configuration
-    DEFAULT_AI_PROVIDER: str = os.getenv("DEFAULT_AI_PROVIDER", "gemini") # gemini or openai
+    DEFAULT_AI_PROVIDER: str = os.getenv("DEFAULT_AI_PROVIDER", "gemini") # gemini, openai, rule_based or replay
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    # Constrain responses to the plan JSON schema (needs a model with structured output support)
+    AI_STRUCTURED_OUTPUT: bool = os.getenv("AI_STRUCTURED_OUTPUT", "true").lower() == "true"
+    # Ask for full-week plans in a short-key JSON format, expanded locally (fewer output tokens)
+    AI_COMPACT_OUTPUT: bool = os.getenv("AI_COMPACT_OUTPUT", "false").lower() == "true"
+    
+    # Send simple profiles to a smaller, faster model; answers failing the schema check go to the *_MODEL tier
+    AI_TIERING_ENABLED: bool = os.getenv("AI_TIERING_ENABLED", "false").lower() == "true"
+    AI_TIER_COMPLEXITY_THRESHOLD: float = float(os.getenv("AI_TIER_COMPLEXITY_THRESHOLD", "1.0"))
+    GEMINI_SMALL_MODEL: str = os.getenv("GEMINI_SMALL_MODEL", "gemini-1.5-flash-8b")
+    OPENAI_SMALL_MODEL: str = os.getenv("OPENAI_SMALL_MODEL", "gpt-4o-mini")
+    
+    # Fall back to the local rule-based generator when the provider fails or times out
+    AI_FALLBACK_ENABLED: bool = os.getenv("AI_FALLBACK_ENABLED", "true").lower() == "true"
+    AI_TIMEOUT_SECONDS: float = float(os.getenv("AI_TIMEOUT_SECONDS", "30"))
+    # Overall time for the AI work of one generation (all calls and repairs); 0 disables
+    AI_REQUEST_BUDGET_SECONDS: float = float(os.getenv("AI_REQUEST_BUDGET_SECONDS", "45"))
+    
+    # Provider HTTP clients, created once per process and shared by every request
+    AI_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("AI_HTTP_TIMEOUT_SECONDS", "60"))
+    AI_HTTP_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    
+    # Hedged requests: also ask the other provider when the default one is slow
+    AI_HEDGE_ENABLED: bool = os.getenv("AI_HEDGE_ENABLED", "false").lower() == "true"
+    AI_HEDGE_DELAY_SECONDS: float = float(os.getenv("AI_HEDGE_DELAY_SECONDS", "2.0"))
+    AI_HEDGE_ADAPTIVE: bool = os.getenv("AI_HEDGE_ADAPTIVE", "true").lower() == "true"
+    AI_HEDGE_PERCENTILE: float = float(os.getenv("AI_HEDGE_PERCENTILE", "95"))
+    
+    # Per-provider circuit breakers and routing across configured providers
+    AI_CIRCUIT_BREAKER_ENABLED: bool = os.getenv("AI_CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    AI_BREAKER_FAILURE_RATE: float = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+    AI_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", "20"))
+    AI_BREAKER_SLOW_CALL_RATE: float = float(os.getenv("AI_BREAKER_SLOW_CALL_RATE", "0.8"))
+    AI_BREAKER_WINDOW: int = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+    AI_BREAKER_MIN_CALLS: int = int(os.getenv("AI_BREAKER_MIN_CALLS", "5"))
+    AI_BREAKER_OPEN_SECONDS: float = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+    AI_LATENCY_ROUTING: bool = os.getenv("AI_LATENCY_ROUTING", "true").lower() == "true"
+    
+    # Offline replay of recorded provider responses (DEFAULT_AI_PROVIDER=replay)
+    AI_REPLAY_CORPUS_PATH: str = os.getenv("AI_REPLAY_CORPUS_PATH", "data/ai_corpus.jsonl")
+    AI_REPLAY_LATENCY: str = os.getenv("AI_REPLAY_LATENCY", "recorded") # none, recorded, fixed:s, uniform:a,b, normal:m,sd, lognormal:mu,sigma
+    AI_REPLAY_ERROR_RATE: float = float(os.getenv("AI_REPLAY_ERROR_RATE", "0"))
+    AI_REPLAY_TRUNCATION_RATE: float = float(os.getenv("AI_REPLAY_TRUNCATION_RATE", "0"))
+    # When set, real provider responses are appended to this corpus
+    AI_RECORD_CORPUS_PATH: Optional[str] = os.getenv("AI_RECORD_CORPUS_PATH")
+
+    # Per-call usage ledger (tokens, latency, cost), written to the database in batches
+    AI_USAGE_LEDGER_ENABLED: bool = os.getenv("AI_USAGE_LEDGER_ENABLED", "true").lower() == "true"
+    AI_USAGE_BATCH_SIZE: int = int(os.getenv("AI_USAGE_BATCH_SIZE", "200"))
+    AI_USAGE_FLUSH_SECONDS: float = float(os.getenv("AI_USAGE_FLUSH_SECONDS", "2"))
+    # USD per 1M tokens: model=prompt/completion[/cached],...
+    AI_PRICES: str = os.getenv(
+        "AI_PRICES",
+        "gpt-4o-mini=0.15/0.60/0.075,gemini-1.5-flash=0.075/0.30/0.01875,gemini-1.5-flash-8b=0.0375/0.15/0.01"
+    )
+    
+    # Plan generation cache (keyed by profile fingerprint)
+    PLAN_CACHE_ENABLED: bool = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_MAX_ENTRIES: int = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "512"))
+    PLAN_CACHE_TTL_SECONDS: int = int(os.getenv("PLAN_CACHE_TTL_SECONDS", "86400"))
+    
+    # Reuse of approved plans for near-identical profiles instead of calling the AI
+    PLAN_REUSE_ENABLED: bool = os.getenv("PLAN_REUSE_ENABLED", "true").lower() == "true"
+    PLAN_REUSE_MAX_DISTANCE: float = float(os.getenv("PLAN_REUSE_MAX_DISTANCE", "1.0"))
+    PLAN_REUSE_RELOAD_SECONDS: float = float(os.getenv("PLAN_REUSE_RELOAD_SECONDS", "300"))
+    
+    # Coalescing of duplicate concurrent generations (same user and plan type)
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    GENERATION_LEASE_SECONDS: int = int(os.getenv("GENERATION_LEASE_SECONDS", "120"))
+    GENERATION_LEASE_POLL_SECONDS: float = float(os.getenv("GENERATION_LEASE_POLL_SECONDS", "0.5"))
+    
+    # Generate a week as parallel calls of this many days each (0 = one call per week)
+    PLAN_FAN_OUT_DAYS: int = int(os.getenv("PLAN_FAN_OUT_DAYS", "0"))
+    
+    # Upper bound on simultaneous AI calls when generating for a whole roster
+    BULK_GENERATION_CONCURRENCY: int = int(os.getenv("BULK_GENERATION_CONCURRENCY", "5"))
+    
+    # Per-user token buckets on AI generation endpoints: role=capacity/refill-per-hour
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_STORE: str = os.getenv("RATE_LIMIT_STORE", "memory") # memory or database
+    RATE_LIMIT_BUDGETS: str = os.getenv(
+        "RATE_LIMIT_BUDGETS", "client=5/10,trainer=150/300,nutritionist=150/300,admin=200/500"
+    )
+    
+    # Admission control: per-process cap on synchronous generations, shedding load with 503 when exceeded
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+    ADMISSION_MAX_LATENCY_SECONDS: float = float(os.getenv("ADMISSION_MAX_LATENCY_SECONDS", "40")) # 0 disables
+    ADMISSION_LATENCY_WINDOW_SECONDS: float = float(os.getenv("ADMISSION_LATENCY_WINDOW_SECONDS", "60"))
+    ADMISSION_RETRY_AFTER_SECONDS: float = float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+    
+    # Draft plans generated in the background (low-priority jobs) once a profile is complete
+    PLAN_PREGENERATION_ENABLED: bool = os.getenv("PLAN_PREGENERATION_ENABLED", "false").lower() == "true"
+    PLAN_PREGENERATION_MAX_AGE_SECONDS: int = int(os.getenv("PLAN_PREGENERATION_MAX_AGE_SECONDS", "86400"))
+    
+    # Background generation worker
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_POLL_INTERVAL_SECONDS: float = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "1.0"))
+    JOB_STALE_AFTER_SECONDS: int = int(os.getenv("JOB_STALE_AFTER_SECONDS", "600"))
+    # Runs a job gets before a stale one is failed instead of requeued (e.g. it keeps killing its worker)
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
 
 @lru_cache()
 def get_settings():
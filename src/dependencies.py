@@ -1,6 +1,7 @@
+from typing import Optional
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from src.infrastructure.database import get_db
+from src.infrastructure.database import get_db, SessionLocal
 from src.domain.repositories import (
     UserRepository, 
     CompleteUserRepository,
@@ -8,7 +9,14 @@ from src.domain.repositories import (
     NutritionPlanRepository,
     PlanVersionRepository,
     PlanCommentRepository,
-    NotificationRepository
+    NotificationRepository,
+    PlanCacheRepository,
+    GenerationJobRepository,
+    GenerationLeaseRepository,
+    ApprovedPlanRepository,
+    RateLimitRepository,
+    AIUsageRepository,
+    PreparedPlanRepository
 )
 from src.infrastructure.repositories import (
     SqlAlchemyUserRepository, 
@@ -16,7 +24,14 @@ from src.infrastructure.repositories import (
     SqlAlchemyNutritionPlanRepository,
     SqlAlchemyPlanVersionRepository,
     SqlAlchemyPlanCommentRepository,
-    SqlAlchemyNotificationRepository
+    SqlAlchemyNotificationRepository,
+    SqlAlchemyPlanCacheRepository,
+    SqlAlchemyGenerationJobRepository,
+    SqlAlchemyGenerationLeaseRepository,
+    SqlAlchemyApprovedPlanRepository,
+    SqlAlchemyRateLimitRepository,
+    SqlAlchemyAIUsageRepository,
+    SqlAlchemyPreparedPlanRepository
 )
 from src.application.user_service import UserService
 from src.application.planning_service import PlanningService
@@ -24,10 +39,27 @@ from src.application.role_service import RoleService
 from src.application.version_service import VersionService
 from src.application.comment_service import CommentService
 from src.application.notification_service import NotificationService
+from src.application.job_service import JobService
 from src.application.interfaces import AIService
-from src.infrastructure.ai import GeminiAIService
+from src.application.plan_cache import PlanCache, PlanCacheStats, TTLLRUCache
+from src.application.plan_similarity import SimilarPlanIndex, SimilarPlanMatcher
+from src.application.rate_limiter import RateLimiter, InMemoryRateLimitStore, parse_budgets
+from src.application.single_flight import SingleFlight, GenerationLease
+from src.application.blocking import BlockingCalls
+from src.application.deadline import Deadline
+from src.application.admission import AdmissionController
+from src.application.pregeneration import PlanPregenerator
+from src.application.usage_ledger import AIUsageLedger, parse_prices
+from src.application.usage_service import AIUsageService
+import src.infrastructure.ai as ai_providers
+from src.infrastructure.ai import RuleBasedAIService, FallbackAIService, HedgedAIService, ProviderRouter, TieredAIService
+from src.infrastructure.ai.circuit_breaker import CircuitBreakerRegistry
+from src.infrastructure.ai.metrics import LatencyTracker, TokenUsageTracker
+from src.infrastructure.ai.replay import ReplayAIService, RecordingAIService, ReplayCorpus
+from src.infrastructure.ai.tiered import TierStats
 
 import os
+from functools import lru_cache
 
 # Repository Providers
 def get_user_repository(db: Session = Depends(get_db)) -> CompleteUserRepository:
@@ -48,28 +80,373 @@ def get_comment_repository(db: Session = Depends(get_db)) -> PlanCommentReposito
 def get_notification_repository(db: Session = Depends(get_db)) -> NotificationRepository:
     return SqlAlchemyNotificationRepository(db)
 
+def get_plan_cache_repository(db: Session = Depends(get_db)) -> PlanCacheRepository:
+    return SqlAlchemyPlanCacheRepository(db)
+
+def get_job_repository(db: Session = Depends(get_db)) -> GenerationJobRepository:
+    return SqlAlchemyGenerationJobRepository(db)
+
+def get_lease_repository(db: Session = Depends(get_db)) -> GenerationLeaseRepository:
+    return SqlAlchemyGenerationLeaseRepository(db)
+
+def get_approved_plan_repository(db: Session = Depends(get_db)) -> ApprovedPlanRepository:
+    return SqlAlchemyApprovedPlanRepository(db)
+
+def get_rate_limit_repository(db: Session = Depends(get_db)) -> RateLimitRepository:
+    return SqlAlchemyRateLimitRepository(db)
+
+def get_ai_usage_repository(db: Session = Depends(get_db)) -> AIUsageRepository:
+    return SqlAlchemyAIUsageRepository(db)
+
+def get_prepared_plan_repository(db: Session = Depends(get_db)) -> PreparedPlanRepository:
+    return SqlAlchemyPreparedPlanRepository(db)
+
 from src.config import get_settings
 
 # Service Providers
+@lru_cache()
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide latency stats per AI provider"""
+    return LatencyTracker()
+
+@lru_cache()
+def get_token_usage() -> TokenUsageTracker:
+    """Process-wide token totals per AI provider"""
+    return TokenUsageTracker()
+
+def _write_usage(records) -> None:
+    # Runs on the ledger's writer thread, so it can't share a request's session
+    db = SessionLocal()
+    try:
+        SqlAlchemyAIUsageRepository(db).save_many(records)
+    finally:
+        db.close()
+
+@lru_cache()
+def get_usage_ledger() -> Optional[AIUsageLedger]:
+    """Process-wide buffer of per-call AI usage records"""
+    settings = get_settings()
+    if not settings.AI_USAGE_LEDGER_ENABLED:
+        return None
+    return AIUsageLedger(
+        _write_usage,
+        parse_prices(settings.AI_PRICES),
+        batch_size=settings.AI_USAGE_BATCH_SIZE,
+        flush_seconds=settings.AI_USAGE_FLUSH_SECONDS
+    )
+
+# Resolved by name so a provider's SDK is only imported when that provider is built
+PROVIDER_CLASSES = {"gemini": "GeminiAIService", "openai": "OpenAIService"}
+
+def _build_provider(provider: str, settings, small: bool = False):
+    provider_class = getattr(ai_providers, PROVIDER_CLASSES[provider])
+    if provider == "openai":
+        return provider_class(
+            settings.OPENAI_API_KEY,
+            timeout_seconds=settings.AI_HTTP_TIMEOUT_SECONDS,
+            connect_timeout_seconds=settings.AI_HTTP_CONNECT_TIMEOUT_SECONDS,
+            max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry_seconds=settings.AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            model=settings.OPENAI_SMALL_MODEL if small else settings.OPENAI_MODEL,
+            structured_output=settings.AI_STRUCTURED_OUTPUT,
+            token_usage=get_token_usage(),
+            usage_ledger=get_usage_ledger()
+        )
+    return provider_class(
+        settings.GEMINI_API_KEY,
+        timeout_seconds=settings.AI_HTTP_TIMEOUT_SECONDS,
+        model=settings.GEMINI_SMALL_MODEL if small else settings.GEMINI_MODEL,
+        structured_output=settings.AI_STRUCTURED_OUTPUT,
+        token_usage=get_token_usage(),
+        usage_ledger=get_usage_ledger()
+    )
+
+@lru_cache()
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Process-wide circuit breaker per AI provider"""
+    settings = get_settings()
+    return CircuitBreakerRegistry(
+        failure_rate_threshold=settings.AI_BREAKER_FAILURE_RATE,
+        slow_call_seconds=settings.AI_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold=settings.AI_BREAKER_SLOW_CALL_RATE,
+        window=settings.AI_BREAKER_WINDOW,
+        min_calls=settings.AI_BREAKER_MIN_CALLS,
+        open_seconds=settings.AI_BREAKER_OPEN_SECONDS
+    )
+
+@lru_cache()
+def get_replay_corpus(path: str) -> ReplayCorpus:
+    return ReplayCorpus(path)
+
+def _provider_order(settings) -> list:
+    """Default provider first, then the other one if its key is configured"""
+    primary = "openai" if settings.DEFAULT_AI_PROVIDER == "openai" else "gemini"
+    secondary = "gemini" if primary == "openai" else "openai"
+    secondary_key = settings.GEMINI_API_KEY if secondary == "gemini" else settings.OPENAI_API_KEY
+    return [primary, secondary] if secondary_key else [primary]
+
+def _build_provider_tier(settings, small: bool = False) -> tuple:
+    names = _provider_order(settings)
+    providers = [_build_provider(names[0], settings, small)]
+    for secondary in names[1:]:
+        try:
+            providers.append(_build_provider(secondary, settings, small))
+        except ImportError as e:
+            print(f"Secondary AI provider unavailable: {e}")
+    if small:
+        # Separate breaker, latency and token entries from the large tier
+        for provider in providers:
+            provider.name = f"{provider.name}:small"
+    return tuple(providers)
+
+@lru_cache()
+def get_remote_providers() -> tuple:
+    """Provider clients, built once per process so their connection pools are reused.
+
+    Default provider first, then the other one if its key is configured.
+    """
+    return _build_provider_tier(get_settings())
+
+@lru_cache()
+def get_small_remote_providers() -> tuple:
+    """Provider clients for the small-model tier (AI_TIERING_ENABLED)"""
+    return _build_provider_tier(get_settings(), small=True)
+
+@lru_cache()
+def get_tier_stats() -> TierStats:
+    """Process-wide routing, latency and escalation counts per model tier"""
+    return TierStats()
+
+def _record(providers, settings) -> list:
+    providers = list(providers)
+    if settings.AI_RECORD_CORPUS_PATH:
+        corpus = get_replay_corpus(settings.AI_RECORD_CORPUS_PATH)
+        providers = [RecordingAIService(p, corpus) for p in providers]
+    return providers
+
+def _compose(providers, settings):
+    """Hedge or route across the providers of one tier"""
+    breakers = get_circuit_breakers() if settings.AI_CIRCUIT_BREAKER_ENABLED else None
+    if settings.AI_HEDGE_ENABLED and len(providers) > 1:
+        service = HedgedAIService(
+            providers[0],
+            providers[1],
+            get_latency_tracker(),
+            hedge_delay_seconds=settings.AI_HEDGE_DELAY_SECONDS,
+            adaptive=settings.AI_HEDGE_ADAPTIVE,
+            hedge_percentile=settings.AI_HEDGE_PERCENTILE,
+            breakers=breakers
+        )
+    elif breakers:
+        service = ProviderRouter(providers, breakers, get_latency_tracker(), latency_weighted=settings.AI_LATENCY_ROUTING)
+    else:
+        service = providers[0]
+    # The outermost provider service builds the prompts, so it decides the wire format
+    service.compact_output = settings.AI_COMPACT_OUTPUT
+    return service
+
+@lru_cache()
 def get_ai_service() -> AIService:
+    """Process-wide AI service; built on first use (normally at app startup)"""
     settings = get_settings()
     # You can switch provider based on settings here if needed
-    if settings.DEFAULT_AI_PROVIDER == "openai":
-        from src.infrastructure.ai import OpenAIService
-        return OpenAIService(settings.OPENAI_API_KEY)
+    if settings.DEFAULT_AI_PROVIDER == "rule_based":
+        return RuleBasedAIService()
+    
+    if settings.DEFAULT_AI_PROVIDER == "replay":
+        service = _compose([ReplayAIService(
+            get_replay_corpus(settings.AI_REPLAY_CORPUS_PATH),
+            latency=settings.AI_REPLAY_LATENCY,
+            error_rate=settings.AI_REPLAY_ERROR_RATE,
+            truncation_rate=settings.AI_REPLAY_TRUNCATION_RATE
+        )], settings)
+    else:
+        service = _compose(_record(get_remote_providers(), settings), settings)
+        if _tiering_enabled(settings):
+            service = TieredAIService(
+                _compose(_record(get_small_remote_providers(), settings), settings),
+                service,
+                get_tier_stats(),
+                threshold=settings.AI_TIER_COMPLEXITY_THRESHOLD
+            )
     
-    return GeminiAIService(settings.GEMINI_API_KEY)
+    if settings.AI_FALLBACK_ENABLED:
+        return FallbackAIService(
+            service, RuleBasedAIService(), settings.AI_TIMEOUT_SECONDS, max_workers=_sync_ai_call_threads(settings)
+        )
+    return service
 
-def get_user_service(user_repo: UserRepository = Depends(get_user_repository)) -> UserService:
-    return UserService(user_repo)
+def _tiering_enabled(settings) -> bool:
+    """AI_TIERING_ENABLED, unless the default provider's small model is its main model"""
+    if not settings.AI_TIERING_ENABLED:
+        return False
+    if settings.DEFAULT_AI_PROVIDER == "openai":
+        small, large = settings.OPENAI_SMALL_MODEL, settings.OPENAI_MODEL
+    else:
+        small, large = settings.GEMINI_SMALL_MODEL, settings.GEMINI_MODEL
+    if small == large:
+        print(f"Small and main model are both {large}, model tiering disabled")
+        return False
+    return True
+
+def _sync_ai_call_threads(settings) -> int:
+    """Threads for blocking AI calls: one per call of every generation the worker runs at once"""
+    calls_per_generation = -(-7 // settings.PLAN_FAN_OUT_DAYS) if settings.PLAN_FAN_OUT_DAYS > 0 else 1
+    return max(8, settings.WORKER_CONCURRENCY * calls_per_generation)
+
+async def close_ai_service() -> None:
+    """Close provider connection pools; the next get_ai_service() call builds new clients"""
+    for tier in (get_remote_providers, get_small_remote_providers):
+        if not tier.cache_info().currsize:
+            continue
+        for provider in tier():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                print(f"Error closing AI provider {provider.name}: {e}")
+    get_ai_service.cache_clear()
+    get_remote_providers.cache_clear()
+    get_small_remote_providers.cache_clear()
+    # Write the buffered usage records before the process goes away
+    ledger = get_usage_ledger() if get_usage_ledger.cache_info().currsize else None
+    if ledger is not None:
+        ledger.close()
+    get_usage_ledger.cache_clear()
+
+@lru_cache()
+def get_plan_cache_memory() -> TTLLRUCache:
+    """In-process LRU tier of the plan cache, shared by every request"""
+    settings = get_settings()
+    return TTLLRUCache(settings.PLAN_CACHE_MAX_ENTRIES, settings.PLAN_CACHE_TTL_SECONDS)
+
+@lru_cache()
+def get_plan_cache_stats() -> PlanCacheStats:
+    return PlanCacheStats()
+
+def get_plan_cache(cache_repo: PlanCacheRepository = Depends(get_plan_cache_repository)) -> Optional[PlanCache]:
+    settings = get_settings()
+    if not settings.PLAN_CACHE_ENABLED:
+        return None
+    return PlanCache(get_plan_cache_memory(), get_plan_cache_stats(), cache_repo, settings.PLAN_CACHE_TTL_SECONDS)
+
+@lru_cache()
+def get_similar_plan_index() -> SimilarPlanIndex:
+    """Process-wide nearest-neighbour index over approved plans"""
+    return SimilarPlanIndex()
+
+def _list_approved_plans(plan_type: str, limit: int):
+    # Runs on the matcher's loader thread, so it can't share a request's session
+    db = SessionLocal()
+    try:
+        return SqlAlchemyApprovedPlanRepository(db).list_approved(plan_type, limit)
+    finally:
+        db.close()
+
+def get_plan_matcher() -> Optional[SimilarPlanMatcher]:
+    settings = get_settings()
+    if not settings.PLAN_REUSE_ENABLED:
+        return None
+    return SimilarPlanMatcher(
+        get_similar_plan_index(),
+        _list_approved_plans,
+        max_distance=settings.PLAN_REUSE_MAX_DISTANCE,
+        reload_seconds=settings.PLAN_REUSE_RELOAD_SECONDS
+    )
+
+@lru_cache()
+def get_memory_rate_limit_store() -> InMemoryRateLimitStore:
+    """Process-local token buckets (RATE_LIMIT_STORE=memory)"""
+    return InMemoryRateLimitStore()
+
+def get_rate_limiter(
+    rate_limit_repo: RateLimitRepository = Depends(get_rate_limit_repository)
+) -> Optional[RateLimiter]:
+    settings = get_settings()
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    store = rate_limit_repo if settings.RATE_LIMIT_STORE == "database" else get_memory_rate_limit_store()
+    return RateLimiter(store, parse_budgets(settings.RATE_LIMIT_BUDGETS))
+
+@lru_cache()
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Process-wide cap on synchronous plan generations"""
+    settings = get_settings()
+    if not settings.ADMISSION_ENABLED:
+        return None
+    return AdmissionController(
+        settings.ADMISSION_MAX_IN_FLIGHT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        max_latency_seconds=settings.ADMISSION_MAX_LATENCY_SECONDS,
+        latency_window_seconds=settings.ADMISSION_LATENCY_WINDOW_SECONDS,
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS
+    )
+
+@lru_cache()
+def get_single_flight() -> SingleFlight:
+    """Process-wide registry of in-flight generations"""
+    return SingleFlight()
+
+def get_plan_pregenerator(
+    prepared_repo: PreparedPlanRepository = Depends(get_prepared_plan_repository),
+    job_repo: GenerationJobRepository = Depends(get_job_repository)
+) -> PlanPregenerator:
+    # Built even with PLAN_PREGENERATION_ENABLED=false, so drafts prepared earlier are still used
+    return PlanPregenerator(prepared_repo, job_repo, get_settings().PLAN_PREGENERATION_MAX_AGE_SECONDS)
+
+def get_user_service(
+    user_repo: UserRepository = Depends(get_user_repository),
+    pregenerator: PlanPregenerator = Depends(get_plan_pregenerator)
+) -> UserService:
+    return UserService(user_repo, pregenerator if get_settings().PLAN_PREGENERATION_ENABLED else None)
+
+def get_blocking_calls(db: Session = Depends(get_db)) -> BlockingCalls:
+    """One per request, shared by everything that uses the request's DB session from async code"""
+    return BlockingCalls()
+
+def get_generation_lease(
+    lease_repo: GenerationLeaseRepository = Depends(get_lease_repository),
+    blocking_calls: BlockingCalls = Depends(get_blocking_calls)
+) -> Optional[GenerationLease]:
+    settings = get_settings()
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return None
+    return GenerationLease(
+        lease_repo, settings.GENERATION_LEASE_SECONDS, settings.GENERATION_LEASE_POLL_SECONDS, blocking_calls
+    )
 
 def get_planning_service(
     ai_service: AIService = Depends(get_ai_service),
     workout_repo: WorkoutPlanRepository = Depends(get_workout_repository),
     nutrition_repo: NutritionPlanRepository = Depends(get_nutrition_repository),
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    plan_cache: Optional[PlanCache] = Depends(get_plan_cache),
+    generation_lease: Optional[GenerationLease] = Depends(get_generation_lease),
+    plan_matcher: Optional[SimilarPlanMatcher] = Depends(get_plan_matcher),
+    pregenerator: PlanPregenerator = Depends(get_plan_pregenerator),
+    blocking_calls: BlockingCalls = Depends(get_blocking_calls)
 ) -> PlanningService:
-    return PlanningService(ai_service, workout_repo, nutrition_repo, user_repo)
+    return PlanningService(
+        ai_service,
+        workout_repo,
+        nutrition_repo,
+        user_repo,
+        plan_cache=plan_cache,
+        single_flight=get_single_flight() if get_settings().SINGLE_FLIGHT_ENABLED else None,
+        generation_lease=generation_lease,
+        fan_out_days=get_settings().PLAN_FAN_OUT_DAYS,
+        plan_matcher=plan_matcher,
+        request_budget_seconds=get_settings().AI_REQUEST_BUDGET_SECONDS,
+        usage_ledger=get_usage_ledger(),
+        pregenerator=pregenerator,
+        blocking_calls=blocking_calls
+    )
+
+def get_request_deadline() -> Optional[Deadline]:
+    """Time budget for the AI work of one request, counted from its arrival"""
+    budget = get_settings().AI_REQUEST_BUDGET_SECONDS
+    return Deadline(budget) if budget > 0 else None
 
 def get_role_service(user_repo: UserRepository = Depends(get_user_repository)) -> RoleService:
     return RoleService(user_repo)
@@ -82,3 +459,12 @@ def get_comment_service(comment_repo: PlanCommentRepository = Depends(get_commen
 
 def get_notification_service(notification_repo: NotificationRepository = Depends(get_notification_repository)) -> NotificationService:
     return NotificationService(notification_repo)
+
+def get_job_service(
+    job_repo: GenerationJobRepository = Depends(get_job_repository),
+    pregenerator: PlanPregenerator = Depends(get_plan_pregenerator)
+) -> JobService:
+    return JobService(job_repo, pregenerator)
+
+def get_usage_service(usage_repo: AIUsageRepository = Depends(get_ai_usage_repository)) -> AIUsageService:
+    return AIUsageService(usage_repo)
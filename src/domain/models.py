@@ -35,6 +35,14 @@ class NotificationType(Enum):
     TRAINER_ASSIGNED = "trainer_assigned"
     NUTRITIONIST_ASSIGNED = "nutritionist_assigned"
 
+class JobStatus(Enum):
+    """Lifecycle of a background plan-generation job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"  # Dropped before it ran (a speculative job whose profile changed)
+
 @dataclass
 class UserProfile:
     age: int
@@ -192,3 +200,84 @@ class Notification:
     is_read: bool = False
     created_at: datetime = field(default_factory=datetime.now)
     read_at: Optional[datetime] = None
+
+@dataclass
+class CachedPlanData:
+    """Raw AI plan output cached under a normalized profile fingerprint"""
+    key: str  # "<plan_type>:<fingerprint>"
+    plan_type: str  # "workout" or "nutrition"
+    plan_data: dict
+    created_at: datetime = field(default_factory=datetime.now)
+
+@dataclass
+class ApprovedPlanSample:
+    """An approved plan together with the profile it was written for"""
+    plan_id: str
+    plan_type: str  # "workout" or "nutrition"
+    profile: UserProfile
+    plan_data: dict  # Same shape as raw AI output: {"sessions": [...]} or {"daily_plans": [...]}
+
+@dataclass
+class TokenBucket:
+    """Stored state of one rate-limit bucket"""
+    key: str  # "<scope>:<user_id>"
+    tokens: float
+    updated_at: float  # Unix timestamp of the last refill
+
+@dataclass
+class GenerationJob:
+    """Queued request to generate a plan outside the HTTP request"""
+    id: str
+    user_id: str  # Owner of the plan being generated
+    plan_type: str  # "workout" or "nutrition"
+    requested_by: str
+    status: str = "queued"  # Value from JobStatus enum
+    priority: int = 0  # Higher runs first
+    bypass_cache: bool = False
+    plan_id: Optional[str] = None  # Set once the job succeeds
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+@dataclass
+class PreparedPlan:
+    """Plan data generated speculatively for a user's profile, waiting for their first generate request"""
+    user_id: str
+    plan_type: str  # "workout" or "nutrition"
+    profile_key: str  # profile_fingerprint of the profile it is generated for
+    job_id: str  # Low-priority job that fills plan_data
+    plan_data: Optional[dict] = None  # Raw AI output, once the job has run
+    created_at: datetime = field(default_factory=datetime.now)
+
+@dataclass
+class AIUsageRecord:
+    """One AI provider call, or one generation answered from the plan cache, in the usage ledger"""
+    provider: str  # Provider name, or "plan_cache" / "plan_reuse" / "pregenerated" for cache hits
+    model: str = ""
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # Part of prompt_tokens served from the provider's prompt cache
+    completion_tokens: int = 0
+    latency_ms: int = 0
+    outcome: str = "ok"  # "ok", "repaired", "parse_error", "error" or "cancelled"
+    cache_hit: bool = False
+    cost_usd: float = 0.0
+    user_id: Optional[str] = None  # Owner of the plan being generated
+    plan_type: Optional[str] = None
+    plan_id: Optional[str] = None
+    endpoint: Optional[str] = None  # "POST /plans/workout", "worker", ...
+    created_at: datetime = field(default_factory=datetime.now)
+
+@dataclass
+class AIUsageTotal:
+    """Ledger totals for one day and one provider, endpoint or user"""
+    day: str  # ISO date
+    key: Optional[str]
+    calls: int
+    errors: int
+    cache_hits: int
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+    cost_usd: float
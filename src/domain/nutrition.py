@@ -0,0 +1,58 @@
+"""
+Energy and macronutrient estimates derived from a user profile.
+"""
+from dataclasses import dataclass
+from .models import UserProfile, Goal, ActivityLevel
+
+ACTIVITY_FACTORS = {
+    ActivityLevel.SEDENTARY: 1.2,
+    ActivityLevel.LIGHTLY_ACTIVE: 1.375,
+    ActivityLevel.MODERATELY_ACTIVE: 1.55,
+    ActivityLevel.VERY_ACTIVE: 1.725,
+    ActivityLevel.EXTRA_ACTIVE: 1.9,
+}
+
+GOAL_CALORIE_ADJUSTMENT = {
+    Goal.WEIGHT_LOSS: -500,
+    Goal.MUSCLE_GAIN: 300,
+    Goal.MAINTENANCE: 0,
+    Goal.IMPROVE_ENDURANCE: 200,
+}
+
+# Grams of protein per kg of body weight
+PROTEIN_PER_KG = {
+    Goal.WEIGHT_LOSS: 2.0,
+    Goal.MUSCLE_GAIN: 2.0,
+    Goal.MAINTENANCE: 1.6,
+    Goal.IMPROVE_ENDURANCE: 1.4,
+}
+
+FAT_CALORIE_SHARE = 0.25
+MIN_DAILY_CALORIES = 1200
+
+
+@dataclass
+class DailyTargets:
+    """Daily energy and macro targets"""
+    calories: int
+    protein: int  # grams
+    carbs: int  # grams
+    fats: int  # grams
+
+
+def estimate_daily_calories(profile: UserProfile) -> int:
+    """Estimate daily calorie needs (Mifflin-St Jeor BMR x activity factor, adjusted for goal)"""
+    bmr = 10 * profile.weight + 6.25 * profile.height - 5 * profile.age
+    bmr += -161 if (profile.gender or "").strip().lower().startswith(("f", "w")) else 5
+    calories = bmr * ACTIVITY_FACTORS.get(profile.activity_level, 1.2)
+    calories += GOAL_CALORIE_ADJUSTMENT.get(profile.goal, 0)
+    return max(MIN_DAILY_CALORIES, int(round(calories)))
+
+
+def estimate_daily_targets(profile: UserProfile) -> DailyTargets:
+    """Split the calorie estimate into protein, carbs and fats"""
+    calories = estimate_daily_calories(profile)
+    protein = int(round(profile.weight * PROTEIN_PER_KG.get(profile.goal, 1.6)))
+    fats = int(round(calories * FAT_CALORIE_SHARE / 9))
+    carbs = max(0, int(round((calories - protein * 4 - fats * 9) / 4)))
+    return DailyTargets(calories=calories, protein=protein, carbs=carbs, fats=fats)
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, TypeVar, Generic
-from .models import User, WorkoutPlan, NutritionPlan, PlanVersion, PlanComment, Notification
+from datetime import datetime
+from typing import Optional, List, Tuple, TypeVar, Generic
+from .models import User, WorkoutPlan, NutritionPlan, PlanVersion, PlanComment, Notification, CachedPlanData, GenerationJob, PreparedPlan, ApprovedPlanSample, TokenBucket, AIUsageRecord, AIUsageTotal
 
 # Generic Type for Plans
 T = TypeVar('T', bound='WorkoutPlan | NutritionPlan')
@@ -119,3 +120,113 @@ class NotificationRepository(ABC):
     @abstractmethod
     def mark_all_as_read(self, user_id: str) -> None:
         pass
+
+class PlanCacheRepository(ABC):
+    """Persistent tier of the plan-generation cache"""
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedPlanData]:
+        pass
+    
+    @abstractmethod
+    def save(self, entry: CachedPlanData) -> None:
+        pass
+
+class ApprovedPlanRepository(ABC):
+    """Read-only view of approved plans, used to reuse them for similar profiles"""
+    @abstractmethod
+    def list_approved(self, plan_type: str, limit: int) -> List[ApprovedPlanSample]:
+        """Most recently approved plans of the given type whose owner has a profile"""
+        pass
+
+class GenerationJobRepository(ABC):
+    """DB-backed queue of plan-generation jobs"""
+    @abstractmethod
+    def save(self, job: GenerationJob) -> None:
+        pass
+    
+    @abstractmethod
+    def get_by_id(self, job_id: str) -> Optional[GenerationJob]:
+        pass
+    
+    @abstractmethod
+    def update(self, job: GenerationJob) -> None:
+        pass
+    
+    @abstractmethod
+    def claim_next(self) -> Optional[GenerationJob]:
+        """Atomically move the next queued job to running and return it"""
+        pass
+    
+    @abstractmethod
+    def requeue_stale(self, started_before: datetime, max_attempts: int) -> Tuple[int, int]:
+        """Return running jobs whose worker died before finishing to the queue,
+        failing those already run max_attempts times; returns (requeued, failed)"""
+        pass
+    
+    @abstractmethod
+    def cancel_queued(self, job_id: str) -> bool:
+        """Cancel the job if no worker has claimed it yet"""
+        pass
+
+class PreparedPlanRepository(ABC):
+    """Speculatively generated plan data, one entry per user and plan type"""
+    @abstractmethod
+    def get(self, user_id: str, plan_type: str) -> Optional[PreparedPlan]:
+        pass
+    
+    @abstractmethod
+    def get_by_job(self, job_id: str) -> Optional[PreparedPlan]:
+        pass
+    
+    @abstractmethod
+    def save(self, prepared: PreparedPlan) -> None:
+        """Insert or replace the user's entry for the plan type"""
+        pass
+    
+    @abstractmethod
+    def delete(self, prepared: PreparedPlan) -> bool:
+        """Remove the entry if it still belongs to the same job; False if it was already gone or replaced"""
+        pass
+
+class GenerationLeaseRepository(ABC):
+    """Short-lived locks that let one worker generate on behalf of all others"""
+    @abstractmethod
+    def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Take the lease if it is free or expired"""
+        pass
+    
+    @abstractmethod
+    def release(self, key: str, owner: str) -> None:
+        pass
+    
+    @abstractmethod
+    def is_held(self, key: str) -> bool:
+        """True while an unexpired lease exists for the key"""
+        pass
+
+class RateLimitRepository(ABC):
+    """Token-bucket state shared by every worker"""
+    @abstractmethod
+    def get(self, key: str) -> Optional[TokenBucket]:
+        pass
+    
+    @abstractmethod
+    def compare_and_set(self, expected: Optional[TokenBucket], bucket: TokenBucket) -> bool:
+        """Store bucket only if the stored state still matches expected (None: does not exist yet)"""
+        pass
+
+class AIUsageRepository(ABC):
+    """Append-only ledger of AI calls"""
+    @abstractmethod
+    def save_many(self, records: List[AIUsageRecord]) -> None:
+        pass
+    
+    @abstractmethod
+    def daily_totals(self, since: datetime, group_by: str = "provider") -> List[AIUsageTotal]:
+        """Totals per day and per provider, endpoint or user, for records created since the given time"""
+        pass
+    
+    @abstractmethod
+    def latencies(self, since: datetime, limit: int) -> List[Tuple[str, str, int]]:
+        """(provider, model, latency_ms) of the most recent successful provider calls"""
+        pass
@@ -1,4 +1,27 @@
-from .gemini import GeminiAIService
-from .openai import OpenAIService
+import importlib
 
-__all__ = ['GeminiAIService', 'OpenAIService']
+# Provider modules are imported by name on first use: the SDKs behind them
+# (google-generativeai, openai) take about a second to import, and only the
+# configured provider is ever needed.
+_MODULES = {
+    'GeminiAIService': '.gemini',
+    'OpenAIService': '.openai',
+    'RuleBasedAIService': '.rule_based',
+    'FallbackAIService': '.fallback',
+    'HedgedAIService': '.hedged',
+    'ProviderRouter': '.provider_router',
+    'ReplayAIService': '.replay',
+    'RecordingAIService': '.replay',
+    'TieredAIService': '.tiered',
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ['GeminiAIService', 'OpenAIService', 'RuleBasedAIService', 'FallbackAIService', 'HedgedAIService', 'ProviderRouter', 'ReplayAIService', 'RecordingAIService', 'TieredAIService']
@@ -1,71 +1,73 @@
 from abc import ABC, abstractmethod
+import asyncio
 import json
-from typing import Dict, Any
-from src.application.interfaces import AIService
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from src.application.interfaces import (
+    AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService
+)
+from src.application.plan_schema import WORKOUT_PLAN_SCHEMA, NUTRITION_PLAN_SCHEMA
+from src.application.usage_ledger import AIUsageLedger
 from src.domain.models import UserProfile
+from src.infrastructure.ai.compact import (
+    COMPACT_WORKOUT_SYSTEM_MESSAGE, COMPACT_NUTRITION_SYSTEM_MESSAGE, COMPACT_WORKOUT_SCHEMA, COMPACT_NUTRITION_SCHEMA,
+    ITEMS_KEYS, WORKOUT_FORMAT, NUTRITION_FORMAT, expand_item, expand_plan_data
+)
+from src.infrastructure.ai.metrics import TokenUsageTracker
+from src.infrastructure.ai.parsing import IncrementalArrayParser, parse_json_tolerant
+from src.infrastructure.ai.rule_based import workout_outline, nutrition_outline
 
+WORKOUT_SYSTEM_MESSAGE = "You are a helpful fitness assistant that outputs only JSON."
+NUTRITION_SYSTEM_MESSAGE = "You are a helpful nutritionist assistant that outputs only JSON."
 
-class BaseAIService(AIService, ABC):
-    """Base class for AI services using Template Method Pattern"""
-    
-    def generate_workout_plan(self, profile: UserProfile) -> Dict[str, Any]:
-        prompt = self._build_workout_prompt(profile)
-        response_text = self._call_ai_api(prompt, system_message="You are a helpful fitness assistant that outputs only JSON.")
-        return self._parse_json_response(response_text)
-    
-    def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
-        prompt = self._build_nutrition_prompt(profile)
-        response_text = self._call_ai_api(prompt, system_message="You are a helpful nutritionist assistant that outputs only JSON.")
-        return self._parse_json_response(response_text)
-    
-    def _build_workout_prompt(self, profile: UserProfile) -> str:
-        """Build the workout plan generation prompt"""
-        return f"""
-        Act as a professional fitness coach. Generate a 1-week workout plan for a user with the following profile:
-        - Age: {profile.age}
-        - Gender: {profile.gender}
-        - Goal: {profile.goal.value}
-        - Activity Level: {profile.activity_level.value}
-        - Injuries: {', '.join(profile.injuries) if profile.injuries else 'None'}
+# Every prompt sent with one of these system messages asks for the same top-level
+# shape, so providers can look up the structured-output schema from it
+RESPONSE_SCHEMAS = {
+    WORKOUT_SYSTEM_MESSAGE: ("workout_plan", WORKOUT_PLAN_SCHEMA),
+    NUTRITION_SYSTEM_MESSAGE: ("nutrition_plan", NUTRITION_PLAN_SCHEMA),
+    COMPACT_WORKOUT_SYSTEM_MESSAGE: ("compact_workout_plan", COMPACT_WORKOUT_SCHEMA),
+    COMPACT_NUTRITION_SYSTEM_MESSAGE: ("compact_nutrition_plan", COMPACT_NUTRITION_SCHEMA),
+}
+
+# Static prompt prefixes. Everything that is the same for every user comes
+# first and the profile last, so providers can reuse the processed prefix
+# (prompt caching) across requests. Keep them byte-identical between calls.
+WORKOUT_PROMPT_PREFIX = """
+        Act as a professional fitness coach. Generate a 1-week workout plan for the user profile given at the end.
         
         Return ONLY valid JSON (no markdown formatting) with the following structure:
-        {{
+        {
             "sessions": [
-                {{
+                {
                     "day": "Monday",
                     "focus": "Upper Body",
                     "exercises": [
-                        {{
+                        {
                             "name": "Exercise Name",
                             "description": "Brief description",
                             "sets": 3,
                             "reps": "10-12",
                             "rest_time": "60s",
                             "video_url": "optional_url"
-                        }}
+                        }
                     ]
-                }}
+                }
             ]
-        }}
+        }
         """
-    
-    def _build_nutrition_prompt(self, profile: UserProfile) -> str:
-        """Build the nutrition plan generation prompt"""
-        return f"""
-        Act as a professional nutritionist. Generate a 1-week meal plan for a user with the following profile:
-        - Age: {profile.age}
-        - Gender: {profile.gender}
-        - Goal: {profile.goal.value}
-        - Activity Level: {profile.activity_level.value}
-        - Dietary Restrictions: {', '.join(profile.dietary_restrictions) if profile.dietary_restrictions else 'None'}
+
+NUTRITION_PROMPT_PREFIX = """
+        Act as a professional nutritionist. Generate a 1-week meal plan for the user profile given at the end.
         
         Return ONLY valid JSON (no markdown formatting) with the following structure:
-        {{
+        {
             "daily_plans": [
-                {{
+                {
                     "day": "Monday",
                     "meals": [
-                        {{
+                        {
                             "name": "Breakfast",
                             "description": "Oatmeal with fruits",
                             "calories": 400,
@@ -73,17 +75,320 @@ class BaseAIService(AIService, ABC):
                             "carbs": 60,
                             "fats": 10,
                             "ingredients": ["oats", "milk", "banana"]
-                        }}
+                        }
                     ]
-                }}
+                }
             ]
-        }}
+        }
+        """
+
+COMPACT_WORKOUT_PROMPT_PREFIX = f"""
+        Act as a professional fitness coach. Generate a 1-week workout plan for the user profile given at the end.
+        
+        Return ONLY minified JSON with these short keys (no descriptions, no markdown):
+        {WORKOUT_FORMAT}
+        """
+
+COMPACT_NUTRITION_PROMPT_PREFIX = f"""
+        Act as a professional nutritionist. Generate a 1-week meal plan for the user profile given at the end.
+        
+        Return ONLY minified JSON with these short keys (no markdown):
+        {NUTRITION_FORMAT}
+        """
+
+# Repair and per-day requests: part of a week, with the rest given as context
+WORKOUT_PARTIAL_PROMPT_PREFIX = """
+        Act as a professional fitness coach. You are writing part of a 1-week workout plan for the user profile given below.
+        
+        Return ONLY valid JSON: {"sessions": [{"day": "...", "focus": "...", "exercises": [{"name": "...", "description": "...", "sets": 3, "reps": "10-12", "rest_time": "60s"}]}]}
+        """
+
+NUTRITION_PARTIAL_PROMPT_PREFIX = """
+        Act as a professional nutritionist. You are writing part of a 1-week meal plan for the user profile given below.
+        
+        Return ONLY valid JSON: {"daily_plans": [{"day": "...", "meals": [{"name": "Breakfast", "description": "...", "calories": 400, "protein": 15, "carbs": 60, "fats": 10, "ingredients": ["..."]}]}]}
+        """
+
+# Items array each system message asks for, so a response is parsed the same
+# way wherever it is looked at
+ITEMS_KEY_BY_SYSTEM_MESSAGE = {
+    WORKOUT_SYSTEM_MESSAGE: 'sessions',
+    NUTRITION_SYSTEM_MESSAGE: 'daily_plans',
+    COMPACT_WORKOUT_SYSTEM_MESSAGE: ITEMS_KEYS["workout"][0],
+    COMPACT_NUTRITION_SYSTEM_MESSAGE: ITEMS_KEYS["nutrition"][0],
+}
+
+# Responses parsed for the usage ledger or the hedge, waiting for the plan
+# parse to take them, so each response is parsed (and repaired) only once
+_PARSED_LIMIT = 64
+_parsed: "OrderedDict[Tuple[str, Optional[str]], Tuple[Any, str]]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+class BaseAIService(AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService, ABC):
+    """Base class for AI services using Template Method Pattern"""
+    
+    # Provider label used in latency stats and logs
+    name = "ai"
+    # Token totals, including prompt tokens served from the provider's prefix cache
+    token_usage: Optional[TokenUsageTracker] = None
+    # Per-call ledger (tokens, latency, parse outcome, who the call was for)
+    usage_ledger: Optional[AIUsageLedger] = None
+    # Model behind the provider, as named in the ledger's price table
+    model_name = ""
+    
+    # Ask for the short-key format of compact.py on full-week requests. Set on
+    # the outermost service, which is the one building the prompts.
+    compact_output = False
+    
+    def generate_workout_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        prompt, system_message, items_key = self._plan_request("workout", profile)
+        response_text = self._call_ai_api(prompt, system_message=system_message)
+        return self._parse_plan_response("workout", response_text, items_key)
+    
+    def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        prompt, system_message, items_key = self._plan_request("nutrition", profile)
+        response_text = self._call_ai_api(prompt, system_message=system_message)
+        return self._parse_plan_response("nutrition", response_text, items_key)
+    
+    async def generate_workout_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        prompt, system_message, items_key = self._plan_request("workout", profile)
+        response_text = await self._call_ai_api_async(prompt, system_message=system_message)
+        return self._parse_plan_response("workout", response_text, items_key)
+    
+    async def generate_nutrition_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        prompt, system_message, items_key = self._plan_request("nutrition", profile)
+        response_text = await self._call_ai_api_async(prompt, system_message=system_message)
+        return self._parse_plan_response("nutrition", response_text, items_key)
+    
+    async def stream_workout_sessions(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        prompt, system_message, items_key = self._plan_request("workout", profile)
+        async for session in self._stream_array_items(prompt, system_message, items_key):
+            yield expand_item("workout", session) if self.compact_output else session
+    
+    async def stream_nutrition_days(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        prompt, system_message, items_key = self._plan_request("nutrition", profile)
+        async for day in self._stream_array_items(prompt, system_message, items_key):
+            yield expand_item("nutrition", day) if self.compact_output else day
+    
+    def _plan_request(self, plan_type: str, profile: UserProfile) -> Tuple[str, str, str]:
+        """Prompt, system message and items key of a full-week request"""
+        if self.compact_output:
+            if plan_type == "workout":
+                return self._build_compact_workout_prompt(profile), COMPACT_WORKOUT_SYSTEM_MESSAGE, ITEMS_KEYS["workout"][0]
+            return self._build_compact_nutrition_prompt(profile), COMPACT_NUTRITION_SYSTEM_MESSAGE, ITEMS_KEYS["nutrition"][0]
+        if plan_type == "workout":
+            return self._build_workout_prompt(profile), WORKOUT_SYSTEM_MESSAGE, 'sessions'
+        return self._build_nutrition_prompt(profile), NUTRITION_SYSTEM_MESSAGE, 'daily_plans'
+    
+    def _parse_plan_response(self, plan_type: str, response_text: str, items_key: str) -> Dict[str, Any]:
+        data = self._parse_json_response(response_text, items_key=items_key)
+        return expand_plan_data(plan_type, data) if self.compact_output else data
+    
+    def complete_workout_sessions(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_workout_repair_prompt(profile, accepted, days)
+        response_text = self._call_ai_api(prompt, system_message=WORKOUT_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='sessions').get('sessions', [])
+    
+    def complete_nutrition_days(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_nutrition_repair_prompt(profile, accepted, days)
+        response_text = self._call_ai_api(prompt, system_message=NUTRITION_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='daily_plans').get('daily_plans', [])
+    
+    async def complete_workout_sessions_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_workout_repair_prompt(profile, accepted, days)
+        response_text = await self._call_ai_api_async(prompt, system_message=WORKOUT_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='sessions').get('sessions', [])
+    
+    async def complete_nutrition_days_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_nutrition_repair_prompt(profile, accepted, days)
+        response_text = await self._call_ai_api_async(prompt, system_message=NUTRITION_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='daily_plans').get('daily_plans', [])
+    
+    def outline_workout_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return workout_outline(profile)
+    
+    def outline_nutrition_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return nutrition_outline(profile)
+    
+    def generate_workout_sessions(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_workout_days_prompt(profile, outline, days)
+        response_text = self._call_ai_api(prompt, system_message=WORKOUT_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='sessions').get('sessions', [])
+    
+    def generate_nutrition_days(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_nutrition_days_prompt(profile, outline, days)
+        response_text = self._call_ai_api(prompt, system_message=NUTRITION_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='daily_plans').get('daily_plans', [])
+    
+    async def generate_workout_sessions_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_workout_days_prompt(profile, outline, days)
+        response_text = await self._call_ai_api_async(prompt, system_message=WORKOUT_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='sessions').get('sessions', [])
+    
+    async def generate_nutrition_days_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        prompt = self._build_nutrition_days_prompt(profile, outline, days)
+        response_text = await self._call_ai_api_async(prompt, system_message=NUTRITION_SYSTEM_MESSAGE)
+        return self._parse_json_response(response_text, items_key='daily_plans').get('daily_plans', [])
+    
+    async def _stream_array_items(self, prompt: str, system_message: str, array_key: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the response and yield each element of array_key once it is complete"""
+        parser = IncrementalArrayParser(array_key)
+        async for chunk in self._stream_ai_api(prompt, system_message=system_message):
+            for item in parser.feed(chunk):
+                yield item
+    
+    def _describe_profile(self, profile: UserProfile, plan_type: str) -> str:
+        """The per-user part of every prompt; always placed after the static instructions"""
+        if plan_type == "workout":
+            constraints = f"- Injuries: {', '.join(profile.injuries) if profile.injuries else 'None'}"
+        else:
+            restrictions = ', '.join(profile.dietary_restrictions) if profile.dietary_restrictions else 'None'
+            constraints = f"- Dietary Restrictions: {restrictions}"
+        return f"""User profile:
+        - Age: {profile.age}
+        - Gender: {profile.gender}
+        - Goal: {profile.goal.value}
+        - Activity Level: {profile.activity_level.value}
+        {constraints}"""
+    
+    def _build_workout_prompt(self, profile: UserProfile) -> str:
+        """Build the workout plan generation prompt"""
+        return f"""{WORKOUT_PROMPT_PREFIX}
+        {self._describe_profile(profile, "workout")}
+        """
+    
+    def _build_nutrition_prompt(self, profile: UserProfile) -> str:
+        """Build the nutrition plan generation prompt"""
+        return f"""{NUTRITION_PROMPT_PREFIX}
+        {self._describe_profile(profile, "nutrition")}
+        """
+    
+    def _build_compact_workout_prompt(self, profile: UserProfile) -> str:
+        """Workout prompt asking for the short-key format"""
+        return f"""{COMPACT_WORKOUT_PROMPT_PREFIX}
+        {self._describe_profile(profile, "workout")}
+        """
+    
+    def _build_compact_nutrition_prompt(self, profile: UserProfile) -> str:
+        """Nutrition prompt asking for the short-key format"""
+        return f"""{COMPACT_NUTRITION_PROMPT_PREFIX}
+        {self._describe_profile(profile, "nutrition")}
+        """
+    
+    def _build_workout_repair_prompt(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> str:
+        """Ask only for the missing sessions; accepted ones are summarized as context"""
+        planned = "\n".join(
+            f"- {s.get('day')}: {s.get('focus', '')} ({', '.join(e.get('name', '') for e in s.get('exercises', []))})"
+            for s in accepted
+        ) or "- None"
+        wanted = ', '.join(days) if days else "the remaining training days of the week"
+        return f"""{WORKOUT_PARTIAL_PROMPT_PREFIX}
+        {self._describe_profile(profile, "workout")}
+        
+        Sessions already planned (keep the week balanced, do not repeat them):
+        {planned}
+        
+        Generate ONLY the sessions for: {wanted}.
+        """
+    
+    def _build_nutrition_repair_prompt(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> str:
+        """Ask only for the missing days; accepted ones are summarized as context"""
+        planned = "\n".join(
+            f"- {d.get('day')}: {', '.join(m.get('description') or m.get('name', '') for m in d.get('meals', []))}"
+            for d in accepted
+        ) or "- None"
+        return f"""{NUTRITION_PARTIAL_PROMPT_PREFIX}
+        {self._describe_profile(profile, "nutrition")}
+        
+        Days already planned (keep calories consistent, vary the meals):
+        {planned}
+        
+        Generate ONLY the days: {', '.join(days)}.
+        """
+    
+    def _build_workout_days_prompt(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> str:
+        """Ask for some sessions of the week; the shared outline keeps the split consistent across calls"""
+        split = "\n".join(f"- {d['day']}: {d['focus']}" for d in outline)
+        return f"""{WORKOUT_PARTIAL_PROMPT_PREFIX}
+        {self._describe_profile(profile, "workout")}
+        
+        Weekly split (other sessions are written separately, follow this focus):
+        {split}
+        
+        Generate ONLY the sessions for: {', '.join(days)}.
         """
     
-    def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse JSON response, handling markdown code blocks"""
+    def _build_nutrition_days_prompt(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> str:
+        """Ask for some days of the week against shared daily targets"""
+        targets = "\n".join(
+            f"- {d['day']}: {d['calories']} kcal, {d['protein']}g protein, {d['carbs']}g carbs, {d['fats']}g fats"
+            for d in outline if d['day'] in days
+        )
+        return f"""{NUTRITION_PARTIAL_PROMPT_PREFIX}
+        {self._describe_profile(profile, "nutrition")}
+        
+        Daily targets (other days are written separately, vary the meals across the week):
+        {targets}
+        
+        Generate ONLY the days: {', '.join(days)}.
+        """
+    
+    def _parse_json_response(self, response_text: str, items_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse JSON response, handling markdown code blocks.
+        
+        Malformed output goes through the tolerant parser instead of failing.
+        If a truncated response had to be cut back, the plan keeps the complete
+        items, gets a 'parse_report' describing what was dropped, and is marked
+        as not cacheable.
+        """
+        with _parsed_lock:
+            parsed = _parsed.pop((response_text, items_key), None)
+        data, outcome = parsed or self._parse_once(response_text, items_key)
+        if outcome == "parse_error":
+            raise ValueError(data)
+        return data
+    
+    def _parsed_response(self, response_text: str, items_key: Optional[str] = None, keep: bool = True) -> Tuple[Any, str]:
+        """
+        Parsed response and its outcome (ok, repaired or parse_error), parsing
+        it now unless it already was. With keep, the result is held for the
+        _parse_json_response call that will take it.
+        """
+        key = (response_text, items_key)
+        with _parsed_lock:
+            if key in _parsed:
+                return _parsed[key]
+        parsed = self._parse_once(response_text, items_key)
+        if keep:
+            with _parsed_lock:
+                _parsed[key] = parsed
+                while len(_parsed) > _PARSED_LIMIT:
+                    _parsed.popitem(last=False)
+        return parsed
+    
+    def _parse_once(self, response_text: str, items_key: Optional[str]) -> Tuple[Any, str]:
+        """Data and outcome of a response; on a parse error the data is the error message"""
         cleaned_text = response_text.replace('```json', '').replace('```', '').strip()
-        return json.loads(cleaned_text)
+        try:
+            return json.loads(cleaned_text), "ok"
+        except ValueError:
+            pass
+        
+        try:
+            result = parse_json_tolerant(response_text, items_key)
+        except ValueError as e:
+            return str(e), "parse_error"
+        if not isinstance(result.data, dict):
+            return "AI response is not a JSON object", "parse_error"
+        print(f"Repaired AI response ({self.name}): {result.report()}")
+        data = result.data
+        if result.truncated or result.dropped:
+            data['parse_report'] = result.report()
+        if result.truncated:
+            data['cacheable'] = False
+        return data, "repaired"
     
     @abstractmethod
     def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
@@ -99,3 +404,59 @@ class BaseAIService(AIService, ABC):
             The raw text response from the API
         """
         pass
+    
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        """
+        Non-blocking counterpart of _call_ai_api.
+        
+        Providers with a native async client should override this. The default
+        runs the blocking call in a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(self._call_ai_api, prompt, system_message)
+    
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        """
+        Stream the raw text response in chunks.
+        
+        Providers with a streaming API should override this. The default
+        yields the complete response as a single chunk.
+        """
+        yield await self._call_ai_api_async(prompt, system_message)
+    
+    def _record_usage(self, prompt_tokens: int, cached_tokens: int = 0, output_tokens: int = 0) -> Tuple[int, int, int]:
+        if self.token_usage is not None:
+            self.token_usage.record(self.name, prompt_tokens, cached_tokens, output_tokens)
+        return prompt_tokens, cached_tokens, output_tokens
+    
+    def _log_call(self, started: float, outcome: str, tokens: Tuple[int, int, int] = (0, 0, 0)) -> None:
+        """Add one provider call to the usage ledger (outcome: ok, repaired, parse_error, error or cancelled)"""
+        if self.usage_ledger is not None:
+            prompt_tokens, cached_tokens, output_tokens = tokens
+            self.usage_ledger.record(
+                self.name,
+                self.model_name,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+                completion_tokens=output_tokens,
+                latency_seconds=time.monotonic() - started,
+                outcome=outcome
+            )
+    
+    def _response_outcome(self, response_text: str, system_message: str = "", streamed: bool = False) -> str:
+        """
+        Ledger outcome of a response: valid JSON, salvageable by the tolerant
+        parser, or neither. The parse is kept for the plan parse that follows;
+        streamed responses are parsed item by item instead, so theirs is not.
+        """
+        if self.usage_ledger is None:
+            return "ok"
+        items_key = ITEMS_KEY_BY_SYSTEM_MESSAGE.get(system_message)
+        return self._parsed_response(response_text, items_key, keep=not streamed)[1]
+    
+    async def aclose(self) -> None:
+        """
+        Release network clients held by the provider.
+        
+        Called once at shutdown. Providers without pooled connections need not override.
+        """
+        pass
@@ -0,0 +1,178 @@
+"""
+Bundled exercise and meal catalog for the rule-based generator.
+
+Exercises are keyed by muscle group and tagged with the minimum experience
+level they suit and the body parts they load (used to exclude exercises that
+conflict with a user's injuries). Meals are keyed by slot and tagged with the
+dietary restrictions they satisfy.
+"""
+from typing import Dict, List, Set
+from src.domain.models import Goal, ActivityLevel
+
+BEGINNER = "beginner"
+INTERMEDIATE = "intermediate"
+
+# Body parts used for injury exclusion, with the words that refer to them
+INJURY_KEYWORDS: Dict[str, Set[str]] = {
+    "knee": {"knee", "knees", "acl", "mcl", "meniscus", "patella", "rodilla"},
+    "back": {"back", "spine", "lumbar", "disc", "hernia", "sciatica", "espalda"},
+    "shoulder": {"shoulder", "shoulders", "rotator", "hombro"},
+    "wrist": {"wrist", "wrists", "carpal", "muñeca"},
+    "elbow": {"elbow", "elbows", "tennis elbow", "codo"},
+    "ankle": {"ankle", "ankles", "achilles", "tobillo"},
+    "hip": {"hip", "hips", "cadera"},
+    "neck": {"neck", "cervical", "cuello"},
+}
+
+EXERCISES: Dict[str, List[dict]] = {
+    "legs": [
+        {"name": "Goblet Squat", "description": "Hold a dumbbell at chest height and squat to parallel", "level": BEGINNER, "loads": {"knee", "hip"}},
+        {"name": "Glute Bridge", "description": "Lie on your back and drive your hips up squeezing the glutes", "level": BEGINNER, "loads": {"hip"}},
+        {"name": "Leg Press", "description": "Press the platform away with feet shoulder-width apart", "level": BEGINNER, "loads": {"knee"}},
+        {"name": "Romanian Deadlift", "description": "Hinge at the hips with a neutral spine, lowering the weight along the legs", "level": INTERMEDIATE, "loads": {"back", "hip"}},
+        {"name": "Walking Lunge", "description": "Step forward into a lunge, alternating legs", "level": INTERMEDIATE, "loads": {"knee", "ankle", "hip"}},
+        {"name": "Back Squat", "description": "Squat with the barbell on your upper back, keeping the chest up", "level": INTERMEDIATE, "loads": {"knee", "back", "hip"}},
+        {"name": "Seated Leg Curl", "description": "Curl the pad down by flexing the knees under control", "level": BEGINNER, "loads": {"knee"}},
+        {"name": "Standing Calf Raise", "description": "Rise onto the balls of your feet and lower slowly", "level": BEGINNER, "loads": {"ankle"}},
+        {"name": "Hip Abduction Machine", "description": "Push the pads outward using the outer glutes", "level": BEGINNER, "loads": {"hip"}},
+    ],
+    "chest": [
+        {"name": "Push-Up", "description": "Lower your chest to the floor with a straight body line", "level": BEGINNER, "loads": {"wrist", "shoulder"}},
+        {"name": "Machine Chest Press", "description": "Press the handles forward from chest height", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Dumbbell Bench Press", "description": "Press dumbbells up from chest level while lying on a bench", "level": BEGINNER, "loads": {"shoulder", "elbow"}},
+        {"name": "Barbell Bench Press", "description": "Lower the bar to mid-chest and press back up", "level": INTERMEDIATE, "loads": {"shoulder", "elbow", "wrist"}},
+        {"name": "Incline Dumbbell Press", "description": "Press dumbbells on a 30-degree incline bench", "level": INTERMEDIATE, "loads": {"shoulder", "elbow"}},
+        {"name": "Cable Fly", "description": "Bring the cable handles together in a wide hugging arc", "level": BEGINNER, "loads": {"shoulder"}},
+    ],
+    "back": [
+        {"name": "Lat Pulldown", "description": "Pull the bar to your upper chest, driving the elbows down", "level": BEGINNER, "loads": {"shoulder", "elbow"}},
+        {"name": "Seated Cable Row", "description": "Row the handle to your stomach keeping the torso upright", "level": BEGINNER, "loads": {"elbow"}},
+        {"name": "Chest-Supported Dumbbell Row", "description": "Row dumbbells while lying face down on an incline bench", "level": BEGINNER, "loads": {"elbow"}},
+        {"name": "Pull-Up", "description": "Pull your chin over the bar from a dead hang", "level": INTERMEDIATE, "loads": {"shoulder", "elbow", "wrist"}},
+        {"name": "Barbell Row", "description": "Hinge forward and row the bar to your lower ribs", "level": INTERMEDIATE, "loads": {"back", "elbow"}},
+        {"name": "Bird Dog", "description": "On all fours, extend opposite arm and leg while bracing the core", "level": BEGINNER, "loads": set()},
+    ],
+    "shoulders": [
+        {"name": "Dumbbell Lateral Raise", "description": "Raise dumbbells out to the sides to shoulder height", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Seated Dumbbell Press", "description": "Press dumbbells overhead from shoulder height", "level": BEGINNER, "loads": {"shoulder", "elbow"}},
+        {"name": "Face Pull", "description": "Pull the rope toward your face with elbows high", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Standing Overhead Press", "description": "Press the barbell overhead while bracing the core", "level": INTERMEDIATE, "loads": {"shoulder", "back", "elbow"}},
+        {"name": "Band Pull-Apart", "description": "Stretch a resistance band apart at chest height", "level": BEGINNER, "loads": set()},
+    ],
+    "arms": [
+        {"name": "Dumbbell Biceps Curl", "description": "Curl the dumbbells up without swinging the torso", "level": BEGINNER, "loads": {"elbow", "wrist"}},
+        {"name": "Cable Triceps Pushdown", "description": "Extend the elbows pushing the cable bar down", "level": BEGINNER, "loads": {"elbow"}},
+        {"name": "Hammer Curl", "description": "Curl dumbbells with palms facing each other", "level": BEGINNER, "loads": {"elbow"}},
+        {"name": "Overhead Triceps Extension", "description": "Lower a dumbbell behind your head and extend the elbows", "level": INTERMEDIATE, "loads": {"elbow", "shoulder"}},
+        {"name": "Bench Dip", "description": "Lower and raise your body using a bench behind you", "level": INTERMEDIATE, "loads": {"shoulder", "wrist", "elbow"}},
+    ],
+    "core": [
+        {"name": "Plank", "description": "Hold a straight body line on your forearms", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Dead Bug", "description": "Lower opposite arm and leg while keeping the lower back flat", "level": BEGINNER, "loads": set()},
+        {"name": "Side Plank", "description": "Hold a straight line on one forearm, hips high", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Pallof Press", "description": "Press a cable straight out and resist the rotation", "level": BEGINNER, "loads": set()},
+        {"name": "Hanging Knee Raise", "description": "Hang from a bar and raise your knees toward the chest", "level": INTERMEDIATE, "loads": {"shoulder", "wrist"}},
+    ],
+    "conditioning": [
+        {"name": "Stationary Bike Intervals", "description": "Alternate 30s hard and 60s easy pedalling", "level": BEGINNER, "loads": set()},
+        {"name": "Brisk Incline Walk", "description": "Walk on a treadmill at a 6-10% incline", "level": BEGINNER, "loads": {"ankle"}},
+        {"name": "Rowing Machine", "description": "Steady strokes driving with the legs first", "level": BEGINNER, "loads": {"back"}},
+        {"name": "Swimming", "description": "Continuous easy-pace laps in any stroke", "level": BEGINNER, "loads": {"shoulder"}},
+        {"name": "Jump Rope", "description": "Skip rope in short continuous rounds", "level": INTERMEDIATE, "loads": {"ankle", "knee"}},
+    ],
+}
+
+# Focus name -> muscle groups trained that day, in exercise order
+SESSION_FOCUS: Dict[str, List[str]] = {
+    "Full Body": ["legs", "chest", "back", "shoulders", "core"],
+    "Upper Body": ["chest", "back", "shoulders", "arms", "arms"],
+    "Lower Body": ["legs", "legs", "legs", "core", "core"],
+    "Push": ["chest", "chest", "shoulders", "shoulders", "arms"],
+    "Pull": ["back", "back", "shoulders", "arms", "core"],
+    "Legs": ["legs", "legs", "legs", "legs", "core"],
+}
+
+# Number of training days -> (day, focus) schedule
+WEEKLY_SPLITS: Dict[int, List[tuple]] = {
+    3: [("Monday", "Full Body"), ("Wednesday", "Full Body"), ("Friday", "Full Body")],
+    4: [("Monday", "Upper Body"), ("Tuesday", "Lower Body"), ("Thursday", "Upper Body"), ("Friday", "Lower Body")],
+    5: [("Monday", "Push"), ("Tuesday", "Pull"), ("Wednesday", "Legs"), ("Friday", "Upper Body"), ("Saturday", "Lower Body")],
+}
+
+TRAINING_DAYS: Dict[ActivityLevel, int] = {
+    ActivityLevel.SEDENTARY: 3,
+    ActivityLevel.LIGHTLY_ACTIVE: 3,
+    ActivityLevel.MODERATELY_ACTIVE: 4,
+    ActivityLevel.VERY_ACTIVE: 5,
+    ActivityLevel.EXTRA_ACTIVE: 5,
+}
+
+EXPERIENCE_LEVEL: Dict[ActivityLevel, Set[str]] = {
+    ActivityLevel.SEDENTARY: {BEGINNER},
+    ActivityLevel.LIGHTLY_ACTIVE: {BEGINNER},
+    ActivityLevel.MODERATELY_ACTIVE: {BEGINNER, INTERMEDIATE},
+    ActivityLevel.VERY_ACTIVE: {BEGINNER, INTERMEDIATE},
+    ActivityLevel.EXTRA_ACTIVE: {BEGINNER, INTERMEDIATE},
+}
+
+# Goal -> (sets, reps, rest_time, conditioning finisher?)
+SET_SCHEMES: Dict[Goal, tuple] = {
+    Goal.MUSCLE_GAIN: (4, "8-12", "90s", False),
+    Goal.WEIGHT_LOSS: (3, "12-15", "45s", True),
+    Goal.MAINTENANCE: (3, "10-12", "60s", False),
+    Goal.IMPROVE_ENDURANCE: (3, "15-20", "30s", True),
+}
+
+CONDITIONING_PRESCRIPTION = {
+    Goal.WEIGHT_LOSS: "20 min",
+    Goal.IMPROVE_ENDURANCE: "30 min",
+}
+
+# Dietary restriction tags and the words that refer to them
+RESTRICTION_KEYWORDS: Dict[str, Set[str]] = {
+    "vegan": {"vegan", "vegano", "plant-based", "plant based"},
+    "vegetarian": {"vegetarian", "vegetariano", "no meat"},
+    "gluten_free": {"gluten", "gluten-free", "gluten free", "celiac", "coeliac", "celiaco"},
+    "dairy_free": {"dairy", "lactose", "dairy-free", "lactose intolerant", "lactosa"},
+    "nut_free": {"nut", "nuts", "peanut", "peanuts", "tree nut", "nueces"},
+}
+
+# Meal slot -> share of daily calories
+MEAL_SLOTS: List[tuple] = [
+    ("Breakfast", 0.25),
+    ("Lunch", 0.35),
+    ("Snack", 0.10),
+    ("Dinner", 0.30),
+]
+
+MEALS: Dict[str, List[dict]] = {
+    "Breakfast": [
+        {"description": "Oatmeal with banana and peanut butter", "ingredients": ["oats", "milk", "banana", "peanut butter"], "tags": {"vegetarian"}},
+        {"description": "Scrambled eggs on toast with spinach", "ingredients": ["eggs", "whole-grain bread", "spinach", "olive oil"], "tags": {"vegetarian", "dairy_free", "nut_free"}},
+        {"description": "Tofu scramble with potatoes and peppers", "ingredients": ["tofu", "potatoes", "bell pepper", "onion", "olive oil"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Greek yogurt with berries and honey", "ingredients": ["greek yogurt", "mixed berries", "honey", "chia seeds"], "tags": {"vegetarian", "gluten_free", "nut_free"}},
+        {"description": "Overnight oats with soy milk, apple and cinnamon", "ingredients": ["gluten-free oats", "soy milk", "apple", "cinnamon", "flaxseed"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+    ],
+    "Lunch": [
+        {"description": "Grilled chicken with rice and broccoli", "ingredients": ["chicken breast", "rice", "broccoli", "olive oil"], "tags": {"gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Lentil and quinoa bowl with roasted vegetables", "ingredients": ["lentils", "quinoa", "zucchini", "carrot", "tahini"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Turkey wrap with avocado and salad", "ingredients": ["whole-wheat tortilla", "turkey breast", "avocado", "lettuce", "tomato"], "tags": {"dairy_free", "nut_free"}},
+        {"description": "Salmon with sweet potato and green beans", "ingredients": ["salmon", "sweet potato", "green beans", "lemon"], "tags": {"gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Chickpea curry with brown rice", "ingredients": ["chickpeas", "coconut milk", "tomato", "spinach", "brown rice"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+    ],
+    "Snack": [
+        {"description": "Apple with almonds", "ingredients": ["apple", "almonds"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free"}},
+        {"description": "Cottage cheese with pineapple", "ingredients": ["cottage cheese", "pineapple"], "tags": {"vegetarian", "gluten_free", "nut_free"}},
+        {"description": "Hummus with carrot sticks", "ingredients": ["hummus", "carrots", "cucumber"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Rice cakes with banana", "ingredients": ["rice cakes", "banana", "cinnamon"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+    ],
+    "Dinner": [
+        {"description": "Lean beef stir-fry with vegetables and noodles", "ingredients": ["lean beef", "rice noodles", "bell pepper", "broccoli", "tamari"], "tags": {"gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Baked cod with potatoes and salad", "ingredients": ["cod", "potatoes", "mixed greens", "olive oil"], "tags": {"gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Black bean tacos with corn tortillas", "ingredients": ["black beans", "corn tortillas", "avocado", "salsa", "lettuce"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+        {"description": "Chicken and vegetable soup with bread", "ingredients": ["chicken thigh", "carrot", "celery", "potato", "whole-grain bread"], "tags": {"dairy_free", "nut_free"}},
+        {"description": "Tofu and vegetable stir-fry with rice", "ingredients": ["tofu", "rice", "bok choy", "mushrooms", "tamari"], "tags": {"vegan", "vegetarian", "gluten_free", "dairy_free", "nut_free"}},
+    ],
+}
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
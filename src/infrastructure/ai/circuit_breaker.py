@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Closed: calls flow and their outcomes fill a rolling window. The breaker
+    opens once the window holds min_calls outcomes and either the failure
+    rate or the slow-call rate crosses its threshold.
+    Open: calls are refused immediately until open_seconds have passed.
+    Half-open: up to half_open_max_calls trial calls go through; a success
+    closes the breaker, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate_threshold: float = 0.8,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the provider now (reserves a trial slot when half-open)"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """Like allow_request, without reserving anything"""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and self._trial_calls < self.half_open_max_calls)
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._close()
+                return
+            self._outcomes.append((False, seconds >= self.slow_call_seconds))
+            self._evaluate()
+
+    def record_failure(self, seconds: float = 0.0) -> None:
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append((True, seconds >= self.slow_call_seconds))
+            self._evaluate()
+
+    def release(self) -> None:
+        """Give back a trial slot whose call was abandoned without an outcome"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def _evaluate(self) -> None:
+        if self._state != CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        total = len(self._outcomes)
+        failure_rate = sum(1 for failed, _ in self._outcomes if failed) / total
+        slow_rate = sum(1 for _, slow in self._outcomes if slow) / total
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+        self._trial_calls = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            total = len(self._outcomes)
+            failures = sum(1 for failed, _ in self._outcomes if failed)
+            slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+            retry_in = max(0.0, self.open_seconds - (self._clock() - self._opened_at)) if state == OPEN else 0.0
+            return {
+                "state": state,
+                "window_calls": total,
+                "failure_rate": round(failures / total, 3) if total else 0.0,
+                "slow_call_rate": round(slow / total, 3) if total else 0.0,
+                "times_opened": self._times_opened,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+
+
+class CircuitBreakerRegistry:
+    """Process-wide breakers, one per provider name, created on first use"""
+
+    def __init__(self, **breaker_options):
+        self._options = breaker_options
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, **self._options)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.snapshot() for b in breakers}
@@ -0,0 +1,138 @@
+"""
+Compact wire format for generated plans.
+
+Output tokens dominate generation time, and the full format repeats long keys
+("description", "rest_time", "ingredients") for every exercise and meal. In
+compact mode the provider answers with one- or two-letter keys, and exercise
+descriptions are left out and filled in from the bundled catalog. The
+response is expanded back to the full format before anything else sees it.
+
+    {"w": [{"d": "Monday", "f": "Legs", "x": [{"n": "Goblet Squat", "s": 3, "r": "10-12", "t": "60s"}]}]}
+    {"n": [{"d": "Monday", "m": [{"n": "Breakfast", "t": "Oatmeal", "k": 400, "p": 15, "c": 60, "f": 10, "i": ["oats"]}]}]}
+"""
+from typing import Any, Dict
+from src.infrastructure.ai.catalog import EXERCISES
+
+COMPACT_WORKOUT_SYSTEM_MESSAGE = "You are a helpful fitness assistant that outputs only compact JSON with short keys."
+COMPACT_NUTRITION_SYSTEM_MESSAGE = "You are a helpful nutritionist assistant that outputs only compact JSON with short keys."
+
+# Top-level array key of each compact plan, and of its full counterpart
+ITEMS_KEYS = {"workout": ("w", "sessions"), "nutrition": ("n", "daily_plans")}
+SESSION_KEYS = {"d": "day", "f": "focus"}
+EXERCISE_KEYS = {"n": "name", "s": "sets", "r": "reps", "t": "rest_time"}
+DAY_KEYS = {"d": "day"}
+MEAL_KEYS = {"n": "name", "t": "description", "k": "calories", "p": "protein", "c": "carbs", "f": "fats", "i": "ingredients"}
+
+_STRING = {"type": "string"}
+_INTEGER = {"type": "integer"}
+
+COMPACT_WORKOUT_SCHEMA = {
+    "type": "object",
+    "properties": {"w": {"type": "array", "items": {
+        "type": "object",
+        "properties": {"d": _STRING, "f": _STRING, "x": {"type": "array", "items": {
+            "type": "object",
+            "properties": {"n": _STRING, "s": _INTEGER, "r": _STRING, "t": _STRING},
+            "required": ["n", "s", "r"],
+        }}},
+        "required": ["d", "x"],
+    }}},
+    "required": ["w"],
+}
+
+COMPACT_NUTRITION_SCHEMA = {
+    "type": "object",
+    "properties": {"n": {"type": "array", "items": {
+        "type": "object",
+        "properties": {"d": _STRING, "m": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                "n": _STRING, "t": _STRING, "k": _INTEGER, "p": _INTEGER, "c": _INTEGER, "f": _INTEGER,
+                "i": {"type": "array", "items": _STRING},
+            },
+            "required": ["n", "k"],
+        }}},
+        "required": ["d", "m"],
+    }}},
+    "required": ["n"],
+}
+
+WORKOUT_FORMAT = (
+    '{"w": [{"d": day, "f": focus, "x": [{"n": exercise name, "s": sets, "r": "reps", "t": "rest"}]}]}'
+)
+NUTRITION_FORMAT = (
+    '{"n": [{"d": day, "m": [{"n": meal name, "t": "short description", '
+    '"k": kcal, "p": protein g, "c": carbs g, "f": fats g, "i": [ingredients]}]}]}'
+)
+
+_DESCRIPTIONS = {e["name"].lower(): e["description"] for group in EXERCISES.values() for e in group}
+
+
+def _rename(item: Any, keys: Dict[str, str]) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        return item
+    return {keys.get(key, key): value for key, value in item.items()}
+
+
+def _invert(keys: Dict[str, str]) -> Dict[str, str]:
+    return {full: short for short, full in keys.items()}
+
+
+def expand_item(plan_type: str, item: Any) -> Any:
+    """Full-format session or day from its compact form"""
+    if not isinstance(item, dict):
+        return item
+    if plan_type == "workout":
+        session = _rename(item, SESSION_KEYS)
+        exercises = session.pop("x", None)
+        if isinstance(exercises, list):
+            session["exercises"] = [_expand_exercise(e) for e in exercises]
+        return session
+    day = _rename(item, DAY_KEYS)
+    meals = day.pop("m", None)
+    if isinstance(meals, list):
+        day["meals"] = [_rename(m, MEAL_KEYS) for m in meals]
+    return day
+
+
+def _expand_exercise(item: Any) -> Any:
+    exercise = _rename(item, EXERCISE_KEYS)
+    if isinstance(exercise, dict) and "description" not in exercise:
+        name = exercise.get("name")
+        exercise["description"] = _DESCRIPTIONS.get(name.lower(), "") if isinstance(name, str) else ""
+    return exercise
+
+
+def expand_plan_data(plan_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Full-format plan data from a compact response.
+
+    A response that already uses the full format is returned unchanged, so a
+    provider that ignores the compact instructions still works.
+    """
+    compact_key, full_key = ITEMS_KEYS[plan_type]
+    if compact_key not in data or full_key in data:
+        return data
+    expanded = {key: value for key, value in data.items() if key != compact_key}
+    items = data[compact_key]
+    expanded[full_key] = [expand_item(plan_type, item) for item in items] if isinstance(items, list) else items
+    return expanded
+
+
+def compact_plan_data(plan_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact form of full plan data (the inverse of expand_plan_data), for seeding corpora and benchmarks"""
+    compact_key, full_key = ITEMS_KEYS[plan_type]
+    items = []
+    for item in data.get(full_key, []):
+        if plan_type == "workout":
+            session = _rename({k: v for k, v in item.items() if k != "exercises"}, _invert(SESSION_KEYS))
+            session["x"] = [
+                _rename({k: v for k, v in e.items() if k in EXERCISE_KEYS.values()}, _invert(EXERCISE_KEYS))
+                for e in item.get("exercises", [])
+            ]
+            items.append(session)
+        else:
+            day = _rename({k: v for k, v in item.items() if k != "meals"}, _invert(DAY_KEYS))
+            day["m"] = [_rename(m, _invert(MEAL_KEYS)) for m in item.get("meals", [])]
+            items.append(day)
+    return {compact_key: items}
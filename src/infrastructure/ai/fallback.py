@@ -0,0 +1,255 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, AsyncIterator, Callable, Awaitable, List, Optional, Union
+from src.application.interfaces import (
+    AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService
+)
+from src.application.deadline import DeadlineExceeded, call_timeout, current_deadline
+from src.application.plan_repair import plan_items
+from src.domain.models import UserProfile
+
+class FallbackAIService(AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService):
+    """
+    Calls the primary provider and switches to the fallback when it fails
+    or does not answer within timeout_seconds, or within what is left of the
+    request deadline if that is sooner.
+
+    Whatever the fallback serves is marked as not cacheable, down to single
+    sessions/days, so it never shadows a later provider answer.
+
+    Sync calls run on max_workers threads of their own so they can be
+    abandoned. The timeout starts once a thread picks the call up, so time
+    queued behind other generations is not held against the provider; only
+    the request deadline bounds the wait. Abandoned calls keep their thread
+    until the provider gives up, and once they hold every thread new calls
+    go straight to the fallback instead of queueing behind them.
+    """
+
+    def __init__(self, primary: AIService, fallback: AIService, timeout_seconds: float = 30, max_workers: int = 8):
+        self.primary = primary
+        self.fallback = fallback
+        self.timeout_seconds = timeout_seconds
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-fallback")
+        self._lock = threading.Lock()
+        self._abandoned = 0
+
+    def generate_workout_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return self._call(self.primary.generate_workout_plan, self.fallback.generate_workout_plan, profile)
+
+    def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return self._call(self.primary.generate_nutrition_plan, self.fallback.generate_nutrition_plan, profile)
+
+    async def generate_workout_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return await self._call_async(
+            lambda: _generate_async(self.primary, "workout", profile),
+            lambda: _generate_async(self.fallback, "workout", profile)
+        )
+
+    async def generate_nutrition_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return await self._call_async(
+            lambda: _generate_async(self.primary, "nutrition", profile),
+            lambda: _generate_async(self.fallback, "nutrition", profile)
+        )
+
+    def complete_workout_sessions(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._call(
+            _optional_method(self.primary, PlanRepairAIService, "complete_workout_sessions"),
+            _optional_method(self.fallback, PlanRepairAIService, "complete_workout_sessions"),
+            profile, accepted, days
+        )
+
+    def complete_nutrition_days(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._call(
+            _optional_method(self.primary, PlanRepairAIService, "complete_nutrition_days"),
+            _optional_method(self.fallback, PlanRepairAIService, "complete_nutrition_days"),
+            profile, accepted, days
+        )
+
+    async def complete_workout_sessions_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._call_async(
+            lambda: _optional_async(self.primary, PlanRepairAIService, "complete_workout_sessions", profile, accepted, days),
+            lambda: _optional_async(self.fallback, PlanRepairAIService, "complete_workout_sessions", profile, accepted, days)
+        )
+
+    async def complete_nutrition_days_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._call_async(
+            lambda: _optional_async(self.primary, PlanRepairAIService, "complete_nutrition_days", profile, accepted, days),
+            lambda: _optional_async(self.fallback, PlanRepairAIService, "complete_nutrition_days", profile, accepted, days)
+        )
+
+    def outline_workout_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return self._outline_source().outline_workout_week(profile)
+
+    def outline_nutrition_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return self._outline_source().outline_nutrition_week(profile)
+
+    def generate_workout_sessions(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._call(
+            _optional_method(self.primary, PlanFanOutAIService, "generate_workout_sessions"),
+            _optional_method(self.fallback, PlanFanOutAIService, "generate_workout_sessions"),
+            profile, outline, days
+        )
+
+    def generate_nutrition_days(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._call(
+            _optional_method(self.primary, PlanFanOutAIService, "generate_nutrition_days"),
+            _optional_method(self.fallback, PlanFanOutAIService, "generate_nutrition_days"),
+            profile, outline, days
+        )
+
+    async def generate_workout_sessions_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._call_async(
+            lambda: _optional_async(self.primary, PlanFanOutAIService, "generate_workout_sessions", profile, outline, days),
+            lambda: _optional_async(self.fallback, PlanFanOutAIService, "generate_workout_sessions", profile, outline, days)
+        )
+
+    async def generate_nutrition_days_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._call_async(
+            lambda: _optional_async(self.primary, PlanFanOutAIService, "generate_nutrition_days", profile, outline, days),
+            lambda: _optional_async(self.fallback, PlanFanOutAIService, "generate_nutrition_days", profile, outline, days)
+        )
+
+    def _outline_source(self) -> PlanFanOutAIService:
+        if isinstance(self.primary, PlanFanOutAIService):
+            return self.primary
+        if isinstance(self.fallback, PlanFanOutAIService):
+            return self.fallback
+        raise ValueError("No AI provider can generate a plan day by day")
+
+    async def stream_workout_sessions(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        async for session in self._stream("workout", profile):
+            yield session
+
+    async def stream_nutrition_days(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        async for day in self._stream("nutrition", profile):
+            yield day
+
+    def _timeout(self) -> Optional[float]:
+        """Seconds the primary may take, or None once the request deadline has passed"""
+        try:
+            return call_timeout(self.timeout_seconds)
+        except DeadlineExceeded as e:
+            print(f"{e}, using fallback")
+            return None
+
+    def _call(self, primary: Callable, fallback: Callable, *args):
+        if self._timeout() is None:
+            return _not_cacheable(fallback(*args))
+        started = threading.Event()
+
+        def run():
+            started.set()
+            return primary(*args)
+
+        with self._lock:
+            if self._abandoned >= self.max_workers:
+                print("Every AI call thread is held by a timed-out call, using fallback")
+                return _not_cacheable(fallback(*args))
+            # The worker thread needs the caller's context to see the request deadline
+            future = self._executor.submit(contextvars.copy_context().run, run)
+
+        deadline = current_deadline()
+        if not started.wait(deadline.remaining() if deadline else None) and future.cancel():
+            print("Request deadline passed while waiting for an AI call thread, using fallback")
+            return _not_cacheable(fallback(*args))
+        timeout = self._timeout()
+        if timeout is None:
+            self._abandon(future)
+            return _not_cacheable(fallback(*args))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._abandon(future)
+            print(f"AI provider timed out after {timeout:g}s, using fallback")
+        except ValueError as e:
+            print(f"AI provider failed ({e}), using fallback")
+        return _not_cacheable(fallback(*args))
+
+    def _abandon(self, future: Future) -> None:
+        """Count the thread as taken until the abandoned call returns"""
+        with self._lock:
+            self._abandoned += 1
+
+        def released(_):
+            with self._lock:
+                self._abandoned -= 1
+
+        future.add_done_callback(released)
+
+    async def _call_async(self, primary: Callable[[], Awaitable], fallback: Callable[[], Awaitable]):
+        timeout = self._timeout()
+        if timeout is None:
+            return _not_cacheable(await fallback())
+        try:
+            return await asyncio.wait_for(primary(), timeout)
+        except asyncio.TimeoutError:
+            print(f"AI provider timed out after {timeout:g}s, using fallback")
+        except ValueError as e:
+            print(f"AI provider failed ({e}), using fallback")
+        return _not_cacheable(await fallback())
+
+    async def _stream(self, plan_type: str, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        """Stream from the primary; fall back only if it fails before yielding anything"""
+        if not isinstance(self.primary, StreamingAIService):
+            plan_data = await (self.generate_workout_plan_async(profile) if plan_type == "workout"
+                               else self.generate_nutrition_plan_async(profile))
+            for item in plan_items(plan_type, plan_data):
+                yield item
+            return
+
+        stream = _open_stream(self.primary, plan_type, profile)
+        try:
+            first = await asyncio.wait_for(stream.__anext__(), call_timeout(self.timeout_seconds))
+        except StopAsyncIteration:
+            return
+        except (asyncio.TimeoutError, ValueError) as e:
+            print(f"AI provider stream failed ({e!r}), using fallback")
+            await stream.aclose()
+            plan_data = _not_cacheable(await _generate_async(self.fallback, plan_type, profile))
+            for item in plan_items(plan_type, plan_data):
+                yield item
+            return
+
+        yield first
+        async for item in stream:
+            yield item
+
+
+def _not_cacheable(result: Union[Dict[str, Any], List[Dict[str, Any]]]):
+    """Mark a plan, or each item of a list of sessions/days, as served by the fallback"""
+    if isinstance(result, dict):
+        return dict(result, cacheable=False)
+    return [dict(item, cacheable=False) if isinstance(item, dict) else item for item in result]
+
+
+def _open_stream(service: StreamingAIService, plan_type: str, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+    if plan_type == "workout":
+        return service.stream_workout_sessions(profile)
+    return service.stream_nutrition_days(profile)
+
+
+def _generate_async(service: AIService, plan_type: str, profile: UserProfile) -> Awaitable[Dict[str, Any]]:
+    if isinstance(service, AsyncAIService):
+        if plan_type == "workout":
+            return service.generate_workout_plan_async(profile)
+        return service.generate_nutrition_plan_async(profile)
+    method = service.generate_workout_plan if plan_type == "workout" else service.generate_nutrition_plan
+    return asyncio.to_thread(method, profile)
+
+
+def _optional_method(service: AIService, interface: type, method: str) -> Callable:
+    """The method if the service implements the optional interface, else a stub that fails like a provider"""
+    if not isinstance(service, interface):
+        def unsupported(*args):
+            raise ValueError(f"{type(service).__name__} does not support {method}")
+        return unsupported
+    return getattr(service, method)
+
+
+def _optional_async(service: AIService, interface: type, method: str, *args) -> Awaitable[List[Dict[str, Any]]]:
+    if isinstance(service, interface):
+        return getattr(service, method + "_async")(*args)
+    return asyncio.to_thread(_optional_method(service, interface, method), *args)
@@ -1,21 +1,113 @@
+import asyncio
+import time
+from typing import AsyncIterator, Optional, Tuple
 import google.generativeai as genai
-from src.infrastructure.ai.base import BaseAIService
+from src.application.deadline import call_timeout
+from src.infrastructure.ai.base import BaseAIService, RESPONSE_SCHEMAS
+from src.application.usage_ledger import AIUsageLedger
+from src.infrastructure.ai.metrics import TokenUsageTracker
 
 
 class GeminiAIService(BaseAIService):
     """Gemini AI implementation using Template Method Pattern"""
     
-    def __init__(self, api_key: str):
+    name = "gemini"
+    
+    def __init__(
+        self,
+        api_key: str,
+        timeout_seconds: float = 60.0,
+        model: str = "gemini-1.5-flash",
+        structured_output: bool = True,
+        token_usage: Optional[TokenUsageTracker] = None,
+        usage_ledger: Optional[AIUsageLedger] = None
+    ):
+        # configure() is process-global; the model keeps its gRPC channel open between requests
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model = genai.GenerativeModel(model)
+        self.model_name = model
+        self.timeout_seconds = timeout_seconds
+        self.token_usage = token_usage
+        self.usage_ledger = usage_ledger
+        # Structured output: the model is constrained to the plan schema
+        self.generation_configs = {
+            message: genai.GenerationConfig(response_mime_type="application/json", response_schema=schema)
+            for message, (_, schema) in RESPONSE_SCHEMAS.items()
+        } if structured_output else {}
+    
+    def _request_options(self) -> dict:
+        """Per-call timeout, shortened to what is left of the request deadline"""
+        return {"timeout": call_timeout(self.timeout_seconds)}
+    
+    def _track_usage(self, response) -> Tuple[int, int, int]:
+        """The static prompt prefix is cached implicitly; usage reports the cached part"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return 0, 0, 0
+        return self._record_usage(
+            usage.prompt_token_count, usage.cached_content_token_count, usage.candidates_token_count
+        )
     
     def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
         """Call Gemini API and return raw text response"""
+        request_options = self._request_options()
+        started = time.monotonic()
+        try:
+            # Gemini doesn't have a separate system message; it only selects the response schema
+            response = self.model.generate_content(
+                prompt, generation_config=self.generation_configs.get(system_message), request_options=request_options
+            )
+            tokens = self._track_usage(response)
+            text = response.text
+        except Exception as e:
+            self._log_call(started, "error")
+            print(f"Error calling Gemini API: {e}")
+            raise ValueError(f"Failed to generate plan from Gemini AI: {e}")
+        self._log_call(started, self._response_outcome(text, system_message), tokens)
+        return text
+    
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        """Call Gemini API without blocking the event loop"""
+        request_options = self._request_options()
+        started = time.monotonic()
         try:
-            # Gemini doesn't have a separate system message, so we can ignore it
-            # or prepend it to the prompt if needed
-            response = self.model.generate_content(prompt)
-            return response.text
+            response = await self.model.generate_content_async(
+                prompt, generation_config=self.generation_configs.get(system_message), request_options=request_options
+            )
+            tokens = self._track_usage(response)
+            text = response.text
+        except asyncio.CancelledError:
+            self._log_call(started, "cancelled")
+            raise
         except Exception as e:
+            self._log_call(started, "error")
             print(f"Error calling Gemini API: {e}")
             raise ValueError(f"Failed to generate plan from Gemini AI: {e}")
+        self._log_call(started, self._response_outcome(text, system_message), tokens)
+        return text
+    
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        """Stream Gemini output chunk by chunk"""
+        request_options = self._request_options()
+        started = time.monotonic()
+        chunks = []
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                stream=True,
+                generation_config=self.generation_configs.get(system_message),
+                request_options=request_options
+            )
+            async for chunk in response:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+            tokens = self._track_usage(response)
+        except (asyncio.CancelledError, GeneratorExit):
+            self._log_call(started, "cancelled")
+            raise
+        except Exception as e:
+            self._log_call(started, "error")
+            print(f"Error streaming from Gemini API: {e}")
+            raise ValueError(f"Failed to generate plan from Gemini AI: {e}")
+        self._log_call(started, self._response_outcome("".join(chunks), system_message, streamed=True), tokens)
@@ -0,0 +1,240 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import AsyncIterator, List, Optional
+from src.infrastructure.ai.base import BaseAIService, ITEMS_KEY_BY_SYSTEM_MESSAGE
+from src.infrastructure.ai.circuit_breaker import CircuitBreakerRegistry
+from src.infrastructure.ai.metrics import LatencyTracker
+
+# Sync calls run here; a losing call cannot be interrupted, so it finishes in the background
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ai-hedge")
+
+
+class HedgedAIService(BaseAIService):
+    """
+    Sends the prompt to the primary provider and, if no valid JSON arrives
+    within the hedge delay, to the secondary as well; the first valid answer
+    wins and the other call is cancelled. An answer the tolerant parser had
+    to cut back because it was truncated is not valid: it counts as a failure.
+
+    With adaptive delay the hedge fires at the primary's observed latency
+    percentile, so only the slow tail is duplicated. Primaries cancelled
+    because the hedge won count at the time they had taken, so hedging does
+    not hide the tail it fires on. Streams are recorded the same way, once
+    the winning stream ends. With circuit breakers a
+    provider whose circuit is open is skipped instead of waited for.
+    """
+
+    name = "hedged"
+
+    def __init__(
+        self,
+        primary: BaseAIService,
+        secondary: BaseAIService,
+        latency: LatencyTracker,
+        hedge_delay_seconds: float = 2.0,
+        adaptive: bool = True,
+        hedge_percentile: float = 95,
+        min_samples: int = 20,
+        min_delay_seconds: float = 0.5,
+        breakers: Optional[CircuitBreakerRegistry] = None
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.latency = latency
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.adaptive = adaptive
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.min_delay_seconds = min_delay_seconds
+        self.breakers = breakers
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging"""
+        if self.adaptive and self.latency.count(self.primary.name) >= self.min_samples:
+            observed = self.latency.percentile(self.primary.name, self.hedge_percentile)
+            return max(self.min_delay_seconds, observed)
+        return self.hedge_delay_seconds
+
+    def _providers(self) -> List[BaseAIService]:
+        """Primary then secondary, leaving out providers whose circuit is open"""
+        providers = [self.primary, self.secondary]
+        if self.breakers:
+            providers = [p for p in providers if self.breakers.get(p.name).is_available()]
+        if not providers:
+            raise ValueError("Failed to generate plan: all AI providers are unavailable (circuit open)")
+        return providers
+
+    def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
+        first, *backup = self._providers()
+        pending = {_executor.submit(contextvars.copy_context().run, self._timed_call, first, prompt, system_message)}
+        done, pending = wait(pending, timeout=self.hedge_delay())
+        last_error: Optional[Exception] = None
+
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+                last_error = future.exception()
+            if backup:
+                # Primary is slow or has already failed
+                pending.add(_executor.submit(
+                    contextvars.copy_context().run, self._timed_call, backup.pop(), prompt, system_message
+                ))
+            if not pending:
+                raise last_error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        first, *backup = self._providers()
+        pending = {asyncio.ensure_future(self._timed_call_async(first, prompt, system_message))}
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+        last_error: Optional[BaseException] = None
+
+        try:
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if backup:
+                    pending.add(asyncio.ensure_future(self._timed_call_async(backup.pop(), prompt, system_message)))
+                if not pending:
+                    raise last_error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            await _cancel(pending)
+
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        """Hedge on time to first chunk, then stream from whichever provider answered"""
+        first, *backup = self._providers()
+        pending = {asyncio.ensure_future(self._open_stream(first, prompt, system_message))}
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+        opened = set(done)
+        last_error: Optional[BaseException] = None
+        winner = None
+
+        try:
+            while winner is None:
+                for task in done:
+                    if task.exception() is None:
+                        winner = task.result()
+                        break
+                    last_error = task.exception()
+                if winner is not None:
+                    break
+                if backup:
+                    pending.add(asyncio.ensure_future(self._open_stream(backup.pop(), prompt, system_message)))
+                if not pending:
+                    raise last_error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                opened |= done
+        finally:
+            await _cancel(pending)
+            # Providers that answered in the same instant as the winner lost too
+            for task in opened:
+                if not task.cancelled() and task.exception() is None and task.result() is not winner:
+                    await self._drop_stream(task.result())
+
+        first_chunk, stream, service, started = winner
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self._record_cancelled(service, time.monotonic() - started)
+            raise
+        except Exception:
+            self._record(service, time.monotonic() - started, success=False)
+            raise
+        self._record(service, time.monotonic() - started)
+
+    async def _open_stream(self, service: BaseAIService, prompt: str, system_message: str):
+        """Start one provider's stream: its first chunk, the stream, the provider and when it started"""
+        self._admit(service)
+        started = time.monotonic()
+        stream = service._stream_ai_api(prompt, system_message=system_message)
+        try:
+            first_chunk = await stream.__anext__()
+        except asyncio.CancelledError:
+            self._record_cancelled(service, time.monotonic() - started)
+            raise
+        except Exception:
+            self._record(service, time.monotonic() - started, success=False)
+            raise
+        return first_chunk, stream, service, started
+
+    async def _drop_stream(self, opened: tuple) -> None:
+        """Close a stream that produced its first chunk but lost the hedge"""
+        _, stream, service, started = opened
+        self._record_cancelled(service, time.monotonic() - started)
+        await stream.aclose()
+
+    def _timed_call(self, service: BaseAIService, prompt: str, system_message: str) -> str:
+        """Call one provider, recording its latency; invalid JSON counts as a failure"""
+        self._admit(service)
+        started = time.monotonic()
+        try:
+            text = service._call_ai_api(prompt, system_message=system_message)
+            self._check_response(service, text, system_message)
+        except Exception:
+            self._record(service, time.monotonic() - started, success=False)
+            raise
+        self._record(service, time.monotonic() - started)
+        return text
+
+    async def _timed_call_async(self, service: BaseAIService, prompt: str, system_message: str) -> str:
+        self._admit(service)
+        started = time.monotonic()
+        try:
+            text = await service._call_ai_api_async(prompt, system_message=system_message)
+            self._check_response(service, text, system_message)
+        except asyncio.CancelledError:
+            self._record_cancelled(service, time.monotonic() - started)
+            raise
+        except Exception:
+            self._record(service, time.monotonic() - started, success=False)
+            raise
+        self._record(service, time.monotonic() - started)
+        return text
+
+    def _check_response(self, service: BaseAIService, text: str, system_message: str) -> None:
+        """
+        Raise unless the answer is a complete JSON object, possibly after minor
+        repairs. The parse is kept for the plan parse of the winner.
+        """
+        data, outcome = self._parsed_response(text, ITEMS_KEY_BY_SYSTEM_MESSAGE.get(system_message))
+        if outcome == "parse_error":
+            raise ValueError(data)
+        if (data.get('parse_report') or {}).get('truncated'):
+            raise ValueError(f"Failed to generate plan: {service.name} response was truncated")
+
+    def _admit(self, service: BaseAIService) -> None:
+        if self.breakers and not self.breakers.get(service.name).allow_request():
+            raise ValueError(f"Failed to generate plan: {service.name} circuit is open")
+
+    def _record_cancelled(self, service: BaseAIService, seconds: float) -> None:
+        # Usually the loser of a hedge: the slow tail the adaptive delay must still see
+        self.latency.record_cancelled(service.name, seconds)
+        if self.breakers:
+            self.breakers.get(service.name).release()
+
+    def _record(self, service: BaseAIService, seconds: float, success: bool = True) -> None:
+        self.latency.record(service.name, seconds, success=success)
+        if self.breakers:
+            breaker = self.breakers.get(service.name)
+            if success:
+                breaker.record_success(seconds)
+            else:
+                breaker.record_failure(seconds)
+
+
+async def _cancel(tasks) -> None:
+    """Cancel the losing calls and wait for them to unwind"""
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
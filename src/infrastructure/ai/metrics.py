@@ -0,0 +1,113 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies per provider.
+
+    Shared by every request in the process, so percentiles reflect what the
+    providers have been doing lately rather than what one request saw.
+
+    Calls cancelled before they finished (a hedge won, the client went away)
+    count at the time they had taken, a lower bound of their latency:
+    leaving them out would drop exactly the slow tail.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._lock = threading.Lock()
+        # success is None for a cancelled call
+        self._samples: Dict[str, Deque[Tuple[float, Optional[bool]]]] = {}
+
+    def record(self, provider: str, seconds: float, success: bool = True) -> None:
+        self._append(provider, seconds, success)
+
+    def record_cancelled(self, provider: str, seconds: float) -> None:
+        """A call abandoned after seconds, before it answered or failed"""
+        self._append(provider, seconds, None)
+
+    def _append(self, provider: str, seconds: float, success: Optional[bool]) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(provider, deque(maxlen=self.window))
+            samples.append((seconds, success))
+
+    def count(self, provider: str) -> int:
+        """Number of latency samples (successful or cancelled calls) in the window"""
+        with self._lock:
+            return sum(1 for _, ok in self._samples.get(provider, ()) if ok is not False)
+
+    def percentile(self, provider: str, q: float) -> Optional[float]:
+        """Latency percentile (0-100) of successful and cancelled calls, or None without data"""
+        with self._lock:
+            latencies = sorted(s for s, ok in self._samples.get(provider, ()) if ok is not False)
+        return _percentile(latencies, q)
+
+    def error_rate(self, provider: str) -> float:
+        """Share of failures among the calls that finished"""
+        with self._lock:
+            finished = [ok for _, ok in self._samples.get(provider, ()) if ok is not None]
+        if not finished:
+            return 0.0
+        return sum(1 for ok in finished if not ok) / len(finished)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            providers = {name: list(samples) for name, samples in self._samples.items()}
+        result = {}
+        for name, samples in providers.items():
+            latencies = sorted(s for s, ok in samples if ok is not False)
+            result[name] = {
+                "calls": len(samples),
+                "errors": sum(1 for _, ok in samples if ok is False),
+                "cancelled": sum(1 for _, ok in samples if ok is None),
+                "p50": _round(_percentile(latencies, 50)),
+                "p95": _round(_percentile(latencies, 95)),
+                "p99": _round(_percentile(latencies, 99)),
+            }
+        return result
+
+
+class TokenUsageTracker:
+    """
+    Running token totals per provider.
+
+    cached_tokens counts prompt tokens the provider served from its prefix
+    cache; they are billed at a discount and skip most input processing.
+    """
+
+    FIELDS = ("calls", "prompt_tokens", "cached_tokens", "output_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, provider: str, prompt_tokens: int, cached_tokens: int = 0, output_tokens: int = 0) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(provider, dict.fromkeys(self.FIELDS, 0))
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens or 0
+            totals["cached_tokens"] += cached_tokens or 0
+            totals["output_tokens"] += output_tokens or 0
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            totals = {name: dict(values) for name, values in self._totals.items()}
+        for values in totals.values():
+            prompt = values["prompt_tokens"]
+            values["cached_ratio"] = round(values["cached_tokens"] / prompt, 3) if prompt else 0.0
+        return totals
+
+
+def _percentile(sorted_values, q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
@@ -1,32 +1,162 @@
-from src.infrastructure.ai.base import BaseAIService
+import asyncio
+import time
+from typing import AsyncIterator, Optional, Tuple
+from src.application.deadline import call_timeout
+from src.infrastructure.ai.base import BaseAIService, RESPONSE_SCHEMAS
+from src.application.usage_ledger import AIUsageLedger
+from src.infrastructure.ai.metrics import TokenUsageTracker
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
+    httpx = None
     OpenAI = None
+    AsyncOpenAI = None
 
 
 class OpenAIService(BaseAIService):
     """OpenAI implementation using Template Method Pattern"""
     
-    def __init__(self, api_key: str):
+    name = "openai"
+    
+    def __init__(
+        self,
+        api_key: str,
+        timeout_seconds: float = 60.0,
+        connect_timeout_seconds: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_seconds: float = 30.0,
+        model: str = "gpt-4o-mini",
+        structured_output: bool = True,
+        token_usage: Optional[TokenUsageTracker] = None,
+        usage_ledger: Optional[AIUsageLedger] = None
+    ):
         if OpenAI is None:
             raise ImportError("openai package is not installed. Please install it with `pip install openai`")
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4-turbo-preview"  # Or gpt-3.5-turbo
+        # Built once per process: the pools keep TCP/TLS connections open between requests
+        timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds
+        )
+        self.client = OpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            http_client=httpx.Client(limits=limits, timeout=timeout)
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+        )
+        self.timeout = timeout
+        self.model = model
+        self.model_name = model
+        self.structured_output = structured_output
+        self.token_usage = token_usage
+        self.usage_ledger = usage_ledger
+    
+    async def aclose(self) -> None:
+        """Close both connection pools"""
+        self.client.close()
+        await self.async_client.close()
+    
+    def _request_timeout(self):
+        """Client timeout, shortened to what is left of the request deadline"""
+        seconds = call_timeout(self.timeout.read)
+        return httpx.Timeout(seconds, connect=min(seconds, self.timeout.connect))
+    
+    def _response_format(self, system_message: str) -> dict:
+        """Structured output against the plan schema, or plain JSON mode for other prompts"""
+        if not self.structured_output or system_message not in RESPONSE_SCHEMAS:
+            return {"type": "json_object"}
+        name, schema = RESPONSE_SCHEMAS[system_message]
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+    
+    def _track_usage(self, usage) -> Tuple[int, int, int]:
+        """Prompts over 1024 tokens are prefix-cached automatically; usage reports the cached part"""
+        if usage is None:
+            return 0, 0, 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        return self._record_usage(usage.prompt_tokens, getattr(details, "cached_tokens", 0) or 0, usage.completion_tokens)
+    
+    def _build_messages(self, prompt: str, system_message: str) -> list:
+        return [
+            {"role": "system", "content": system_message or "You are a helpful assistant that outputs only JSON."},
+            {"role": "user", "content": prompt}
+        ]
     
     def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
         """Call OpenAI API and return raw text response"""
+        timeout = self._request_timeout()
+        started = time.monotonic()
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message or "You are a helpful assistant that outputs only JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
+                messages=self._build_messages(prompt, system_message),
+                response_format=self._response_format(system_message),
+                timeout=timeout
             )
-            return response.choices[0].message.content
+            tokens = self._track_usage(response.usage)
+            text = response.choices[0].message.content
         except Exception as e:
+            self._log_call(started, "error")
             print(f"Error calling OpenAI API: {e}")
             raise ValueError(f"Failed to generate plan from OpenAI: {e}")
+        self._log_call(started, self._response_outcome(text or "", system_message), tokens)
+        return text
+    
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        """Call OpenAI API without blocking the event loop"""
+        timeout = self._request_timeout()
+        started = time.monotonic()
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_message),
+                response_format=self._response_format(system_message),
+                timeout=timeout
+            )
+            tokens = self._track_usage(response.usage)
+            text = response.choices[0].message.content
+        except asyncio.CancelledError:
+            self._log_call(started, "cancelled")
+            raise
+        except Exception as e:
+            self._log_call(started, "error")
+            print(f"Error calling OpenAI API: {e}")
+            raise ValueError(f"Failed to generate plan from OpenAI: {e}")
+        self._log_call(started, self._response_outcome(text or "", system_message), tokens)
+        return text
+    
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        """Stream OpenAI output token deltas"""
+        timeout = self._request_timeout()
+        started = time.monotonic()
+        chunks, tokens = [], (0, 0, 0)
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_message),
+                response_format=self._response_format(system_message),
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                if getattr(chunk, "usage", None):
+                    tokens = self._track_usage(chunk.usage)
+        except (asyncio.CancelledError, GeneratorExit):
+            self._log_call(started, "cancelled", tokens)
+            raise
+        except Exception as e:
+            self._log_call(started, "error", tokens)
+            print(f"Error streaming from OpenAI API: {e}")
+            raise ValueError(f"Failed to generate plan from OpenAI: {e}")
+        self._log_call(started, self._response_outcome("".join(chunks), system_message, streamed=True), tokens)
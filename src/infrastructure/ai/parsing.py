@@ -0,0 +1,367 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalArrayParser:
+    """Extracts elements of a top-level JSON array while the text is still arriving.
+
+    Feed it chunks of a response shaped like {"sessions": [{...}, {...}]} and
+    every object inside the target array is returned as soon as its closing
+    brace arrives, without waiting for the rest of the document. Markdown
+    fences or prose around the JSON are ignored.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+        self.array_closed = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._buffer
+
+    @property
+    def in_element(self) -> bool:
+        """True while an array element has been opened but not yet closed"""
+        return self._element_start is not None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the array elements it completed"""
+        self._buffer += chunk
+        buf = self._buffer
+        completed = []
+
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._element_start is None:
+                        self._last_string = buf[self._string_start + 1:i]
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ':':
+                if self._depth == 1:
+                    self._pending_key = self._last_string
+            elif c == ',':
+                if self._depth == 1:
+                    self._pending_key = None
+            elif c in '{[':
+                self._depth += 1
+                if (c == '[' and self._array_depth is None and not self.array_closed
+                        and self._depth == 2 and self._pending_key == self.array_key):
+                    self._array_depth = self._depth
+                elif (c == '{' and self._array_depth is not None
+                        and self._depth == self._array_depth + 1):
+                    self._element_start = i
+            elif c in '}]':
+                if c == ']' and self._array_depth is not None and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self.array_closed = True
+                self._depth -= 1
+                if (c == '}' and self._element_start is not None
+                        and self._array_depth is not None and self._depth == self._array_depth):
+                    element = self._load_element(buf[self._element_start:i + 1])
+                    if element is not None:
+                        completed.append(element)
+                    self._element_start = None
+
+        self._pos = len(buf)
+        return completed
+
+    def _load_element(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            element = json.loads(text)
+        except ValueError:
+            try:
+                element = parse_json_tolerant(text).data
+            except ValueError:
+                return None
+        return element if isinstance(element, dict) else None
+
+
+@dataclass
+class ParseResult:
+    """Outcome of a tolerant parse"""
+    data: Any
+    truncated: bool = False
+    items_salvaged: Optional[int] = None
+    repairs: Dict[str, int] = field(default_factory=dict)
+    dropped: List[str] = field(default_factory=list)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "truncated": self.truncated,
+            "items_salvaged": self.items_salvaged,
+            "repairs": dict(self.repairs),
+            "dropped": list(self.dropped),
+        }
+
+
+# Object frame states: what the next token should be
+_KEY, _COLON, _VALUE, _COMMA = range(4)
+_LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null", "undefined": "null"}
+_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class _Frame:
+    __slots__ = ("closer", "state", "key", "is_items")
+
+    def __init__(self, closer: str):
+        self.closer = closer
+        self.state = _KEY if closer == "}" else _VALUE
+        self.key: Optional[str] = None
+        self.is_items = False
+
+
+class TolerantJSONParser:
+    """Single-pass parser that repairs the usual defects of model output.
+
+    Skips prose and markdown fences around the first JSON object, drops
+    trailing and duplicate commas, inserts missing commas between values,
+    escapes raw control characters in strings and maps Python literals
+    (True/False/None) to JSON. If the text ends early, the document is cut
+    back to the last complete element of items_key (or the last complete
+    container when no key is given) and closed, and the partial element is
+    reported as dropped. Text can be fed in chunks as it streams in.
+    """
+
+    def __init__(self, items_key: Optional[str] = None):
+        self.items_key = items_key
+        self._out: List[str] = []
+        self._last_sig: Optional[int] = None
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._key_chars: List[str] = []
+        self._literal: List[str] = []
+        self._item_open = False
+        self._items_seen = False
+        self._items_completed = 0
+        self._cut: Optional[tuple] = None
+        self._skipped = 0
+        self._trailing = 0
+        self.repairs: Dict[str, int] = {}
+
+    def feed(self, chunk: str) -> None:
+        for c in chunk:
+            if self._done:
+                if not c.isspace() and c != "`":
+                    self._trailing += 1
+            elif self._in_string:
+                self._string_char(c)
+            elif not self._started:
+                if c == "{":
+                    self._started = True
+                    self._open("}")
+                elif not c.isspace():
+                    self._skipped += 1
+            else:
+                self._char(c)
+
+    def finish(self) -> ParseResult:
+        """Close the document and load it"""
+        if not self._started:
+            raise ValueError("No JSON object found in response")
+        if not self._in_string and self._literal:
+            self._flush_literal()
+        dropped = []
+        truncated = not self._done
+        if truncated:
+            if self._cut is None:
+                raise ValueError("Response was truncated before any complete element")
+            position, closers = self._cut
+            text = "".join(self._out[:position]) + closers
+            if self._item_open:
+                dropped.append(f"incomplete {self.items_key} element #{self._items_completed + 1}")
+            elif self.items_key is None:
+                dropped.append("content after the last complete container")
+        else:
+            text = "".join(self._out)
+        if self._skipped:
+            self._repair("leading text")
+        if self._trailing:
+            dropped.append("text after the JSON object")
+
+        data = json.loads(text, strict=False)
+        return ParseResult(
+            data=data,
+            truncated=truncated,
+            items_salvaged=self._items_completed if self._items_seen else None,
+            repairs=self.repairs,
+            dropped=dropped,
+        )
+
+    def _repair(self, kind: str) -> None:
+        self.repairs[kind] = self.repairs.get(kind, 0) + 1
+
+    def _emit(self, text: str, significant: bool = True) -> None:
+        self._out.append(text)
+        if significant:
+            self._last_sig = len(self._out) - 1
+
+    def _begin_value(self) -> None:
+        frame = self._stack[-1]
+        if frame.state == _COMMA:
+            self._repair("missing comma")
+            self._emit(",")
+        elif frame.state == _COLON:
+            self._repair("missing colon")
+            self._emit(":")
+        frame.state = _VALUE
+
+    def _end_value(self) -> None:
+        if self._stack:
+            self._stack[-1].state = _COMMA
+
+    def _open(self, closer: str) -> None:
+        parent = self._stack[-1] if self._stack else None
+        frame = _Frame(closer)
+        self._emit("{" if closer == "}" else "[")
+        if parent is not None:
+            if (closer == "]" and len(self._stack) == 1 and self.items_key is not None
+                    and parent.key == self.items_key and not self._items_seen):
+                frame.is_items = True
+                self._items_seen = True
+            elif closer == "}" and parent.is_items:
+                self._item_open = True
+        self._stack.append(frame)
+        if frame.is_items:
+            self._mark_cut()
+
+    def _close(self) -> None:
+        if self._last_sig is not None and self._out[self._last_sig] == ",":
+            self._out[self._last_sig] = ""
+            self._repair("trailing comma")
+        frame = self._stack.pop()
+        self._emit(frame.closer)
+        if not self._stack:
+            self._done = True
+            return
+        self._end_value()
+        if self._stack[-1].is_items:
+            self._items_completed += 1
+            self._item_open = False
+            self._mark_cut()
+        elif frame.is_items or self.items_key is None or not self._items_seen:
+            self._mark_cut()
+
+    def _mark_cut(self) -> None:
+        closers = "".join(f.closer for f in reversed(self._stack))
+        self._cut = (len(self._out), closers)
+
+    def _char(self, c: str) -> None:
+        if self._literal and not (c.isalnum() or c in "-+._"):
+            self._flush_literal()
+        if c.isspace():
+            return
+        frame = self._stack[-1]
+        if c == '"':
+            is_key = frame.closer == "}" and frame.state in (_KEY, _COMMA)
+            if is_key:
+                if frame.state == _COMMA:
+                    self._repair("missing comma")
+                    self._emit(",")
+                self._key_chars = []
+            else:
+                self._begin_value()
+            self._string_is_key = is_key
+            self._in_string = True
+            self._emit('"')
+        elif c in "{[":
+            self._begin_value()
+            self._open("}" if c == "{" else "]")
+        elif c in "}]":
+            if c != frame.closer:
+                self._repair("mismatched bracket")
+            self._close()
+        elif c == ":":
+            if frame.closer == "}" and frame.state == _COLON:
+                frame.state = _VALUE
+                self._emit(":")
+            else:
+                self._repair("stray colon")
+        elif c == ",":
+            if frame.state == _COMMA:
+                frame.state = _KEY if frame.closer == "}" else _VALUE
+                self._emit(",")
+            else:
+                self._repair("duplicate comma")
+        elif c.isalnum() or c in "-+._":
+            self._literal.append(c)
+        else:
+            self._skipped += 1
+
+    def _flush_literal(self) -> None:
+        token = "".join(self._literal)
+        self._literal = []
+        frame = self._stack[-1]
+        if frame.closer == "}" and frame.state in (_KEY, _COMMA):
+            # Unquoted key
+            if frame.state == _COMMA:
+                self._repair("missing comma")
+                self._emit(",")
+            self._repair("unquoted key")
+            frame.key = token
+            frame.state = _COLON
+            self._emit(json.dumps(token))
+            return
+        self._begin_value()
+        if token in _LITERALS:
+            self._repair("non-JSON literal")
+            token = _LITERALS[token]
+        self._emit(token)
+        self._end_value()
+
+    def _string_char(self, c: str) -> None:
+        if self._escape:
+            self._escape = False
+            self._emit(c, significant=False)
+            if self._string_is_key:
+                self._key_chars.append(c)
+            return
+        if c == "\\":
+            self._escape = True
+            self._emit(c, significant=False)
+            return
+        if c == '"':
+            self._in_string = False
+            self._emit('"')
+            frame = self._stack[-1]
+            if self._string_is_key:
+                frame.key = "".join(self._key_chars)
+                frame.state = _COLON
+            else:
+                self._end_value()
+            return
+        if c in _ESCAPES:
+            c = _ESCAPES[c]
+        self._emit(c, significant=False)
+        if self._string_is_key:
+            self._key_chars.append(c)
+
+
+def parse_json_tolerant(text: str, items_key: Optional[str] = None) -> ParseResult:
+    """Parse model output, repairing and salvaging what can be saved"""
+    parser = TolerantJSONParser(items_key)
+    parser.feed(text)
+    return parser.finish()
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+from typing import AsyncIterator, List, Optional, Sequence
+from src.application.deadline import current_deadline
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.circuit_breaker import CircuitBreakerRegistry
+from src.infrastructure.ai.metrics import LatencyTracker
+
+
+class ProviderRouter(BaseAIService):
+    """
+    Routes each call to one of several providers, skipping those whose
+    circuit breaker is open and failing over to the next on error.
+
+    With latency weighting the first choice is drawn at random with weight
+    inversely proportional to each provider's recent median latency, so the
+    fastest healthy provider gets most of the traffic while the others keep
+    enough calls to notice when they recover.
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        providers: Sequence[BaseAIService],
+        breakers: CircuitBreakerRegistry,
+        latency: LatencyTracker,
+        latency_weighted: bool = True,
+        rng: Optional[random.Random] = None
+    ):
+        self.providers = list(providers)
+        self.breakers = breakers
+        self.latency = latency
+        self.latency_weighted = latency_weighted
+        self.rng = rng or random.Random()
+
+    def route(self) -> List[BaseAIService]:
+        """Providers to try, in order; open circuits are left out"""
+        available = [p for p in self.providers if self.breakers.get(p.name).is_available()]
+        if not self.latency_weighted or len(available) < 2:
+            return available
+
+        medians = {p.name: self.latency.percentile(p.name, 50) for p in available}
+        known = [m for m in medians.values() if m is not None]
+        # Providers without history are treated as fast so they get explored
+        default = min(known) if known else 1.0
+        weights = [1.0 / max(medians[p.name] if medians[p.name] is not None else default, 0.001) for p in available]
+
+        first = self.rng.choices(available, weights=weights)[0]
+        rest = sorted(
+            (p for p in available if p is not first),
+            key=lambda p: medians[p.name] if medians[p.name] is not None else default
+        )
+        return [first] + rest
+
+    def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
+        last_error: Optional[Exception] = None
+        for provider in self.route():
+            breaker = self.breakers.get(provider.name)
+            if not breaker.allow_request():
+                continue
+            started = time.monotonic()
+            try:
+                text = provider._call_ai_api(prompt, system_message=system_message)
+                self._parse_json_response(text)
+            except Exception as e:
+                if _out_of_time():
+                    breaker.release()
+                    raise
+                self._record_failure(provider, started)
+                last_error = e
+                continue
+            self._record_success(provider, started)
+            return text
+        raise self._unavailable(last_error)
+
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        last_error: Optional[Exception] = None
+        for provider in self.route():
+            breaker = self.breakers.get(provider.name)
+            if not breaker.allow_request():
+                continue
+            started = time.monotonic()
+            try:
+                text = await provider._call_ai_api_async(prompt, system_message=system_message)
+                self._parse_json_response(text)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if _out_of_time():
+                    breaker.release()
+                    raise
+                self._record_failure(provider, started)
+                last_error = e
+                continue
+            self._record_success(provider, started)
+            return text
+        raise self._unavailable(last_error)
+
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        """Fail over while no output has been produced; afterwards errors propagate"""
+        last_error: Optional[Exception] = None
+        for provider in self.route():
+            breaker = self.breakers.get(provider.name)
+            if not breaker.allow_request():
+                continue
+            started = time.monotonic()
+            stream = provider._stream_ai_api(prompt, system_message=system_message)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                breaker.record_success(time.monotonic() - started)
+                return
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if _out_of_time():
+                    breaker.release()
+                    raise
+                breaker.record_failure(time.monotonic() - started)
+                last_error = e
+                continue
+            breaker.record_success(time.monotonic() - started)
+            yield first
+            async for chunk in stream:
+                yield chunk
+            return
+        raise self._unavailable(last_error)
+
+    def _record_success(self, provider: BaseAIService, started: float) -> None:
+        elapsed = time.monotonic() - started
+        self.breakers.get(provider.name).record_success(elapsed)
+        self.latency.record(provider.name, elapsed)
+
+    def _record_failure(self, provider: BaseAIService, started: float) -> None:
+        elapsed = time.monotonic() - started
+        self.breakers.get(provider.name).record_failure(elapsed)
+        self.latency.record(provider.name, elapsed, success=False)
+
+    def _unavailable(self, last_error: Optional[Exception]) -> ValueError:
+        if last_error is None:
+            return ValueError("Failed to generate plan: all AI providers are unavailable (circuit open)")
+        return ValueError(f"Failed to generate plan: all AI providers failed ({last_error})")
+
+
+def _out_of_time() -> bool:
+    """The request deadline has passed, so a failure says nothing about the provider"""
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired
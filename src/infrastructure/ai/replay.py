@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from src.infrastructure.ai.base import BaseAIService
+
+
+def recording_key(prompt: str, system_message: str = "") -> str:
+    """Stable key for a prompt; whitespace differences don't matter"""
+    normalized = " ".join(system_message.split()) + "\n" + " ".join(prompt.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """
+    Delay applied to each replayed response.
+
+    Specs: "none", "recorded" (the latency captured with the response),
+    "fixed:<s>", "uniform:<min>,<max>", "normal:<mean>,<stddev>" and
+    "lognormal:<mu>,<sigma>" (parameters of the underlying normal, in log-seconds).
+    """
+
+    KINDS = ("none", "recorded", "fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "recorded"):
+        kind, _, params = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency model: {spec}")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+
+    def sample(self, rng: random.Random, recorded: Optional[float] = None) -> float:
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            return recorded or 0.0
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.params[0], self.params[1]))
+        return rng.lognormvariate(self.params[0], self.params[1])
+
+
+class ReplayCorpus:
+    """Recorded responses in a JSON Lines file, one recording per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, dict] = {}
+        self._by_system: Dict[str, List[dict]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, recording: dict) -> None:
+        self._by_key[recording["key"]] = recording
+        self._by_system.setdefault(recording.get("system_message", ""), []).append(recording)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def find(self, prompt: str, system_message: str = "") -> Optional[dict]:
+        """Exact recording for the prompt, else one recorded with the same system message"""
+        key = recording_key(prompt, system_message)
+        with self._lock:
+            recording = self._by_key.get(key)
+            if recording is not None:
+                return recording
+            # Unseen profile: reuse a recording of the same kind of plan, picked stably
+            candidates = self._by_system.get(system_message) or list(self._by_key.values())
+            if not candidates:
+                return None
+            return candidates[int(key, 16) % len(candidates)]
+
+    def add(self, prompt: str, system_message: str, response: str, latency_seconds: float) -> None:
+        recording = {
+            "key": recording_key(prompt, system_message),
+            "system_message": system_message,
+            "prompt": prompt,
+            "response": response,
+            "latency_seconds": round(latency_seconds, 3),
+        }
+        with self._lock:
+            self._index(recording)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(recording) + "\n")
+
+
+class ReplayAIService(BaseAIService):
+    """
+    Stand-in provider that answers from a recorded corpus, for load tests and
+    benchmarks without network access or provider spend.
+
+    Latency follows the configured model; error_rate and truncation_rate
+    inject provider failures and responses cut off mid-JSON.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        corpus: ReplayCorpus,
+        latency: str = "recorded",
+        error_rate: float = 0.0,
+        truncation_rate: float = 0.0,
+        stream_chunks: int = 8,
+        seed: Optional[int] = None
+    ):
+        self.corpus = corpus
+        self.latency = LatencyModel(latency)
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.stream_chunks = stream_chunks
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
+        delay, response = self._plan_response(prompt, system_message)
+        time.sleep(delay)
+        return self._deliver(response)
+
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        delay, response = self._plan_response(prompt, system_message)
+        await asyncio.sleep(delay)
+        return self._deliver(response)
+
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        delay, response = self._plan_response(prompt, system_message)
+        text = self._deliver(response)
+        size = max(1, -(-len(text) // self.stream_chunks))
+        for start in range(0, len(text), size):
+            await asyncio.sleep(delay / self.stream_chunks)
+            yield text[start:start + size]
+
+    def _plan_response(self, prompt: str, system_message: str):
+        """Pick the recording, the delay and any injected defect for one call"""
+        recording = self.corpus.find(prompt, system_message)
+        with self._rng_lock:
+            delay = self.latency.sample(self._rng, recording.get("latency_seconds") if recording else None)
+            if recording is None:
+                return delay, ValueError("Failed to generate plan from replay provider: corpus is empty")
+            if self._rng.random() < self.error_rate:
+                return delay, ValueError("Failed to generate plan from replay provider: injected error")
+            response = recording["response"]
+            if self._rng.random() < self.truncation_rate:
+                response = response[:int(len(response) * self._rng.uniform(0.3, 0.95))]
+        return delay, response
+
+    def _deliver(self, response) -> str:
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class RecordingAIService(BaseAIService):
+    """Passes calls through to a real provider and appends each response to the corpus"""
+
+    def __init__(self, provider: BaseAIService, corpus: ReplayCorpus):
+        self.provider = provider
+        self.corpus = corpus
+        self.name = provider.name
+
+    def _call_ai_api(self, prompt: str, system_message: str = "") -> str:
+        started = time.monotonic()
+        response = self.provider._call_ai_api(prompt, system_message=system_message)
+        self.corpus.add(prompt, system_message, response, time.monotonic() - started)
+        return response
+
+    async def _call_ai_api_async(self, prompt: str, system_message: str = "") -> str:
+        started = time.monotonic()
+        response = await self.provider._call_ai_api_async(prompt, system_message=system_message)
+        self.corpus.add(prompt, system_message, response, time.monotonic() - started)
+        return response
+
+    async def _stream_ai_api(self, prompt: str, system_message: str = "") -> AsyncIterator[str]:
+        started = time.monotonic()
+        chunks = []
+        async for chunk in self.provider._stream_ai_api(prompt, system_message=system_message):
+            chunks.append(chunk)
+            yield chunk
+        self.corpus.add(prompt, system_message, "".join(chunks), time.monotonic() - started)
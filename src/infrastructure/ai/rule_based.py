@@ -0,0 +1,207 @@
+import re
+from typing import Dict, Any, AsyncIterator, List, Set
+from src.application.interfaces import (
+    AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService
+)
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.domain.nutrition import estimate_daily_targets
+from src.infrastructure.ai.catalog import (
+    EXERCISES, SESSION_FOCUS, WEEKLY_SPLITS, TRAINING_DAYS, EXPERIENCE_LEVEL,
+    SET_SCHEMES, CONDITIONING_PRESCRIPTION, INJURY_KEYWORDS,
+    RESTRICTION_KEYWORDS, MEAL_SLOTS, MEALS, WEEK_DAYS
+)
+
+
+class RuleBasedAIService(AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService):
+    """
+    Builds plans locally from the bundled catalog, without any network call.
+
+    Output is deterministic for a given profile. Plans are marked as not
+    cacheable so a fallback result never shadows a later provider answer.
+    """
+
+    name = "rule_based"
+
+    def generate_workout_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return {'sessions': self._build_sessions(profile), 'cacheable': False}
+
+    def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return {'daily_plans': self._build_daily_plans(profile), 'cacheable': False}
+
+    async def generate_workout_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return self.generate_workout_plan(profile)
+
+    async def generate_nutrition_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return self.generate_nutrition_plan(profile)
+
+    async def stream_workout_sessions(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        for session in self._build_sessions(profile):
+            yield session
+
+    async def stream_nutrition_days(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        for day in self._build_daily_plans(profile):
+            yield day
+
+    def complete_workout_sessions(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        taken = {s.get('day') for s in accepted}
+        sessions = self._build_sessions(profile)
+        spare = [s for s in sessions if s['day'] not in taken]
+        if not days:
+            return spare
+        spare = spare or sessions
+        return [dict(spare[i % len(spare)], day=day) for i, day in enumerate(days)]
+
+    def complete_nutrition_days(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return [d for d in self._build_daily_plans(profile) if d['day'] in days]
+
+    async def complete_workout_sessions_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self.complete_workout_sessions(profile, accepted, days)
+
+    async def complete_nutrition_days_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self.complete_nutrition_days(profile, accepted, days)
+
+    def outline_workout_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return workout_outline(profile)
+
+    def outline_nutrition_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return nutrition_outline(profile)
+
+    def generate_workout_sessions(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return [s for s in self._build_sessions(profile) if s['day'] in days]
+
+    def generate_nutrition_days(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return [d for d in self._build_daily_plans(profile) if d['day'] in days]
+
+    async def generate_workout_sessions_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self.generate_workout_sessions(profile, outline, days)
+
+    async def generate_nutrition_days_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self.generate_nutrition_days(profile, outline, days)
+
+    # Workout
+
+    def _build_sessions(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        levels = EXPERIENCE_LEVEL.get(profile.activity_level, EXPERIENCE_LEVEL[ActivityLevel.SEDENTARY])
+        sets, reps, rest_time, conditioning = SET_SCHEMES.get(profile.goal, SET_SCHEMES[Goal.MAINTENANCE])
+        injured = injured_body_parts(profile.injuries)
+
+        sessions = []
+        for index, planned in enumerate(workout_outline(profile)):
+            day, focus = planned['day'], planned['focus']
+            used: Set[str] = set()
+            exercises = []
+            for group in SESSION_FOCUS[focus]:
+                exercise = self._pick_exercise(group, levels, injured, used, index)
+                if exercise:
+                    used.add(exercise['name'])
+                    exercises.append(self._prescribe(exercise, sets, reps, rest_time))
+            if conditioning:
+                exercise = self._pick_exercise("conditioning", levels, injured, used, index)
+                if exercise:
+                    exercises.append({
+                        'name': exercise['name'],
+                        'description': exercise['description'],
+                        'sets': 1,
+                        'reps': CONDITIONING_PRESCRIPTION[profile.goal],
+                        'rest_time': "0s",
+                    })
+            sessions.append({'day': day, 'focus': focus, 'exercises': exercises})
+        return sessions
+
+    def _pick_exercise(self, group: str, levels: Set[str], injured: Set[str], used: Set[str], rotation: int):
+        """Pick a safe exercise for the group, rotating through candidates by session"""
+        candidates = [
+            e for e in EXERCISES[group]
+            if e['level'] in levels and not (e['loads'] & injured) and e['name'] not in used
+        ]
+        if not candidates:
+            return None
+        return candidates[rotation % len(candidates)]
+
+    def _prescribe(self, exercise: dict, sets: int, reps: str, rest_time: str) -> Dict[str, Any]:
+        return {
+            'name': exercise['name'],
+            'description': exercise['description'],
+            'sets': sets,
+            'reps': reps,
+            'rest_time': rest_time,
+        }
+
+    # Nutrition
+
+    def _build_daily_plans(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        targets = estimate_daily_targets(profile)
+        required = restriction_tags(profile.dietary_restrictions)
+        if "vegan" in required:
+            required.add("vegetarian")
+
+        daily_plans = []
+        for index, day in enumerate(WEEK_DAYS):
+            meals = []
+            for slot, share in MEAL_SLOTS:
+                options = [m for m in MEALS[slot] if required <= m['tags']]
+                if not options:
+                    raise ValueError(f"No {slot.lower()} option meets the dietary restrictions: {', '.join(sorted(required))}")
+                meal = options[index % len(options)]
+                meals.append({
+                    'name': slot,
+                    'description': meal['description'],
+                    'calories': int(round(targets.calories * share)),
+                    'protein': int(round(targets.protein * share)),
+                    'carbs': int(round(targets.carbs * share)),
+                    'fats': int(round(targets.fats * share)),
+                    'ingredients': list(meal['ingredients']),
+                })
+            daily_plans.append({'day': day, 'meals': meals})
+        return daily_plans
+
+
+def workout_outline(profile: UserProfile) -> List[Dict[str, Any]]:
+    """Training days and session focus for the week, from the profile's activity level"""
+    days = TRAINING_DAYS.get(profile.activity_level, 3)
+    return [{'day': day, 'focus': focus} for day, focus in WEEKLY_SPLITS[days]]
+
+
+def nutrition_outline(profile: UserProfile) -> List[Dict[str, Any]]:
+    """Every day of the week with the same calorie and macro targets"""
+    targets = estimate_daily_targets(profile)
+    return [
+        {'day': day, 'calories': targets.calories, 'protein': targets.protein,
+         'carbs': targets.carbs, 'fats': targets.fats}
+        for day in WEEK_DAYS
+    ]
+
+
+# Entries that mean the profile has nothing to declare
+NO_ENTRY = {"", "none", "no", "n/a", "na", "nothing", "ninguna", "ninguno", "nada"}
+
+
+def _match_keywords(entries: List[str], keywords: Dict[str, Set[str]], kind: str) -> Set[str]:
+    """
+    Map each entry to the catalog's tags. An entry that matches none is
+    refused rather than ignored, so the plan is never built without it.
+    """
+    matched = set()
+    for entry in entries or []:
+        text = entry.lower().strip()
+        if text in NO_ENTRY:
+            continue
+        words = set(re.findall(r"[\wñ]+", text))
+        tags = {
+            tag for tag, terms in keywords.items()
+            if any(term in words or (" " in term and term in text) for term in terms)
+        }
+        if not tags:
+            raise ValueError(f"Unrecognized {kind}: {entry}")
+        matched |= tags
+    return matched
+
+
+def injured_body_parts(injuries: List[str]) -> Set[str]:
+    """Map free-text injuries to the catalog's body parts"""
+    return _match_keywords(injuries, INJURY_KEYWORDS, "injury")
+
+
+def restriction_tags(restrictions: List[str]) -> Set[str]:
+    """Map free-text dietary restrictions to the catalog's meal tags"""
+    return _match_keywords(restrictions, RESTRICTION_KEYWORDS, "dietary restriction")
@@ -0,0 +1,217 @@
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+from src.application.interfaces import (
+    AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService
+)
+from src.application.plan_schema import ITEM_VALIDATORS, PLAN_VALIDATORS
+from src.domain.models import UserProfile, Goal
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.metrics import LatencyTracker
+
+SMALL = "small"
+LARGE = "large"
+
+
+def profile_complexity(plan_type: str, profile: UserProfile) -> float:
+    """
+    Rough difficulty of writing a safe plan for the profile.
+
+    Each injury (workout) or dietary restriction (nutrition) adds 1, as do an
+    age outside 18-65 and a BMI outside 18.5-35. A goal other than
+    maintenance adds 0.5. A healthy adult scores 0 or 0.5.
+    """
+    constraints = profile.injuries if plan_type == "workout" else profile.dietary_restrictions
+    score = float(sum(1 for c in constraints or [] if c and c.strip()))
+    if profile.age < 18 or profile.age > 65:
+        score += 1
+    if profile.height:
+        bmi = profile.weight / (profile.height / 100) ** 2
+        if bmi < 18.5 or bmi >= 35:
+            score += 1
+    if profile.goal != Goal.MAINTENANCE:
+        score += 0.5
+    return score
+
+
+class TierStats:
+    """Per-tier call latency plus how often the small tier had to escalate"""
+
+    def __init__(self, latency: LatencyTracker = None):
+        self.latency = latency or LatencyTracker()
+        self._lock = threading.Lock()
+        self.routed = {SMALL: 0, LARGE: 0}
+        self.escalations = 0
+
+    def route(self, tier: str) -> None:
+        with self._lock:
+            self.routed[tier] += 1
+
+    def escalate(self) -> None:
+        with self._lock:
+            self.escalations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency.snapshot()
+        with self._lock:
+            routed = dict(self.routed)
+            escalations = self.escalations
+        return {
+            "tiers": {tier: {"routed": count, "latency": latency.get(tier)} for tier, count in routed.items()},
+            "escalations": escalations,
+            "escalation_rate": round(escalations / routed[SMALL], 3) if routed[SMALL] else 0.0,
+        }
+
+
+class TieredAIService(AIService, AsyncAIService, StreamingAIService, PlanRepairAIService, PlanFanOutAIService):
+    """
+    Sends simple profiles to a fast small-model tier and complex ones to the
+    large model.
+
+    A small-tier answer that fails the compiled schema check, or a small-tier
+    error, is retried once on the large tier. Streams cannot be retried once
+    items have been shown, so they are only routed.
+    """
+
+    def __init__(self, small: BaseAIService, large: BaseAIService, stats: TierStats, threshold: float = 1.0):
+        self.small = small
+        self.large = large
+        self.stats = stats
+        self.threshold = threshold
+
+    def tier_for(self, plan_type: str, profile: UserProfile) -> str:
+        return SMALL if profile_complexity(plan_type, profile) < self.threshold else LARGE
+
+    def generate_workout_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return self._cascade("workout", profile, lambda s: s.generate_workout_plan(profile), _plan_valid("workout"))
+
+    def generate_nutrition_plan(self, profile: UserProfile) -> Dict[str, Any]:
+        return self._cascade("nutrition", profile, lambda s: s.generate_nutrition_plan(profile), _plan_valid("nutrition"))
+
+    async def generate_workout_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return await self._cascade_async(
+            "workout", profile, lambda s: s.generate_workout_plan_async(profile), _plan_valid("workout")
+        )
+
+    async def generate_nutrition_plan_async(self, profile: UserProfile) -> Dict[str, Any]:
+        return await self._cascade_async(
+            "nutrition", profile, lambda s: s.generate_nutrition_plan_async(profile), _plan_valid("nutrition")
+        )
+
+    async def stream_workout_sessions(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        async for session in self._routed("workout", profile).stream_workout_sessions(profile):
+            yield session
+
+    async def stream_nutrition_days(self, profile: UserProfile) -> AsyncIterator[Dict[str, Any]]:
+        async for day in self._routed("nutrition", profile).stream_nutrition_days(profile):
+            yield day
+
+    def complete_workout_sessions(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._cascade("workout", profile, lambda s: s.complete_workout_sessions(profile, accepted, days), _items_valid("workout"))
+
+    def complete_nutrition_days(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._cascade("nutrition", profile, lambda s: s.complete_nutrition_days(profile, accepted, days), _items_valid("nutrition"))
+
+    async def complete_workout_sessions_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._cascade_async(
+            "workout", profile, lambda s: s.complete_workout_sessions_async(profile, accepted, days), _items_valid("workout")
+        )
+
+    async def complete_nutrition_days_async(self, profile: UserProfile, accepted: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._cascade_async(
+            "nutrition", profile, lambda s: s.complete_nutrition_days_async(profile, accepted, days), _items_valid("nutrition")
+        )
+
+    def outline_workout_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return self.large.outline_workout_week(profile)
+
+    def outline_nutrition_week(self, profile: UserProfile) -> List[Dict[str, Any]]:
+        return self.large.outline_nutrition_week(profile)
+
+    def generate_workout_sessions(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._cascade(
+            "workout", profile, lambda s: s.generate_workout_sessions(profile, outline, days), _items_valid("workout")
+        )
+
+    def generate_nutrition_days(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return self._cascade(
+            "nutrition", profile, lambda s: s.generate_nutrition_days(profile, outline, days), _items_valid("nutrition")
+        )
+
+    async def generate_workout_sessions_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._cascade_async(
+            "workout", profile, lambda s: s.generate_workout_sessions_async(profile, outline, days), _items_valid("workout")
+        )
+
+    async def generate_nutrition_days_async(self, profile: UserProfile, outline: List[Dict[str, Any]], days: List[str]) -> List[Dict[str, Any]]:
+        return await self._cascade_async(
+            "nutrition", profile, lambda s: s.generate_nutrition_days_async(profile, outline, days), _items_valid("nutrition")
+        )
+
+    def _routed(self, plan_type: str, profile: UserProfile) -> BaseAIService:
+        tier = self.tier_for(plan_type, profile)
+        self.stats.route(tier)
+        return self.small if tier == SMALL else self.large
+
+    def _cascade(self, plan_type: str, profile: UserProfile, call: Callable[[BaseAIService], Any], is_valid: Callable[[Any], bool]):
+        tier = self.tier_for(plan_type, profile)
+        self.stats.route(tier)
+        if tier == SMALL:
+            started = time.monotonic()
+            try:
+                result = call(self.small)
+                if is_valid(result):
+                    self.stats.latency.record(SMALL, time.monotonic() - started)
+                    return result
+                print("Small model answer failed schema validation, escalating to the large model")
+            except ValueError as e:
+                print(f"Small model failed ({e}), escalating to the large model")
+            self.stats.latency.record(SMALL, time.monotonic() - started, success=False)
+            self.stats.escalate()
+        started = time.monotonic()
+        try:
+            result = call(self.large)
+        except ValueError:
+            self.stats.latency.record(LARGE, time.monotonic() - started, success=False)
+            raise
+        self.stats.latency.record(LARGE, time.monotonic() - started)
+        return result
+
+    async def _cascade_async(
+        self, plan_type: str, profile: UserProfile, call: Callable[[BaseAIService], Awaitable], is_valid: Callable[[Any], bool]
+    ):
+        tier = self.tier_for(plan_type, profile)
+        self.stats.route(tier)
+        if tier == SMALL:
+            started = time.monotonic()
+            try:
+                result = await call(self.small)
+                if is_valid(result):
+                    self.stats.latency.record(SMALL, time.monotonic() - started)
+                    return result
+                print("Small model answer failed schema validation, escalating to the large model")
+            except ValueError as e:
+                print(f"Small model failed ({e}), escalating to the large model")
+            self.stats.latency.record(SMALL, time.monotonic() - started, success=False)
+            self.stats.escalate()
+        started = time.monotonic()
+        try:
+            result = await call(self.large)
+        except ValueError:
+            self.stats.latency.record(LARGE, time.monotonic() - started, success=False)
+            raise
+        self.stats.latency.record(LARGE, time.monotonic() - started)
+        return result
+
+
+def _plan_valid(plan_type: str) -> Callable[[Any], bool]:
+    """The plan matches the schema and has at least one session or day"""
+    validate = PLAN_VALIDATORS[plan_type]
+    key = 'sessions' if plan_type == "workout" else 'daily_plans'
+    return lambda plan_data: validate(plan_data) and bool(plan_data[key])
+
+
+def _items_valid(plan_type: str) -> Callable[[Any], bool]:
+    """Every returned session or day matches the schema"""
+    validate = ITEM_VALIDATORS[plan_type]
+    return lambda items: isinstance(items, list) and all(validate(item) for item in items)
@@ -117,3 +117,79 @@ class NotificationORM(Base):
     read_at = Column(DateTime, nullable=True)
     
     user = relationship("UserORM", back_populates="notifications")
+
+class PlanCacheORM(Base):
+    """Persistent tier of the plan-generation cache"""
+    __tablename__ = "plan_cache"
+    
+    key = Column(String, primary_key=True, index=True)  # "<plan_type>:<fingerprint>"
+    plan_type = Column(String, nullable=False)
+    plan_data = Column(JSON, nullable=False)  # Raw AI output
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+class GenerationJobORM(Base):
+    """Queue table for background plan generation"""
+    __tablename__ = "generation_jobs"
+    
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
+    plan_type = Column(String, nullable=False)  # "workout" or "nutrition"
+    requested_by = Column(String, nullable=False)
+    status = Column(String, default="queued", index=True, nullable=False)  # From JobStatus enum
+    priority = Column(Integer, default=0, nullable=False)  # Higher runs first
+    bypass_cache = Column(Boolean, default=False)
+    plan_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+class GenerationLeaseORM(Base):
+    """Cross-worker lease so only one worker generates a given user's plan at a time"""
+    __tablename__ = "generation_leases"
+    
+    key = Column(String, primary_key=True)  # "<plan_type>:<user_id>"
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+class RateLimitBucketORM(Base):
+    """Token bucket per user and scope, shared by every API worker"""
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String, primary_key=True)  # "<scope>:<user_id>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # Unix timestamp of the last refill
+
+class PreparedPlanORM(Base):
+    """Speculatively generated plan data waiting for the user's first generate request"""
+    __tablename__ = "prepared_plans"
+    
+    key = Column(String, primary_key=True)  # "<plan_type>:<user_id>"
+    user_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
+    plan_type = Column(String, nullable=False)
+    profile_key = Column(String, nullable=False)  # Profile fingerprint the data is for
+    job_id = Column(String, index=True, nullable=False)
+    plan_data = Column(JSON, nullable=True)  # Raw AI output, once the job has run
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+class AIUsageORM(Base):
+    """Append-only ledger of AI provider calls and plan cache hits"""
+    __tablename__ = "ai_usage_ledger"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.now, index=True, nullable=False)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False, default="")
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Integer, nullable=False, default=0)
+    outcome = Column(String, nullable=False, default="ok")  # ok, parse_error, error, cancelled
+    cache_hit = Column(Boolean, nullable=False, default=False)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    user_id = Column(String, nullable=True)  # No foreign key: the ledger outlives users
+    plan_type = Column(String, nullable=True)
+    plan_id = Column(String, nullable=True)
+    endpoint = Column(String, nullable=True)
+
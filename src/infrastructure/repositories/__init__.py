@@ -4,3 +4,10 @@ from .nutrition_repository import SqlAlchemyNutritionPlanRepository
 from .version_repository import SqlAlchemyPlanVersionRepository
 from .comment_repository import SqlAlchemyPlanCommentRepository
 from .notification_repository import SqlAlchemyNotificationRepository
+from .plan_cache_repository import SqlAlchemyPlanCacheRepository
+from .job_repository import SqlAlchemyGenerationJobRepository
+from .lease_repository import SqlAlchemyGenerationLeaseRepository
+from .approved_plan_repository import SqlAlchemyApprovedPlanRepository
+from .rate_limit_repository import SqlAlchemyRateLimitRepository
+from .ai_usage_repository import SqlAlchemyAIUsageRepository
+from .prepared_plan_repository import SqlAlchemyPreparedPlanRepository
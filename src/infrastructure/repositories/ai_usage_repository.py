@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from src.domain.models import AIUsageRecord, AIUsageTotal
+from src.domain.repositories import AIUsageRepository
+from src.infrastructure.orm_models import AIUsageORM
+
+GROUP_COLUMNS = {
+    "provider": AIUsageORM.provider,
+    "model": AIUsageORM.model,
+    "endpoint": AIUsageORM.endpoint,
+    "user": AIUsageORM.user_id,
+    "plan_type": AIUsageORM.plan_type,
+}
+
+# Calls that produced no usable plan, and calls whose latency is a full answer
+FAILED_OUTCOMES = ("error", "parse_error")
+ANSWERED_OUTCOMES = ("ok", "repaired")
+
+class SqlAlchemyAIUsageRepository(AIUsageRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save_many(self, records: List[AIUsageRecord]) -> None:
+        self.db.bulk_insert_mappings(AIUsageORM, [
+            {
+                "created_at": r.created_at,
+                "provider": r.provider,
+                "model": r.model,
+                "prompt_tokens": r.prompt_tokens,
+                "cached_tokens": r.cached_tokens,
+                "completion_tokens": r.completion_tokens,
+                "latency_ms": r.latency_ms,
+                "outcome": r.outcome,
+                "cache_hit": r.cache_hit,
+                "cost_usd": r.cost_usd,
+                "user_id": r.user_id,
+                "plan_type": r.plan_type,
+                "plan_id": r.plan_id,
+                "endpoint": r.endpoint,
+            }
+            for r in records
+        ])
+        self.db.commit()
+
+    def daily_totals(self, since: datetime, group_by: str = "provider") -> List[AIUsageTotal]:
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Invalid grouping: {group_by}")
+        key = GROUP_COLUMNS[group_by]
+        day = func.date(AIUsageORM.created_at)
+        rows = (
+            self.db.query(
+                day,
+                key,
+                func.count(AIUsageORM.id),
+                func.sum(case((AIUsageORM.outcome.in_(FAILED_OUTCOMES), 1), else_=0)),
+                func.sum(case((AIUsageORM.cache_hit, 1), else_=0)),
+                func.sum(AIUsageORM.prompt_tokens),
+                func.sum(AIUsageORM.cached_tokens),
+                func.sum(AIUsageORM.completion_tokens),
+                func.sum(AIUsageORM.cost_usd),
+            )
+            .filter(AIUsageORM.created_at >= since)
+            .group_by(day, key)
+            .order_by(day, key)
+            .all()
+        )
+        return [
+            AIUsageTotal(
+                day=str(row[0]),
+                key=row[1],
+                calls=row[2],
+                errors=int(row[3] or 0),
+                cache_hits=int(row[4] or 0),
+                prompt_tokens=int(row[5] or 0),
+                cached_tokens=int(row[6] or 0),
+                completion_tokens=int(row[7] or 0),
+                cost_usd=round(float(row[8] or 0), 6),
+            )
+            for row in rows
+        ]
+
+    def latencies(self, since: datetime, limit: int) -> List[Tuple[str, str, int]]:
+        rows = (
+            self.db.query(AIUsageORM.provider, AIUsageORM.model, AIUsageORM.latency_ms)
+            .filter(
+                AIUsageORM.created_at >= since,
+                AIUsageORM.cache_hit.is_(False),
+                AIUsageORM.outcome.in_(ANSWERED_OUTCOMES)
+            )
+            .order_by(AIUsageORM.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [(provider, model, latency) for provider, model, latency in rows]
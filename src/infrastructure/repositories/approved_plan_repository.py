@@ -0,0 +1,48 @@
+from typing import List
+from sqlalchemy.orm import Session
+from src.domain.models import ApprovedPlanSample, UserProfile, Goal, ActivityLevel
+from src.domain.repositories import ApprovedPlanRepository
+from src.infrastructure.orm_models import UserORM, WorkoutPlanORM, NutritionPlanORM
+
+# A plan stays a good example once a professional has signed it off
+APPROVED_STATES = ("approved", "active", "completed")
+
+class SqlAlchemyApprovedPlanRepository(ApprovedPlanRepository):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def list_approved(self, plan_type: str, limit: int) -> List[ApprovedPlanSample]:
+        if plan_type == "workout":
+            plan_orm, items_column, items_key = WorkoutPlanORM, WorkoutPlanORM.sessions_data, 'sessions'
+        else:
+            plan_orm, items_column, items_key = NutritionPlanORM, NutritionPlanORM.daily_plans_data, 'daily_plans'
+        
+        rows = (
+            self.db.query(plan_orm.id, items_column, UserORM.profile_data)
+            .join(UserORM, UserORM.id == plan_orm.user_id)
+            .filter(plan_orm.state.in_(APPROVED_STATES), UserORM.profile_data.isnot(None))
+            .order_by(plan_orm.modified_at.desc(), plan_orm.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            ApprovedPlanSample(
+                plan_id=plan_id,
+                plan_type=plan_type,
+                profile=self._to_profile(profile_data),
+                plan_data={items_key: items or []}
+            )
+            for plan_id, items, profile_data in rows
+        ]
+    
+    def _to_profile(self, data: dict) -> UserProfile:
+        return UserProfile(
+            age=data['age'],
+            weight=data['weight'],
+            height=data['height'],
+            gender=data['gender'],
+            goal=Goal(data['goal']),
+            activity_level=ActivityLevel(data['activity_level']),
+            dietary_restrictions=data.get('dietary_restrictions', []),
+            injuries=data.get('injuries', [])
+        )
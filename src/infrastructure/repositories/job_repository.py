@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from src.domain.models import GenerationJob, JobStatus
+from src.domain.repositories import GenerationJobRepository
+from src.infrastructure.orm_models import GenerationJobORM
+
+class SqlAlchemyGenerationJobRepository(GenerationJobRepository):
+    # How many times claim_next retries when another worker wins the race
+    CLAIM_ATTEMPTS = 5
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _to_domain(self, j: GenerationJobORM) -> GenerationJob:
+        return GenerationJob(
+            id=j.id,
+            user_id=j.user_id,
+            plan_type=j.plan_type,
+            requested_by=j.requested_by,
+            status=j.status,
+            priority=j.priority,
+            bypass_cache=bool(j.bypass_cache),
+            plan_id=j.plan_id,
+            error=j.error,
+            attempts=j.attempts,
+            created_at=j.created_at,
+            started_at=j.started_at,
+            finished_at=j.finished_at
+        )
+
+    def save(self, job: GenerationJob) -> None:
+        job_orm = GenerationJobORM(
+            id=job.id,
+            user_id=job.user_id,
+            plan_type=job.plan_type,
+            requested_by=job.requested_by,
+            status=job.status,
+            priority=job.priority,
+            bypass_cache=job.bypass_cache,
+            plan_id=job.plan_id,
+            error=job.error,
+            attempts=job.attempts,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at
+        )
+        self.db.add(job_orm)
+        self.db.commit()
+
+    def get_by_id(self, job_id: str) -> Optional[GenerationJob]:
+        j = self.db.query(GenerationJobORM).filter(GenerationJobORM.id == job_id).first()
+        if not j:
+            return None
+        return self._to_domain(j)
+
+    def update(self, job: GenerationJob) -> None:
+        self.db.query(GenerationJobORM).filter(GenerationJobORM.id == job.id).update({
+            "status": job.status,
+            "plan_id": job.plan_id,
+            "error": job.error,
+            "attempts": job.attempts,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at
+        })
+        self.db.commit()
+
+    def claim_next(self) -> Optional[GenerationJob]:
+        # Compare-and-set on status instead of row locks so the queue works on
+        # SQLite as well as PostgreSQL; losing the race just means trying again.
+        for _ in range(self.CLAIM_ATTEMPTS):
+            candidate = (
+                self.db.query(GenerationJobORM.id)
+                .filter(GenerationJobORM.status == JobStatus.QUEUED.value)
+                .order_by(GenerationJobORM.priority.desc(), GenerationJobORM.created_at.asc())
+                .first()
+            )
+            if not candidate:
+                return None
+
+            claimed = self.db.query(GenerationJobORM).filter(
+                GenerationJobORM.id == candidate.id,
+                GenerationJobORM.status == JobStatus.QUEUED.value
+            ).update({
+                "status": JobStatus.RUNNING.value,
+                "started_at": datetime.now(),
+                "attempts": GenerationJobORM.attempts + 1
+            }, synchronize_session=False)
+            self.db.commit()
+
+            if claimed:
+                return self.get_by_id(candidate.id)
+        return None
+
+    def requeue_stale(self, started_before: datetime, max_attempts: int) -> Tuple[int, int]:
+        stale = (
+            GenerationJobORM.status == JobStatus.RUNNING.value,
+            GenerationJobORM.started_at < started_before
+        )
+        failed = self.db.query(GenerationJobORM).filter(
+            *stale, GenerationJobORM.attempts >= max_attempts
+        ).update({
+            "status": JobStatus.FAILED.value,
+            "error": f"Worker stopped before finishing, {max_attempts} attempt(s) used",
+            "finished_at": datetime.now()
+        }, synchronize_session=False)
+        requeued = self.db.query(GenerationJobORM).filter(*stale).update({
+            "status": JobStatus.QUEUED.value,
+            "started_at": None
+        }, synchronize_session=False)
+        self.db.commit()
+        return requeued, failed
+
+    def cancel_queued(self, job_id: str) -> bool:
+        cancelled = self.db.query(GenerationJobORM).filter(
+            GenerationJobORM.id == job_id,
+            GenerationJobORM.status == JobStatus.QUEUED.value
+        ).update({
+            "status": JobStatus.CANCELLED.value,
+            "finished_at": datetime.now()
+        }, synchronize_session=False)
+        self.db.commit()
+        return cancelled > 0
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.domain.repositories import GenerationLeaseRepository
+from src.infrastructure.orm_models import GenerationLeaseORM
+
+class SqlAlchemyGenerationLeaseRepository(GenerationLeaseRepository):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        
+        # Fast path: nobody holds the lease, the primary key makes the insert atomic
+        try:
+            self.db.add(GenerationLeaseORM(key=key, owner=owner, expires_at=expires_at))
+            self.db.commit()
+            return True
+        except IntegrityError:
+            self.db.rollback()
+        
+        # Take over an expired lease left behind by a crashed worker
+        taken = self.db.query(GenerationLeaseORM).filter(
+            GenerationLeaseORM.key == key,
+            GenerationLeaseORM.expires_at < now
+        ).update({"owner": owner, "expires_at": expires_at}, synchronize_session=False)
+        self.db.commit()
+        return taken == 1
+    
+    def release(self, key: str, owner: str) -> None:
+        self.db.query(GenerationLeaseORM).filter(
+            GenerationLeaseORM.key == key,
+            GenerationLeaseORM.owner == owner
+        ).delete(synchronize_session=False)
+        self.db.commit()
+    
+    def is_held(self, key: str) -> bool:
+        lease = self.db.query(GenerationLeaseORM.expires_at).filter(GenerationLeaseORM.key == key).first()
+        self.db.commit()  # End the read so the next poll sees other workers' commits
+        return lease is not None and lease.expires_at > datetime.now()
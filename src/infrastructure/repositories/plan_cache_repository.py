@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from src.domain.models import CachedPlanData
+from src.domain.repositories import PlanCacheRepository
+from src.infrastructure.orm_models import PlanCacheORM
+
+class SqlAlchemyPlanCacheRepository(PlanCacheRepository):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get(self, key: str) -> Optional[CachedPlanData]:
+        entry = self.db.query(PlanCacheORM).filter(PlanCacheORM.key == key).first()
+        if not entry:
+            return None
+        return CachedPlanData(
+            key=entry.key,
+            plan_type=entry.plan_type,
+            plan_data=entry.plan_data,
+            created_at=entry.created_at
+        )
+    
+    def save(self, entry: CachedPlanData) -> None:
+        entry_orm = PlanCacheORM(
+            key=entry.key,
+            plan_type=entry.plan_type,
+            plan_data=entry.plan_data,
+            created_at=entry.created_at
+        )
+        self.db.merge(entry_orm)
+        self.db.commit()
@@ -0,0 +1,56 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from src.domain.models import PreparedPlan
+from src.domain.repositories import PreparedPlanRepository
+from src.infrastructure.orm_models import PreparedPlanORM
+
+class SqlAlchemyPreparedPlanRepository(PreparedPlanRepository):
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _key(user_id: str, plan_type: str) -> str:
+        return f"{plan_type}:{user_id}"
+
+    def _to_domain(self, p: PreparedPlanORM) -> PreparedPlan:
+        return PreparedPlan(
+            user_id=p.user_id,
+            plan_type=p.plan_type,
+            profile_key=p.profile_key,
+            job_id=p.job_id,
+            plan_data=p.plan_data,
+            created_at=p.created_at
+        )
+
+    def get(self, user_id: str, plan_type: str) -> Optional[PreparedPlan]:
+        p = self.db.query(PreparedPlanORM).filter(PreparedPlanORM.key == self._key(user_id, plan_type)).first()
+        if not p:
+            return None
+        return self._to_domain(p)
+
+    def get_by_job(self, job_id: str) -> Optional[PreparedPlan]:
+        p = self.db.query(PreparedPlanORM).filter(PreparedPlanORM.job_id == job_id).first()
+        if not p:
+            return None
+        return self._to_domain(p)
+
+    def save(self, prepared: PreparedPlan) -> None:
+        self.db.merge(PreparedPlanORM(
+            key=self._key(prepared.user_id, prepared.plan_type),
+            user_id=prepared.user_id,
+            plan_type=prepared.plan_type,
+            profile_key=prepared.profile_key,
+            job_id=prepared.job_id,
+            plan_data=prepared.plan_data,
+            created_at=prepared.created_at
+        ))
+        self.db.commit()
+
+    def delete(self, prepared: PreparedPlan) -> bool:
+        # Matching on the job too means two requests can't both take the same entry
+        deleted = self.db.query(PreparedPlanORM).filter(
+            PreparedPlanORM.key == self._key(prepared.user_id, prepared.plan_type),
+            PreparedPlanORM.job_id == prepared.job_id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted > 0
@@ -0,0 +1,36 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.domain.models import TokenBucket
+from src.domain.repositories import RateLimitRepository
+from src.infrastructure.orm_models import RateLimitBucketORM
+
+class SqlAlchemyRateLimitRepository(RateLimitRepository):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get(self, key: str) -> Optional[TokenBucket]:
+        row = self.db.query(RateLimitBucketORM).filter(RateLimitBucketORM.key == key).first()
+        self.db.commit()  # End the read so a retry sees other workers' commits
+        if not row:
+            return None
+        return TokenBucket(key=row.key, tokens=row.tokens, updated_at=row.updated_at)
+    
+    def compare_and_set(self, expected: Optional[TokenBucket], bucket: TokenBucket) -> bool:
+        if expected is None:
+            # The primary key makes the first insert atomic
+            try:
+                self.db.add(RateLimitBucketORM(key=bucket.key, tokens=bucket.tokens, updated_at=bucket.updated_at))
+                self.db.commit()
+                return True
+            except IntegrityError:
+                self.db.rollback()
+                return False
+        
+        updated = self.db.query(RateLimitBucketORM).filter(
+            RateLimitBucketORM.key == bucket.key,
+            RateLimitBucketORM.tokens == expected.tokens,
+            RateLimitBucketORM.updated_at == expected.updated_at
+        ).update({"tokens": bucket.tokens, "updated_at": bucket.updated_at}, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
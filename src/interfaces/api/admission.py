@@ -0,0 +1,56 @@
+"""Shed synchronous plan generations once the process is saturated"""
+
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Callable, Optional
+from fastapi import Depends, HTTPException
+from src.application.admission import AdmissionController, Overloaded
+from src.dependencies import get_admission_controller
+
+
+async def admit_generation(
+    background: bool = False,
+    admission: Optional[AdmissionController] = Depends(get_admission_controller)
+) -> AsyncIterator[None]:
+    """Dependency that holds a generation slot until the response is sent, or raises 503 with Retry-After
+
+    Queued (background=true) requests don't generate inline, so they are let through.
+
+    Example:
+        @router.post("/plans/workout", dependencies=[Depends(admit_generation)])
+    """
+    if admission is None or background:
+        yield
+        return
+    try:
+        started = await admission.acquire()
+    except Overloaded as e:
+        retry_after = max(1, math.ceil(e.retry_after_seconds))
+        raise HTTPException(
+            status_code=503,
+            detail=f"{e}. Try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
+    try:
+        yield
+    finally:
+        admission.release(started)
+
+
+def per_generation_admission(admission: Optional[AdmissionController]) -> Callable[[], AsyncContextManager]:
+    """Slot for PlanningService.generate_plans_for_clients: each client's
+    generation takes its own admission slot, so a bulk call counts for as
+    many generations as it runs at once. A shed generation fails that client
+    (Overloaded) instead of the whole roster."""
+    @asynccontextmanager
+    async def slot():
+        if admission is None:
+            yield
+            return
+        started = await admission.acquire()
+        try:
+            yield
+        finally:
+            admission.release(started)
+
+    return slot
@@ -0,0 +1,33 @@
+"""Stop generation work once the client that asked for it has gone away"""
+
+import asyncio
+from typing import Awaitable, TypeVar
+from fastapi import HTTPException, Request
+
+T = TypeVar('T')
+
+# How often a waiting request checks that its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+# nginx's status for a request the client closed; nobody receives the response
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[T], poll_seconds: float = DISCONNECT_POLL_SECONDS) -> T:
+    """Await the work, cancelling it (and the provider call inside it) if the client disconnects first
+
+    Example:
+        return await cancel_on_disconnect(request, service.generate_workout_plan_async(user.id))
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                print("Client disconnected, cancelling generation")
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
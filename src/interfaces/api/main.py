@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.staticfiles import StaticFiles
 from src.interfaces.api.routers import router as api_router
+from src.dependencies import get_ai_service, close_ai_service
+from src.interfaces.api.usage import ai_usage_endpoint
 
 from src.infrastructure.database import engine, Base
 import os
@@ -8,7 +11,19 @@ import os
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="AI Fitness Agent")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Provider clients and their connection pools live as long as the process
+    try:
+        get_ai_service()
+    except Exception as e:
+        print(f"AI provider setup failed, retrying on first request: {e}")
+    yield
+    await close_ai_service()
+
+
+app = FastAPI(title="AI Fitness Agent", lifespan=lifespan, dependencies=[Depends(ai_usage_endpoint)])
 
 # Mount static files
 static_dir = os.path.join(os.path.dirname(__file__), "../frontend")
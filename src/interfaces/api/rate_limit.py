@@ -0,0 +1,96 @@
+"""Per-user rate limiting of AI generation endpoints"""
+
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, Callable, Optional
+from fastapi import Depends, HTTPException
+from src.application.blocking import BlockingCalls
+from src.application.rate_limiter import RateLimiter, RateLimitDecision
+from src.dependencies import get_rate_limiter
+from src.domain.models import User
+from src.interfaces.api.auth import get_current_user
+
+# Retry-After for buckets that never refill
+MAX_RETRY_AFTER_SECONDS = 86400
+
+
+def enforce_quota(limiter: Optional[RateLimiter], user: User, cost: int = 1) -> None:
+    """Take cost generations from the user's budget or raise 429 with Retry-After.
+
+    A cost larger than the whole budget is refused with 413: waiting would not help.
+    """
+    if limiter is None:
+        return
+    decision = limiter.consume(user, cost)
+    if not decision.allowed and cost > decision.limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{cost} generations requested but your budget holds at most {decision.limit}. "
+                   f"Generate for fewer clients at a time.",
+            headers={"X-RateLimit-Limit": str(decision.limit)},
+        )
+    if not decision.allowed:
+        retry_after = int(math.ceil(min(decision.retry_after_seconds, MAX_RETRY_AFTER_SECONDS)))
+        raise HTTPException(
+            status_code=429,
+            detail=f"Generation limit reached. Try again in {retry_after} seconds.",
+            headers={
+                "Retry-After": str(max(1, retry_after)),
+                "X-RateLimit-Limit": str(decision.limit),
+                "X-RateLimit-Remaining": str(decision.remaining),
+            },
+        )
+
+
+def refund_quota(limiter: Optional[RateLimiter], user: User, cost: int = 1) -> None:
+    """Give back generations charged for a request rejected with 400"""
+    if limiter is not None:
+        limiter.refund(user, cost)
+
+
+def per_generation_quota(
+    limiter: Optional[RateLimiter], user: User, blocking_calls: BlockingCalls
+) -> Callable[[], AsyncContextManager]:
+    """Slot for PlanningService.generate_plans_for_clients: one generation is
+    charged as each client's starts and given back if it fails.
+
+    The budget may be stored in the request's DB session, so it is charged
+    through the planning service's blocking_calls, off the event loop.
+    """
+    @asynccontextmanager
+    async def slot():
+        if limiter is not None and not (await blocking_calls.run(limiter.consume, user)).allowed:
+            raise ValueError("Generation limit reached")
+        try:
+            yield
+        except Exception:
+            await blocking_calls.run(refund_quota, limiter, user)
+            raise
+
+    return slot
+
+
+def require_generation_quota(
+    user: User = Depends(get_current_user),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter)
+) -> User:
+    """Dependency that spends one generation from the current user's budget
+
+    Example:
+        @router.post("/plans/workout", dependencies=[Depends(require_generation_quota)])
+    """
+    enforce_quota(limiter, user)
+    return user
+
+
+def quota_usage(decision: RateLimitDecision) -> dict:
+    """Serialize a bucket state for the quota endpoint"""
+    if decision.limit == 0:
+        return {"limited": False}
+    return {
+        "limited": True,
+        "limit": decision.limit,
+        "remaining": decision.remaining,
+        "reset_after_seconds": round(min(decision.reset_after_seconds, MAX_RETRY_AFTER_SECONDS), 1),
+        "retry_after_seconds": round(min(decision.retry_after_seconds, MAX_RETRY_AFTER_SECONDS), 1),
+    }
@@ -8,7 +8,8 @@ from src.interfaces.api.routers import (
     nutritionist,
     versions,
     comments,
-    notifications
+    notifications,
+    jobs
 )
 
 router = APIRouter()
@@ -22,3 +23,4 @@ router.include_router(nutritionist.router, tags=["Nutritionist"])
 router.include_router(versions.router, tags=["Versions"])
 router.include_router(comments.router, tags=["Comments"])
 router.include_router(notifications.router, tags=["Notifications"])
+router.include_router(jobs.router, tags=["Jobs"])
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from src.dependencies import get_role_service
+from src.dependencies import get_role_service, get_plan_cache_stats, get_plan_cache_memory, get_latency_tracker, get_token_usage, get_tier_stats, get_circuit_breakers, get_similar_plan_index, get_usage_service, get_admission_controller
 from src.application.role_service import RoleService
+from src.application.usage_service import AIUsageService
 from src.domain.models import User
 from src.domain.permissions import Role
 from src.interfaces.api.auth import get_current_user, require_role
@@ -57,3 +58,68 @@ def remove_role_from_user(
         return service.remove_role(current_user.id, user_id, role)
     except (PermissionError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/admin/plan-cache/stats", dependencies=[Depends(require_role(Role.ADMIN))])
+def plan_cache_stats():
+    """Hit/miss counters for the plan-generation cache (admin only)"""
+    stats = get_plan_cache_stats().snapshot()
+    stats["memory_entries"] = len(get_plan_cache_memory())
+    return stats
+
+@router.get("/admin/plan-reuse/stats", dependencies=[Depends(require_role(Role.ADMIN))])
+def plan_reuse_stats():
+    """Size and hit rate of the approved-plan similarity index (admin only)"""
+    return get_similar_plan_index().snapshot()
+
+@router.get("/admin/ai/latency", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_latency_stats():
+    """Recent latency percentiles (seconds) per AI provider (admin only)"""
+    return get_latency_tracker().snapshot()
+
+@router.get("/admin/ai/tokens", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_token_usage():
+    """Token totals per AI provider, with the share of prompt tokens served from prompt cache (admin only)"""
+    return get_token_usage().snapshot()
+
+@router.get("/admin/ai/tiers", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_tier_stats():
+    """Calls, latency and small-to-large escalation rate per model tier (admin only)"""
+    return get_tier_stats().snapshot()
+
+@router.get("/admin/ai/admission", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_admission_stats():
+    """Generations in flight and queued, recent p95 duration, and how many were shed (admin only)"""
+    admission = get_admission_controller()
+    return admission.snapshot() if admission else {"enabled": False}
+
+@router.get("/admin/ai/usage/spend", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_spend(
+    days: int = 30,
+    group_by: str = "provider",
+    service: AIUsageService = Depends(get_usage_service)
+):
+    """Calls, tokens and cost per day from the usage ledger, grouped by provider, model, endpoint, user or plan_type (admin only)"""
+    try:
+        return service.spend(days, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/admin/ai/usage/latency", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_latency_percentiles(
+    days: int = 1,
+    service: AIUsageService = Depends(get_usage_service)
+):
+    """p50/p95 provider latency per model from the usage ledger (admin only)"""
+    try:
+        return service.latency(days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/admin/ai/providers", dependencies=[Depends(require_role(Role.ADMIN))])
+def ai_provider_health():
+    """Circuit breaker state and recent latency per AI provider (admin only)"""
+    latency = get_latency_tracker().snapshot()
+    return {
+        name: {**breaker, "latency": latency.get(name)}
+        for name, breaker in get_circuit_breakers().snapshot().items()
+    }
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.dependencies import get_job_service
+from src.application.job_service import JobService
+from src.domain.models import User
+from src.interfaces.api.auth import get_current_user
+
+router = APIRouter()
+
+# ============================================================================
+# BACKGROUND JOB ENDPOINTS
+# ============================================================================
+
+@router.get("/jobs/{job_id}")
+def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    service: JobService = Depends(get_job_service)
+):
+    """Get the status of a plan-generation job (queued, running, succeeded, failed)"""
+    job = service.get_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,41 +1,151 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from src.dependencies import (
     get_planning_service,
     get_workout_repository,
-    get_nutrition_repository
+    get_nutrition_repository,
+    get_job_service,
+    get_rate_limiter,
+    get_request_deadline
 )
 from src.application.planning_service import PlanningService
+from src.application.job_service import JobService
+from src.application.rate_limiter import RateLimiter
+from src.application.deadline import Deadline
 from src.domain.repositories import WorkoutPlanRepository, NutritionPlanRepository
-from src.domain.models import User
+from src.domain.models import User, WorkoutPlan, NutritionPlan
 from src.interfaces.api.auth import get_current_user
+from src.interfaces.api.rate_limit import require_generation_quota, refund_quota
+from src.interfaces.api.cancellation import cancel_on_disconnect
+from src.interfaces.api.admission import admit_generation
 
 router = APIRouter()
 
+
+def _sse_event(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+
+async def _sse_response(
+    stream: AsyncIterator, item_event: str, limiter: Optional[RateLimiter], user: User
+) -> StreamingResponse:
+    # Pull the first item before responding so validation errors
+    # (e.g. missing profile) still surface as a regular 400.
+    try:
+        first = await stream.__anext__()
+    except ValueError as e:
+        refund_quota(limiter, user)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        item = first
+        try:
+            while True:
+                if isinstance(item, (WorkoutPlan, NutritionPlan)):
+                    yield _sse_event("plan", item)
+                else:
+                    yield _sse_event(item_event, item)
+                item = await stream.__anext__()
+        except StopAsyncIteration:
+            pass
+        except ValueError as e:
+            yield _sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _enqueue(job_service: JobService, user_id: str, plan_type: str, bypass_cache: bool) -> JSONResponse:
+    job = job_service.enqueue(user_id, plan_type, requested_by=user_id, bypass_cache=bypass_cache)
+    return JSONResponse(status_code=202, content=jsonable_encoder(job))
+
 # ============================================================================
 # PLAN GENERATION ENDPOINTS
 # ============================================================================
 
-@router.post("/plans/workout")
-def generate_my_workout(
-    current_user: User = Depends(get_current_user),
-    service: PlanningService = Depends(get_planning_service)
+@router.post("/plans/workout", dependencies=[Depends(admit_generation)])
+async def generate_my_workout(
+    request: Request,
+    bypass_cache: bool = False,
+    background: bool = False,
+    current_user: User = Depends(require_generation_quota),
+    service: PlanningService = Depends(get_planning_service),
+    job_service: JobService = Depends(get_job_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    deadline: Optional[Deadline] = Depends(get_request_deadline)
 ):
-    """Generate workout plan for current user"""
+    """Generate workout plan for current user.
+    
+    With background=true the request is queued and a job is returned
+    immediately; poll GET /jobs/{job_id} for the resulting plan id.
+    Otherwise generation stops if the client disconnects.
+    """
+    if background:
+        return _enqueue(job_service, current_user.id, "workout", bypass_cache)
     try:
-        return service.generate_workout_plan(current_user.id)
+        return await cancel_on_disconnect(
+            request, service.generate_workout_plan_async(current_user.id, bypass_cache=bypass_cache, deadline=deadline)
+        )
     except ValueError as e:
+        refund_quota(limiter, current_user)
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/plans/nutrition")
-def generate_my_nutrition(
-    current_user: User = Depends(get_current_user),
-    service: PlanningService = Depends(get_planning_service)
+@router.post("/plans/nutrition", dependencies=[Depends(admit_generation)])
+async def generate_my_nutrition(
+    request: Request,
+    bypass_cache: bool = False,
+    background: bool = False,
+    current_user: User = Depends(require_generation_quota),
+    service: PlanningService = Depends(get_planning_service),
+    job_service: JobService = Depends(get_job_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    deadline: Optional[Deadline] = Depends(get_request_deadline)
 ):
+    """Generate nutrition plan for current user (background=true queues a job)"""
+    if background:
+        return _enqueue(job_service, current_user.id, "nutrition", bypass_cache)
     try:
-        return service.generate_nutrition_plan(current_user.id)
+        return await cancel_on_disconnect(
+            request, service.generate_nutrition_plan_async(current_user.id, bypass_cache=bypass_cache, deadline=deadline)
+        )
     except ValueError as e:
+        refund_quota(limiter, current_user)
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/plans/workout/stream", dependencies=[Depends(admit_generation)])
+async def stream_my_workout(
+    bypass_cache: bool = False,
+    current_user: User = Depends(require_generation_quota),
+    service: PlanningService = Depends(get_planning_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    deadline: Optional[Deadline] = Depends(get_request_deadline)
+):
+    """Generate workout plan for current user, streaming sessions as Server-Sent Events.
+    
+    Emits one `session` event per WorkoutSession as soon as it is complete,
+    then a `plan` event with the saved plan (or an `error` event).
+    """
+    stream = service.stream_workout_plan(current_user.id, bypass_cache=bypass_cache, deadline=deadline)
+    return await _sse_response(stream, item_event="session", limiter=limiter, user=current_user)
+
+@router.post("/plans/nutrition/stream", dependencies=[Depends(admit_generation)])
+async def stream_my_nutrition(
+    bypass_cache: bool = False,
+    current_user: User = Depends(require_generation_quota),
+    service: PlanningService = Depends(get_planning_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    deadline: Optional[Deadline] = Depends(get_request_deadline)
+):
+    """Generate nutrition plan for current user, streaming `day` events then a `plan` event"""
+    stream = service.stream_nutrition_plan(current_user.id, bypass_cache=bypass_cache, deadline=deadline)
+    return await _sse_response(stream, item_event="day", limiter=limiter, user=current_user)
+
 @router.get("/plans/workout/current")
 def get_my_current_workout_plan(
     current_user: User = Depends(get_current_user),
@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from datetime import datetime
+from typing import Optional
+from src.config import get_settings
 from src.dependencies import (
     get_role_service,
     get_planning_service,
+    get_rate_limiter,
     get_workout_repository,
     get_version_service,
-    get_notification_service
+    get_notification_service,
+    get_request_deadline,
+    get_admission_controller
 )
 from src.application.role_service import RoleService
 from src.application.planning_service import PlanningService
+from src.application.rate_limiter import RateLimiter
+from src.application.admission import AdmissionController
 from src.application.version_service import VersionService
 from src.application.notification_service import NotificationService
+from src.application.deadline import Deadline
 from src.domain.repositories import WorkoutPlanRepository
 from src.domain.models import User, WorkoutSession, Exercise, NotificationType
 from src.domain.permissions import Role
 from src.interfaces.api.auth import get_current_user, require_role
+from src.interfaces.api.rate_limit import enforce_quota, refund_quota, per_generation_quota
+from src.interfaces.api.cancellation import cancel_on_disconnect
+from src.interfaces.api.admission import admit_generation, per_generation_admission
 from src.interfaces.api.dto import WorkoutPlanUpdateRequest
 
 router = APIRouter()
@@ -43,12 +54,59 @@ def assign_myself_as_trainer(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/trainer/clients/{client_id}/workout-plan", dependencies=[Depends(require_role(Role.TRAINER))])
-def create_workout_plan_for_client(
+@router.post("/trainer/clients/workout-plans", dependencies=[Depends(require_role(Role.TRAINER))])
+async def create_workout_plans_for_all_clients(
+    request: Request,
+    max_concurrency: Optional[int] = None,
+    bypass_cache: bool = False,
+    current_user: User = Depends(get_current_user),
+    service: PlanningService = Depends(get_planning_service),
+    role_service: RoleService = Depends(get_role_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    admission: Optional[AdmissionController] = Depends(get_admission_controller)
+):
+    """Generate workout plans for every one of my clients concurrently.
+    
+    max_concurrency can lower, but never exceed, the configured cap.
+    Each client costs one generation from my budget, charged as it starts and
+    given back if it fails; clients beyond the budget fail with
+    "Generation limit reached". Each generation also goes through admission
+    control on its own, and a shed one fails only that client.
+    """
+    limit = get_settings().BULK_GENERATION_CONCURRENCY
+    if max_concurrency is not None:
+        limit = max(1, min(max_concurrency, limit))
+    
+    clients = role_service.get_my_clients(current_user.id)
+    results = await cancel_on_disconnect(request, service.generate_plans_for_clients(
+        clients,
+        plan_types=("workout",),
+        max_concurrency=limit,
+        bypass_cache=bypass_cache,
+        generation_slots=[
+            per_generation_admission(admission),
+            per_generation_quota(limiter, current_user, service.blocking_calls)
+        ]
+    ))
+    
+    succeeded = sum(1 for r in results if r.success)
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+@router.post("/trainer/clients/{client_id}/workout-plan", dependencies=[Depends(require_role(Role.TRAINER)), Depends(admit_generation)])
+async def create_workout_plan_for_client(
+    request: Request,
     client_id: str,
+    bypass_cache: bool = False,
     current_user: User = Depends(get_current_user),
     service: PlanningService = Depends(get_planning_service),
-    role_service: RoleService = Depends(get_role_service)
+    role_service: RoleService = Depends(get_role_service),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    deadline: Optional[Deadline] = Depends(get_request_deadline)
 ):
     """Create a workout plan for one of my clients"""
     # Verify client is assigned to this trainer
@@ -61,9 +119,13 @@ def create_workout_plan_for_client(
             detail="You can only create plans for your assigned clients"
         )
     
+    enforce_quota(limiter, current_user)
     try:
-        return service.generate_workout_plan(client_id)
+        return await cancel_on_disconnect(
+            request, service.generate_workout_plan_async(client_id, bypass_cache=bypass_cache, deadline=deadline)
+        )
     except ValueError as e:
+        refund_quota(limiter, current_user)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/trainer/workout-plans/{plan_id}", dependencies=[Depends(require_role(Role.TRAINER))])
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 from src.dependencies import (
     get_user_service,
     get_user_repository,
+    get_rate_limiter,
 )
 from src.application.user_service import UserService
+from src.application.rate_limiter import RateLimiter
 from src.domain.repositories import UserRepository
 from src.domain.models import User, UserProfile, Goal, ActivityLevel
 from src.interfaces.api.auth import get_current_user
+from src.interfaces.api.rate_limit import quota_usage
 from src.interfaces.api.dto import UserCreateRequest, UserProfileRequest
 
 router = APIRouter()
@@ -29,6 +33,16 @@ def get_my_profile(current_user: User = Depends(get_current_user)):
     """Get current user's profile"""
     return current_user
 
+@router.get("/users/me/quota")
+def get_my_generation_quota(
+    current_user: User = Depends(get_current_user),
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter)
+):
+    """How many plan generations I have left and when the budget refills"""
+    if limiter is None:
+        return {"limited": False}
+    return quota_usage(limiter.usage(current_user))
+
 @router.put("/users/me/profile")
 def update_my_profile(
     profile: UserProfileRequest, 
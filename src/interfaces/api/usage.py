@@ -0,0 +1,13 @@
+"""Attribute the AI calls made while serving a request to its endpoint"""
+
+from typing import AsyncIterator
+from fastapi import Request
+from src.application.usage_ledger import UsageContext, usage_scope
+
+
+async def ai_usage_endpoint(request: Request) -> AsyncIterator[None]:
+    """App-wide dependency: AI usage recorded during the request is tagged "METHOD /route/path" """
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    with usage_scope(UsageContext(endpoint=f"{request.method} {path}")):
+        yield
@@ -0,0 +1,126 @@
+"""
+Background worker that drains the generation_jobs queue.
+
+Run alongside the API:
+    python -m src.interfaces.worker.worker --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from src.config import get_settings
+from src.dependencies import (
+    get_ai_service, close_ai_service, get_plan_cache, get_generation_lease, get_plan_matcher, get_planning_service,
+    get_plan_pregenerator
+)
+from src.infrastructure.database import SessionLocal, Base, engine
+from src.infrastructure.repositories import (
+    SqlAlchemyUserRepository,
+    SqlAlchemyWorkoutPlanRepository,
+    SqlAlchemyNutritionPlanRepository,
+    SqlAlchemyPlanCacheRepository,
+    SqlAlchemyGenerationJobRepository,
+    SqlAlchemyGenerationLeaseRepository,
+    SqlAlchemyPreparedPlanRepository
+)
+from src.application.blocking import BlockingCalls
+from src.application.job_service import JobService
+from src.application.usage_ledger import UsageContext, usage_scope
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def process_one() -> bool:
+    """Run a single queued job in its own DB session
+
+    Returns:
+        True if a job was processed, False if the queue was empty
+    """
+    db = SessionLocal()
+    try:
+        job_repo = SqlAlchemyGenerationJobRepository(db)
+        pregenerator = get_plan_pregenerator(SqlAlchemyPreparedPlanRepository(db), job_repo)
+        blocking_calls = BlockingCalls()
+        planning_service = get_planning_service(
+            ai_service=get_ai_service(),
+            workout_repo=SqlAlchemyWorkoutPlanRepository(db),
+            nutrition_repo=SqlAlchemyNutritionPlanRepository(db),
+            user_repo=SqlAlchemyUserRepository(db),
+            plan_cache=get_plan_cache(SqlAlchemyPlanCacheRepository(db)),
+            generation_lease=get_generation_lease(SqlAlchemyGenerationLeaseRepository(db), blocking_calls),
+            plan_matcher=get_plan_matcher(),
+            pregenerator=pregenerator,
+            blocking_calls=blocking_calls
+        )
+        with usage_scope(UsageContext(endpoint="worker")):
+            job = JobService(job_repo, pregenerator).process_next(planning_service)
+        if job:
+            logger.info(f"Job {job.id} ({job.plan_type} for {job.user_id}) finished: {job.status}")
+        return job is not None
+    finally:
+        db.close()
+
+
+def requeue_stale_jobs() -> None:
+    db = SessionLocal()
+    try:
+        settings = get_settings()
+        requeued, failed = JobService(SqlAlchemyGenerationJobRepository(db)).requeue_stale(
+            settings.JOB_STALE_AFTER_SECONDS, settings.JOB_MAX_ATTEMPTS
+        )
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale job(s)")
+        if failed:
+            logger.error(f"Failed {failed} stale job(s) after {settings.JOB_MAX_ATTEMPTS} attempt(s)")
+    finally:
+        db.close()
+
+
+def worker_loop(stop_event: threading.Event, poll_interval: float) -> None:
+    while not stop_event.is_set():
+        try:
+            if process_one():
+                continue
+        except Exception:
+            logger.exception("Unexpected error while processing job")
+        stop_event.wait(poll_interval)
+
+
+def run_worker(concurrency: int, poll_interval: float) -> None:
+    Base.metadata.create_all(bind=engine)
+    requeue_stale_jobs()
+
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=worker_loop, args=(stop_event, poll_interval), name=f"job-worker-{i}", daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    logger.info(f"Worker running with concurrency={concurrency}")
+    try:
+        stale_check_interval = get_settings().JOB_STALE_AFTER_SECONDS
+        while True:
+            time.sleep(stale_check_interval)
+            requeue_stale_jobs()
+    except KeyboardInterrupt:
+        logger.info("Shutting down worker...")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        asyncio.run(close_ai_service())
+
+
+if __name__ == '__main__':
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Plan generation worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL_SECONDS)
+    args = parser.parse_args()
+    run_worker(args.concurrency, args.poll_interval)
@@ -0,0 +1,169 @@
+"""
+Unit tests for admission control of plan generations.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from src.application.admission import AdmissionController, Overloaded
+from src.application.interfaces import AsyncAIService
+from src.application.planning_service import PlanningService
+from src.dependencies import get_admission_controller
+from src.domain.models import User
+from src.interfaces.api.admission import admit_generation, per_generation_admission
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdmissionController:
+    """Tests for the concurrency and latency limits"""
+
+    def test_rejects_beyond_in_flight_limit_without_queue(self):
+        # Arrange
+        admission = AdmissionController(max_in_flight=2, max_queue=0)
+
+        async def run():
+            await admission.acquire()
+            await admission.acquire()
+            await admission.acquire()
+
+        # Act / Assert
+        with pytest.raises(Overloaded):
+            asyncio.run(run())
+        assert admission.snapshot()["in_flight"] == 2
+        assert admission.rejected == 1
+
+    def test_queued_generation_gets_the_released_slot(self):
+        # Arrange
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_seconds=5)
+
+        async def run():
+            started = await admission.acquire()
+            waiter = asyncio.ensure_future(admission.acquire())
+            await asyncio.sleep(0.01)
+            queued = admission.snapshot()["queued"]
+            admission.release(started)
+            await waiter
+            return queued
+
+        # Act
+        queued = asyncio.run(run())
+
+        # Assert
+        assert queued == 1
+        assert admission.snapshot()["in_flight"] == 1
+        assert admission.snapshot()["queued"] == 0
+
+    def test_queue_wait_times_out(self):
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_seconds=0.01)
+
+        async def run():
+            await admission.acquire()
+            await admission.acquire()
+
+        with pytest.raises(Overloaded):
+            asyncio.run(run())
+        assert admission.snapshot()["queued"] == 0
+
+    def test_slow_generations_shed_load_until_they_age_out(self):
+        # Arrange
+        clock = FakeClock()
+        admission = AdmissionController(
+            max_in_flight=10, max_latency_seconds=20, latency_window_seconds=300, clock=clock
+        )
+
+        async def generate(seconds):
+            started = await admission.acquire()
+            clock.now += seconds
+            admission.release(started)
+
+        async def run():
+            for _ in range(AdmissionController.MIN_LATENCY_SAMPLES):
+                await generate(30)
+            with pytest.raises(Overloaded):
+                await admission.acquire()
+            clock.now += 301
+            await admission.acquire()
+
+        # Act / Assert
+        asyncio.run(run())
+        assert admission.rejected == 1
+
+
+class TestAdmissionDependency:
+    """Tests for the 503 response on generation endpoints"""
+
+    def make_client(self, admission):
+        app = FastAPI()
+
+        @app.post("/generate", dependencies=[Depends(admit_generation)])
+        async def generate():
+            return {"ok": True}
+
+        @app.get("/current")
+        async def current():
+            return {"ok": True}
+
+        app.dependency_overrides[get_admission_controller] = lambda: admission
+        return TestClient(app)
+
+    def test_saturated_generation_returns_503_with_retry_after(self):
+        # Arrange
+        admission = AdmissionController(max_in_flight=0, retry_after_seconds=7)
+        client = self.make_client(admission)
+
+        # Act
+        response = client.post("/generate")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+        assert client.get("/current").status_code == 200
+
+    def test_slot_is_released_after_the_response(self):
+        admission = AdmissionController(max_in_flight=1)
+        client = self.make_client(admission)
+
+        assert client.post("/generate").status_code == 200
+        assert client.post("/generate").status_code == 200
+        assert admission.snapshot()["in_flight"] == 0
+
+    def test_queued_background_requests_are_not_shed(self):
+        client = self.make_client(AdmissionController(max_in_flight=0))
+
+        assert client.post("/generate?background=true").status_code == 200
+
+
+class TestBulkAdmission:
+    """Tests for admitting each generation of a bulk call"""
+
+    def test_each_client_takes_its_own_slot(self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user):
+        # Arrange
+        admission = AdmissionController(max_in_flight=1, max_queue=0)
+        clients = [User(id=f"client-{i}", username=f"c{i}", profile=sample_user.profile) for i in range(3)]
+        mock_user_repo.get_by_id.side_effect = lambda user_id: next(c for c in clients if c.id == user_id)
+
+        async def generate(profile):
+            await asyncio.sleep(0.05)
+            return {"sessions": []}
+
+        ai_service = Mock(spec=AsyncAIService)
+        ai_service.generate_workout_plan_async = AsyncMock(side_effect=generate)
+        service = PlanningService(ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+
+        # Act
+        results = asyncio.run(service.generate_plans_for_clients(
+            clients, max_concurrency=3, generation_slots=[per_generation_admission(admission)]
+        ))
+
+        # Assert: only one generation fits, the others are shed individually
+        assert [r.success for r in results] == [True, False, False]
+        assert results[1].error == "Too many generations in progress"
+        assert admission.snapshot()["in_flight"] == 0
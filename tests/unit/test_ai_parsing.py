@@ -0,0 +1,160 @@
+"""
+Unit tests for AI response parsing helpers.
+"""
+import json
+import pytest
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.parsing import IncrementalArrayParser, TolerantJSONParser, parse_json_tolerant
+
+
+def feed_in_chunks(parser, text, size):
+    """Feed text in fixed-size chunks, returning (chunk_index, items) for each emission"""
+    emitted = []
+    for i in range(0, len(text), size):
+        items = parser.feed(text[i:i + size])
+        if items:
+            emitted.append((i, items))
+    return emitted
+
+
+class TestIncrementalArrayParser:
+    """Tests for streaming extraction of array elements"""
+
+    def test_emits_each_element_as_soon_as_it_closes(self):
+        """Test elements are returned before the document is complete"""
+        text = json.dumps({"sessions": [{"day": "Monday"}, {"day": "Tuesday"}]})
+        parser = IncrementalArrayParser("sessions")
+
+        first_end = text.index("}") + 1
+        assert parser.feed(text[:first_end]) == [{"day": "Monday"}]
+        assert parser.feed(text[first_end:]) == [{"day": "Tuesday"}]
+        assert parser.array_closed
+
+    def test_handles_fences_prose_and_tricky_strings(self):
+        """Test brackets inside strings and surrounding markdown don't confuse the parser"""
+        payload = {
+            "title": "Plan [v1] {draft}",
+            "sessions": [
+                {"day": "Monday", "focus": "Push \"}\" day", "exercises": [{"name": "Dips", "sets": 3}]},
+                {"day": "Tuesday", "focus": "Pull", "exercises": []}
+            ],
+            "notes": [{"day": "ignored"}]
+        }
+        text = "Here is your plan:\n```json\n" + json.dumps(payload, indent=2) + "\n```"
+        parser = IncrementalArrayParser("sessions")
+
+        emitted = feed_in_chunks(parser, text, 5)
+        items = [item for _, batch in emitted for item in batch]
+
+        assert items == payload["sessions"]
+        assert len(emitted) == 2
+
+    def test_ignores_nested_arrays_with_same_key(self):
+        """Test only the top-level array is streamed"""
+        text = json.dumps({"meta": {"sessions": [{"x": 1}]}, "sessions": [{"day": "Monday"}]})
+        parser = IncrementalArrayParser("sessions")
+
+        assert parser.feed(text) == [{"day": "Monday"}]
+
+    def test_incomplete_element_is_held_back(self):
+        """Test a truncated element is never emitted"""
+        parser = IncrementalArrayParser("daily_plans")
+
+        assert parser.feed('{"daily_plans": [{"day": "Monday", "meals": []}, {"day": "Tues') == [
+            {"day": "Monday", "meals": []}
+        ]
+        assert parser.in_element
+        assert not parser.array_closed
+
+
+WEEK = {
+    "sessions": [
+        {"day": "Monday", "focus": "Legs", "exercises": [{"name": "Squat", "sets": 3}]},
+        {"day": "Tuesday", "focus": "Push", "exercises": [{"name": "Bench", "sets": 3}]},
+        {"day": "Wednesday", "focus": "Pull", "exercises": [{"name": "Row", "sets": 3}]},
+    ]
+}
+
+
+class TestTolerantJSONParser:
+    """Tests for repairing and salvaging malformed model output"""
+
+    def test_valid_json_is_unchanged(self):
+        """Test well-formed input parses with no repairs"""
+        result = parse_json_tolerant(json.dumps(WEEK), "sessions")
+
+        assert result.data == WEEK
+        assert result.repairs == {}
+        assert not result.truncated
+        assert result.items_salvaged == 3
+
+    def test_repairs_common_defects(self):
+        """Test prose, fences, trailing/missing commas and Python literals are fixed"""
+        # Arrange
+        text = (
+            'Sure! Here is your plan:\n```json\n'
+            '{"sessions": [{"day": "Monday", "rest": True,}, {"day": "Tuesday"} {"day": "Wednesday"},],'
+            ' "notes": "line one\nline two"}\n```\nEnjoy!'
+        )
+
+        # Act
+        result = parse_json_tolerant(text, "sessions")
+
+        # Assert
+        assert [s["day"] for s in result.data["sessions"]] == ["Monday", "Tuesday", "Wednesday"]
+        assert result.data["sessions"][0]["rest"] is True
+        assert result.data["notes"] == "line one\nline two"
+        assert result.repairs["trailing comma"] == 2
+        assert result.repairs["missing comma"] == 1
+        assert result.dropped == ["text after the JSON object"]
+
+    def test_truncated_payload_keeps_complete_items(self):
+        """Test a response cut mid-session keeps the finished sessions and reports the partial one"""
+        # Arrange
+        text = json.dumps(WEEK, indent=2)
+        cut = text.index('"Wednesday"') + 20
+
+        # Act
+        result = parse_json_tolerant(text[:cut], "sessions")
+
+        # Assert
+        assert result.truncated
+        assert result.data == {"sessions": WEEK["sessions"][:2]}
+        assert result.items_salvaged == 2
+        assert result.dropped == ["incomplete sessions element #3"]
+
+    def test_feeding_chunks_matches_single_pass(self):
+        """Test the parser gives the same result when fed as a stream"""
+        text = json.dumps(WEEK)[:-30]
+        parser = TolerantJSONParser("sessions")
+
+        for i in range(0, len(text), 7):
+            parser.feed(text[i:i + 7])
+
+        assert parser.finish().data == parse_json_tolerant(text, "sessions").data
+
+    def test_no_json_raises(self):
+        """Test text without any object is still an error"""
+        with pytest.raises(ValueError):
+            parse_json_tolerant("I cannot help with that.")
+
+
+class TestParseJsonResponse:
+    """Tests for the provider-side parse step"""
+
+    class Service(BaseAIService):
+        def _call_ai_api(self, prompt, system_message=""):
+            return ""
+
+    def test_truncated_plan_is_flagged_not_cacheable(self):
+        """Test salvaged plans carry a report and stay out of the cache"""
+        text = json.dumps(WEEK)
+        data = self.Service()._parse_json_response(text[:text.index('"Wednesday"')], items_key="sessions")
+
+        assert len(data["sessions"]) == 2
+        assert data["cacheable"] is False
+        assert data["parse_report"]["dropped"] == ["incomplete sessions element #3"]
+
+    def test_valid_response_takes_fast_path(self):
+        """Test valid JSON is returned as-is"""
+        assert self.Service()._parse_json_response("```json\n" + json.dumps(WEEK) + "\n```") == WEEK
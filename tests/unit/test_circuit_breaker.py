@@ -0,0 +1,219 @@
+"""
+Unit tests for provider circuit breakers and latency-aware routing.
+"""
+import asyncio
+import random
+import time
+import pytest
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CLOSED, OPEN, HALF_OPEN
+from src.infrastructure.ai.hedged import HedgedAIService
+from src.infrastructure.ai.metrics import LatencyTracker
+from src.infrastructure.ai.provider_router import ProviderRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProvider(BaseAIService):
+    def __init__(self, name, response='{"ok": true}', error=None, delay=0.0):
+        self.name = name
+        self.response = response
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    def _call_ai_api(self, prompt, system_message=""):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.response
+
+
+def make_breaker(clock=None, **options):
+    defaults = dict(window=4, min_calls=4, failure_rate_threshold=0.5, open_seconds=10, slow_call_seconds=5)
+    defaults.update(options)
+    return CircuitBreaker("gemini", clock=clock or FakeClock(), **defaults)
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions"""
+
+    def test_opens_when_failure_rate_crosses_threshold(self):
+        """Test the breaker opens once enough calls failed"""
+        # Arrange
+        breaker = make_breaker()
+
+        # Act
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+        assert breaker.state == CLOSED
+        breaker.record_failure(0.1)
+
+        # Assert
+        assert breaker.state == OPEN
+        assert breaker.allow_request() is False
+
+    def test_opens_on_slow_calls(self):
+        """Test consistently slow successes also open the breaker"""
+        breaker = make_breaker(slow_call_rate_threshold=0.75)
+
+        for _ in range(4):
+            breaker.record_success(6.0)
+
+        assert breaker.state == OPEN
+
+    def test_half_open_allows_one_trial(self):
+        """Test after the open period a single trial call is let through"""
+        # Arrange
+        clock = FakeClock()
+        breaker = make_breaker(clock=clock, min_calls=1)
+        breaker.record_failure()
+
+        # Act
+        clock.now = 11
+
+        # Assert
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+    def test_trial_success_closes_and_failure_reopens(self):
+        """Test the trial outcome decides the next state"""
+        clock = FakeClock()
+        breaker = make_breaker(clock=clock, min_calls=1)
+        breaker.record_failure()
+        clock.now = 11
+        breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+        clock.now = 22
+        breaker.allow_request()
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()["times_opened"] == 2
+
+    def test_release_frees_trial_slot(self):
+        """Test an abandoned trial call doesn't wedge the breaker half-open"""
+        clock = FakeClock()
+        breaker = make_breaker(clock=clock, min_calls=1)
+        breaker.record_failure()
+        clock.now = 11
+        breaker.allow_request()
+
+        breaker.release()
+
+        assert breaker.allow_request() is True
+
+
+class TestProviderRouter:
+    """Tests for failover and latency-weighted routing"""
+
+    def test_fails_over_to_next_provider(self):
+        """Test a provider error is retried on the next provider"""
+        # Arrange
+        gemini = FakeProvider("gemini", error=ValueError("down"))
+        openai = FakeProvider("openai", response='{"from": "openai"}')
+        router = ProviderRouter([gemini, openai], CircuitBreakerRegistry(), LatencyTracker(), latency_weighted=False)
+
+        # Act
+        result = router._call_ai_api("prompt")
+
+        # Assert
+        assert result == '{"from": "openai"}'
+        assert gemini.calls == 1
+
+    def test_open_circuit_is_skipped_without_calling(self):
+        """Test an open provider costs no call at all"""
+        breakers = CircuitBreakerRegistry(min_calls=1)
+        breakers.get("gemini").record_failure()
+        gemini = FakeProvider("gemini")
+        openai = FakeProvider("openai")
+        router = ProviderRouter([gemini, openai], breakers, LatencyTracker(), latency_weighted=False)
+
+        router._call_ai_api("prompt")
+
+        assert gemini.calls == 0
+        assert openai.calls == 1
+
+    def test_all_open_fails_fast(self):
+        """Test the router raises immediately when every circuit is open"""
+        breakers = CircuitBreakerRegistry(min_calls=1)
+        breakers.get("gemini").record_failure()
+        router = ProviderRouter([FakeProvider("gemini", delay=5)], breakers, LatencyTracker())
+
+        start = time.monotonic()
+        with pytest.raises(ValueError):
+            router._call_ai_api("prompt")
+
+        assert time.monotonic() - start < 0.1
+
+    def test_weighted_routing_prefers_fastest(self):
+        """Test most first choices go to the provider with the lower median latency"""
+        # Arrange
+        latency = LatencyTracker()
+        for _ in range(10):
+            latency.record("gemini", 4.0)
+            latency.record("openai", 1.0)
+        router = ProviderRouter(
+            [FakeProvider("gemini"), FakeProvider("openai")],
+            CircuitBreakerRegistry(), latency, rng=random.Random(7)
+        )
+
+        # Act
+        firsts = [router.route()[0].name for _ in range(200)]
+
+        # Assert
+        assert firsts.count("openai") > 140
+        assert firsts.count("gemini") > 0
+
+    def test_errors_open_the_circuit(self):
+        """Test repeated failures trip the provider's breaker"""
+        breakers = CircuitBreakerRegistry(min_calls=2)
+        gemini = FakeProvider("gemini", error=ValueError("down"))
+        router = ProviderRouter([gemini, FakeProvider("openai")], breakers, LatencyTracker(), latency_weighted=False)
+
+        router._call_ai_api("prompt")
+        router._call_ai_api("prompt")
+        router._call_ai_api("prompt")
+
+        assert breakers.get("gemini").state == OPEN
+        assert gemini.calls == 2
+
+    def test_async_fails_over(self):
+        """Test the async path fails over too"""
+        router = ProviderRouter(
+            [FakeProvider("gemini", response="not json"), FakeProvider("openai", response='{"sessions": []}')],
+            CircuitBreakerRegistry(), LatencyTracker(), latency_weighted=False
+        )
+
+        assert asyncio.run(router._call_ai_api_async("prompt")) == '{"sessions": []}'
+
+
+class TestHedgedWithBreakers:
+    """Tests for hedging that respects open circuits"""
+
+    def test_open_primary_goes_straight_to_secondary(self):
+        """Test the hedge delay isn't waited out for a provider known to be down"""
+        breakers = CircuitBreakerRegistry(min_calls=1)
+        breakers.get("gemini").record_failure()
+        gemini = FakeProvider("gemini")
+        service = HedgedAIService(
+            gemini, FakeProvider("openai", response='{"from": "openai"}'),
+            LatencyTracker(), hedge_delay_seconds=5, adaptive=False, breakers=breakers
+        )
+
+        start = time.monotonic()
+        result = service._call_ai_api("prompt")
+
+        assert result == '{"from": "openai"}'
+        assert gemini.calls == 0
+        assert time.monotonic() - start < 1
@@ -0,0 +1,95 @@
+"""
+Unit tests for the compact short-key generation format.
+"""
+import asyncio
+import json
+from src.application.plan_schema import PLAN_VALIDATORS
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.compact import (
+    COMPACT_WORKOUT_SYSTEM_MESSAGE, compact_plan_data, expand_plan_data
+)
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+class CannedAIService(BaseAIService):
+    """Answers every call with a fixed response, recording the system messages"""
+
+    def __init__(self, response):
+        self.response = response
+        self.system_messages = []
+
+    def _call_ai_api(self, prompt, system_message=""):
+        self.system_messages.append(system_message)
+        return self.response
+
+
+class TestExpansion:
+    """Tests for expanding compact responses"""
+
+    def test_round_trip_restores_the_full_plan(self):
+        # Arrange
+        rules = RuleBasedAIService()
+        nutrition = rules.generate_nutrition_plan(make_profile())
+
+        # Act
+        expanded = expand_plan_data("nutrition", compact_plan_data("nutrition", nutrition))
+
+        # Assert
+        assert expanded == {"daily_plans": nutrition["daily_plans"]}
+
+    def test_exercise_descriptions_come_from_the_catalog(self):
+        workout = RuleBasedAIService().generate_workout_plan(make_profile())
+
+        expanded = expand_plan_data("workout", compact_plan_data("workout", workout))
+
+        assert expanded["sessions"] == workout["sessions"]
+        assert PLAN_VALIDATORS["workout"](expanded)
+
+    def test_full_format_response_is_left_alone(self):
+        data = {"sessions": [{"day": "Monday", "exercises": []}]}
+
+        assert expand_plan_data("workout", data) is data
+
+    def test_compact_is_smaller(self):
+        nutrition = RuleBasedAIService().generate_nutrition_plan(make_profile())
+
+        compact = json.dumps(compact_plan_data("nutrition", nutrition))
+
+        assert len(compact) < 0.85 * len(json.dumps({"daily_plans": nutrition["daily_plans"]}))
+
+
+class TestCompactGeneration:
+    """Tests for compact mode in BaseAIService"""
+
+    def test_compact_mode_asks_for_and_expands_short_keys(self):
+        # Arrange
+        response = '{"w": [{"d": "Monday", "f": "Legs", "x": [{"n": "Goblet Squat", "s": 3, "r": "10", "t": "60s"}]}]}'
+        service = CannedAIService(response)
+        service.compact_output = True
+
+        # Act
+        plan = service.generate_workout_plan(make_profile())
+
+        # Assert
+        assert service.system_messages == [COMPACT_WORKOUT_SYSTEM_MESSAGE]
+        exercise = plan["sessions"][0]["exercises"][0]
+        assert exercise["rest_time"] == "60s"
+        assert exercise["description"].startswith("Hold a dumbbell")
+
+    def test_streamed_items_are_expanded(self):
+        service = CannedAIService('{"n": [{"d": "Monday", "m": [{"n": "Lunch", "k": 600}]}]}')
+        service.compact_output = True
+
+        async def collect():
+            return [day async for day in service.stream_nutrition_days(make_profile())]
+
+        assert asyncio.run(collect()) == [{"day": "Monday", "meals": [{"name": "Lunch", "calories": 600}]}]
@@ -0,0 +1,154 @@
+"""
+Unit tests for request deadlines and cancellation of AI work.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import HTTPException
+from src.application.deadline import Deadline, DeadlineExceeded, call_timeout, deadline_scope, current_deadline
+from src.application.planning_service import PlanningService
+from src.application.single_flight import SingleFlight
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.fallback import FallbackAIService
+from src.infrastructure.ai.gemini import GeminiAIService
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+from src.interfaces.api.cancellation import cancel_on_disconnect, CLIENT_CLOSED_REQUEST
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+class SlowAIService(RuleBasedAIService):
+    """Rule-based plans after a delay, like a provider that hangs"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.cancelled = False
+
+    async def generate_workout_plan_async(self, profile):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.generate_workout_plan(profile)
+
+
+class TestDeadline:
+    """Tests for the deadline and the per-call timeout"""
+
+    def test_call_timeout_is_shortened_to_the_deadline(self):
+        # Arrange
+        deadline = Deadline(5)
+
+        # Act
+        with deadline_scope(deadline):
+            timeout = call_timeout(60)
+
+        # Assert
+        assert 4 < timeout <= 5
+        assert call_timeout(60) == 60
+        assert current_deadline() is None
+
+    def test_expired_deadline_refuses_new_calls(self):
+        with deadline_scope(Deadline(0)):
+            with pytest.raises(DeadlineExceeded):
+                call_timeout(60)
+
+    def test_provider_request_timeout_follows_the_deadline(self):
+        service = GeminiAIService("test-key", timeout_seconds=60)
+        service.model = Mock()
+        service.model.generate_content.return_value.text = "{}"
+
+        with deadline_scope(Deadline(2)):
+            service._call_ai_api("prompt")
+
+        assert service.model.generate_content.call_args.kwargs["request_options"]["timeout"] <= 2
+
+
+class TestBudgetFallback:
+    """Tests for the overall budget switching to the fallback"""
+
+    def test_spent_budget_goes_straight_to_fallback(self):
+        # Arrange
+        primary = Mock()
+        service = FallbackAIService(primary, RuleBasedAIService(), timeout_seconds=30)
+
+        # Act
+        with deadline_scope(Deadline(0)):
+            plan = service.generate_workout_plan(make_profile())
+
+        # Assert
+        primary.generate_workout_plan.assert_not_called()
+        assert plan["sessions"]
+
+    def test_budget_cuts_a_hung_provider_short(
+        self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        slow = SlowAIService(delay=5)
+        ai_service = FallbackAIService(slow, RuleBasedAIService(), timeout_seconds=30)
+        service = PlanningService(
+            ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, request_budget_seconds=0.1
+        )
+
+        # Act
+        started = time.monotonic()
+        plan = asyncio.run(service.generate_workout_plan_async(sample_user.id))
+
+        # Assert
+        assert time.monotonic() - started < 2
+        assert plan.sessions
+        assert slow.cancelled
+
+
+class TestCancellation:
+    """Tests for stopping work nobody is waiting for"""
+
+    def test_client_disconnect_cancels_the_generation(self):
+        # Arrange
+        request = Mock()
+        request.is_disconnected = AsyncMock(side_effect=[False, True])
+        slow = SlowAIService(delay=5)
+
+        async def run():
+            try:
+                await cancel_on_disconnect(request, slow.generate_workout_plan_async(make_profile()), poll_seconds=0.01)
+            finally:
+                await asyncio.sleep(0)
+
+        # Act
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(run())
+
+        # Assert
+        assert error.value.status_code == CLIENT_CLOSED_REQUEST
+        assert slow.cancelled
+
+    def test_waiters_take_over_when_the_leader_is_cancelled(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "plan"
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do_async("key", generate))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(flight.do_async("key", generate))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        assert asyncio.run(run()) == "plan"
+        assert len(calls) == 2
@@ -0,0 +1,279 @@
+"""
+Unit tests for hedged provider requests and latency tracking.
+"""
+import asyncio
+import time
+import pytest
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.circuit_breaker import CircuitBreakerRegistry
+from src.infrastructure.ai.hedged import HedgedAIService
+from src.infrastructure.ai.metrics import LatencyTracker
+
+
+class FakeProvider(BaseAIService):
+    """Provider answering after a fixed delay"""
+
+    def __init__(self, name, delay=0.0, response='{"sessions": []}', error=None):
+        self.name = name
+        self.delay = delay
+        self.response = response
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    def _call_ai_api(self, prompt, system_message=""):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.response
+
+    async def _call_ai_api_async(self, prompt, system_message=""):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return self.response
+
+    async def _stream_ai_api(self, prompt, system_message=""):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        for chunk in (self.response[:5], self.response[5:]):
+            yield chunk
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+def make_service(primary, secondary, delay=0.05, tracker=None):
+    return HedgedAIService(primary, secondary, tracker or LatencyTracker(), hedge_delay_seconds=delay, adaptive=False)
+
+
+class TestHedgedSync:
+    """Tests for the blocking hedged call"""
+
+    def test_fast_primary_is_not_hedged(self):
+        """Test the secondary is never called when the primary answers in time"""
+        # Arrange
+        primary = FakeProvider("gemini", response='{"a": 1}')
+        secondary = FakeProvider("openai")
+        service = make_service(primary, secondary, delay=1)
+
+        # Act
+        result = service._call_ai_api("prompt")
+
+        # Assert
+        assert result == '{"a": 1}'
+        assert secondary.calls == 0
+
+    def test_slow_primary_is_hedged(self):
+        """Test the secondary answers when the primary is slower than the delay"""
+        primary = FakeProvider("gemini", delay=1, response='{"from": "primary"}')
+        secondary = FakeProvider("openai", response='{"from": "secondary"}')
+        service = make_service(primary, secondary, delay=0.05)
+
+        start = time.monotonic()
+        result = service._call_ai_api("prompt")
+
+        assert result == '{"from": "secondary"}'
+        assert time.monotonic() - start < 0.5
+
+    def test_invalid_json_is_not_a_winner(self):
+        """Test a malformed answer triggers the secondary immediately"""
+        primary = FakeProvider("gemini", response="not json")
+        secondary = FakeProvider("openai", response='{"ok": true}')
+        service = make_service(primary, secondary, delay=5)
+
+        result = service._call_ai_api("prompt")
+
+        assert result == '{"ok": true}'
+
+    def test_truncated_json_is_not_a_winner(self):
+        """Test an answer that had to be cut back counts as a failure, not a win"""
+        tracker = LatencyTracker()
+        primary = FakeProvider("gemini", response='{"sessions": [{"day": "Monday"}, {"day": "Tues')
+        secondary = FakeProvider("openai", response='{"sessions": []}')
+        service = make_service(primary, secondary, delay=5, tracker=tracker)
+
+        result = service._call_ai_api("prompt")
+
+        assert result == '{"sessions": []}'
+        assert tracker.snapshot()["gemini"]["errors"] == 1
+
+    def test_raises_when_both_fail(self):
+        """Test the last provider error is raised when nobody answers"""
+        primary = FakeProvider("gemini", error=ValueError("primary down"))
+        secondary = FakeProvider("openai", error=ValueError("secondary down"))
+        service = make_service(primary, secondary)
+
+        with pytest.raises(ValueError):
+            service._call_ai_api("prompt")
+
+
+class TestHedgedAsync:
+    """Tests for the non-blocking hedged call"""
+
+    def test_loser_is_cancelled(self):
+        """Test the slow primary is cancelled once the secondary wins"""
+        # Arrange
+        primary = FakeProvider("gemini", delay=1, response='{"from": "primary"}')
+        secondary = FakeProvider("openai", response='{"from": "secondary"}')
+        service = make_service(primary, secondary)
+
+        # Act
+        plan = asyncio.run(service.generate_workout_plan_async(make_profile()))
+
+        # Assert
+        assert plan == {"from": "secondary"}
+        assert primary.cancelled
+
+    def test_stream_hedges_on_first_chunk(self):
+        """Test streaming switches to the provider that produces output first"""
+        primary = FakeProvider("gemini", delay=1, response='{"from": "primary"}')
+        secondary = FakeProvider("openai", response='{"from": "secondary"}')
+        service = make_service(primary, secondary)
+
+        async def collect():
+            return "".join([c async for c in service._stream_ai_api("prompt")])
+
+        assert asyncio.run(collect()) == '{"from": "secondary"}'
+
+    def test_stream_records_latency_and_breaker_outcomes(self):
+        """Test the winning stream and the cancelled loser are both recorded"""
+        # Arrange
+        tracker = LatencyTracker()
+        breakers = CircuitBreakerRegistry()
+        primary = FakeProvider("gemini", delay=1, response='{"from": "primary"}')
+        secondary = FakeProvider("openai", response='{"from": "secondary"}')
+        service = HedgedAIService(
+            primary, secondary, tracker, hedge_delay_seconds=0.05, adaptive=False, breakers=breakers
+        )
+
+        async def collect():
+            return "".join([c async for c in service._stream_ai_api("prompt")])
+
+        # Act
+        asyncio.run(collect())
+        stats = tracker.snapshot()
+
+        # Assert
+        assert stats["openai"]["calls"] == 1
+        assert stats["openai"]["errors"] == 0
+        assert stats["gemini"]["cancelled"] == 1
+        assert breakers.get("openai").snapshot()["window_calls"] == 1
+
+    def test_failed_stream_is_recorded(self):
+        """Test a provider whose stream fails before its first chunk counts as an error"""
+        tracker = LatencyTracker()
+        service = make_service(FakeProvider("gemini", error=ValueError("down")), FakeProvider("openai"), tracker=tracker)
+
+        async def collect():
+            return "".join([c async for c in service._stream_ai_api("prompt")])
+
+        assert asyncio.run(collect()) == '{"sessions": []}'
+        assert tracker.snapshot()["gemini"]["errors"] == 1
+
+
+class TestAdaptiveDelay:
+    """Tests for the percentile-driven hedge delay"""
+
+    def test_uses_default_until_enough_samples(self):
+        """Test the configured delay is used without history"""
+        tracker = LatencyTracker()
+        service = HedgedAIService(FakeProvider("gemini"), FakeProvider("openai"), tracker, hedge_delay_seconds=2.0, min_samples=5)
+
+        assert service.hedge_delay() == 2.0
+
+    def test_follows_primary_percentile(self):
+        """Test the delay tracks the primary's observed p95"""
+        # Arrange
+        tracker = LatencyTracker()
+        for seconds in [1.0] * 19 + [4.0]:
+            tracker.record("gemini", seconds)
+        tracker.record("openai", 9.0)
+        service = HedgedAIService(FakeProvider("gemini"), FakeProvider("openai"), tracker, hedge_percentile=95, min_samples=5)
+
+        # Act
+        delay = service.hedge_delay()
+
+        # Assert
+        assert delay == 1.0
+
+    def test_delay_is_stable_when_primaries_are_cancelled(self):
+        """Test hedged-away slow primaries still count, so the delay does not drift down"""
+        # Arrange
+        tracker = LatencyTracker()
+        primary = FakeProvider("gemini")
+        service = HedgedAIService(
+            primary, FakeProvider("openai", delay=0.01), tracker,
+            hedge_delay_seconds=0.05, min_samples=4, min_delay_seconds=0.001
+        )
+
+        async def run():
+            for i in range(12):
+                # Every other call is slow and loses to the hedge
+                primary.delay = 0.3 if i % 2 else 0.001
+                await service._call_ai_api_async("prompt")
+
+        # Act
+        asyncio.run(run())
+
+        # Assert
+        assert tracker.snapshot()["gemini"]["cancelled"] == 6
+        assert service.hedge_delay() >= 0.05
+
+    def test_calls_are_recorded(self):
+        """Test each provider call lands in the tracker"""
+        tracker = LatencyTracker()
+        service = make_service(FakeProvider("gemini", error=ValueError("down")), FakeProvider("openai"), tracker=tracker)
+
+        service._call_ai_api("prompt")
+        stats = tracker.snapshot()
+
+        assert stats["gemini"]["errors"] == 1
+        assert stats["openai"]["calls"] == 1
+        assert stats["openai"]["p50"] is not None
+
+
+class TestLatencyTracker:
+    """Tests for the rolling latency window"""
+
+    def test_percentiles_ignore_failures(self):
+        tracker = LatencyTracker()
+        for seconds in [0.1, 0.2, 0.3, 0.4]:
+            tracker.record("gemini", seconds)
+        tracker.record("gemini", 30.0, success=False)
+
+        assert tracker.percentile("gemini", 50) == 0.2
+        assert tracker.percentile("gemini", 100) == 0.4
+        assert tracker.error_rate("gemini") == 0.2
+
+    def test_cancelled_calls_are_latency_lower_bounds(self):
+        tracker = LatencyTracker()
+        tracker.record("gemini", 0.1)
+        tracker.record_cancelled("gemini", 5.0)
+
+        assert tracker.percentile("gemini", 100) == 5.0
+        assert tracker.count("gemini") == 2
+        assert tracker.error_rate("gemini") == 0.0
+
+    def test_window_drops_old_samples(self):
+        tracker = LatencyTracker(window=3)
+        for seconds in [10.0, 1.0, 1.0, 1.0]:
+            tracker.record("gemini", seconds)
+
+        assert tracker.percentile("gemini", 100) == 1.0
+        assert tracker.percentile("unknown", 50) is None
+
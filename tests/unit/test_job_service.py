@@ -0,0 +1,121 @@
+"""
+Unit tests for JobService using mocks.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from src.application.job_service import JobService
+from src.domain.models import GenerationJob, JobStatus
+
+
+def make_job(**overrides):
+    fields = dict(
+        id="job_123",
+        user_id="user_123",
+        plan_type="workout",
+        requested_by="user_123",
+        status=JobStatus.RUNNING.value
+    )
+    fields.update(overrides)
+    return GenerationJob(**fields)
+
+
+class TestJobServiceEnqueue:
+    """Tests for queueing jobs"""
+
+    def test_enqueue_workout_job(self):
+        """Test a queued job is saved with queued status"""
+        mock_repo = Mock()
+        service = JobService(mock_repo)
+
+        job = service.enqueue("user_123", "workout", requested_by="trainer_1", bypass_cache=True)
+
+        assert job.status == JobStatus.QUEUED.value
+        assert job.user_id == "user_123"
+        assert job.requested_by == "trainer_1"
+        assert job.bypass_cache is True
+        mock_repo.save.assert_called_once_with(job)
+
+    def test_enqueue_invalid_plan_type(self):
+        """Test unknown plan types are rejected"""
+        mock_repo = Mock()
+        service = JobService(mock_repo)
+
+        with pytest.raises(ValueError, match="Invalid plan type"):
+            service.enqueue("user_123", "cardio", requested_by="user_123")
+
+        mock_repo.save.assert_not_called()
+
+
+class TestJobServiceVisibility:
+    """Tests for job lookup"""
+
+    def test_owner_and_requester_can_see_job(self):
+        """Test both the plan owner and the requester can poll the job"""
+        mock_repo = Mock()
+        mock_repo.get_by_id.return_value = make_job(requested_by="trainer_1")
+        service = JobService(mock_repo)
+
+        assert service.get_job("job_123", "user_123") is not None
+        assert service.get_job("job_123", "trainer_1") is not None
+        assert service.get_job("job_123", "someone_else") is None
+
+
+class TestJobServiceProcessing:
+    """Tests for running claimed jobs"""
+
+    def test_process_next_empty_queue(self):
+        """Test nothing happens when no job is queued"""
+        mock_repo = Mock()
+        mock_repo.claim_next.return_value = None
+        planning_service = Mock()
+        service = JobService(mock_repo)
+
+        assert service.process_next(planning_service) is None
+        planning_service.generate_workout_plan.assert_not_called()
+
+    def test_process_next_success(self, sample_workout_plan):
+        """Test a successful job records the generated plan id"""
+        mock_repo = Mock()
+        mock_repo.claim_next.return_value = make_job()
+        planning_service = Mock()
+        planning_service.generate_workout_plan.return_value = sample_workout_plan
+        service = JobService(mock_repo)
+
+        job = service.process_next(planning_service)
+
+        assert job.status == JobStatus.SUCCEEDED.value
+        assert job.plan_id == sample_workout_plan.id
+        assert job.finished_at is not None
+        planning_service.generate_workout_plan.assert_called_once_with("user_123", bypass_cache=False)
+        mock_repo.update.assert_called_once_with(job)
+
+    def test_process_next_failure(self):
+        """Test a failing generation marks the job failed with the error"""
+        mock_repo = Mock()
+        mock_repo.claim_next.return_value = make_job(plan_type="nutrition")
+        planning_service = Mock()
+        planning_service.generate_nutrition_plan.side_effect = ValueError("AI service down")
+        service = JobService(mock_repo)
+
+        job = service.process_next(planning_service)
+
+        assert job.status == JobStatus.FAILED.value
+        assert job.error == "AI service down"
+        assert job.plan_id is None
+        mock_repo.update.assert_called_once_with(job)
+
+
+class TestJobServiceStaleJobs:
+    """Tests for recovering jobs whose worker died"""
+
+    def test_requeue_stale_passes_the_attempt_limit(self):
+        """Test stale jobs are requeued up to the attempt limit and failed past it"""
+        mock_repo = Mock()
+        mock_repo.requeue_stale.return_value = (2, 1)
+        service = JobService(mock_repo)
+
+        assert service.requeue_stale(600, max_attempts=3) == (2, 1)
+        started_before, max_attempts = mock_repo.requeue_stale.call_args.args
+        assert max_attempts == 3
+        assert started_before < datetime.now() - timedelta(seconds=599)
@@ -0,0 +1,111 @@
+"""
+Unit tests for the small/large model tier cascade.
+"""
+import asyncio
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+from src.infrastructure.ai.tiered import TieredAIService, TierStats, profile_complexity, SMALL, LARGE
+
+
+def make_profile(**overrides):
+    fields = dict(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MAINTENANCE, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+class CountingAIService(RuleBasedAIService):
+    """Returns the rule-based plan, or a fixed malformed answer, and counts calls"""
+
+    def __init__(self, malformed=None):
+        super().__init__()
+        self.malformed = malformed
+        self.calls = 0
+
+    def generate_workout_plan(self, profile):
+        self.calls += 1
+        return self.malformed if self.malformed is not None else super().generate_workout_plan(profile)
+
+    async def generate_workout_plan_async(self, profile):
+        return self.generate_workout_plan(profile)
+
+
+class TestProfileComplexity:
+    """Tests for complexity scoring"""
+
+    def test_healthy_maintenance_adult_scores_zero(self):
+        assert profile_complexity("workout", make_profile()) == 0
+
+    def test_constraints_age_and_bmi_add_up(self):
+        # Arrange
+        profile = make_profile(age=70, weight=120.0, goal=Goal.WEIGHT_LOSS, injuries=["knee", "back"])
+
+        # Act
+        score = profile_complexity("workout", profile)
+
+        # Assert
+        assert score == 2 + 1 + 1 + 0.5
+
+    def test_only_the_plan_types_constraints_count(self):
+        profile = make_profile(injuries=["knee"], dietary_restrictions=["vegan"])
+
+        assert profile_complexity("workout", profile) == 1
+        assert profile_complexity("nutrition", profile) == 1
+        assert profile_complexity("nutrition", make_profile(injuries=["knee"])) == 0
+
+
+class TestTieredAIService:
+    """Tests for routing and escalation"""
+
+    def test_simple_profile_uses_the_small_model(self):
+        # Arrange
+        small, large, stats = CountingAIService(), CountingAIService(), TierStats()
+        service = TieredAIService(small, large, stats)
+
+        # Act
+        plan = service.generate_workout_plan(make_profile())
+
+        # Assert
+        assert plan["sessions"]
+        assert (small.calls, large.calls) == (1, 0)
+        assert stats.snapshot()["tiers"][SMALL]["routed"] == 1
+
+    def test_complex_profile_goes_straight_to_the_large_model(self):
+        small, large = CountingAIService(), CountingAIService()
+        service = TieredAIService(small, large, TierStats())
+
+        service.generate_workout_plan(make_profile(injuries=["knee", "shoulder"]))
+
+        assert (small.calls, large.calls) == (0, 1)
+
+    def test_answer_failing_the_schema_escalates(self):
+        # Arrange
+        small = CountingAIService(malformed={"sessions": [{"day": "Monday", "exercises": [{"name": "Squat"}]}]})
+        large, stats = CountingAIService(), TierStats()
+        service = TieredAIService(small, large, stats)
+
+        # Act
+        plan = asyncio.run(service.generate_workout_plan_async(make_profile()))
+
+        # Assert
+        assert plan["sessions"][0]["exercises"][0]["sets"]
+        assert (small.calls, large.calls) == (1, 1)
+        snapshot = stats.snapshot()
+        assert snapshot["escalations"] == 1
+        assert snapshot["escalation_rate"] == 1.0
+        assert snapshot["tiers"][SMALL]["latency"]["errors"] == 1
+        assert snapshot["tiers"][LARGE]["latency"]["calls"] == 1
+
+    def test_small_model_error_escalates(self):
+        class FailingAIService(CountingAIService):
+            def generate_workout_plan(self, profile):
+                raise ValueError("timeout")
+
+        large = CountingAIService()
+        service = TieredAIService(FailingAIService(), large, TierStats())
+
+        assert service.generate_workout_plan(make_profile())["sessions"]
+        assert large.calls == 1
@@ -0,0 +1,258 @@
+"""
+Unit tests for the plan-generation cache.
+"""
+import asyncio
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+from src.application.plan_cache import PlanCache, PlanCacheStats, TTLLRUCache, profile_fingerprint
+from src.application.planning_service import PlanningService
+from src.domain.models import UserProfile, Goal, ActivityLevel, CachedPlanData
+
+
+WORKOUT_DATA = {
+    "sessions": [
+        {"day": "Monday", "focus": "Chest", "exercises": [{"name": "Bench Press", "sets": 3, "reps": "10"}]}
+    ]
+}
+
+
+def make_profile(**overrides):
+    fields = dict(
+        age=30,
+        weight=80.0,
+        height=180.0,
+        gender="Male",
+        goal=Goal.MUSCLE_GAIN,
+        activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[],
+        injuries=[]
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProfileFingerprint:
+    """Tests for profile normalization"""
+
+    def test_fingerprint_ignores_case_order_and_whitespace(self):
+        """Test equivalent free-text fields produce the same fingerprint"""
+        a = make_profile(gender="Male", injuries=["Knee", " lower back"])
+        b = make_profile(gender=" male", injuries=["Lower Back", "knee"])
+
+        assert profile_fingerprint(a, "workout") == profile_fingerprint(b, "workout")
+
+    def test_fingerprint_ignores_fields_not_in_prompt(self):
+        """Test weight/height don't split workout entries, nor unrelated lists either type"""
+        a = make_profile(weight=70.0, dietary_restrictions=["vegan"])
+        b = make_profile(weight=95.0, dietary_restrictions=[])
+
+        assert profile_fingerprint(a, "workout") == profile_fingerprint(b, "workout")
+        assert profile_fingerprint(a, "nutrition") != profile_fingerprint(b, "nutrition")
+
+    def test_nutrition_fingerprint_follows_calorie_targets(self):
+        """Test weight and height split nutrition entries, whose targets depend on them"""
+        a = make_profile(weight=70.0)
+        b = make_profile(weight=95.0)
+        c = make_profile(height=170.0)
+
+        assert profile_fingerprint(a, "workout") == profile_fingerprint(b, "workout")
+        assert profile_fingerprint(a, "nutrition") != profile_fingerprint(b, "nutrition")
+        assert profile_fingerprint(make_profile(), "nutrition") != profile_fingerprint(c, "nutrition")
+
+    def test_fingerprint_changes_with_goal(self):
+        """Test a different goal yields a different fingerprint"""
+        a = make_profile(goal=Goal.MUSCLE_GAIN)
+        b = make_profile(goal=Goal.WEIGHT_LOSS)
+
+        assert profile_fingerprint(a, "workout") != profile_fingerprint(b, "workout")
+
+
+class TestTTLLRUCache:
+    """Tests for the in-process cache tier"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted first"""
+        cache = TTLLRUCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has passed"""
+        clock = FakeClock()
+        cache = TTLLRUCache(max_entries=10, ttl_seconds=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 29
+        assert cache.get("a") == 1
+        clock.now = 31
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestPlanCache:
+    """Tests for the two-tier plan cache"""
+
+    def test_memory_hit_after_put(self):
+        """Test a stored plan is served from memory and counted as a hit"""
+        stats = PlanCacheStats()
+        cache = PlanCache(TTLLRUCache(10, 60), stats)
+        profile = make_profile()
+
+        assert cache.get("workout", profile) is None
+        cache.put("workout", profile, WORKOUT_DATA)
+        result = cache.get("workout", profile)
+
+        assert result == WORKOUT_DATA
+        assert result is not WORKOUT_DATA
+        assert stats.snapshot()["memory_hits"] == 1
+        assert stats.snapshot()["misses"] == 1
+
+    def test_persistent_hit_promotes_to_memory(self):
+        """Test a persistent-tier hit is copied into the memory tier"""
+        profile = make_profile()
+        repo = Mock()
+        repo.get.return_value = CachedPlanData(
+            key=PlanCache.make_key("workout", profile),
+            plan_type="workout",
+            plan_data=WORKOUT_DATA,
+            created_at=datetime.now()
+        )
+        memory = TTLLRUCache(10, 60)
+        stats = PlanCacheStats()
+        cache = PlanCache(memory, stats, repo)
+
+        assert cache.get("workout", profile) == WORKOUT_DATA
+        assert cache.get("workout", profile) == WORKOUT_DATA
+
+        repo.get.assert_called_once()
+        assert stats.snapshot()["persistent_hits"] == 1
+        assert stats.snapshot()["memory_hits"] == 1
+
+    def test_expired_persistent_entry_is_a_miss(self):
+        """Test persistent entries older than the TTL are ignored"""
+        profile = make_profile()
+        repo = Mock()
+        repo.get.return_value = CachedPlanData(
+            key=PlanCache.make_key("workout", profile),
+            plan_type="workout",
+            plan_data=WORKOUT_DATA,
+            created_at=datetime.now() - timedelta(seconds=120)
+        )
+        cache = PlanCache(TTLLRUCache(10, 60), PlanCacheStats(), repo)
+
+        assert cache.get("workout", profile) is None
+
+
+class TestPlanningServiceCaching:
+    """Tests for cache integration in PlanningService"""
+
+    def make_service(self, mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, stats):
+        cache = PlanCache(TTLLRUCache(10, 60), stats)
+        return PlanningService(
+            mock_ai_service,
+            mock_workout_repo,
+            mock_nutrition_repo,
+            mock_user_repo,
+            plan_cache=cache
+        )
+
+    def test_identical_profile_skips_ai_call(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test the second generation for the same profile is served from cache"""
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_workout_plan.return_value = WORKOUT_DATA
+        service = self.make_service(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, PlanCacheStats())
+
+        first = service.generate_workout_plan("user_123")
+        second = service.generate_workout_plan("user_123")
+
+        assert first.id != second.id
+        assert second.sessions[0].focus == "Chest"
+        mock_ai_service.generate_workout_plan.assert_called_once()
+        assert mock_workout_repo.save.call_count == 2
+
+    def test_bypass_flag_forces_ai_call(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test bypass_cache always calls the provider and is counted"""
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_workout_plan.return_value = WORKOUT_DATA
+        stats = PlanCacheStats()
+        service = self.make_service(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, stats)
+
+        service.generate_workout_plan("user_123")
+        service.generate_workout_plan("user_123", bypass_cache=True)
+
+        assert mock_ai_service.generate_workout_plan.call_count == 2
+        assert stats.snapshot()["bypasses"] == 1
+
+    def test_empty_plan_is_not_cached(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test empty AI output is never reused"""
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_nutrition_plan.return_value = {"daily_plans": []}
+        service = self.make_service(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, PlanCacheStats())
+
+        service.generate_nutrition_plan("user_123")
+        service.generate_nutrition_plan("user_123")
+
+        assert mock_ai_service.generate_nutrition_plan.call_count == 2
+
+    def test_stream_caches_only_fresh_provider_output(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test a streamed cache hit is served without being written back to the cache"""
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_workout_plan.return_value = WORKOUT_DATA
+        service = self.make_service(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, PlanCacheStats())
+        service.plan_cache.put = Mock(wraps=service.plan_cache.put)
+
+        async def stream():
+            return [item async for item in service.stream_workout_plan("user_123")]
+
+        # Act
+        asyncio.run(stream())
+        items = asyncio.run(stream())
+
+        # Assert
+        assert items[-1].sessions[0].focus == "Chest"
+        mock_ai_service.generate_workout_plan.assert_called_once()
+        service.plan_cache.put.assert_called_once()
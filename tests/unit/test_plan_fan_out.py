@@ -0,0 +1,157 @@
+"""
+Unit tests for generating a week as parallel per-day calls.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.application.plan_repair import assemble_days
+from src.application.planning_service import PlanningService
+from src.domain.models import User, UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+class SlowRuleBasedAIService(RuleBasedAIService):
+    """Rule-based plans with a fixed delay per call, recording the day groups asked for"""
+
+    def __init__(self, delay=0.1, failing_days=()):
+        self.delay = delay
+        self.failing_days = set(failing_days)
+        self.groups = []
+        self.lock = threading.Lock()
+
+    def _check(self, days):
+        with self.lock:
+            self.groups.append(list(days))
+        if self.failing_days & set(days):
+            raise ValueError("provider failed")
+
+    def generate_workout_sessions(self, profile, outline, days):
+        time.sleep(self.delay)
+        self._check(days)
+        return super().generate_workout_sessions(profile, outline, days)
+
+    def generate_nutrition_days(self, profile, outline, days):
+        time.sleep(self.delay)
+        self._check(days)
+        return super().generate_nutrition_days(profile, outline, days)
+
+    async def generate_nutrition_days_async(self, profile, outline, days):
+        await asyncio.sleep(self.delay)
+        self._check(days)
+        return super().generate_nutrition_days(profile, outline, days)
+
+
+class PromptOnlyAIService(BaseAIService):
+    def _call_ai_api(self, prompt, system_message=""):
+        raise ValueError("not used")
+
+
+def make_service(ai_service, fan_out_days=1):
+    user_repo = Mock()
+    user_repo.get_by_id.return_value = User(id="user-1", username="u", profile=make_profile())
+    return PlanningService(ai_service, Mock(), Mock(), user_repo, fan_out_days=fan_out_days)
+
+
+class TestFanOutGeneration:
+    """Tests for per-day fan-out in PlanningService"""
+
+    def test_days_are_generated_concurrently(self):
+        """Test seven one-day calls take about as long as one"""
+        # Arrange
+        ai_service = SlowRuleBasedAIService(delay=0.2)
+        service = make_service(ai_service)
+
+        # Act
+        started = time.monotonic()
+        plan = asyncio.run(service.generate_nutrition_plan_async("user-1"))
+        elapsed = time.monotonic() - started
+
+        # Assert
+        assert sorted(ai_service.groups) == sorted([day] for day in WEEK)
+        assert [d.day for d in plan.daily_plans] == WEEK
+        assert elapsed < 0.2 * 3
+
+    def test_sync_groups_follow_the_outline(self):
+        """Test group size and session order come from the shared outline"""
+        # Arrange
+        ai_service = SlowRuleBasedAIService(delay=0)
+        outline_days = [d['day'] for d in ai_service.outline_workout_week(make_profile())]
+
+        # Act
+        plan = make_service(ai_service, fan_out_days=2).generate_workout_plan("user-1")
+
+        # Assert
+        assert sorted(ai_service.groups) == sorted(outline_days[i:i + 2] for i in range(0, len(outline_days), 2))
+        assert [s.day for s in plan.sessions] == outline_days
+
+    def test_failed_group_is_repaired(self):
+        """Test a group that fails is regenerated through the repair path"""
+        ai_service = SlowRuleBasedAIService(delay=0, failing_days=["Wednesday"])
+        ai_service.complete_nutrition_days = Mock(
+            side_effect=lambda profile, accepted, days: RuleBasedAIService().complete_nutrition_days(profile, accepted, days)
+        )
+
+        plan = make_service(ai_service).generate_nutrition_plan("user-1")
+
+        assert ai_service.complete_nutrition_days.call_args[0][2] == ["Wednesday"]
+        assert [d.day for d in plan.daily_plans] == WEEK
+
+    def test_every_group_failing_raises(self):
+        ai_service = SlowRuleBasedAIService(delay=0, failing_days=WEEK)
+
+        with pytest.raises(ValueError):
+            asyncio.run(make_service(ai_service).generate_nutrition_plan_async("user-1"))
+
+    def test_disabled_by_default(self):
+        ai_service = SlowRuleBasedAIService(delay=0)
+
+        make_service(ai_service, fan_out_days=0).generate_nutrition_plan("user-1")
+
+        assert ai_service.groups == []
+
+
+class TestFanOutPrompts:
+    """Tests for the shared outline and per-group prompts"""
+
+    def test_workout_prompt_carries_the_whole_split(self):
+        # Arrange
+        service = PromptOnlyAIService()
+        outline = service.outline_workout_week(make_profile())
+
+        # Act
+        prompt = service._build_workout_days_prompt(make_profile(), outline, [outline[1]['day']])
+
+        # Assert
+        for planned in outline:
+            assert f"{planned['day']}: {planned['focus']}" in prompt
+        assert f"sessions for: {outline[1]['day']}." in prompt
+
+    def test_nutrition_prompt_lists_targets_for_requested_days(self):
+        service = PromptOnlyAIService()
+        outline = service.outline_nutrition_week(make_profile())
+
+        prompt = service._build_nutrition_days_prompt(make_profile(), outline, ["Friday"])
+
+        assert f"Friday: {outline[4]['calories']} kcal" in prompt
+        assert "Monday:" not in prompt
+
+    def test_assemble_days_orders_and_marks_gaps(self):
+        items = [{"day": "Tuesday", "meals": []}, {"day": "Monday", "meals": []}, {"day": "Sunday"}]
+
+        plan_data = assemble_days("nutrition", ["Monday", "Tuesday", "Wednesday"], items)
+
+        assert [d["day"] for d in plan_data["daily_plans"]] == ["Monday", "Tuesday", "Wednesday"]
+        assert plan_data["daily_plans"][2] == {"day": "Wednesday"}
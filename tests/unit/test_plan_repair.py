@@ -0,0 +1,222 @@
+"""
+Unit tests for regenerating only the missing or invalid days of a plan.
+"""
+import asyncio
+from unittest.mock import Mock
+from src.application.interfaces import AIService, AsyncAIService, PlanRepairAIService
+from src.application.plan_repair import find_plan_gaps, merge_repaired_items
+from src.application.planning_service import PlanningService
+from src.domain.models import User, UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.fallback import FallbackAIService
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+def session(day, exercises=("Squat",)):
+    return {"day": day, "focus": "Full body", "exercises": [{"name": name, "sets": 3, "reps": "10"} for name in exercises]}
+
+
+def nutrition_day(day):
+    return {"day": day, "meals": [{"name": "Oats", "calories": 400}]}
+
+
+class RepairingAIService(AIService, AsyncAIService, PlanRepairAIService):
+    """AI service whose repair calls are recorded and answered with valid days"""
+
+    def __init__(self, workout_plan=None, nutrition_plan=None):
+        self.workout_plan = workout_plan
+        self.nutrition_plan = nutrition_plan
+        self.repair_calls = []
+
+    def generate_workout_plan(self, profile):
+        return self.workout_plan
+
+    def generate_nutrition_plan(self, profile):
+        return self.nutrition_plan
+
+    async def generate_workout_plan_async(self, profile):
+        return self.workout_plan
+
+    async def generate_nutrition_plan_async(self, profile):
+        return self.nutrition_plan
+
+    def complete_workout_sessions(self, profile, accepted, days):
+        self.repair_calls.append(("workout", [s["day"] for s in accepted], list(days)))
+        return [session(day, ("Lunge",)) for day in (days or ["Friday"])]
+
+    def complete_nutrition_days(self, profile, accepted, days):
+        self.repair_calls.append(("nutrition", [d["day"] for d in accepted], list(days)))
+        return [nutrition_day(day) for day in days]
+
+    async def complete_workout_sessions_async(self, profile, accepted, days):
+        return self.complete_workout_sessions(profile, accepted, days)
+
+    async def complete_nutrition_days_async(self, profile, accepted, days):
+        return self.complete_nutrition_days(profile, accepted, days)
+
+
+class PromptOnlyAIService(BaseAIService):
+    def _call_ai_api(self, prompt, system_message=""):
+        raise ValueError("not used")
+
+
+def make_service(ai_service):
+    user_repo = Mock()
+    user_repo.get_by_id.return_value = User(id="user-1", username="u", profile=make_profile())
+    return PlanningService(ai_service, Mock(), Mock(), user_repo)
+
+
+class TestFindPlanGaps:
+    """Tests for detecting which days need to be regenerated"""
+
+    def test_complete_nutrition_week_needs_nothing(self):
+        gaps = find_plan_gaps("nutrition", {"daily_plans": [nutrition_day(d) for d in WEEK]})
+
+        assert not gaps.needs_repair
+
+    def test_missing_and_empty_nutrition_days(self):
+        """Test days without meals and absent days are both regenerated"""
+        # Arrange
+        days = [nutrition_day(d) for d in WEEK[:5]]
+        days[1] = {"day": "Tuesday", "meals": []}
+
+        # Act
+        gaps = find_plan_gaps("nutrition", {"daily_plans": days})
+
+        # Assert
+        assert [d["day"] for d in gaps.accepted] == ["Monday", "Wednesday", "Thursday", "Friday"]
+        assert gaps.days == ["Tuesday", "Saturday", "Sunday"]
+
+    def test_workout_session_without_exercises(self):
+        gaps = find_plan_gaps("workout", {"sessions": [session("Monday"), session("Wednesday", ())]})
+
+        assert gaps.days == ["Wednesday"]
+        assert not gaps.remaining
+
+    def test_truncated_workout_asks_for_the_rest_of_the_week(self):
+        plan_data = {"sessions": [session("Monday")], "parse_report": {"truncated": True}}
+
+        gaps = find_plan_gaps("workout", plan_data)
+
+        assert gaps.remaining
+        assert gaps.days == []
+
+
+class TestMergeRepairedItems:
+    """Tests for merging regenerated days into the accepted ones"""
+
+    def test_merge_keeps_week_order_and_ignores_unwanted_days(self):
+        # Arrange
+        plan_data = {"daily_plans": [nutrition_day("Wednesday"), nutrition_day("Monday")]}
+        gaps = find_plan_gaps("nutrition", plan_data)
+        repaired = [nutrition_day(d) for d in reversed(WEEK)] + [{"day": "Tuesday", "meals": []}]
+
+        # Act
+        merged = merge_repaired_items("nutrition", plan_data, gaps, repaired)
+
+        # Assert
+        assert [d["day"] for d in merged["daily_plans"]] == WEEK
+        assert merged["daily_plans"][0] is plan_data["daily_plans"][1]
+
+
+class TestPlanningServiceRepair:
+    """Tests for partial regeneration during plan generation"""
+
+    def test_only_missing_days_are_requested(self):
+        """Test the repair call gets the accepted days as context and asks only for the gaps"""
+        # Arrange
+        ai_service = RepairingAIService(nutrition_plan={"daily_plans": [nutrition_day(d) for d in WEEK[:4]]})
+        service = make_service(ai_service)
+
+        # Act
+        plan = service.generate_nutrition_plan("user-1")
+
+        # Assert
+        assert ai_service.repair_calls == [("nutrition", WEEK[:4], ["Friday", "Saturday", "Sunday"])]
+        assert [d.day for d in plan.daily_plans] == WEEK
+
+    def test_complete_plan_is_not_repaired(self):
+        ai_service = RepairingAIService(workout_plan={"sessions": [session("Monday"), session("Thursday")]})
+
+        asyncio.run(make_service(ai_service).generate_workout_plan_async("user-1"))
+
+        assert ai_service.repair_calls == []
+
+    def test_invalid_session_is_replaced_async(self):
+        # Arrange
+        ai_service = RepairingAIService(workout_plan={"sessions": [session("Monday"), session("Thursday", ())]})
+
+        # Act
+        plan = asyncio.run(make_service(ai_service).generate_workout_plan_async("user-1"))
+
+        # Assert
+        assert ai_service.repair_calls == [("workout", ["Monday"], ["Thursday"])]
+        assert [s.exercises[0].name for s in plan.sessions] == ["Squat", "Lunge"]
+
+    def test_failed_repair_keeps_the_plan(self):
+        # Arrange
+        ai_service = RepairingAIService(nutrition_plan={"daily_plans": [nutrition_day("Monday")]})
+        ai_service.complete_nutrition_days = Mock(side_effect=ValueError("provider down"))
+
+        # Act
+        plan = make_service(ai_service).generate_nutrition_plan("user-1")
+
+        # Assert
+        assert [d.day for d in plan.daily_plans] == ["Monday"]
+
+    def test_stream_yields_repaired_days(self):
+        """Test streamed plans also get their missing days, after the streamed ones"""
+        ai_service = RepairingAIService(nutrition_plan={"daily_plans": [nutrition_day(d) for d in WEEK[:6]]})
+        service = make_service(ai_service)
+
+        async def collect():
+            return [item async for item in service.stream_nutrition_plan("user-1")]
+
+        items = asyncio.run(collect())
+        assert [d.day for d in items[:-1]] == WEEK
+        assert [d.day for d in items[-1].daily_plans] == WEEK
+
+
+class TestRepairProviders:
+    """Tests for the provider side of partial regeneration"""
+
+    def test_repair_prompt_lists_only_missing_days(self):
+        # Arrange
+        service = PromptOnlyAIService()
+        accepted = [nutrition_day("Monday")]
+
+        # Act
+        prompt = service._build_nutrition_repair_prompt(make_profile(), accepted, ["Saturday", "Sunday"])
+
+        # Assert
+        assert "Saturday, Sunday" in prompt
+        assert "Monday" in prompt
+        assert "Tuesday" not in prompt
+
+    def test_rule_based_fills_requested_days(self):
+        service = RuleBasedAIService()
+
+        days = service.complete_nutrition_days(make_profile(), [], ["Tuesday", "Sunday"])
+        sessions = service.complete_workout_sessions(make_profile(), [session("Monday")], ["Saturday"])
+
+        assert [d["day"] for d in days] == ["Tuesday", "Sunday"]
+        assert [s["day"] for s in sessions] == ["Saturday"]
+        assert sessions[0]["exercises"]
+
+    def test_fallback_repairs_when_primary_cannot(self):
+        """Test a primary without repair support hands the repair to the fallback"""
+        service = FallbackAIService(Mock(spec=AIService), RuleBasedAIService(), timeout_seconds=5)
+
+        days = asyncio.run(service.complete_nutrition_days_async(make_profile(), [], ["Friday"]))
+
+        assert [d["day"] for d in days] == ["Friday"]
@@ -0,0 +1,72 @@
+"""
+Unit tests for the plan response schemas and their compiled validators.
+"""
+from unittest.mock import Mock
+from src.application.plan_schema import ITEM_VALIDATORS, PLAN_VALIDATORS, compile_schema
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import WORKOUT_SYSTEM_MESSAGE, NUTRITION_SYSTEM_MESSAGE
+from src.infrastructure.ai.gemini import GeminiAIService
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+
+def make_profile():
+    return UserProfile(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+
+
+class TestCompiledValidator:
+    """Tests for schema compilation"""
+
+    def test_types_and_required_fields(self):
+        # Arrange
+        validate = compile_schema({
+            "type": "object",
+            "properties": {"sets": {"type": "integer"}, "tags": {"type": "array", "items": {"type": "string"}}},
+            "required": ["sets"],
+        })
+
+        # Act / Assert
+        assert validate({"sets": 3, "tags": ["a"], "extra": None})
+        assert validate({"sets": 3.0})
+        assert not validate({"sets": "3"})
+        assert not validate({"sets": True})
+        assert not validate({"tags": []})
+        assert not validate({"sets": 3, "tags": [1]})
+        assert not validate([])
+
+    def test_rule_based_plans_match_the_schemas(self):
+        rules = RuleBasedAIService()
+
+        assert PLAN_VALIDATORS["workout"](rules.generate_workout_plan(make_profile()))
+        assert PLAN_VALIDATORS["nutrition"](rules.generate_nutrition_plan(make_profile()))
+
+    def test_session_with_malformed_exercise_is_invalid(self):
+        session = {"day": "Monday", "exercises": [{"name": "Squat", "sets": 3, "reps": 10}]}
+
+        assert not ITEM_VALIDATORS["workout"](session)
+
+
+class TestStructuredOutput:
+    """Tests for passing the schema to the provider"""
+
+    def test_gemini_sends_the_schema_for_plan_prompts(self):
+        # Arrange
+        service = GeminiAIService("test-key")
+        service.model = Mock()
+        service.model.generate_content.return_value.text = '{"sessions": []}'
+
+        # Act
+        service._call_ai_api("prompt", system_message=WORKOUT_SYSTEM_MESSAGE)
+
+        # Assert
+        config = service.model.generate_content.call_args.kwargs["generation_config"]
+        assert config.response_mime_type == "application/json"
+        assert "sessions" in config.response_schema["properties"]
+
+    def test_gemini_without_structured_output(self):
+        service = GeminiAIService("test-key", structured_output=False)
+
+        assert service.generation_configs.get(NUTRITION_SYSTEM_MESSAGE) is None
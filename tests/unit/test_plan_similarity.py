@@ -0,0 +1,257 @@
+"""
+Unit tests for reusing approved plans for similar profiles.
+"""
+import threading
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from src.application import plan_similarity
+from src.application.plan_similarity import (
+    SimilarPlanIndex, SimilarPlanMatcher, adapt_plan_data, profile_vector
+)
+from src.application.planning_service import PlanningService
+from src.domain.models import (
+    ApprovedPlanSample, User, UserProfile, Goal, ActivityLevel, WorkoutPlan, WorkoutSession, Exercise
+)
+from src.domain.nutrition import estimate_daily_targets
+
+
+def make_profile(**overrides):
+    fields = dict(
+        age=30,
+        weight=80.0,
+        height=180.0,
+        gender="Male",
+        goal=Goal.MUSCLE_GAIN,
+        activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[],
+        injuries=[]
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+def workout_sample(plan_id="plan-1", **profile_overrides):
+    return ApprovedPlanSample(
+        plan_id=plan_id,
+        plan_type="workout",
+        profile=make_profile(**profile_overrides),
+        plan_data={"sessions": [{"day": "Monday", "focus": "Legs", "exercises": [{"name": "Squat"}]}]}
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSimilarPlanIndex:
+    """Tests for nearest-neighbour lookup and hard filters"""
+
+    def test_nearest_profile_wins(self):
+        # Arrange
+        index = SimilarPlanIndex()
+        index.add(workout_sample("far", age=40))
+        index.add(workout_sample("near", age=32))
+
+        # Act
+        sample, distance = index.nearest("workout", make_profile(age=31))
+
+        # Assert
+        assert sample.plan_id == "near"
+        assert distance < 0.5
+
+    def test_different_goal_is_far(self):
+        distance = sum(
+            (a - b) ** 2 for a, b in zip(profile_vector(make_profile()), profile_vector(make_profile(goal=Goal.WEIGHT_LOSS)))
+        ) ** 0.5
+
+        assert distance > 1.0
+
+    def test_injuries_are_a_hard_filter(self):
+        """Test a profile with other injuries never sees the plan, however close"""
+        index = SimilarPlanIndex()
+        index.add(workout_sample(injuries=["Knee"]))
+
+        assert index.nearest("workout", make_profile(injuries=[])) is None
+        assert index.nearest("workout", make_profile(injuries=[" knee "]))[0].plan_id == "plan-1"
+
+    def test_re_adding_a_plan_moves_it(self):
+        # Arrange
+        index = SimilarPlanIndex()
+        index.add(workout_sample(injuries=["knee"]))
+
+        # Act
+        index.add(workout_sample(injuries=[]))
+
+        # Assert
+        assert len(index) == 1
+        assert index.nearest("workout", make_profile(injuries=["knee"])) is None
+
+    def test_group_is_capped_to_newest(self):
+        index = SimilarPlanIndex(max_entries_per_group=2)
+        for i in range(3):
+            index.add(workout_sample(f"plan-{i}", age=30 + i))
+
+        assert len(index) == 2
+        assert index.nearest("workout", make_profile(age=30))[0].plan_id == "plan-1"
+
+
+class TestNearestScan:
+    """Tests that the vectorized and pure-Python scans agree"""
+
+    @pytest.fixture(params=["numpy", "python"])
+    def scan(self, request, monkeypatch):
+        if request.param == "numpy":
+            monkeypatch.setattr(plan_similarity, "np", pytest.importorskip("numpy"))
+        else:
+            monkeypatch.setattr(plan_similarity, "np", None)
+        return request.param
+
+    def test_nearest_after_changes_to_the_group(self, scan):
+        # Arrange
+        index = SimilarPlanIndex()
+        for i, age in enumerate([25, 40, 33, 50]):
+            index.add(workout_sample(f"plan-{i}", age=age))
+        index.nearest("workout", make_profile(age=30))
+
+        # Act: changes after a lookup must not reuse stale vectors
+        index.add(workout_sample("plan-2", age=60))
+        index.add(workout_sample("plan-4", age=31))
+        sample, distance = index.nearest("workout", make_profile(age=30))
+
+        # Assert
+        assert sample.plan_id == "plan-4"
+        assert distance == pytest.approx(0.2)
+
+
+class TestAdaptPlanData:
+    """Tests for light adaptation of a cloned plan"""
+
+    def test_nutrition_portions_follow_calorie_needs(self):
+        # Arrange
+        source = make_profile(weight=70.0)
+        target = make_profile(weight=74.0)
+        sample = ApprovedPlanSample(
+            plan_id="n-1",
+            plan_type="nutrition",
+            profile=source,
+            plan_data={"daily_plans": [{"day": "Monday", "meals": [{"name": "Lunch", "calories": 1000, "protein": 50}]}]}
+        )
+
+        # Act
+        plan_data = adapt_plan_data("nutrition", sample, target)
+
+        # Assert
+        ratio = estimate_daily_targets(target).calories / estimate_daily_targets(source).calories
+        meal = plan_data["daily_plans"][0]["meals"][0]
+        assert meal["calories"] == round(1000 * ratio)
+        assert plan_data["reused_from"] == "n-1"
+        assert sample.plan_data["daily_plans"][0]["meals"][0]["calories"] == 1000
+
+
+class TestSimilarPlanMatcher:
+    """Tests for threshold, loading and reloading"""
+
+    def test_threshold_rejects_distant_profiles(self):
+        index = SimilarPlanIndex()
+        index.add(workout_sample(weight=80.0))
+        matcher = SimilarPlanMatcher(index, max_distance=1.0)
+
+        assert matcher.find("workout", make_profile(weight=82.0)) is not None
+        assert matcher.find("workout", make_profile(weight=95.0)) is None
+        assert index.snapshot()["hits"] == 1
+
+    def test_index_is_loaded_once_then_reloaded(self):
+        # Arrange
+        clock = FakeClock()
+        list_approved = Mock(return_value=[workout_sample()])
+        matcher = SimilarPlanMatcher(SimilarPlanIndex(clock=clock), list_approved, reload_seconds=60)
+
+        # Act
+        matcher.find("workout", make_profile())
+        matcher.loader.join()
+        matcher.find("workout", make_profile())
+        clock.now = 61
+        matcher.find("workout", make_profile())
+        matcher.loader.join()
+
+        # Assert
+        assert list_approved.call_count == 2
+
+    def test_load_runs_in_the_background_and_serves_the_current_index(self):
+        """Test a lookup never waits for the load; the loaded plans serve later lookups"""
+        # Arrange
+        release = threading.Event()
+        index = SimilarPlanIndex()
+
+        def list_approved(plan_type, limit):
+            release.wait(5)
+            return [workout_sample()]
+
+        matcher = SimilarPlanMatcher(index, list_approved)
+
+        # Act
+        during_load = matcher.find("workout", make_profile())
+        release.set()
+        matcher.loader.join()
+        after_load = matcher.find("workout", make_profile())
+
+        # Assert
+        assert during_load is None
+        assert after_load is not None
+
+
+class TestPlanningServiceReuse:
+    """Tests for reuse during plan generation"""
+
+    def make_service(self, matcher):
+        ai_service = Mock()
+        user_repo = Mock()
+        user_repo.get_by_id.return_value = User(id="user-1", username="u", profile=make_profile(age=31))
+        return PlanningService(ai_service, Mock(), Mock(), user_repo, plan_matcher=matcher), ai_service
+
+    def test_similar_profile_skips_the_ai(self):
+        """Test a close approved plan is cloned into a new draft"""
+        # Arrange
+        index = SimilarPlanIndex()
+        index.add(workout_sample())
+        service, ai_service = self.make_service(SimilarPlanMatcher(index))
+
+        # Act
+        plan = service.generate_workout_plan("user-1")
+
+        # Assert
+        ai_service.generate_workout_plan.assert_not_called()
+        assert plan.state == "draft"
+        assert plan.sessions[0].exercises[0].name == "Squat"
+
+    def test_bypass_cache_skips_reuse(self):
+        index = SimilarPlanIndex()
+        index.add(workout_sample())
+        service, ai_service = self.make_service(SimilarPlanMatcher(index))
+        ai_service.generate_workout_plan.return_value = {"sessions": []}
+
+        service.generate_workout_plan("user-1", bypass_cache=True)
+
+        ai_service.generate_workout_plan.assert_called_once()
+
+    def test_approving_a_plan_indexes_it(self):
+        # Arrange
+        index = SimilarPlanIndex()
+        service, _ = self.make_service(SimilarPlanMatcher(index))
+        service.workout_repo.get_by_id.return_value = WorkoutPlan(
+            id="plan-9", user_id="user-1", start_date=datetime.now(), end_date=datetime.now() + timedelta(days=7), sessions=[]
+        )
+        sessions = [WorkoutSession(day="Monday", focus="Legs", exercises=[Exercise("Squat", "", 3, "8", "90s")])]
+
+        # Act
+        service.update_workout_plan("plan-9", datetime.now(), datetime.now(), sessions, "trainer-1")
+
+        # Assert
+        sample, _ = index.nearest("workout", make_profile(age=31))
+        assert sample.plan_id == "plan-9"
+        assert sample.plan_data["sessions"][0]["exercises"][0]["name"] == "Squat"
@@ -1,11 +1,15 @@
 """
 Unit tests for PlanningService using mocks.
 """
+import asyncio
+import threading
+import time
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
+from src.application.interfaces import AsyncAIService, StreamingAIService
 from src.application.planning_service import PlanningService
-from src.domain.models import WorkoutPlan, NutritionPlan
+from src.domain.models import User, WorkoutPlan, NutritionPlan, WorkoutSession, DailyMealPlan
 
 
 class TestPlanningServiceWorkoutGeneration:
@@ -250,3 +254,277 @@ class TestPlanningServiceNutritionGeneration:
         assert len(result.daily_plans) == 1
         mock_nutrition_repo.save.assert_called_once()
         mock_ai_service.generate_nutrition_plan.assert_called_once()
+
+
+class TestPlanningServiceAsyncGeneration:
+    """Tests for the event-loop friendly generation path"""
+    
+    def test_generate_workout_plan_async_uses_async_provider(
+        self,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test async generation awaits the provider's native async method"""
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        ai_service = Mock(spec=AsyncAIService)
+        ai_service.generate_workout_plan_async = AsyncMock(return_value={
+            "sessions": [{"day": "Monday", "focus": "Legs", "exercises": []}]
+        })
+        
+        service = PlanningService(
+            ai_service,
+            mock_workout_repo,
+            mock_nutrition_repo,
+            mock_user_repo
+        )
+        
+        # Act
+        result = asyncio.run(service.generate_workout_plan_async("user_123"))
+        
+        # Assert
+        assert result.sessions[0].focus == "Legs"
+        ai_service.generate_workout_plan_async.assert_awaited_once_with(sample_user.profile)
+        mock_workout_repo.save.assert_called_once()
+    
+    def test_generate_nutrition_plan_async_falls_back_to_thread(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test async generation runs sync-only providers in a worker thread"""
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_nutrition_plan.return_value = {
+            "daily_plans": [{"day": "Monday", "meals": []}]
+        }
+        
+        service = PlanningService(
+            mock_ai_service,
+            mock_workout_repo,
+            mock_nutrition_repo,
+            mock_user_repo
+        )
+        
+        # Act
+        result = asyncio.run(service.generate_nutrition_plan_async("user_123"))
+        
+        # Assert
+        assert result.daily_plans[0].day == "Monday"
+        mock_ai_service.generate_nutrition_plan.assert_called_once()
+        mock_nutrition_repo.save.assert_called_once()
+    
+    def test_generate_workout_plan_async_no_profile(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo
+    ):
+        """Test async generation validates the profile before calling the AI"""
+        mock_user_repo.get_by_id.return_value = None
+        
+        service = PlanningService(
+            mock_ai_service,
+            mock_workout_repo,
+            mock_nutrition_repo,
+            mock_user_repo
+        )
+        
+        with pytest.raises(ValueError, match="User profile incomplete or not found"):
+            asyncio.run(service.generate_workout_plan_async("user_123"))
+        
+        mock_ai_service.generate_workout_plan.assert_not_called()
+    
+    def test_repository_calls_run_off_the_event_loop_one_at_a_time(
+        self,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test profile lookups and saves leave the loop free but never share the DB session between threads"""
+        # Arrange
+        worker_threads, active, overlaps = set(), [0], []
+        lock = threading.Lock()
+        
+        def slow(result):
+            def call(*args):
+                with lock:
+                    active[0] += 1
+                    overlaps.append(active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+                worker_threads.add(threading.get_ident())
+                return result
+            return call
+        
+        mock_user_repo.get_by_id.side_effect = slow(sample_user)
+        mock_workout_repo.save.side_effect = slow(None)
+        ai_service = Mock(spec=AsyncAIService)
+        ai_service.generate_workout_plan_async = AsyncMock(return_value={
+            "sessions": [{"day": "Monday", "focus": "Legs", "exercises": []}]
+        })
+        service = PlanningService(ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        async def run():
+            return threading.get_ident(), await service.generate_plans_for_clients(
+                [User(id=f"client_{i}", username=f"client_{i}") for i in range(3)], ["workout"]
+            )
+        
+        # Act
+        loop_thread, results = asyncio.run(run())
+        
+        # Assert
+        assert all(r.success for r in results)
+        assert loop_thread not in worker_threads
+        assert max(overlaps) == 1
+
+
+class TestPlanningServiceBulkGeneration:
+    """Tests for roster-wide concurrent generation"""
+    
+    def make_clients(self, sample_user, count):
+        return [
+            User(id=f"client_{i}", username=f"client_{i}", profile=sample_user.profile)
+            for i in range(count)
+        ]
+    
+    def test_generate_plans_for_clients_respects_concurrency_cap(
+        self,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test no more than max_concurrency generations run at once"""
+        # Arrange
+        clients = self.make_clients(sample_user, 6)
+        mock_user_repo.get_by_id.side_effect = lambda user_id: next(c for c in clients if c.id == user_id)
+        in_flight = {"current": 0, "peak": 0}
+        
+        async def slow_generation(profile):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return {"sessions": [{"day": "Monday", "focus": "Legs", "exercises": []}]}
+        
+        ai_service = Mock(spec=AsyncAIService)
+        ai_service.generate_workout_plan_async = AsyncMock(side_effect=slow_generation)
+        service = PlanningService(ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        # Act
+        results = asyncio.run(service.generate_plans_for_clients(clients, max_concurrency=2))
+        
+        # Assert
+        assert [r.client_id for r in results] == [c.id for c in clients]
+        assert all(r.success for r in results)
+        assert in_flight["peak"] == 2
+        assert mock_workout_repo.save.call_count == 6
+    
+    def test_generate_plans_for_clients_reports_failures(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test one failing client doesn't abort the rest of the roster"""
+        # Arrange
+        clients = self.make_clients(sample_user, 2)
+        no_profile = User(id="client_np", username="client_np")
+        clients.append(no_profile)
+        mock_user_repo.get_by_id.side_effect = lambda user_id: next(c for c in clients if c.id == user_id)
+        mock_ai_service.generate_workout_plan.return_value = {"sessions": []}
+        mock_ai_service.generate_nutrition_plan.return_value = {"daily_plans": []}
+        service = PlanningService(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        # Act
+        results = asyncio.run(service.generate_plans_for_clients(
+            clients, plan_types=("workout", "nutrition")
+        ))
+        
+        # Assert
+        assert len(results) == 6
+        failures = [r for r in results if not r.success]
+        assert {(r.client_id, r.plan_type) for r in failures} == {("client_np", "workout"), ("client_np", "nutrition")}
+        assert all(r.error == "User profile incomplete or not found" for r in failures)
+    
+    def test_generate_plans_for_clients_invalid_plan_type(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo
+    ):
+        """Test unknown plan types are rejected up front"""
+        service = PlanningService(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        with pytest.raises(ValueError, match="Invalid plan type"):
+            asyncio.run(service.generate_plans_for_clients([], plan_types=("cardio",)))
+
+
+class TestPlanningServiceStreaming:
+    """Tests for streamed plan generation"""
+    
+    async def collect(self, stream):
+        return [item async for item in stream]
+    
+    def test_stream_workout_plan_yields_sessions_then_plan(
+        self,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test each session is yielded before the saved plan"""
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        
+        async def sessions(profile):
+            yield {"day": "Monday", "focus": "Push", "exercises": []}
+            yield {"day": "Tuesday", "focus": "Pull", "exercises": []}
+        
+        ai_service = Mock(spec=StreamingAIService)
+        ai_service.stream_workout_sessions = sessions
+        service = PlanningService(ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        # Act
+        items = asyncio.run(self.collect(service.stream_workout_plan("user_123")))
+        
+        # Assert
+        assert [type(i) for i in items] == [WorkoutSession, WorkoutSession, WorkoutPlan]
+        assert [s.focus for s in items[-1].sessions] == ["Push", "Pull"]
+        mock_workout_repo.save.assert_called_once_with(items[-1])
+    
+    def test_stream_nutrition_plan_without_streaming_provider(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test providers without streaming still produce day events"""
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        mock_ai_service.generate_nutrition_plan.return_value = {
+            "daily_plans": [{"day": "Monday", "meals": []}]
+        }
+        service = PlanningService(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+        
+        # Act
+        items = asyncio.run(self.collect(service.stream_nutrition_plan("user_123")))
+        
+        # Assert
+        assert isinstance(items[0], DailyMealPlan)
+        assert isinstance(items[-1], NutritionPlan)
+        mock_nutrition_repo.save.assert_called_once()
@@ -0,0 +1,178 @@
+"""
+Unit tests for speculative plan pre-generation.
+"""
+import copy
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from src.application.job_service import JobService
+from src.application.planning_service import PlanningService
+from src.application.pregeneration import PlanPregenerator, SPECULATIVE_PRIORITY
+from src.application.user_service import UserService
+from src.domain.models import Goal, JobStatus
+from src.domain.repositories import PreparedPlanRepository
+from src.infrastructure.ai.rule_based import RuleBasedAIService
+
+
+class InMemoryPreparedPlanRepository(PreparedPlanRepository):
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, user_id, plan_type):
+        return copy.deepcopy(self.entries.get((user_id, plan_type)))
+
+    def get_by_job(self, job_id):
+        return next((copy.deepcopy(p) for p in self.entries.values() if p.job_id == job_id), None)
+
+    def save(self, prepared):
+        self.entries[(prepared.user_id, prepared.plan_type)] = copy.deepcopy(prepared)
+
+    def delete(self, prepared):
+        current = self.entries.get((prepared.user_id, prepared.plan_type))
+        if current is None or current.job_id != prepared.job_id:
+            return False
+        del self.entries[(prepared.user_id, prepared.plan_type)]
+        return True
+
+
+def make_pregenerator():
+    job_repo = Mock()
+    job_repo.cancel_queued.return_value = True
+    return PlanPregenerator(InMemoryPreparedPlanRepository(), job_repo), job_repo
+
+
+class TestProfileUpdates:
+    """Tests for queueing speculative generation when a profile changes"""
+
+    def test_completed_profile_queues_low_priority_jobs(self, sample_user):
+        # Arrange
+        pregenerator, job_repo = make_pregenerator()
+
+        # Act
+        jobs = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)
+
+        # Assert
+        assert [job.plan_type for job in jobs] == ["workout", "nutrition"]
+        assert all(job.priority == SPECULATIVE_PRIORITY for job in jobs)
+        assert job_repo.save.call_count == 2
+        assert pregenerator.get_for_job(jobs[0].id).plan_data is None
+
+    def test_change_that_does_not_alter_the_plans_keeps_them(self, sample_user):
+        pregenerator, job_repo = make_pregenerator()
+        pregenerator.profile_updated(sample_user.id, None, sample_user.profile)
+
+        jobs = pregenerator.profile_updated(sample_user.id, sample_user.profile, replace(sample_user.profile, gender=" male"))
+
+        assert jobs == []
+        job_repo.cancel_queued.assert_not_called()
+
+    def test_weight_change_only_regenerates_nutrition(self, sample_user):
+        pregenerator, _ = make_pregenerator()
+        pregenerator.profile_updated(sample_user.id, None, sample_user.profile)
+
+        jobs = pregenerator.profile_updated(sample_user.id, sample_user.profile, replace(sample_user.profile, weight=78.0))
+
+        assert [job.plan_type for job in jobs] == ["nutrition"]
+
+    def test_profile_change_discards_prepared_plan(self, sample_user):
+        # Arrange
+        pregenerator, job_repo = make_pregenerator()
+        old_job = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)[0]
+        pregenerator.fill(pregenerator.get_for_job(old_job.id), {"sessions": []})
+        new_profile = replace(sample_user.profile, goal=Goal.WEIGHT_LOSS)
+
+        # Act
+        pregenerator.profile_updated(sample_user.id, sample_user.profile, new_profile)
+
+        # Assert
+        job_repo.cancel_queued.assert_any_call(old_job.id)
+        assert pregenerator.get_for_job(old_job.id) is None
+        assert pregenerator.take("workout", sample_user.id, new_profile) is None
+
+    def test_user_service_triggers_pregeneration(self, mock_user_repo, sample_user):
+        previous = sample_user.profile
+        sample_user.profile = None
+        mock_user_repo.get_by_id.return_value = sample_user
+        pregenerator = Mock()
+
+        UserService(mock_user_repo, pregenerator).update_profile(sample_user.id, previous)
+
+        pregenerator.profile_updated.assert_called_once_with(sample_user.id, None, previous)
+
+
+class TestTakingPreparedPlans:
+    """Tests for using the prepared plan data"""
+
+    def test_prepared_data_is_used_once(self, sample_user):
+        pregenerator, _ = make_pregenerator()
+        job = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)[0]
+        pregenerator.fill(pregenerator.get_for_job(job.id), {"sessions": [{"day": "Monday"}]})
+
+        assert pregenerator.take("workout", sample_user.id, sample_user.profile) == {"sessions": [{"day": "Monday"}]}
+        assert pregenerator.take("workout", sample_user.id, sample_user.profile) is None
+
+    def test_unstarted_job_is_cancelled_when_the_user_generates_first(self, sample_user):
+        pregenerator, job_repo = make_pregenerator()
+        job = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)[0]
+
+        assert pregenerator.take("workout", sample_user.id, sample_user.profile) is None
+        job_repo.cancel_queued.assert_called_once_with(job.id)
+
+    def test_old_prepared_data_is_discarded(self, sample_user):
+        pregenerator, _ = make_pregenerator()
+        job = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)[0]
+        prepared = pregenerator.get_for_job(job.id)
+        prepared.created_at = datetime.now() - timedelta(days=2)
+        prepared.plan_data = {"sessions": []}
+        pregenerator.prepared_repo.save(prepared)
+
+        assert pregenerator.take("workout", sample_user.id, sample_user.profile) is None
+
+
+class TestSpeculativeJobs:
+    """Tests for running speculative jobs and serving their result"""
+
+    def test_job_prepares_data_that_generation_returns_without_ai_call(
+        self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        # Arrange
+        mock_user_repo.get_by_id.return_value = sample_user
+        pregenerator, job_repo = make_pregenerator()
+        job = pregenerator.profile_updated(sample_user.id, None, sample_user.profile)[0]
+        job.status = JobStatus.RUNNING.value
+        ai_service = Mock()
+        plan_data = RuleBasedAIService().generate_workout_plan(sample_user.profile)
+        # As a provider would answer; the rule-based fallback's own plans are never held
+        ai_service.generate_workout_plan.return_value = {k: v for k, v in plan_data.items() if k != "cacheable"}
+        planning_service = PlanningService(
+            ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, pregenerator=pregenerator
+        )
+
+        # Act
+        finished = JobService(job_repo, pregenerator).run_job(job, planning_service)
+        ai_calls = ai_service.generate_workout_plan.call_count
+        plan = planning_service.generate_workout_plan(sample_user.id)
+
+        # Assert
+        assert finished.status == JobStatus.SUCCEEDED.value
+        assert finished.plan_id is None
+        assert ai_calls == 1
+        assert ai_service.generate_workout_plan.call_count == 1
+        assert plan.sessions
+        mock_workout_repo.save.assert_called_once_with(plan)
+
+    def test_job_for_outdated_profile_generates_nothing(
+        self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        pregenerator, job_repo = make_pregenerator()
+        job = pregenerator.profile_updated(sample_user.id, None, replace(sample_user.profile, age=50))[0]
+        mock_user_repo.get_by_id.return_value = sample_user
+        ai_service = Mock()
+        planning_service = PlanningService(
+            ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, pregenerator=pregenerator
+        )
+
+        JobService(job_repo, pregenerator).run_job(job, planning_service)
+
+        ai_service.generate_workout_plan.assert_not_called()
+        assert pregenerator.get_for_job(job.id) is None
@@ -0,0 +1,84 @@
+"""
+Unit tests for cache-friendly prompts and cached-token accounting.
+"""
+import os
+from unittest.mock import Mock
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.base import (
+    BaseAIService, WORKOUT_PROMPT_PREFIX, NUTRITION_PARTIAL_PROMPT_PREFIX, WORKOUT_SYSTEM_MESSAGE
+)
+from src.infrastructure.ai.gemini import GeminiAIService
+from src.infrastructure.ai.metrics import TokenUsageTracker
+
+
+def make_profile(**overrides):
+    fields = dict(
+        age=30, weight=80.0, height=180.0, gender="Male",
+        goal=Goal.MUSCLE_GAIN, activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[], injuries=[]
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+class PromptOnlyAIService(BaseAIService):
+    def _call_ai_api(self, prompt, system_message=""):
+        raise ValueError("not used")
+
+
+class TestPromptLayout:
+    """Tests for a static prefix followed by the per-user part"""
+
+    def test_different_users_share_the_whole_instruction_block(self):
+        # Arrange
+        service = PromptOnlyAIService()
+
+        # Act
+        first = service._build_workout_prompt(make_profile())
+        second = service._build_workout_prompt(make_profile(age=52, injuries=["knee"], goal=Goal.WEIGHT_LOSS))
+
+        # Assert
+        shared = os.path.commonprefix([first, second])
+        assert shared.startswith(WORKOUT_PROMPT_PREFIX)
+        assert first.index("- Age: 30") > len(WORKOUT_PROMPT_PREFIX)
+
+    def test_partial_prompts_start_with_their_prefix(self):
+        service = PromptOnlyAIService()
+        outline = service.outline_nutrition_week(make_profile())
+
+        prompts = [
+            service._build_nutrition_days_prompt(make_profile(), outline, ["Friday"]),
+            service._build_nutrition_repair_prompt(make_profile(), [], ["Sunday"]),
+        ]
+
+        assert all(p.startswith(NUTRITION_PARTIAL_PROMPT_PREFIX) for p in prompts)
+
+
+class TestCachedTokens:
+    """Tests for surfacing the provider's cached-token counts"""
+
+    def test_gemini_usage_is_recorded(self):
+        # Arrange
+        tracker = TokenUsageTracker()
+        service = GeminiAIService("test-key", token_usage=tracker)
+        service.model = Mock()
+        response = service.model.generate_content.return_value
+        response.text = '{"sessions": []}'
+        response.usage_metadata.prompt_token_count = 400
+        response.usage_metadata.cached_content_token_count = 300
+        response.usage_metadata.candidates_token_count = 900
+
+        # Act
+        service._call_ai_api("prompt", system_message=WORKOUT_SYSTEM_MESSAGE)
+
+        # Assert
+        assert tracker.snapshot()["gemini"] == {
+            "calls": 1, "prompt_tokens": 400, "cached_tokens": 300, "output_tokens": 900, "cached_ratio": 0.75
+        }
+
+    def test_no_tracker_records_nothing(self):
+        service = PromptOnlyAIService()
+
+        service._record_usage(100, 50, 10)
+
+        assert service.token_usage is None
@@ -0,0 +1,69 @@
+"""
+Unit tests for process-wide AI provider clients.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.config import Settings
+from src.dependencies import get_ai_service, get_remote_providers, close_ai_service, _tiering_enabled
+
+
+@pytest.fixture(autouse=True)
+def fresh_providers():
+    get_ai_service.cache_clear()
+    get_remote_providers.cache_clear()
+    yield
+    get_ai_service.cache_clear()
+    get_remote_providers.cache_clear()
+
+
+class TestProviderClientReuse:
+    """Tests for building provider clients once and closing them at shutdown"""
+
+    def test_requests_share_one_service(self):
+        assert get_ai_service() is get_ai_service()
+
+    def test_close_releases_clients_and_rebuilds_on_next_use(self):
+        """Test shutdown closes every provider and the next request gets new clients"""
+        # Arrange
+        service = get_ai_service()
+        providers = get_remote_providers()
+        for provider in providers:
+            provider.aclose = AsyncMock()
+
+        # Act
+        asyncio.run(close_ai_service())
+
+        # Assert
+        for provider in providers:
+            provider.aclose.assert_awaited_once()
+        assert get_ai_service() is not service
+
+    def test_close_before_first_use_builds_nothing(self):
+        asyncio.run(close_ai_service())
+
+        assert get_remote_providers.cache_info().currsize == 0
+
+    def test_openai_client_uses_configured_pool(self):
+        pytest.importorskip("openai")
+        from src.infrastructure.ai import OpenAIService
+
+        service = OpenAIService("test-key", timeout_seconds=12, max_connections=3)
+
+        assert service.client.timeout.read == 12
+        asyncio.run(service.aclose())
+
+
+class TestModelTierWiring:
+    """Tests for building the small-model tier only when it is a different model"""
+
+    def test_same_small_and_main_model_skips_tiering(self):
+        settings = Settings()
+        settings.AI_TIERING_ENABLED = True
+        settings.DEFAULT_AI_PROVIDER = "openai"
+        settings.OPENAI_MODEL = settings.OPENAI_SMALL_MODEL = "gpt-4o-mini"
+
+        assert not _tiering_enabled(settings)
+
+        settings.OPENAI_MODEL = "gpt-4o"
+        assert _tiering_enabled(settings)
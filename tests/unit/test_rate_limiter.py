@@ -0,0 +1,191 @@
+"""
+Unit tests for per-user token-bucket rate limiting.
+"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from src.application.rate_limiter import (
+    RateLimiter, RateLimitBudget, InMemoryRateLimitStore, parse_budgets
+)
+from src.application.planning_service import PlanningService
+from src.domain.models import User
+from src.interfaces.api.rate_limit import enforce_quota, per_generation_quota, quota_usage, refund_quota
+
+BUDGETS = {"client": RateLimitBudget(2, 3600), "trainer": RateLimitBudget(10, 36000)}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_user(*roles):
+    return User(id="user-1", username="u", roles=list(roles) or ["client"])
+
+
+def make_limiter(clock=None, store=None):
+    return RateLimiter(store or InMemoryRateLimitStore(), BUDGETS, clock=clock or FakeClock())
+
+
+class TestRateLimiter:
+    """Tests for bucket arithmetic and role budgets"""
+
+    def test_burst_then_deny(self):
+        """Test a full bucket allows its capacity and then denies with a retry time"""
+        # Arrange
+        limiter = make_limiter()
+        user = make_user("client")
+
+        # Act
+        decisions = [limiter.consume(user) for _ in range(3)]
+
+        # Assert
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert decisions[1].remaining == 0
+        assert decisions[2].retry_after_seconds == pytest.approx(1.0)
+
+    def test_tokens_refill_over_time(self):
+        # Arrange
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        user = make_user("client")
+        limiter.consume(user)
+        limiter.consume(user)
+
+        # Act
+        clock.now += 1.5
+
+        # Assert
+        assert limiter.consume(user).allowed
+        assert not limiter.consume(user).allowed
+
+    def test_most_generous_role_applies(self):
+        limiter = make_limiter()
+
+        decision = limiter.consume(make_user("client", "trainer"))
+
+        assert decision.limit == 10
+
+    def test_roles_without_budget_are_not_limited(self):
+        limiter = make_limiter()
+
+        decisions = [limiter.consume(make_user("auditor")) for _ in range(20)]
+
+        assert all(d.allowed for d in decisions)
+
+    def test_denied_request_does_not_spend_tokens(self):
+        """Test asking for more than is left leaves the bucket as it was"""
+        limiter = make_limiter()
+        user = make_user("trainer")
+        limiter.consume(user, cost=8)
+
+        denied = limiter.consume(user, cost=5)
+
+        assert not denied.allowed
+        assert limiter.usage(user).remaining == 2
+
+    def test_lost_race_is_retried(self):
+        """Test a concurrent update is detected and the take retried on fresh state"""
+        # Arrange
+        store = InMemoryRateLimitStore()
+        original = store.compare_and_set
+        calls = []
+
+        def flaky(expected, bucket):
+            calls.append(bucket)
+            return False if len(calls) == 1 else original(expected, bucket)
+
+        store.compare_and_set = flaky
+        limiter = make_limiter(store=store)
+
+        # Act
+        decision = limiter.consume(make_user("client"))
+
+        # Assert
+        assert decision.allowed
+        assert len(calls) == 2
+
+    def test_parse_budgets(self):
+        assert parse_budgets("client=5/10, trainer=50/200") == {
+            "client": RateLimitBudget(5, 10.0),
+            "trainer": RateLimitBudget(50, 200.0),
+        }
+        with pytest.raises(ValueError):
+            parse_budgets("client=5")
+
+
+class TestEnforceQuota:
+    """Tests for the HTTP side of rate limiting"""
+
+    def test_exhausted_budget_returns_429_with_retry_after(self):
+        # Arrange
+        limiter = make_limiter()
+        user = make_user("client")
+        enforce_quota(limiter, user)
+        enforce_quota(limiter, user)
+
+        # Act
+        with pytest.raises(HTTPException) as exc:
+            enforce_quota(limiter, user)
+
+        # Assert
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "1"
+        assert exc.value.headers["X-RateLimit-Limit"] == "2"
+
+    def test_quota_usage_reports_remaining(self):
+        limiter = make_limiter()
+        user = make_user("client")
+        limiter.consume(user)
+
+        usage = quota_usage(limiter.usage(user))
+
+        assert usage["limited"] is True
+        assert usage["remaining"] == 1
+        assert usage["reset_after_seconds"] == 1.0
+
+    def test_cost_above_capacity_is_refused_with_413(self):
+        limiter = make_limiter()
+        user = make_user("client")
+
+        with pytest.raises(HTTPException) as exc:
+            enforce_quota(limiter, user, cost=3)
+
+        assert exc.value.status_code == 413
+        assert limiter.usage(user).remaining == 2
+
+    def test_refund_gives_back_tokens_up_to_capacity(self):
+        limiter = make_limiter()
+        user = make_user("client")
+        enforce_quota(limiter, user)
+
+        refund_quota(limiter, user)
+        refund_quota(limiter, user)
+
+        assert limiter.usage(user).remaining == 2
+
+    def test_bulk_charges_each_generation_and_refunds_failures(
+        self, mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        # Arrange
+        limiter = make_limiter()
+        trainer = make_user("client")
+        clients = [User(id="no-profile", username="np")] + [
+            User(id=f"client-{i}", username=f"c{i}", profile=sample_user.profile) for i in range(3)
+        ]
+        mock_user_repo.get_by_id.side_effect = lambda user_id: next(c for c in clients if c.id == user_id)
+        mock_ai_service.generate_workout_plan.return_value = {"sessions": []}
+        service = PlanningService(mock_ai_service, mock_workout_repo, mock_nutrition_repo, mock_user_repo)
+
+        # Act
+        results = asyncio.run(service.generate_plans_for_clients(
+            clients, max_concurrency=1, generation_slots=[per_generation_quota(limiter, trainer, service.blocking_calls)]
+        ))
+
+        # Assert: the failed client was refunded, so two of the other three fit the budget of 2
+        assert [r.success for r in results] == [False, True, True, False]
+        assert results[-1].error == "Generation limit reached"
+        assert limiter.usage(trainer).remaining == 0
@@ -0,0 +1,147 @@
+"""
+Unit tests for the record/replay provider stand-in.
+"""
+import asyncio
+import json
+import random
+import pytest
+from src.infrastructure.ai.base import BaseAIService
+from src.infrastructure.ai.replay import (
+    ReplayAIService, RecordingAIService, ReplayCorpus, LatencyModel, recording_key
+)
+
+RESPONSE = json.dumps({"sessions": [{"day": "Monday", "focus": "Legs", "exercises": []}]})
+
+
+class FakeProvider(BaseAIService):
+    name = "gemini"
+
+    def _call_ai_api(self, prompt, system_message=""):
+        return '{"recorded": true}'
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = ReplayCorpus(str(tmp_path / "corpus.jsonl"))
+    corpus.add("workout prompt", "fitness", RESPONSE, 2.5)
+    return corpus
+
+
+class TestReplayCorpus:
+    """Tests for corpus storage and lookup"""
+
+    def test_exact_prompt_is_found(self, corpus):
+        """Test a recorded prompt returns its own recording"""
+        assert corpus.find("workout   prompt", "fitness")["response"] == RESPONSE
+
+    def test_unseen_prompt_reuses_same_kind(self, corpus):
+        """Test an unrecorded prompt falls back to a recording with the same system message"""
+        # Arrange
+        corpus.add("nutrition prompt", "nutrition", '{"daily_plans": []}', 1.0)
+
+        # Act
+        recording = corpus.find("another workout prompt", "fitness")
+
+        # Assert
+        assert recording["response"] == RESPONSE
+
+    def test_corpus_is_reloaded_from_disk(self, corpus):
+        """Test recordings persist across instances"""
+        reloaded = ReplayCorpus(corpus.path)
+
+        assert len(reloaded) == 1
+        assert reloaded.find("workout prompt", "fitness")["key"] == recording_key("workout prompt", "fitness")
+
+
+class TestReplayAIService:
+    """Tests for replayed responses and fault injection"""
+
+    def test_replays_recorded_response(self, corpus):
+        """Test the provider returns the recorded text without delay when latency is off"""
+        service = ReplayAIService(corpus, latency="none")
+
+        assert service._call_ai_api("workout prompt", "fitness") == RESPONSE
+
+    def test_error_injection(self, corpus):
+        """Test injected errors look like provider failures"""
+        service = ReplayAIService(corpus, latency="none", error_rate=1.0)
+
+        with pytest.raises(ValueError):
+            service._call_ai_api("workout prompt", "fitness")
+
+    def test_truncation_injection(self, corpus):
+        """Test truncated responses are cut mid-JSON"""
+        # Arrange
+        service = ReplayAIService(corpus, latency="none", truncation_rate=1.0, seed=1)
+
+        # Act
+        text = service._call_ai_api("workout prompt", "fitness")
+
+        # Assert
+        assert len(text) < len(RESPONSE)
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(text)
+
+    def test_async_applies_latency(self, corpus):
+        """Test the async call waits for the sampled latency"""
+        service = ReplayAIService(corpus, latency="fixed:0.05")
+
+        async def timed():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await service._call_ai_api_async("workout prompt", "fitness")
+            return loop.time() - start
+
+        assert asyncio.run(timed()) >= 0.04
+
+    def test_stream_reassembles_response(self, corpus):
+        """Test streamed chunks join back into the recorded response"""
+        service = ReplayAIService(corpus, latency="none", stream_chunks=5)
+
+        async def collect():
+            return [c async for c in service._stream_ai_api("workout prompt", "fitness")]
+
+        chunks = asyncio.run(collect())
+        assert len(chunks) == 5
+        assert "".join(chunks) == RESPONSE
+
+    def test_empty_corpus_fails(self, tmp_path):
+        """Test an empty corpus surfaces as a provider error"""
+        service = ReplayAIService(ReplayCorpus(str(tmp_path / "empty.jsonl")), latency="none")
+
+        with pytest.raises(ValueError):
+            service._call_ai_api("prompt")
+
+
+class TestLatencyModel:
+    """Tests for latency specs"""
+
+    def test_specs(self):
+        rng = random.Random(0)
+        assert LatencyModel("none").sample(rng, 3.0) == 0.0
+        assert LatencyModel("recorded").sample(rng, 3.0) == 3.0
+        assert LatencyModel("fixed:1.5").sample(rng) == 1.5
+        assert 1.0 <= LatencyModel("uniform:1,2").sample(rng) <= 2.0
+        assert LatencyModel("lognormal:0,0.5").sample(rng) > 0
+
+    def test_unknown_spec_is_rejected(self):
+        with pytest.raises(ValueError):
+            LatencyModel("pareto:1")
+
+
+class TestRecordingAIService:
+    """Tests for record mode"""
+
+    def test_records_real_responses(self, tmp_path):
+        """Test responses pass through and land in the corpus"""
+        # Arrange
+        corpus = ReplayCorpus(str(tmp_path / "recorded.jsonl"))
+        service = RecordingAIService(FakeProvider(), corpus)
+
+        # Act
+        text = service._call_ai_api("prompt", "fitness")
+
+        # Assert
+        assert text == '{"recorded": true}'
+        assert service.name == "gemini"
+        assert ReplayCorpus(corpus.path).find("prompt", "fitness")["response"] == text
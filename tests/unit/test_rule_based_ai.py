@@ -0,0 +1,315 @@
+"""
+Unit tests for the rule-based generator and the provider fallback.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from src.application.interfaces import AIService
+from src.application.plan_cache import PlanCache, PlanCacheStats, TTLLRUCache
+from src.application.plan_repair import is_cacheable
+from src.application.planning_service import PlanningService
+from src.domain.models import UserProfile, Goal, ActivityLevel
+from src.infrastructure.ai.catalog import EXERCISES
+from src.infrastructure.ai import rule_based
+from src.infrastructure.ai.fallback import FallbackAIService
+from src.infrastructure.ai.rule_based import RuleBasedAIService, injured_body_parts, restriction_tags
+
+
+def make_profile(**overrides):
+    fields = dict(
+        age=30,
+        weight=80.0,
+        height=180.0,
+        gender="Male",
+        goal=Goal.MUSCLE_GAIN,
+        activity_level=ActivityLevel.MODERATELY_ACTIVE,
+        dietary_restrictions=[],
+        injuries=[]
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+def exercise_loads():
+    return {e['name']: e['loads'] for group in EXERCISES.values() for e in group}
+
+
+class TestRuleBasedWorkout:
+    """Tests for the catalog-driven workout plan"""
+
+    def test_same_profile_gives_same_plan(self):
+        """Test output is deterministic"""
+        # Arrange
+        service = RuleBasedAIService()
+
+        # Act
+        first = service.generate_workout_plan(make_profile())
+        second = service.generate_workout_plan(make_profile())
+
+        # Assert
+        assert first == second
+        assert first['cacheable'] is False
+
+    def test_activity_level_sets_training_days(self):
+        """Test more active users get more sessions"""
+        service = RuleBasedAIService()
+
+        sedentary = service.generate_workout_plan(make_profile(activity_level=ActivityLevel.SEDENTARY))
+        moderate = service.generate_workout_plan(make_profile(activity_level=ActivityLevel.MODERATELY_ACTIVE))
+        very = service.generate_workout_plan(make_profile(activity_level=ActivityLevel.VERY_ACTIVE))
+
+        assert len(sedentary['sessions']) == 3
+        assert len(moderate['sessions']) == 4
+        assert len(very['sessions']) == 5
+
+    def test_injuries_exclude_conflicting_exercises(self):
+        """Test no exercise loads an injured body part"""
+        # Arrange
+        service = RuleBasedAIService()
+        profile = make_profile(injuries=["Left knee (ACL)", "lower back pain"])
+        loads = exercise_loads()
+
+        # Act
+        plan = service.generate_workout_plan(profile)
+
+        # Assert
+        names = [e['name'] for s in plan['sessions'] for e in s['exercises']]
+        assert names
+        for name in names:
+            assert not (loads[name] & {"knee", "back"}), name
+
+    def test_goal_sets_scheme_and_conditioning(self):
+        """Test weight loss uses higher reps and adds a conditioning finisher"""
+        service = RuleBasedAIService()
+
+        gain = service.generate_workout_plan(make_profile(goal=Goal.MUSCLE_GAIN))
+        loss = service.generate_workout_plan(make_profile(goal=Goal.WEIGHT_LOSS))
+
+        assert gain['sessions'][0]['exercises'][0]['sets'] == 4
+        assert gain['sessions'][0]['exercises'][0]['reps'] == "8-12"
+        assert loss['sessions'][0]['exercises'][0]['reps'] == "12-15"
+        assert loss['sessions'][0]['exercises'][-1]['reps'] == "20 min"
+        assert len(loss['sessions'][0]['exercises']) == len(gain['sessions'][0]['exercises']) + 1
+
+    def test_injury_keywords(self):
+        """Test free-text injuries map to body parts"""
+        assert injured_body_parts(["Rotator cuff tear", "tennis elbow"]) == {"shoulder", "elbow"}
+        assert injured_body_parts(["none"]) == set()
+
+    def test_unknown_injury_is_refused(self):
+        """Test an injury the catalog cannot map fails instead of being ignored"""
+        service = RuleBasedAIService()
+        profile = make_profile(injuries=["plantar fasciitis"])
+
+        with pytest.raises(ValueError, match="plantar fasciitis"):
+            service.generate_workout_plan(profile)
+
+
+class TestRuleBasedNutrition:
+    """Tests for the template-driven meal plan"""
+
+    def test_restrictions_filter_meals(self):
+        """Test a vegan profile never gets animal products"""
+        # Arrange
+        service = RuleBasedAIService()
+        profile = make_profile(dietary_restrictions=["Vegan"])
+
+        # Act
+        plan = service.generate_nutrition_plan(profile)
+
+        # Assert
+        ingredients = {i for d in plan['daily_plans'] for m in d['meals'] for i in m['ingredients']}
+        assert len(plan['daily_plans']) == 7
+        assert not ingredients & {"chicken breast", "eggs", "salmon", "greek yogurt", "cottage cheese"}
+
+    def test_calories_follow_goal(self):
+        """Test weight loss targets fewer calories than muscle gain"""
+        service = RuleBasedAIService()
+
+        def daily_calories(goal):
+            plan = service.generate_nutrition_plan(make_profile(goal=goal))
+            return sum(m['calories'] for m in plan['daily_plans'][0]['meals'])
+
+        assert daily_calories(Goal.WEIGHT_LOSS) < daily_calories(Goal.MUSCLE_GAIN)
+
+    def test_restriction_keywords(self):
+        """Test free-text restrictions map to meal tags"""
+        assert restriction_tags(["Lactose intolerant", "peanut allergy"]) == {"dairy_free", "nut_free"}
+
+    @pytest.mark.parametrize("restriction", ["egg allergy", "shellfish allergy", "halal", "pescatarian"])
+    def test_unknown_restriction_is_refused(self, restriction):
+        """Test a restriction the catalog cannot map fails instead of serving unconstrained meals"""
+        service = RuleBasedAIService()
+        profile = make_profile(dietary_restrictions=["Vegan", restriction])
+
+        with pytest.raises(ValueError, match=restriction):
+            service.generate_nutrition_plan(profile)
+
+    def test_no_matching_meal_is_refused(self, monkeypatch):
+        """Test a slot with no option meeting the restrictions fails instead of ignoring them"""
+        # Arrange
+        service = RuleBasedAIService()
+        profile = make_profile(dietary_restrictions=["vegan"])
+        breakfasts = [m for m in rule_based.MEALS["Breakfast"] if "vegan" not in m['tags']]
+        monkeypatch.setitem(rule_based.MEALS, "Breakfast", breakfasts)
+
+        # Act / Assert
+        with pytest.raises(ValueError, match="breakfast"):
+            service.generate_nutrition_plan(profile)
+
+
+class TestFallbackAIService:
+    """Tests for switching to the fallback provider"""
+
+    def test_uses_primary_when_it_answers(self):
+        """Test the fallback is not called on success"""
+        primary = Mock(spec=AIService)
+        primary.generate_workout_plan.return_value = {"sessions": [{"day": "Monday"}]}
+        fallback = Mock(spec=AIService)
+        service = FallbackAIService(primary, fallback, timeout_seconds=1)
+
+        result = service.generate_workout_plan(make_profile())
+
+        assert result == {"sessions": [{"day": "Monday"}]}
+        fallback.generate_workout_plan.assert_not_called()
+
+    def test_falls_back_on_error(self):
+        """Test a provider ValueError switches to the fallback"""
+        # Arrange
+        primary = Mock(spec=AIService)
+        primary.generate_nutrition_plan.side_effect = ValueError("Failed to generate plan")
+        service = FallbackAIService(primary, RuleBasedAIService(), timeout_seconds=1)
+
+        # Act
+        result = service.generate_nutrition_plan(make_profile())
+
+        # Assert
+        assert len(result['daily_plans']) == 7
+
+    def test_falls_back_on_timeout(self):
+        """Test a slow provider is abandoned after the timeout"""
+        # Arrange
+        primary = Mock(spec=AIService)
+        primary.generate_workout_plan.side_effect = lambda profile: time.sleep(1) or {"sessions": []}
+        service = FallbackAIService(primary, RuleBasedAIService(), timeout_seconds=0.05)
+
+        # Act
+        start = time.monotonic()
+        result = service.generate_workout_plan(make_profile())
+
+        # Assert
+        assert time.monotonic() - start < 0.5
+        assert result['sessions']
+        assert result['cacheable'] is False
+
+    def test_time_queued_for_a_thread_does_not_count_towards_timeout(self):
+        """Test a call waiting behind another one still gets its full timeout"""
+        # Arrange
+        primary = Mock(spec=AIService)
+        primary.generate_workout_plan.side_effect = lambda profile: time.sleep(0.2) or {"sessions": []}
+        service = FallbackAIService(primary, RuleBasedAIService(), timeout_seconds=0.3, max_workers=1)
+
+        # Act
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            results = list(callers.map(lambda _: service.generate_workout_plan(make_profile()), range(2)))
+
+        # Assert
+        assert results == [{"sessions": []}, {"sessions": []}]
+
+    def test_abandoned_calls_do_not_block_new_ones(self):
+        """Test once timed-out calls hold every thread, calls go straight to the fallback"""
+        # Arrange
+        release = threading.Event()
+        primary = Mock(spec=AIService)
+        primary.generate_workout_plan.side_effect = lambda profile: release.wait(5) and {"sessions": []}
+        service = FallbackAIService(primary, RuleBasedAIService(), timeout_seconds=0.05, max_workers=1)
+
+        # Act
+        service.generate_workout_plan(make_profile())
+        start = time.monotonic()
+        result = service.generate_workout_plan(make_profile())
+        elapsed = time.monotonic() - start
+        release.set()
+
+        # Assert
+        assert elapsed < 0.05
+        assert result['cacheable'] is False
+        primary.generate_workout_plan.assert_called_once()
+
+    def test_async_falls_back_on_timeout(self):
+        """Test the async path also gives up on a slow provider"""
+        # Arrange
+        class SlowService(RuleBasedAIService):
+            async def generate_workout_plan_async(self, profile):
+                await asyncio.sleep(1)
+                return {"sessions": []}
+
+        service = FallbackAIService(SlowService(), RuleBasedAIService(), timeout_seconds=0.05)
+
+        # Act
+        result = asyncio.run(service.generate_workout_plan_async(make_profile()))
+
+        # Assert
+        assert result['sessions']
+
+    def test_stream_falls_back_before_first_item(self):
+        """Test a stream that fails immediately is replaced by the fallback plan"""
+        # Arrange
+        class FailingStream(RuleBasedAIService):
+            async def stream_workout_sessions(self, profile):
+                raise ValueError("stream failed")
+                yield
+
+        service = FallbackAIService(FailingStream(), RuleBasedAIService(), timeout_seconds=1)
+
+        async def collect():
+            return [s async for s in service.stream_workout_sessions(make_profile())]
+
+        # Act
+        sessions = asyncio.run(collect())
+
+        # Assert
+        assert len(sessions) == 4
+
+    def test_streamed_fallback_plan_is_not_cached(
+        self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        """Test a plan streamed from the fallback never reaches the plan cache"""
+        # Arrange
+        class FailingStream(RuleBasedAIService):
+            async def stream_workout_sessions(self, profile):
+                raise ValueError("stream failed")
+                yield
+
+        mock_user_repo.get_by_id.return_value = sample_user
+        cache = PlanCache(TTLLRUCache(10, 60), PlanCacheStats())
+        service = PlanningService(
+            FallbackAIService(FailingStream(), RuleBasedAIService(), timeout_seconds=1),
+            mock_workout_repo, mock_nutrition_repo, mock_user_repo, plan_cache=cache
+        )
+
+        async def collect():
+            return [item async for item in service.stream_workout_plan(sample_user.id)]
+
+        # Act
+        items = asyncio.run(collect())
+
+        # Assert
+        assert items[-1].sessions
+        assert cache.get("workout", sample_user.profile) is None
+
+    def test_plan_repaired_by_fallback_is_not_cached(self):
+        """Test days the fallback filled in during repair keep the plan out of the cache"""
+        # Arrange
+        # A provider without repair support fails over like one that errors
+        service = FallbackAIService(Mock(spec=AIService), RuleBasedAIService(), timeout_seconds=1)
+
+        # Act
+        days = service.complete_nutrition_days(make_profile(), [], ["Monday", "Tuesday"])
+
+        # Assert
+        assert len(days) == 2
+        assert not is_cacheable("nutrition", {"daily_plans": days})
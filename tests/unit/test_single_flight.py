@@ -0,0 +1,189 @@
+"""
+Unit tests for duplicate-generation coalescing.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.application.single_flight import SingleFlight, GenerationLease
+from src.application.planning_service import PlanningService
+
+
+class TestSingleFlightThreads:
+    """Tests for coalescing across threads"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test only the leader runs while followers receive its result"""
+        group = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            release.wait(1)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(group.do("k", work))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        while group.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 5
+        assert all(r is results[0] for r in results)
+        assert group.in_flight() == 0
+
+    def test_errors_propagate_to_leader(self):
+        """Test the leader's exception is raised and the key is released"""
+        group = SingleFlight()
+
+        with pytest.raises(ValueError, match="boom"):
+            group.do("k", Mock(side_effect=ValueError("boom")))
+
+        assert group.do("k", lambda: 42) == 42
+
+
+class TestSingleFlightAsync:
+    """Tests for coalescing coroutines"""
+
+    def test_concurrent_coroutines_share_one_execution(self):
+        """Test concurrent awaits for the same key run the coroutine once"""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "plan"
+
+        async def main():
+            return await asyncio.gather(*(group.do_async("k", work) for _ in range(4)))
+
+        assert asyncio.run(main()) == ["plan"] * 4
+        assert len(calls) == 1
+
+    def test_different_keys_run_independently(self):
+        """Test different keys are not coalesced"""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(group.do_async("a", work), group.do_async("b", work))
+
+        asyncio.run(main())
+        assert len(calls) == 2
+
+
+class TestGenerationLease:
+    """Tests for cross-worker coalescing"""
+
+    def test_lease_holder_generates_and_releases(self):
+        """Test the worker that gets the lease generates and releases it"""
+        repo = Mock()
+        repo.acquire.return_value = True
+        lease = GenerationLease(repo, ttl_seconds=5, poll_seconds=0)
+        fetch = Mock()
+
+        assert lease.run("workout:u1", lambda: "new", fetch) == "new"
+        repo.release.assert_called_once()
+        fetch.assert_not_called()
+
+    def test_follower_waits_and_reuses_holder_result(self):
+        """Test a worker without the lease waits and returns the persisted result"""
+        repo = Mock()
+        repo.acquire.return_value = False
+        repo.is_held.side_effect = [True, True, False]
+        lease = GenerationLease(repo, ttl_seconds=5, poll_seconds=0)
+        generate = Mock()
+
+        assert lease.run("workout:u1", generate, lambda since: "theirs") == "theirs"
+        generate.assert_not_called()
+        assert repo.is_held.call_count == 3
+
+    def test_follower_generates_if_holder_left_nothing(self):
+        """Test a worker falls back to generating when no result was persisted"""
+        repo = Mock()
+        repo.acquire.return_value = False
+        repo.is_held.return_value = False
+        lease = GenerationLease(repo, ttl_seconds=5, poll_seconds=0)
+
+        assert asyncio.run(lease.run_async("workout:u1", _async_value("mine"), lambda since: None)) == "mine"
+
+    def test_async_lease_lookups_run_off_the_event_loop(self):
+        """Test acquiring, polling and fetching the holder's result never block the loop"""
+        # Arrange
+        threads = []
+        repo = Mock()
+        repo.acquire.side_effect = lambda *args: threads.append(threading.get_ident()) or False
+        repo.is_held.side_effect = lambda key: threads.append(threading.get_ident()) or len(threads) < 3
+        lease = GenerationLease(repo, ttl_seconds=5, poll_seconds=0)
+
+        def fetch(since):
+            threads.append(threading.get_ident())
+            return "theirs"
+
+        async def main():
+            return threading.get_ident(), await lease.run_async("workout:u1", _async_value("mine"), fetch)
+
+        # Act
+        loop_thread, result = asyncio.run(main())
+
+        # Assert
+        assert result == "theirs"
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+
+def _async_value(value):
+    async def produce():
+        return value
+    return produce
+
+
+class TestPlanningServiceCoalescing:
+    """Tests for single-flight integration in PlanningService"""
+
+    def test_duplicate_async_requests_share_one_plan(
+        self,
+        mock_ai_service,
+        mock_workout_repo,
+        mock_nutrition_repo,
+        mock_user_repo,
+        sample_user
+    ):
+        """Test concurrent generations for one user make one AI call and one draft"""
+        mock_user_repo.get_by_id.return_value = sample_user
+
+        def slow_generation(profile):
+            time.sleep(0.05)
+            return {"sessions": [{"day": "Monday", "focus": "Legs", "exercises": []}]}
+
+        mock_ai_service.generate_workout_plan.side_effect = slow_generation
+        service = PlanningService(
+            mock_ai_service,
+            mock_workout_repo,
+            mock_nutrition_repo,
+            mock_user_repo,
+            single_flight=SingleFlight()
+        )
+
+        async def main():
+            return await asyncio.gather(*(service.generate_workout_plan_async("user_123") for _ in range(3)))
+
+        plans = asyncio.run(main())
+
+        assert plans[0] is plans[1] is plans[2]
+        mock_ai_service.generate_workout_plan.assert_called_once()
+        mock_workout_repo.save.assert_called_once()
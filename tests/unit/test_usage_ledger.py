@@ -0,0 +1,205 @@
+"""
+Unit tests for the per-call AI usage ledger and its reports.
+"""
+import threading
+import pytest
+from unittest.mock import Mock
+from src.application.planning_service import PlanningService
+from src.application.usage_ledger import AIUsageLedger, ModelPrice, UsageContext, parse_prices, usage_scope
+from src.application.usage_service import AIUsageService
+from src.domain.models import AIUsageTotal
+from src.infrastructure.ai import base
+from src.infrastructure.ai.base import WORKOUT_SYSTEM_MESSAGE
+from src.infrastructure.ai.gemini import GeminiAIService
+from src.infrastructure.ai.parsing import parse_json_tolerant
+
+
+def make_gemini(ledger):
+    service = GeminiAIService("test-key", model="gemini-1.5-flash", usage_ledger=ledger)
+    service.model = Mock()
+    response = service.model.generate_content.return_value
+    response.text = '{"sessions": []}'
+    response.usage_metadata.prompt_token_count = 1000
+    response.usage_metadata.cached_content_token_count = 600
+    response.usage_metadata.candidates_token_count = 500
+    return service
+
+
+class TestPrices:
+    """Tests for the per-model price table"""
+
+    def test_parse_prices(self):
+        prices = parse_prices("gpt-4o-mini=0.15/0.60/0.075, gemini-1.5-flash=0.075/0.30")
+
+        assert prices["gpt-4o-mini"] == ModelPrice(0.15, 0.60, 0.075)
+        # Without a cached price, cached tokens cost the same as the rest of the prompt
+        assert prices["gemini-1.5-flash"] == ModelPrice(0.075, 0.30, 0.075)
+
+    def test_invalid_price_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_prices("gpt-4o-mini=cheap")
+
+    def test_cached_tokens_are_billed_at_the_cached_price(self):
+        price = ModelPrice(prompt=1.0, completion=4.0, cached=0.5)
+
+        assert price.cost(1_000_000, 400_000, 250_000) == pytest.approx(0.6 + 0.2 + 1.0)
+
+
+class TestLedger:
+    """Tests for buffering and attributing usage records"""
+
+    def test_records_are_written_in_batches(self):
+        # Arrange
+        batches = []
+        written = threading.Event()
+
+        def write_batch(records):
+            batches.append(records)
+            written.set()
+
+        ledger = AIUsageLedger(write_batch, batch_size=3, flush_seconds=60)
+
+        # Act
+        for _ in range(3):
+            ledger.record("gemini", "gemini-1.5-flash", latency_seconds=0.2)
+        written.wait(5)
+        ledger.close()
+
+        # Assert
+        assert [len(batch) for batch in batches] == [3]
+        assert batches[0][0].latency_ms == 200
+
+    def test_plan_id_set_after_the_call_is_attributed(self):
+        # Arrange
+        batches = []
+        ledger = AIUsageLedger(batches.append, parse_prices("gemini-1.5-flash=1/2"), flush_seconds=60)
+        context = UsageContext(endpoint="POST /plans/workout/generate", user_id="user-1", plan_type="workout")
+
+        # Act
+        with usage_scope(context):
+            ledger.record("gemini", "gemini-1.5-flash", prompt_tokens=1_000_000)
+        context.plan_id = "plan-1"
+        ledger.close()
+
+        # Assert
+        record = batches[0][0]
+        assert (record.endpoint, record.user_id, record.plan_type, record.plan_id) == (
+            "POST /plans/workout/generate", "user-1", "workout", "plan-1"
+        )
+        assert record.cost_usd == pytest.approx(1.0)
+
+    def test_failed_write_is_dropped(self):
+        ledger = AIUsageLedger(Mock(side_effect=RuntimeError("db down")), flush_seconds=60)
+        ledger.record("openai", "gpt-4o-mini")
+
+        assert ledger.flush() == 0
+        assert ledger.flush() == 0
+
+
+class TestProviderCalls:
+    """Tests for provider calls reaching the ledger"""
+
+    def test_successful_call_is_recorded_with_tokens(self):
+        # Arrange
+        batches = []
+        ledger = AIUsageLedger(batches.append, parse_prices("gemini-1.5-flash=0.075/0.30/0.01875"))
+        service = make_gemini(ledger)
+
+        # Act
+        service._call_ai_api("prompt")
+        ledger.flush()
+
+        # Assert
+        record = batches[0][0]
+        assert (record.provider, record.model, record.outcome) == ("gemini", "gemini-1.5-flash", "ok")
+        assert (record.prompt_tokens, record.cached_tokens, record.completion_tokens) == (1000, 600, 500)
+        assert record.cost_usd == pytest.approx((400 * 0.075 + 600 * 0.01875 + 500 * 0.30) / 1_000_000)
+
+    def test_failed_and_unparseable_calls_are_recorded(self):
+        batches = []
+        ledger = AIUsageLedger(batches.append)
+        service = make_gemini(ledger)
+
+        service.model.generate_content.return_value.text = "not json"
+        service._call_ai_api("prompt")
+        service.model.generate_content.side_effect = RuntimeError("quota")
+        with pytest.raises(ValueError):
+            service._call_ai_api("prompt")
+        ledger.flush()
+
+        assert [r.outcome for r in batches[0]] == ["parse_error", "error"]
+
+    def test_repaired_response_is_parsed_once(self, monkeypatch):
+        batches = []
+        ledger = AIUsageLedger(batches.append)
+        service = make_gemini(ledger)
+        service.model.generate_content.return_value.text = '{"sessions": [{"day": "Monday"}, {"day": "Tue'
+        parses = []
+        monkeypatch.setattr(base, "parse_json_tolerant", lambda *args: parses.append(args) or parse_json_tolerant(*args))
+
+        text = service._call_ai_api("prompt", system_message=WORKOUT_SYSTEM_MESSAGE)
+        data = service._parse_json_response(text, items_key='sessions')
+        ledger.flush()
+
+        assert len(parses) == 1
+        assert data['sessions'] == [{"day": "Monday"}] and data['cacheable'] is False
+        assert [r.outcome for r in batches[0]] == ["repaired"]
+
+    def test_plan_cache_hit_is_recorded_against_the_plan(
+        self, mock_workout_repo, mock_nutrition_repo, mock_user_repo, sample_user
+    ):
+        # Arrange
+        batches = []
+        ledger = AIUsageLedger(batches.append)
+        mock_user_repo.get_by_id.return_value = sample_user
+        plan_cache = Mock()
+        plan_cache.get.return_value = {"sessions": []}
+        service = PlanningService(
+            Mock(), mock_workout_repo, mock_nutrition_repo, mock_user_repo,
+            plan_cache=plan_cache, usage_ledger=ledger
+        )
+
+        # Act
+        plan = service.generate_workout_plan(sample_user.id)
+        ledger.flush()
+
+        # Assert
+        record = batches[0][0]
+        assert (record.provider, record.cache_hit) == ("plan_cache", True)
+        assert (record.user_id, record.plan_type, record.plan_id) == (sample_user.id, "workout", plan.id)
+
+
+class TestUsageReports:
+    """Tests for the spend and latency reports"""
+
+    def test_latency_percentiles_per_model(self):
+        # Arrange
+        usage_repo = Mock()
+        usage_repo.latencies.return_value = [("gemini", "gemini-1.5-flash", ms) for ms in range(1, 101)] + [
+            ("openai", "gpt-4o-mini", 900)
+        ]
+
+        # Act
+        report = AIUsageService(usage_repo).latency(days=1)
+
+        # Assert
+        assert report["gemini/gemini-1.5-flash"] == {"calls": 100, "p50_ms": 50, "p95_ms": 95}
+        assert report["openai/gpt-4o-mini"]["p95_ms"] == 900
+
+    def test_spend_adds_up_the_days(self):
+        usage_repo = Mock()
+        usage_repo.daily_totals.return_value = [
+            AIUsageTotal("2026-10-16", "gemini", calls=10, errors=1, cache_hits=0,
+                         prompt_tokens=9000, cached_tokens=0, completion_tokens=7000, cost_usd=0.25),
+            AIUsageTotal("2026-10-17", "gemini", calls=4, errors=0, cache_hits=2,
+                         prompt_tokens=3000, cached_tokens=1000, completion_tokens=2500, cost_usd=0.1),
+        ]
+
+        report = AIUsageService(usage_repo).spend(days=7, group_by="provider")
+
+        assert report["total_cost_usd"] == pytest.approx(0.35)
+        assert [day["calls"] for day in report["days"]] == [10, 4]
+
+    def test_days_must_be_positive(self):
+        with pytest.raises(ValueError):
+            AIUsageService(Mock()).spend(days=0)